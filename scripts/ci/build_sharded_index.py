@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+""" Build a compact, per-extension sharded copy of src/index.json.
+
+The output directory holds a small manifest.json with the latest version and sha256Digest of every
+extension, and one extensions/<name>.json file per extension with its full history, in the same form
+as its entry in index.json. A client resolving one extension reads the manifest and, when it needs
+more than the latest version, that extension's history file only.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from distutils.version import LooseVersion  # pylint: disable=deprecated-module
+
+from util import get_index_data
+
+MANIFEST_FILE_NAME = 'manifest.json'
+HISTORY_DIR_NAME = 'extensions'
+
+
+def _dumps(data):
+    return json.dumps(data, sort_keys=True, separators=(',', ':'))
+
+
+def build_sharded_index(index, output_dir):
+    """ Write the manifest and per-extension history files of index into output_dir, replacing its content.
+
+    An existing output_dir is only replaced when it is empty or holds a previous sharded index.
+    """
+    output_dir = os.path.abspath(output_dir)
+    if os.path.isdir(output_dir) and os.listdir(output_dir) and \
+            not os.path.isfile(os.path.join(output_dir, MANIFEST_FILE_NAME)):
+        raise ValueError('{} is not a sharded index, refusing to replace it'.format(output_dir))
+    parent_dir = os.path.dirname(output_dir)
+    staging_dir = tempfile.mkdtemp(dir=parent_dir, prefix='.sharded-index-')
+    try:
+        manifest = _write_sharded_index(index, staging_dir)
+        # build the new tree next to the old one and swap them with renames, readers see one build or the other
+        # (or briefly no directory) but never a manifest next to histories of another build
+        if os.path.isdir(output_dir):
+            old_dir = staging_dir + '-old'
+            os.replace(output_dir, old_dir)
+            try:
+                os.replace(staging_dir, output_dir)
+            except OSError:
+                os.replace(old_dir, output_dir)
+                raise
+            shutil.rmtree(old_dir)
+        else:
+            os.replace(staging_dir, output_dir)
+    except BaseException:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    return manifest
+
+
+def _write_sharded_index(index, staging_dir):
+    os.mkdir(os.path.join(staging_dir, HISTORY_DIR_NAME))
+    manifest = {'formatVersion': index['formatVersion'], 'extensions': {}}
+    for ext_name, exts in index['extensions'].items():
+        history = _dumps(exts).encode('utf-8')
+        history_path = '{}/{}.json'.format(HISTORY_DIR_NAME, ext_name)
+        with open(os.path.join(staging_dir, history_path), 'wb') as f:
+            f.write(history)
+        latest = max(exts, key=lambda item: LooseVersion(item['metadata']['version']))
+        manifest['extensions'][ext_name] = {
+            'version': latest['metadata']['version'],
+            'filename': latest['filename'],
+            'downloadUrl': latest['downloadUrl'],
+            'sha256Digest': latest['sha256Digest'],
+            'history': history_path,
+            'historySha256Digest': hashlib.sha256(history).hexdigest()
+        }
+    with open(os.path.join(staging_dir, MANIFEST_FILE_NAME), 'w') as f:
+        f.write(_dumps(manifest))
+    return manifest
+
+
+def load_manifest(output_dir):
+    with open(os.path.join(output_dir, MANIFEST_FILE_NAME)) as f:
+        return json.load(f)
+
+
+def load_extension_history(output_dir, manifest, ext_name):
+    """ Read the history of one extension, checking it against the digest recorded in the manifest """
+    with open(os.path.join(output_dir, manifest['extensions'][ext_name]['history']), 'rb') as f:
+        history = f.read()
+    if hashlib.sha256(history).hexdigest() != manifest['extensions'][ext_name]['historySha256Digest']:
+        raise ValueError("History of {} doesn't match the manifest".format(ext_name))
+    return json.loads(history.decode('utf-8'))
+
+
+def load_sharded_index(output_dir):
+    """ Reassemble the canonical index from a sharded index """
+    manifest = load_manifest(output_dir)
+    return {
+        'formatVersion': manifest['formatVersion'],
+        'extensions': {ext_name: load_extension_history(output_dir, manifest, ext_name)
+                       for ext_name in manifest['extensions']}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output-dir', required=True, help='Directory to write the sharded index to.')
+    args = parser.parse_args()
+    index = get_index_data()
+    manifest = build_sharded_index(index, args.output_dir)
+    if load_sharded_index(args.output_dir) != index:
+        raise AssertionError('The sharded index in {} does not match index.json'.format(args.output_dir))
+    print('Wrote {} extensions to {}'.format(len(manifest['extensions']), args.output_dir))
+
+
+if __name__ == '__main__':
+    main()
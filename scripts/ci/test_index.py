@@ -13,20 +13,13 @@ import os
 import json
 import tempfile
 import unittest
-import hashlib
 import shutil
 
 from distutils.version import LooseVersion
 from wheel.install import WHEEL_INFO_RE
 
-from util import get_ext_metadata, get_whl_from_url, get_index_data, verify_dependency
-
-
-def get_sha256sum(a_file):
-    sha256 = hashlib.sha256()
-    with open(a_file, 'rb') as f:
-        sha256.update(f.read())
-    return sha256.hexdigest()
+from build_sharded_index import build_sharded_index, load_manifest, load_sharded_index
+from util import get_ext_metadata, get_verified_whls, get_index_data, verify_dependency
 
 
 class TestIndex(unittest.TestCase):
@@ -36,7 +29,11 @@ class TestIndex(unittest.TestCase):
         cls.longMessage = True
         cls.index = get_index_data()
         cls.whl_cache_dir = tempfile.mkdtemp()
-        cls.whl_cache = {}
+        cls.whls = {}
+        if os.getenv('CI'):
+            # download and hash all wheels in parallel once, verified ones are cached across runs
+            cls.whls = get_verified_whls([item for exts in cls.index['extensions'].values() for item in exts],
+                                         cls.whl_cache_dir)
 
     @classmethod
     def tearDownClass(cls):
@@ -103,13 +100,32 @@ class TestIndex(unittest.TestCase):
             filename_seen.add(f)
         self.assertFalse(dups, "Duplicate filenames found {}".format(dups))
 
+    def test_sharded_index(self):
+        output_dir = os.path.join(self.whl_cache_dir, 'sharded-index')
+        build_sharded_index(self.index, output_dir)
+        self.assertEqual(load_sharded_index(output_dir), self.index,
+                         "The sharded index doesn't reassemble to index.json")
+        manifest = load_manifest(output_dir)
+        for ext_name, exts in self.index['extensions'].items():
+            latest = max(exts, key=lambda item: LooseVersion(item['metadata']['version']))
+            self.assertEqual(manifest['extensions'][ext_name]['sha256Digest'], latest['sha256Digest'])
+
+        # a rebuild replaces the previous output, but a directory that isn't a sharded index is left alone
+        build_sharded_index(self.index, output_dir)
+        self.assertEqual(load_manifest(output_dir), manifest)
+        self.assertEqual(sorted(os.listdir(self.whl_cache_dir)), ['sharded-index'])
+        other_dir = os.path.join(self.whl_cache_dir, 'other')
+        os.mkdir(other_dir)
+        open(os.path.join(other_dir, 'keep.txt'), 'w').close()
+        with self.assertRaises(ValueError):
+            build_sharded_index(self.index, other_dir)
+        self.assertEqual(os.listdir(other_dir), ['keep.txt'])
+
     @unittest.skipUnless(os.getenv('CI'), 'Skipped as not running on CI')
     def test_checksums(self):
         for exts in self.index['extensions'].values():
             for item in exts:
-                ext_file = get_whl_from_url(item['downloadUrl'], item['filename'],
-                                            self.whl_cache_dir, self.whl_cache)
-                computed_hash = get_sha256sum(ext_file)
+                _, computed_hash = self.whls[item['filename']]
                 self.assertEqual(computed_hash, item['sha256Digest'],
                                  "Computed {} but found {} in index for {}".format(computed_hash,
                                                                                    item['sha256Digest'],
@@ -131,18 +147,15 @@ class TestIndex(unittest.TestCase):
             'log-analytics': '0.2.1'
         }
 
-        extensions_dir = tempfile.mkdtemp()
         for ext_name, exts in self.index['extensions'].items():
             for item in exts:
-                ext_dir = tempfile.mkdtemp(dir=extensions_dir)
-                ext_file = get_whl_from_url(item['downloadUrl'], item['filename'],
-                                            self.whl_cache_dir, self.whl_cache)
+                ext_file, _ = self.whls[item['filename']]
 
                 print(ext_file)
 
                 ext_version = item['metadata']['version']
                 try:
-                    metadata = get_ext_metadata(ext_dir, ext_file, ext_name)    # check file exists
+                    metadata = get_ext_metadata(ext_file, ext_name)    # check file exists
                 except ValueError as ex:
                     if ext_name in skipable_extension_thresholds:
                         threshold_version = skipable_extension_thresholds[ext_name]
@@ -187,7 +200,6 @@ class TestIndex(unittest.TestCase):
                         all(verify_dependency(dep) for dep in deps),
                         "Dependencies of {} use disallowed extension dependencies. "
                         "Remove these dependencies: {}".format(item['filename'], deps))
-        shutil.rmtree(extensions_dir)
 
 
 if __name__ == '__main__':
@@ -106,9 +106,8 @@ class TestSourceWheels(unittest.TestCase):
                 self.fail("Unable to build extension {} : {}".format(s, err))
         for filename in os.listdir(built_whl_dir):
             ext_file = os.path.join(built_whl_dir, filename)
-            ext_dir = tempfile.mkdtemp(dir=built_whl_dir)
             ext_name = WHEEL_INFO_RE(filename).groupdict().get('name')
-            metadata = get_ext_metadata(ext_dir, ext_file, ext_name)
+            metadata = get_ext_metadata(ext_file, ext_name)
             run_requires = metadata.get('run_requires')
             if run_requires:
                 deps = run_requires[0]['requires']
@@ -4,36 +4,67 @@
 # --------------------------------------------------------------------------------------------
 
 import filecmp
+import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from azure.cli.core import get_default_cli
-from azure.cli.core._session import Session
 from azure.cli.core.commands import _load_extension_command_loader
-from azure.cli.core.extension import get_extension_modname, get_extension_path
+from azure.cli.core.extension import get_extension, get_extension_modname, get_extension_path
 from azure.storage.blob import BlockBlobService
 from sync_extensions import download_file
+from util import get_index_data
 
 STORAGE_ACCOUNT_KEY = os.getenv('AZURE_EXTENSION_CMD_TREE_STORAGE_ACCOUNT_KEY')
 STORAGE_ACCOUNT = os.getenv('AZURE_EXTENSION_CMD_TREE_STORAGE_ACCOUNT')
 STORAGE_CONTAINER = os.getenv('AZURE_EXTENSION_CMD_TREE_STORAGE_CONTAINER')
 
-az_cli = get_default_cli()
 file_name = 'extCmdTreeToUpload.json'
+# command subtree of every extension, keyed by the sha256Digest of the wheel it was built from
+subtrees_blob_name = 'extensionCommandSubtrees.json'
+subtrees_file_name = 'extCmdSubtrees.json'
 
 
-def merge(data, key, value):
-    if isinstance(value, str):
-        if key in data:
-            raise Exception(f"Key: {key} already exists in {data[key]}. 2 extensions cannot have the same command!")
+def merge(data, key, value, path=(), conflicts=None):
+    """ Merge the command (sub)tree value into data[key], recording the commands two extensions both define """
+    if conflicts is None:
+        conflicts = []
+    existing = data.get(key)
+    if existing is None:
         data[key] = value
+    elif isinstance(value, str) or isinstance(existing, str):
+        conflicts.append(f"{' '.join(path + (key,))}: {_owners(existing)} and {_owners(value)}")
     else:
-        data.setdefault(key, {})
         for k, v in value.items():
-            merge(data[key], k, v)
+            merge(existing, k, v, path + (key,), conflicts)
+    return conflicts
 
 
-def update_cmd_tree(ext_name):
+def _owners(value):
+    if isinstance(value, str):
+        return value
+    owners = set()
+    for v in value.values():
+        owners.update(_owners(v).split(', '))
+    return ', '.join(sorted(owners))
+
+
+def merge_subtrees(subtrees):
+    """ Merge the subtrees of all extensions at once, raising one error that lists every conflict """
+    tree = {}
+    conflicts = []
+    for ext_name in sorted(subtrees):
+        for k, v in subtrees[ext_name].items():
+            merge(tree, k, json.loads(json.dumps(v)), conflicts=conflicts)
+    if conflicts:
+        raise Exception("2 extensions cannot have the same command! Conflicts:\n" + '\n'.join(conflicts))
+    return tree
+
+
+def build_cmd_subtree(ext_name):
+    """ Load an extension and return its command tree. Run in a worker process with a CLI of its own """
     print(f"Processing {ext_name}")
+    az_cli = get_default_cli()
 
     ext_dir = get_extension_path(ext_name)
     ext_mod = get_extension_modname(ext_name, ext_dir=ext_dir)
@@ -46,8 +77,6 @@ def update_cmd_tree(ext_name):
     extension_command_table, _ = _load_extension_command_loader(invoker.commands_loader,
                                                                 "", ext_mod)
 
-    EXT_CMD_TREE_TO_UPLOAD = Session()
-    EXT_CMD_TREE_TO_UPLOAD.load(os.path.expanduser(os.path.join('~', '.azure', file_name)))
     root = {}
     for cmd_name, ext_cmd in extension_command_table.items():
         try:
@@ -67,18 +96,63 @@ def update_cmd_tree(ext_name):
             else:
                 parent[part] = {}
             parent = parent[part]
-    print(root)
-    for k, v in root.items():
-        merge(EXT_CMD_TREE_TO_UPLOAD.data, k, v)
-    EXT_CMD_TREE_TO_UPLOAD.save_with_retry()
+    return root
+
+
+def get_installed_digests(ext_names):
+    """ Map each installed extension to the sha256Digest of its version in index.json, if listed """
+    index = get_index_data()['extensions']
+    digests = {}
+    for ext_name in ext_names:
+        version = get_extension(ext_name).version
+        digests[ext_name] = next((item['sha256Digest'] for item in index.get(ext_name, [])
+                                  if item['metadata']['version'] == version), None)
+    return digests
+
+
+def update_cmd_tree(ext_names, cached_subtrees, max_workers=None):
+    """ Build the command tree, only loading the extensions whose wheel changed since the cached subtrees """
+    digests = get_installed_digests(ext_names)
+    subtrees = {}
+    stale = []
+    for ext_name in ext_names:
+        cached = cached_subtrees.get(ext_name)
+        if cached and digests[ext_name] and cached.get('sha256Digest') == digests[ext_name]:
+            subtrees[ext_name] = cached
+        else:
+            stale.append(ext_name)
+    print(f"Reusing the command tree of {len(subtrees)} extension(s), loading {len(stale)}")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for ext_name, tree in zip(stale, executor.map(build_cmd_subtree, stale)):
+            subtrees[ext_name] = {'sha256Digest': digests[ext_name], 'tree': tree}
+
+    return merge_subtrees({k: v['tree'] for k, v in subtrees.items()}), subtrees
+
+
+def _get_blob_client():
+    return BlockBlobService(account_name=STORAGE_ACCOUNT, account_key=STORAGE_ACCOUNT_KEY)
+
+
+def download_cached_subtrees():
+    from azure.common import AzureMissingResourceHttpError
+    try:
+        blob = _get_blob_client().get_blob_to_text(container_name=STORAGE_CONTAINER, blob_name=subtrees_blob_name)
+        return json.loads(blob.content)
+    except (AzureMissingResourceHttpError, ValueError) as ex:
+        print(f"No usable cached command subtrees, loading all extensions: {ex}")
+        return {}
 
 
-def upload_cmd_tree():
+def upload_cmd_tree(subtrees):
     blob_file_name = 'extensionCommandTree.json'
     downloaded_file_name = 'extCmdTreeDownloaded.json'
     file_path = os.path.expanduser(os.path.join('~', '.azure', file_name))
+    subtrees_file_path = os.path.expanduser(os.path.join('~', '.azure', subtrees_file_name))
+    with open(subtrees_file_path, 'w') as f:
+        json.dump(subtrees, f)
 
-    client = BlockBlobService(account_name=STORAGE_ACCOUNT, account_key=STORAGE_ACCOUNT_KEY)
+    client = _get_blob_client()
     client.create_blob_from_path(container_name=STORAGE_CONTAINER, blob_name=blob_file_name,
                                  file_path=file_path)
 
@@ -90,10 +164,13 @@ def upload_cmd_tree():
         print("extensionCommandTree.json uploaded successfully. URL: {}".format(url))
     else:
         raise Exception("Failed to update extensionCommandTree.json in the storage account")
+    # only cache the subtrees once the tree built from them is published
+    client.create_blob_from_path(container_name=STORAGE_CONTAINER, blob_name=subtrees_blob_name,
+                                 file_path=subtrees_file_path)
 
 
 if __name__ == '__main__':
-    for ext in sys.argv[1:]:
-        update_cmd_tree(ext)
-        print()
-    upload_cmd_tree()
+    cmd_tree, ext_subtrees = update_cmd_tree(sys.argv[1:], download_cached_subtrees())
+    with open(os.path.expanduser(os.path.join('~', '.azure', file_name)), 'w') as f:
+        json.dump(cmd_tree, f)
+    upload_cmd_tree(ext_subtrees)
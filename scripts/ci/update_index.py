@@ -3,24 +3,16 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
-import hashlib
 import json
 import re
 import sys
 import tempfile
 
-from util import get_ext_metadata, get_whl_from_url
+from util import get_ext_metadata, get_sha256sum, get_whl_from_url
 
 NAME_REGEX = r'.*/([^/]*)-\d+.\d+.\d+'
 
 
-def get_sha256sum(a_file):
-    sha256 = hashlib.sha256()
-    with open(a_file, 'rb') as f:
-        sha256.update(f.read())
-    return sha256.hexdigest()
-
-
 def main():
 
     # Get extension WHL from URL
@@ -39,8 +31,6 @@ def main():
     except IndexError:
         raise ValueError('unable to parse extension name')
 
-    extensions_dir = tempfile.mkdtemp()
-    ext_dir = tempfile.mkdtemp(dir=extensions_dir)
     whl_cache_dir = tempfile.mkdtemp()
     whl_cache = {}
     ext_file = get_whl_from_url(whl_path, extension_name, whl_cache_dir, whl_cache)
@@ -56,7 +46,7 @@ def main():
     entry[0]['downloadUrl'] = whl_path
     entry[0]['sha256Digest'] = get_sha256sum(ext_file)
     entry[0]['filename'] = whl_path.split('/')[-1]
-    entry[0]['metadata'] = get_ext_metadata(ext_dir, ext_file, extension_name)
+    entry[0]['metadata'] = get_ext_metadata(ext_file, extension_name)
 
     # update index and write back to file
     curr_index['extensions'][extension_name] = entry
@@ -6,12 +6,21 @@
 import os
 import re
 import json
+import hashlib
+import threading
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 
 # Dependencies that will not be checked.
 # This is for packages starting with 'azure-' but do not use the 'azure' namespace.
 SKIP_DEP_CHECK = ['azure-batch-extensions']
 
+CHUNK_SIZE = 1024 * 1024
+MAX_DOWNLOAD_WORKERS = 16
+# verified wheels are kept here across runs, named by a hash of their download URL and their sha256 digest
+WHEEL_CACHE_DIR = os.environ.get('AZEXT_CI_WHEEL_CACHE',
+                                 os.path.join(os.path.expanduser('~'), '.cache', 'azure-cli-extensions', 'wheels'))
+
 # copy from wheel==0.30.0
 WHEEL_INFO_RE = re.compile(
     r"""^(?P<namever>(?P<name>.+?)(-(?P<ver>\d.+?))?)
@@ -27,53 +36,82 @@ def get_repo_root():
     return current_dir
 
 
-def _get_extension_modname(ext_dir):
+def _get_extension_modname(names):
     # Modification of https://github.com/Azure/azure-cli/blob/dev/src/azure-cli-core/azure/cli/core/extension.py#L153
     EXTENSIONS_MOD_PREFIX = 'azext_'
-    pos_mods = [n for n in os.listdir(ext_dir)
-                if n.startswith(EXTENSIONS_MOD_PREFIX) and os.path.isdir(os.path.join(ext_dir, n))]
+    pos_mods = sorted({n.split('/')[0] for n in names if n.startswith(EXTENSIONS_MOD_PREFIX) and '/' in n})
     if len(pos_mods) != 1:
         raise AssertionError("Expected 1 module to load starting with "
                              "'{}': got {}".format(EXTENSIONS_MOD_PREFIX, pos_mods))
     return pos_mods[0]
 
 
-def _get_azext_metadata(ext_dir):
-    # Modification of https://github.com/Azure/azure-cli/blob/dev/src/azure-cli-core/azure/cli/core/extension.py#L109
-    AZEXT_METADATA_FILENAME = 'azext_metadata.json'
-    azext_metadata = None
-    ext_modname = _get_extension_modname(ext_dir=ext_dir)
-    azext_metadata_filepath = os.path.join(ext_dir, ext_modname, AZEXT_METADATA_FILENAME)
-    if os.path.isfile(azext_metadata_filepath):
-        with open(azext_metadata_filepath) as f:
-            azext_metadata = json.load(f)
-    return azext_metadata
+def _read_json_member(zip_ref, name):
+    with zip_ref.open(name) as f:
+        return json.loads(f.read().decode('utf-8'))
 
 
-def get_ext_metadata(ext_dir, ext_file, ext_name):
+def get_ext_metadata(ext_file, ext_name):
     # Modification of https://github.com/Azure/azure-cli/blob/dev/src/azure-cli-core/azure/cli/core/extension.py#L89
+    # The metadata files are read from the wheel directly rather than from an extracted copy.
+    AZEXT_METADATA_FILENAME = 'azext_metadata.json'
     WHL_METADATA_FILENAME = 'metadata.json'
-    zip_ref = zipfile.ZipFile(ext_file, 'r')
-    zip_ref.extractall(ext_dir)
-    zip_ref.close()
     metadata = {}
-    dist_info_dirs = [f for f in os.listdir(ext_dir) if f.endswith('.dist-info')]
+    with zipfile.ZipFile(ext_file, 'r') as zip_ref:
+        names = set(zip_ref.namelist())
+        azext_metadata_name = '{}/{}'.format(_get_extension_modname(names), AZEXT_METADATA_FILENAME)
+        if azext_metadata_name not in names:
+            raise ValueError('azext_metadata.json for Extension "{}" Metadata is missing'.format(ext_name))
+        metadata.update(_read_json_member(zip_ref, azext_metadata_name))
+
+        dist_info_dirs = sorted({n.split('/')[0] for n in names if n.split('/')[0].endswith('.dist-info')})
+        for dist_info_dirname in dist_info_dirs:
+            parsed_dist_info_dir = WHEEL_INFO_RE(dist_info_dirname)
+            if parsed_dist_info_dir and parsed_dist_info_dir.groupdict().get('name') == ext_name.replace('-', '_'):
+                whl_metadata_name = '{}/{}'.format(dist_info_dirname, WHL_METADATA_FILENAME)
+                if whl_metadata_name in names:
+                    metadata.update(_read_json_member(zip_ref, whl_metadata_name))
+    return metadata
 
-    azext_metadata = _get_azext_metadata(ext_dir)
 
-    if not azext_metadata:
-        raise ValueError('azext_metadata.json for Extension "{}" Metadata is missing'.format(ext_name))
+def get_sha256sum(a_file):
+    sha256 = hashlib.sha256()
+    with open(a_file, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
 
-    metadata.update(azext_metadata)
 
-    for dist_info_dirname in dist_info_dirs:
-        parsed_dist_info_dir = WHEEL_INFO_RE(dist_info_dirname)
-        if parsed_dist_info_dir and parsed_dist_info_dir.groupdict().get('name') == ext_name.replace('-', '_'):
-            whl_metadata_filepath = os.path.join(ext_dir, dist_info_dirname, WHL_METADATA_FILENAME)
-            if os.path.isfile(whl_metadata_filepath):
-                with open(whl_metadata_filepath) as f:
-                    metadata.update(json.load(f))
-    return metadata
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """ A requests session shared by all threads, with a connection pool per host large enough for all workers """
+    global _session  # pylint: disable=global-statement
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_DOWNLOAD_WORKERS, pool_maxsize=MAX_DOWNLOAD_WORKERS,
+                                  max_retries=3)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
+
+
+def download_whl(url, ext_file):
+    """ Download a wheel to ext_file and return its sha256 digest, computed while downloading """
+    sha256 = hashlib.sha256()
+    with get_session().get(url, stream=True) as r:
+        assert r.status_code == 200, "Request to {} failed with {}".format(url, r.status_code)
+        with open(ext_file, 'wb') as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:  # ignore keep-alive new chunks
+                    f.write(chunk)
+                    sha256.update(chunk)
+    return sha256.hexdigest()
 
 
 def get_whl_from_url(url, filename, tmp_dir, whl_cache=None):
@@ -81,18 +119,42 @@ def get_whl_from_url(url, filename, tmp_dir, whl_cache=None):
         whl_cache = {}
     if url in whl_cache:
         return whl_cache[url]
-    import requests
-    r = requests.get(url, stream=True)
-    assert r.status_code == 200, "Request to {} failed with {}".format(url, r.status_code)
     ext_file = os.path.join(tmp_dir, filename)
-    with open(ext_file, 'wb') as f:
-        for chunk in r.iter_content(chunk_size=1024):
-            if chunk:  # ignore keep-alive new chunks
-                f.write(chunk)
+    download_whl(url, ext_file)
     whl_cache[url] = ext_file
     return ext_file
 
 
+def get_verified_whl(item, tmp_dir, cache_dir=WHEEL_CACHE_DIR):
+    """ Return (wheel path, computed sha256) for an index entry.
+
+    A wheel whose digest matches the index is moved into cache_dir under its download URL and digest, so
+    later runs skip downloading and hashing it. An entry whose URL changed is downloaded again, even if
+    its digest is cached, so the published URL is always checked. Wheels that don't match are left in tmp_dir.
+    """
+    url_digest = hashlib.sha256(item['downloadUrl'].encode('utf-8')).hexdigest()
+    cached_file = os.path.join(cache_dir, '{}-{}.whl'.format(url_digest, item['sha256Digest']))
+    if os.path.isfile(cached_file):
+        return cached_file, item['sha256Digest']
+    ext_file = os.path.join(tmp_dir, item['filename'])
+    computed_hash = download_whl(item['downloadUrl'], ext_file)
+    if computed_hash != item['sha256Digest']:
+        return ext_file, computed_hash
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        os.replace(ext_file, cached_file)
+        return cached_file, computed_hash
+    except OSError:
+        return ext_file, computed_hash
+
+
+def get_verified_whls(items, tmp_dir, cache_dir=WHEEL_CACHE_DIR, max_workers=MAX_DOWNLOAD_WORKERS):
+    """ Download and hash the wheels of index entries in parallel. Return {filename: (wheel path, sha256)} """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(lambda item: get_verified_whl(item, tmp_dir, cache_dir), items)
+        return {item['filename']: result for item, result in zip(items, results)}
+
+
 SRC_PATH = os.path.join(get_repo_root(), 'src')
 INDEX_PATH = os.path.join(SRC_PATH, 'index.json')
 
@@ -0,0 +1,114 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import stat
+import tempfile
+
+import yaml  # pylint: disable=import-error
+from knack.prompting import prompt_y_n, NoTTYException
+from knack.util import CLIError
+
+# the libyaml bindings are several times faster on large kubeconfig files; fall back to pure python
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper  # pylint: disable=import-error
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper  # pylint: disable=import-error
+
+MERGE_KEYS = ('clusters', 'users', 'contexts')
+
+
+class KubeconfigConflictError(CLIError):
+    """A different object with the same name already exists in the kubeconfig file."""
+
+
+def load_kubeconfig(stream):
+    """Parse a kubeconfig from a string or file object."""
+    return yaml.load(stream, Loader=_SafeLoader)
+
+
+def dump_kubeconfig(config, stream):
+    yaml.dump(config, stream, Dumper=_SafeDumper, default_flow_style=False)
+
+
+def merge_named_entries(existing, addition, key, replace):
+    """Merge the named entries of `addition[key]` into `existing[key]`.
+
+    Entries are indexed by name so the merge is linear in the size of both lists. An existing entry
+    with the same name is dropped if `replace` is set, if it is identical to the new one or if the
+    user agrees to overwrite it; otherwise KubeconfigConflictError is raised. New entries are appended
+    in order after the entries that were kept.
+    """
+    if not addition.get(key):
+        return
+    if existing.get(key) is None:
+        existing[key] = addition[key]
+        return
+
+    entries = list(existing[key])
+    positions = {}
+    for pos, entry in enumerate(entries):
+        positions.setdefault(entry['name'], []).append(pos)
+
+    for item in addition[key]:
+        name = item['name']
+        for pos in positions.pop(name, []):
+            if not (replace or item == entries[pos] or _confirm_overwrite(name)):
+                msg = 'A different object named {} already exists in {} in your kubeconfig file.'
+                raise KubeconfigConflictError(msg.format(name, key))
+            entries[pos] = None
+        positions[name] = [len(entries)]
+        entries.append(item)
+
+    existing[key] = [x for x in entries if x is not None]
+
+
+def _confirm_overwrite(name):
+    msg = 'A different object named {} already exists in your kubeconfig file.\nOverwrite?'
+    try:
+        return prompt_y_n(msg.format(name))
+    except NoTTYException:
+        return False
+
+
+def merge_kubeconfigs(existing, additions, replace):
+    """Merge several kubeconfig objects into `existing` in a single pass and return the result.
+
+    The current context of the last addition becomes the current context of the merged config.
+    """
+    for addition in additions:
+        if existing is None:
+            existing = addition
+            continue
+        for key in MERGE_KEYS:
+            merge_named_entries(existing, addition, key, replace)
+        existing['current-context'] = addition['current-context']
+    return existing
+
+
+def write_kubeconfig(config, path):
+    """Write a kubeconfig atomically: dump to a temporary file next to the target, then rename it.
+
+    Symbolic links are followed and the permissions of an existing file are kept, so a failure midway
+    never leaves a truncated kubeconfig behind.
+    """
+    path = os.path.realpath(path)
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        mode = 0o600
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.kubeconfig-')
+    try:
+        with os.fdopen(fd, 'wt') as stream:
+            dump_kubeconfig(config, stream)
+            stream.flush()
+            os.fsync(stream.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
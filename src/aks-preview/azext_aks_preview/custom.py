@@ -75,6 +75,7 @@ from .vendored_sdks.azure_mgmt_preview_aks.v2020_11_01.models import (ContainerS
                                                                       ManagedClusterPodIdentity,
                                                                       ManagedClusterPodIdentityException,
                                                                       UserAssignedIdentity)
+from ._kubeconfig import load_kubeconfig, merge_kubeconfigs, merge_named_entries, write_kubeconfig
 from ._client_factory import cf_resource_groups
 from ._client_factory import get_auth_management_client
 from ._client_factory import get_graph_rbac_management_client
@@ -2812,6 +2813,13 @@ def _print_or_merge_credentials(path, kubeconfig, overwrite_existing, context_na
         print(kubeconfig)
         return
 
+    _merge_credentials(path, [(kubeconfig, context_name)], overwrite_existing)
+
+
+def _merge_credentials(path, kubeconfigs, overwrite_existing):
+    """Merge several unencrypted kubeconfigs, given as (kubeconfig, context_name) pairs, into the
+    file at the specified path with a single read and a single write.
+    """
     # ensure that at least an empty ~/.kube/config exists
     directory = os.path.dirname(path)
     if directory and not os.path.exists(directory):
@@ -2824,52 +2832,22 @@ def _print_or_merge_credentials(path, kubeconfig, overwrite_existing, context_na
         with os.fdopen(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600), 'wt'):
             pass
 
-    # merge the new kubeconfig into the existing one
-    fd, temp_path = tempfile.mkstemp()
-    additional_file = os.fdopen(fd, 'w+t')
+    # merge the new kubeconfigs into the existing one
     try:
-        additional_file.write(kubeconfig)
-        additional_file.flush()
-        merge_kubernetes_configurations(path, temp_path, overwrite_existing, context_name)
+        additions = [(load_kubeconfig(kubeconfig), context_name) for kubeconfig, context_name in kubeconfigs]
+        _merge_kubernetes_configuration_objects(path, additions, overwrite_existing)
     except yaml.YAMLError as ex:
         logger.warning('Failed to merge credentials to kube config file: %s', ex)
-    finally:
-        additional_file.close()
-        os.remove(temp_path)
 
 
 def _handle_merge(existing, addition, key, replace):
-    if not addition[key]:
-        return
-    if existing[key] is None:
-        existing[key] = addition[key]
-        return
-
-    for i in addition[key]:
-        for j in existing[key]:
-            if i['name'] == j['name']:
-                if replace or i == j:
-                    existing[key].remove(j)
-                else:
-                    from knack.prompting import prompt_y_n
-                    msg = 'A different object named {} already exists in your kubeconfig file.\nOverwrite?'
-                    overwrite = False
-                    try:
-                        overwrite = prompt_y_n(msg.format(i['name']))
-                    except NoTTYException:
-                        pass
-                    if overwrite:
-                        existing[key].remove(j)
-                    else:
-                        msg = 'A different object named {} already exists in {} in your kubeconfig file.'
-                        raise CLIError(msg.format(i['name'], key))
-        existing[key].append(i)
+    merge_named_entries(existing, addition, key, replace)
 
 
 def load_kubernetes_configuration(filename):
     try:
         with open(filename) as stream:
-            return yaml.safe_load(stream)
+            return load_kubeconfig(stream)
     except (IOError, OSError) as ex:
         if getattr(ex, 'errno', 0) == errno.ENOENT:
             raise CLIError('{} does not exist'.format(filename))
@@ -2878,9 +2856,13 @@ def load_kubernetes_configuration(filename):
 
 
 def merge_kubernetes_configurations(existing_file, addition_file, replace, context_name=None):
-    existing = load_kubernetes_configuration(existing_file)
     addition = load_kubernetes_configuration(addition_file)
+    if addition is None:
+        raise CLIError('failed to load additional configuration from {}'.format(addition_file))
+    _merge_kubernetes_configuration_objects(existing_file, [(addition, context_name)], replace)
+
 
+def _prepare_kubernetes_configuration(addition, context_name):
     if context_name is not None:
         addition['contexts'][0]['name'] = context_name
         addition['contexts'][0]['context']['cluster'] = context_name
@@ -2896,17 +2878,16 @@ def merge_kubernetes_configurations(existing_file, addition_file, replace, conte
                 break
         except (KeyError, TypeError):
             continue
+    return addition
 
-    if addition is None:
-        raise CLIError('failed to load additional configuration from {}'.format(addition_file))
 
-    if existing is None:
-        existing = addition
-    else:
-        _handle_merge(existing, addition, 'clusters', replace)
-        _handle_merge(existing, addition, 'users', replace)
-        _handle_merge(existing, addition, 'contexts', replace)
-        existing['current-context'] = addition['current-context']
+def _merge_kubernetes_configuration_objects(existing_file, additions, replace):
+    existing = load_kubernetes_configuration(existing_file)
+    for addition, _ in additions:
+        if addition is None:
+            raise CLIError('failed to load additional configuration')
+    additions = [_prepare_kubernetes_configuration(addition, context_name) for addition, context_name in additions]
+    existing = merge_kubeconfigs(existing, additions, replace)
 
     # check that ~/.kube/config is only read- and writable by its owner
     if platform.system() != 'Windows':
@@ -2915,10 +2896,9 @@ def merge_kubernetes_configurations(existing_file, addition_file, replace, conte
             logger.warning('%s has permissions "%s".\nIt should be readable and writable only by its owner.',
                            existing_file, existing_file_perms)
 
-    with open(existing_file, 'w+') as stream:
-        yaml.safe_dump(existing, stream, default_flow_style=False)
+    write_kubeconfig(existing, existing_file)
 
-    current_context = addition.get('current-context', 'UNKNOWN')
+    current_context = additions[-1].get('current-context', 'UNKNOWN') if additions else 'UNKNOWN'
     msg = 'Merged "{}" as current context in {}'.format(current_context, existing_file)
     print(msg)
 
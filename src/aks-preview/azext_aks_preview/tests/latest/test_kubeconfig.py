@@ -0,0 +1,96 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+from azext_aks_preview import _kubeconfig as kubeconfig
+
+
+def _config(name, server='https://{}.example.com', current=None):
+    return {
+        'apiVersion': 'v1',
+        'kind': 'Config',
+        'clusters': [{'name': name, 'cluster': {'server': server.format(name)}}],
+        'users': [{'name': 'clusterUser_' + name, 'user': {'token': name}}],
+        'contexts': [{'name': name, 'context': {'cluster': name, 'user': 'clusterUser_' + name}}],
+        'current-context': current or name,
+    }
+
+
+class TestMergeNamedEntries(unittest.TestCase):
+    def test_merge_into_empty(self):
+        existing = {'clusters': None}
+        kubeconfig.merge_named_entries(existing, _config('a'), 'clusters', False)
+        self.assertEqual([x['name'] for x in existing['clusters']], ['a'])
+
+    def test_identical_entry_is_moved_to_end(self):
+        existing = kubeconfig.merge_kubeconfigs(None, [_config('a'), _config('b')], False)
+        kubeconfig.merge_named_entries(existing, _config('a'), 'clusters', False)
+        self.assertEqual([x['name'] for x in existing['clusters']], ['b', 'a'])
+
+    def test_conflict_without_replace_raises(self):
+        existing = _config('a')
+        with mock.patch('azext_aks_preview._kubeconfig.prompt_y_n', side_effect=kubeconfig.NoTTYException):
+            with self.assertRaises(kubeconfig.KubeconfigConflictError):
+                kubeconfig.merge_named_entries(existing, _config('a', server='https://other/{}'), 'clusters', False)
+
+    def test_conflict_with_prompt_overwrites(self):
+        existing = _config('a')
+        with mock.patch('azext_aks_preview._kubeconfig.prompt_y_n', return_value=True):
+            kubeconfig.merge_named_entries(existing, _config('a', server='https://other/{}'), 'clusters', False)
+        self.assertEqual(existing['clusters'], [{'name': 'a', 'cluster': {'server': 'https://other/a'}}])
+
+    def test_conflict_with_replace(self):
+        existing = _config('a')
+        kubeconfig.merge_named_entries(existing, _config('a', server='https://other/{}'), 'clusters', True)
+        self.assertEqual(len(existing['clusters']), 1)
+        self.assertEqual(existing['clusters'][0]['cluster']['server'], 'https://other/a')
+
+
+class TestMergeKubeconfigs(unittest.TestCase):
+    def test_merge_many(self):
+        additions = [_config('c{}'.format(i)) for i in range(1000)]
+        merged = kubeconfig.merge_kubeconfigs(_config('existing'), additions, False)
+        for key in kubeconfig.MERGE_KEYS:
+            self.assertEqual(len(merged[key]), 1001)
+        self.assertEqual(merged['current-context'], 'c999')
+
+
+class TestWriteKubeconfig(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_write_roundtrip_and_keeps_permissions(self):
+        path = os.path.join(self.directory, 'config')
+        with open(path, 'w') as f:
+            f.write('garbage')
+        os.chmod(path, 0o640)
+        kubeconfig.write_kubeconfig(_config('a'), path)
+
+        with open(path) as f:
+            self.assertEqual(kubeconfig.load_kubeconfig(f), _config('a'))
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o640)
+        self.assertEqual(os.listdir(self.directory), ['config'])
+
+    def test_failed_write_leaves_original(self):
+        path = os.path.join(self.directory, 'config')
+        with open(path, 'w') as f:
+            f.write('original')
+        with mock.patch('azext_aks_preview._kubeconfig.dump_kubeconfig', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                kubeconfig.write_kubeconfig(_config('a'), path)
+        with open(path) as f:
+            self.assertEqual(f.read(), 'original')
+        self.assertEqual(os.listdir(self.directory), ['config'])
+
+
+if __name__ == '__main__':
+    unittest.main()
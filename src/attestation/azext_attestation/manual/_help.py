@@ -78,6 +78,23 @@ helps['attestation list-default'] = """
                az attestation list-default
 """
 
+helps['attestation attest-open-enclave'] = """
+    type: command
+    short-summary: Attest OpenEnclave reports and verify the returned tokens with the provider's signing keys.
+    long-summary: |
+        With --reports-file, the provider is resolved once and the reports are attested concurrently.
+        The result of each report is appended to --results-file as soon as it is available.
+    examples:
+      - name: Attest a report.
+        text: |-
+               az attestation attest-open-enclave -n "myattestationprovider" -g "MyResourceGroup" \\
+               --report "AQAAAAIAAADkEQAAAAAAAAMAAg..." --runtime-data "eyJqd2siOnsia3R5Ij..." --runtime-data-type JSON
+      - name: Attest every report in a file, streaming the results to a JSON lines file.
+        text: |-
+               az attestation attest-open-enclave -n "myattestationprovider" -g "MyResourceGroup" \\
+               --reports-file reports.json --results-file results.jsonl --max-concurrency 16
+"""
+
 helps['attestation signer'] = """
     type: group
     short-summary: Manage signers.
@@ -17,7 +17,7 @@ from azure.cli.core.commands.parameters import \
 
 
 def load_arguments(self, _):
-    from azext_attestation.vendored_sdks.azure_attestation.models._attestation_client_enums import TeeKind
+    from azext_attestation.vendored_sdks.azure_attestation.models._attestation_client_enums import TeeKind, DataType
 
     provider_name_type = CLIArgumentType(
         help='Name of the attestation provider.', options_list=['--name', '-n'], metavar='NAME', id_part=None,
@@ -76,3 +76,24 @@ def load_arguments(self, _):
                 c.argument('new_attestation_policy', help='Content of the new attestation policy (Text or JWT).')
                 c.argument('new_attestation_policy_file', options_list=['--new-attestation-policy-file', '-f'],
                            help='File name of the new attestation policy.')
+
+    with self.argument_context('attestation attest-open-enclave') as c:
+        c.argument('provider_name', provider_name_type, required=False)
+        c.extra('identifier', options_list=['--id'],
+                help='Resource ID of the provider. Please omit --resource-group/-g or --name/-n '
+                     'if you have already specified --id.')
+        c.argument('report', help='Base64Url encoded OpenEnclave report to attest.')
+        c.argument('runtime_data', help='Base64Url encoded runtime data of the report.')
+        c.argument('runtime_data_type', arg_type=get_enum_type(DataType),
+                   help='Interpretation of the runtime data.')
+        c.argument('init_time_data', help='Base64Url encoded initialization time data of the report.')
+        c.argument('init_time_data_type', arg_type=get_enum_type(DataType),
+                   help='Interpretation of the initialization time data.')
+        c.argument('reports_file', arg_group='Batch',
+                   help='JSON file with a list of reports to attest, each an object with "report" and optional "id", '
+                        '"runtimeData" and "initTimeData" properties. (--report and --reports-file are '
+                        'mutually exclusive.)')
+        c.argument('results_file', arg_group='Batch',
+                   help='File the result of each report is written to as a line of JSON as soon as it completes.')
+        c.argument('max_concurrency', type=int, arg_group='Batch',
+                   help='Maximum number of reports attested at the same time.')
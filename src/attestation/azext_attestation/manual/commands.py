@@ -18,7 +18,7 @@ from azure.cli.core.commands import CliCommandType
 def load_command_table(self, _):
 
     from azext_attestation.generated._client_factory import cf_attestation_provider
-    from azext_attestation.manual._client_factory import cf_policy_certificates, cf_policy
+    from azext_attestation.manual._client_factory import cf_policy_certificates, cf_policy, cf_attestation_data
 
     attestation_attestation_provider = CliCommandType(
         operations_tmpl='azext_attestation.vendored_sdks.attestation.operations._attestation_provider_operations#Attest'
@@ -58,6 +58,15 @@ def load_command_table(self, _):
         g.custom_command('list-default', 'attestation_attestation_provider_list_default',
                          doc_string_source=attestation_provider_doc_template.format('list_default'))
 
+    attestation_data_sdk = CliCommandType(
+        operations_tmpl='azext_attestation.vendored_sdks.azure_attestation.operations.'
+                        '_attest_operations#AttestOperations.{}',
+        client_factory=cf_attestation_data)
+
+    with self.command_group('attestation', attestation_data_sdk, client_factory=cf_attestation_data,
+                            is_experimental=True) as g:
+        g.custom_command('attest-open-enclave', 'attest_open_enclave', validator=validate_provider_resource_id)
+
     with self.command_group('attestation signer', policy_certificates_data_sdk, client_factory=cf_policy_certificates,
                             is_experimental=True) as g:
         g.custom_command('add', 'add_signer', validator=validate_provider_resource_id,
@@ -11,15 +11,18 @@
 
 import base64
 import json
-import jwt
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import jwt
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.primitives.serialization import Encoding
-from cryptography.x509 import load_pem_x509_certificate
+from cryptography.x509 import load_der_x509_certificate, load_pem_x509_certificate
 from knack.cli import CLIError
+from knack.log import get_logger
 
 from azext_attestation.generated._client_factory import cf_attestation_provider
 from azext_attestation.vendored_sdks.azure_attestation.models._attestation_client_enums import TeeKind
@@ -28,12 +31,22 @@ from azext_attestation.vendored_sdks.azure_attestation.models._models_py3 import
 from azext_attestation.vendored_sdks.azure_mgmt_attestation.models import JsonWebKey
 
 
+logger = get_logger(__name__)
+
 tee_mapping = {
     TeeKind.tpm: 'TPM',
     TeeKind.sgx_intel_sdk: 'SgxEnclave',
     TeeKind.sgx_open_enclave_sdk: 'OpenEnclave'
 }
 
+# (subscription, resource group, provider name) -> attest URI, resolved once per process
+_attest_uris = {}
+# attest URI -> {kid: public key} of the service's token signing certificates
+_signing_keys = {}
+_cache_lock = threading.Lock()
+# Algorithms the service signs attestation tokens with; a token's own "alg" header is not trusted
+SIGNING_ALGORITHMS = ['RS256']
+
 
 def attestation_attestation_provider_show(client,
                                           resource_group_name=None,
@@ -55,6 +68,21 @@ def _b64_padding(s):
     return s + ('=' * (4 - len(s) % 4) if len(s) % 4 else '')
 
 
+def _get_attest_uri(cmd, resource_group_name, provider_name, provider=None):
+    """ Resolves the data plane URI of a provider, asking the management API only the first time. """
+    from azure.cli.core.commands.client_factory import get_subscription_id
+    key = (get_subscription_id(cmd.cli_ctx), resource_group_name.lower(), provider_name.lower())
+    with _cache_lock:
+        if provider is None and key in _attest_uris:
+            return _attest_uris[key]
+    if provider is None:
+        provider_client = cf_attestation_provider(cmd.cli_ctx)
+        provider = provider_client.get(resource_group_name=resource_group_name, provider_name=provider_name)
+    with _cache_lock:
+        _attest_uris[key] = provider.attest_uri
+    return provider.attest_uri
+
+
 def attestation_attestation_provider_create(client,
                                             resource_group_name,
                                             provider_name,
@@ -118,9 +146,8 @@ def add_signer(cmd, client, signer=None, signer_file=None, resource_group_name=N
         with open(signer_file) as f:
             signer = f.read()
 
-    provider_client = cf_attestation_provider(cmd.cli_ctx)
-    provider = provider_client.get(resource_group_name=resource_group_name, provider_name=provider_name)
-    token = client.add(tenant_base_url=provider.attest_uri, policy_certificate_to_add=signer)
+    attest_uri = _get_attest_uri(cmd, resource_group_name, provider_name)
+    token = client.add(tenant_base_url=attest_uri, policy_certificate_to_add=signer)
     result = {'Jwt': token}
 
     if token:
@@ -152,16 +179,14 @@ def remove_signer(cmd, client, signer=None, signer_file=None, resource_group_nam
         with open(signer_file) as f:
             signer = f.read()
 
-    provider_client = cf_attestation_provider(cmd.cli_ctx)
-    provider = provider_client.get(resource_group_name=resource_group_name, provider_name=provider_name)
-    client.remove(tenant_base_url=provider.attest_uri, policy_certificate_to_remove=signer)
+    attest_uri = _get_attest_uri(cmd, resource_group_name, provider_name)
+    client.remove(tenant_base_url=attest_uri, policy_certificate_to_remove=signer)
     return list_signers(cmd, client, resource_group_name, provider_name)
 
 
 def list_signers(cmd, client, resource_group_name=None, provider_name=None):
-    provider_client = cf_attestation_provider(cmd.cli_ctx)
-    provider = provider_client.get(resource_group_name=resource_group_name, provider_name=provider_name)
-    signers = client.get(tenant_base_url=provider.attest_uri)
+    attest_uri = _get_attest_uri(cmd, resource_group_name, provider_name)
+    signers = client.get(tenant_base_url=attest_uri)
     token = json.loads(signers.replace('\'', '"')).get('token')
     result = {'Jwt': token}
 
@@ -181,9 +206,8 @@ def list_signers(cmd, client, resource_group_name=None, provider_name=None):
 def get_policy(cmd, client, attestation_type, resource_group_name=None, provider_name=None):
     """ Retrieves the current policy for a given kind of attestation type. """
 
-    provider_client = cf_attestation_provider(cmd.cli_ctx)
-    provider = provider_client.get(resource_group_name=resource_group_name, provider_name=provider_name)
-    token = client.get(tenant_base_url=provider.attest_uri, tee=tee_mapping[attestation_type]).token
+    attest_uri = _get_attest_uri(cmd, resource_group_name, provider_name)
+    token = client.get(tenant_base_url=attest_uri, tee=tee_mapping[attestation_type]).token
     result = {}
 
     if token:
@@ -236,6 +260,7 @@ def set_policy(cmd, client, attestation_type, new_attestation_policy=None, new_a
 
     provider_client = cf_attestation_provider(cmd.cli_ctx)
     provider = provider_client.get(resource_group_name=resource_group_name, provider_name=provider_name)
+    _get_attest_uri(cmd, resource_group_name, provider_name, provider=provider)
 
     if policy_format == 'Text':
         if provider.trust_model != 'AAD':
@@ -268,10 +293,9 @@ def set_policy(cmd, client, attestation_type, new_attestation_policy=None, new_a
 def reset_policy(cmd, client, attestation_type, policy_jws='eyJhbGciOiJub25lIn0..', resource_group_name=None,
                  provider_name=None):
 
-    provider_client = cf_attestation_provider(cmd.cli_ctx)
-    provider = provider_client.get(resource_group_name=resource_group_name, provider_name=provider_name)
+    attest_uri = _get_attest_uri(cmd, resource_group_name, provider_name)
     client.reset(
-        tenant_base_url=provider.attest_uri,
+        tenant_base_url=attest_uri,
         tee=tee_mapping[attestation_type],
         policy_jws=policy_jws
     )
@@ -279,12 +303,44 @@ def reset_policy(cmd, client, attestation_type, policy_jws='eyJhbGciOiJub25lIn0.
                       resource_group_name=resource_group_name, provider_name=provider_name)
 
 
-def attest_open_enclave(cmd, client, report=None, runtime_data=None, runtime_data_type=None, init_time_data=None,
-                        init_time_data_type=None, resource_group_name=None, provider_name=None):
-
-    provider_client = cf_attestation_provider(cmd.cli_ctx)
-    provider = provider_client.get(resource_group_name=resource_group_name, provider_name=provider_name)
-
+def _get_signing_keys(client, attest_uri, refresh=False):
+    """ Returns the public keys the provider signs tokens with by key id, downloaded once per provider. """
+    with _cache_lock:
+        keys = _signing_keys.get(attest_uri)
+    if keys is not None and not refresh:
+        return keys
+
+    keys = {}
+    jwks = client.signing_certificates.get(tenant_base_url=attest_uri) or {}
+    if not isinstance(jwks, dict):
+        # The service answers a bad request with an error body instead of the key set
+        error = getattr(jwks, 'error', None)
+        raise CLIError('Failed to get the signing certificates of {}: {}'.format(
+            attest_uri, getattr(error, 'message', None) or 'bad request'))
+    for jwk in jwks.get('keys', []):
+        if jwk.get('kid') and jwk.get('x5c'):
+            cert = load_der_x509_certificate(base64.b64decode(jwk['x5c'][0]), backend=default_backend())
+            keys[jwk['kid']] = cert.public_key()
+    with _cache_lock:
+        _signing_keys[attest_uri] = keys
+    return keys
+
+
+def _verify_token(client, attest_uri, token):
+    """ Verifies the signature of an attestation token with the provider's signing keys and returns its claims. """
+    header = jwt.get_unverified_header(token)
+    kid = header.get('kid')
+    keys = _get_signing_keys(client, attest_uri)
+    if kid not in keys:
+        # The signing keys were rolled over since they were cached
+        keys = _get_signing_keys(client, attest_uri, refresh=True)
+    if kid not in keys:
+        raise CLIError('Attestation token is signed with unknown key "{}".'.format(kid))
+    return jwt.decode(token, keys[kid], algorithms=SIGNING_ALGORITHMS, options={'verify_aud': False})
+
+
+def _attest_open_enclave_request(client, attest_uri, report, runtime_data=None, runtime_data_type=None,
+                                 init_time_data=None, init_time_data_type=None):
     request = AttestOpenEnclaveRequest(
         report=report,
         runtime_data=RuntimeData(
@@ -297,10 +353,93 @@ def attest_open_enclave(cmd, client, report=None, runtime_data=None, runtime_dat
         )
     )
 
-    return client.attest_open_enclave(
-        tenant_base_url=provider.attest_uri,
-        request=request
-    )
+    # The generated operation only deserializes error responses, the token is in the raw body
+    response = client.attest.attest_open_enclave(tenant_base_url=attest_uri, request=request, raw=True)
+    token = json.loads(response.response.text).get('token')
+    if not token:
+        raise CLIError('Attestation service did not return a token.')
+    return {'Jwt': token, 'Claims': _verify_token(client, attest_uri, token)}
+
+
+def _load_reports_file(reports_file):
+    reports_file = os.path.expanduser(reports_file)
+    if not os.path.isfile(reports_file):
+        raise CLIError('Reports file "{}" does not exist.'.format(reports_file))
+    with open(reports_file, encoding='utf-8') as f:
+        try:
+            reports = json.load(f)
+        except ValueError as e:
+            raise CLIError('Reports file "{}" is not valid JSON: {}'.format(reports_file, e))
+    if not isinstance(reports, list) or not all(isinstance(r, dict) and r.get('report') for r in reports):
+        raise CLIError('Reports file must contain a JSON list of objects with a "report" property.')
+    return reports
+
+
+def _attest_batch(client, attest_uri, reports, max_concurrency, results_file=None):
+    """
+    Attests the reports concurrently over the client's connections, one keep-alive session per worker.
+    Results are appended to results_file as JSON lines as soon as each one completes.
+    """
+    output_lock = threading.Lock()
+    stream = open(os.path.expanduser(results_file), 'w', encoding='utf-8') if results_file else None
+
+    def _attest(index, item):
+        result = {'Id': item.get('id', index)}
+        runtime_data = item.get('runtimeData') or {}
+        init_time_data = item.get('initTimeData') or {}
+        try:
+            result.update(_attest_open_enclave_request(
+                client, attest_uri, item['report'],
+                runtime_data=runtime_data.get('data'), runtime_data_type=runtime_data.get('dataType'),
+                init_time_data=init_time_data.get('data'), init_time_data_type=init_time_data.get('dataType')))
+            result['Status'] = 'Succeeded'
+        except Exception as e:  # pylint: disable=broad-except
+            result.update({'Status': 'Failed', 'Error': str(e)})
+        return result
+
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {executor.submit(_attest, index, item): index for index, item in enumerate(reports)}
+            for future in as_completed(futures):
+                result = future.result()
+                if stream:
+                    with output_lock:
+                        stream.write(json.dumps(result) + '\n')
+                        stream.flush()
+                if result['Status'] == 'Failed':
+                    logger.warning('Attestation of report %s failed: %s', result['Id'], result['Error'])
+                results.append((futures[future], result))
+    finally:
+        if stream:
+            stream.close()
+    return [result for _, result in sorted(results, key=lambda r: r[0])]
+
+
+def attest_open_enclave(cmd, client, report=None, runtime_data=None, runtime_data_type=None, init_time_data=None,
+                        init_time_data_type=None, reports_file=None, results_file=None, max_concurrency=8,
+                        resource_group_name=None, provider_name=None):
+    """ Attests one OpenEnclave report, or every report in --reports-file. """
+
+    if bool(report) == bool(reports_file):
+        raise CLIError('Please specify just one of --report and --reports-file')
+    if results_file and not reports_file:
+        raise CLIError('--results-file can only be used with --reports-file')
+    if max_concurrency < 1:
+        raise CLIError('--max-concurrency must be at least 1')
+
+    attest_uri = _get_attest_uri(cmd, resource_group_name, provider_name)
+    if report:
+        return _attest_open_enclave_request(client, attest_uri, report,
+                                            runtime_data=runtime_data, runtime_data_type=runtime_data_type,
+                                            init_time_data=init_time_data, init_time_data_type=init_time_data_type)
+
+    results = _attest_batch(client, attest_uri, _load_reports_file(reports_file), max_concurrency,
+                            results_file=results_file)
+    failed = [r for r in results if r['Status'] == 'Failed']
+    if failed:
+        logger.warning('%d of %d reports failed attestation.', len(failed), len(results))
+    return results
 
 
 def attestation_attestation_provider_get_default_by_location(client,
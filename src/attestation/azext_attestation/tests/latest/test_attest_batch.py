@@ -0,0 +1,137 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import base64
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import jwt
+from cryptography import x509
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.x509.oid import NameOID
+from knack.util import CLIError
+
+from azext_attestation.manual import custom
+from azext_attestation.manual.custom import attest_open_enclave
+
+ATTEST_URI = 'https://myattestationprovider.wus.attest.azure.net'
+
+
+def _signing_key(kid):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048, backend=default_backend())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+    now = datetime.datetime.utcnow()
+    cert = x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key()) \
+        .serial_number(x509.random_serial_number()).not_valid_before(now) \
+        .not_valid_after(now + datetime.timedelta(days=1)).sign(key, hashes.SHA256(), default_backend())
+    jwk = {'kid': kid, 'kty': 'RSA', 'x5c': [base64.b64encode(cert.public_bytes(Encoding.DER)).decode('ascii')]}
+    return key, jwk
+
+
+class AttestBatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        custom._attest_uris.clear()
+        custom._signing_keys.clear()
+
+        self.keys = {'key1': _signing_key('key1')}
+        self.signing_kid = 'key1'
+        self.client = mock.MagicMock()
+        self.client.attest.attest_open_enclave.side_effect = self._attest
+        self.client.signing_certificates.get.side_effect = \
+            lambda tenant_base_url: {'keys': [jwk for _, jwk in self.keys.values()]}
+
+        self.provider_client = mock.MagicMock()
+        self.provider_client.get.return_value = SimpleNamespace(attest_uri=ATTEST_URI)
+        patcher = mock.patch.object(custom, 'cf_attestation_provider', return_value=self.provider_client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cmd = SimpleNamespace(cli_ctx=None)
+
+    def _attest(self, tenant_base_url, request, raw):
+        self.assertEqual(tenant_base_url, ATTEST_URI)
+        if request.report == 'bad':
+            raise CLIError('Invalid report')
+        key, _ = self.keys[self.signing_kid]
+        token = jwt.encode({'x-ms-sgx-mrsigner': request.report, 'x-ms-runtime': request.runtime_data.data},
+                           key, algorithm='RS256', headers={'kid': self.signing_kid})
+        if isinstance(token, bytes):
+            token = token.decode('ascii')
+        return SimpleNamespace(response=SimpleNamespace(text=json.dumps({'token': token})))
+
+    def _reports_file(self, reports):
+        path = os.path.join(self.work_dir, 'reports.json')
+        with open(path, 'w') as f:
+            json.dump(reports, f)
+        return path
+
+    def test_single_report(self):
+        result = attest_open_enclave(self.cmd, self.client, report='r1', runtime_data='d1',
+                                     resource_group_name='rg', provider_name='p')
+        self.assertEqual(result['Claims'], {'x-ms-sgx-mrsigner': 'r1', 'x-ms-runtime': 'd1'})
+
+        with self.assertRaises(CLIError):
+            attest_open_enclave(self.cmd, self.client, resource_group_name='rg', provider_name='p')
+
+    def test_batch_streams_results(self):
+        reports = [{'id': 'build-{}'.format(i), 'report': 'r{}'.format(i), 'runtimeData': {'data': 'd{}'.format(i)}}
+                   for i in range(20)]
+        reports.insert(3, {'report': 'bad'})
+        results_file = os.path.join(self.work_dir, 'results.jsonl')
+
+        results = attest_open_enclave(self.cmd, self.client, reports_file=self._reports_file(reports),
+                                      results_file=results_file, max_concurrency=4,
+                                      resource_group_name='rg', provider_name='p')
+
+        self.assertEqual([r['Id'] for r in results][:5], ['build-0', 'build-1', 'build-2', 3, 'build-3'])
+        self.assertEqual((results[3]['Status'], results[3]['Error']), ('Failed', 'Invalid report'))
+        self.assertEqual(results[4]['Claims'], {'x-ms-sgx-mrsigner': 'r3', 'x-ms-runtime': 'd3'})
+        with open(results_file) as f:
+            streamed = [json.loads(line) for line in f]
+        self.assertEqual(sorted(r['Id'] for r in streamed if r['Status'] == 'Succeeded'),
+                         sorted('build-{}'.format(i) for i in range(20)))
+
+        # The provider and its signing keys are looked up once, not per report or per call
+        attest_open_enclave(self.cmd, self.client, report='r1', resource_group_name='rg', provider_name='p')
+        self.provider_client.get.assert_called_once()
+        self.client.signing_certificates.get.assert_called_once()
+
+    def test_signing_key_rollover(self):
+        attest_open_enclave(self.cmd, self.client, report='r1', resource_group_name='rg', provider_name='p')
+        self.keys['key2'] = _signing_key('key2')
+        self.signing_kid = 'key2'
+        result = attest_open_enclave(self.cmd, self.client, report='r2', resource_group_name='rg', provider_name='p')
+        self.assertEqual(result['Claims']['x-ms-sgx-mrsigner'], 'r2')
+        self.assertEqual(self.client.signing_certificates.get.call_count, 2)
+
+        # Tokens not signed by the provider are rejected
+        self.keys['key2'] = (_signing_key('other')[0], self.keys['key2'][1])
+        results = attest_open_enclave(self.cmd, self.client, reports_file=self._reports_file([{'report': 'r3'}]),
+                                      resource_group_name='rg', provider_name='p')
+        self.assertEqual(results[0]['Status'], 'Failed')
+
+    def test_signing_certificates_error(self):
+        self.client.signing_certificates.get.side_effect = \
+            lambda tenant_base_url: SimpleNamespace(error=SimpleNamespace(code='BadRequest', message='Bad tenant'))
+        with self.assertRaisesRegex(CLIError, 'Bad tenant'):
+            attest_open_enclave(self.cmd, self.client, report='r1', resource_group_name='rg', provider_name='p')
+
+
+if __name__ == '__main__':
+    unittest.main()
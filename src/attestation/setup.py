@@ -10,7 +10,7 @@ from codecs import open
 from setuptools import setup, find_packages
 
 # HISTORY.rst entry.
-VERSION = '0.2.0'
+VERSION = '0.2.1'
 try:
     from azext_attestation.manual.version import VERSION
 except ImportError:
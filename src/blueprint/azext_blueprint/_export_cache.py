@@ -0,0 +1,94 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import tempfile
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def write_file_atomic(path, content):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except OSError:
+        os.remove(temp_path)
+        raise
+
+
+def dump_json(obj):
+    return json.dumps(obj, indent=4, sort_keys=True).encode('utf-8')
+
+
+class BlueprintExportCache:
+    """
+    Exported blueprint definitions and artifacts, indexed by resource id and the ETag (or last modified time) the
+    service returned for them. Bodies are stored by their sha256 so artifacts shared between versions are kept once.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._index_path = os.path.join(cache_dir, 'index.json')
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, 'blobs', digest + '.json')
+
+    def _read_index(self):
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _read_blob(self, digest):
+        with open(self._blob_path(digest), 'rb') as f:
+            content = f.read()
+        if hashlib.sha256(content).hexdigest() != digest:
+            raise ValueError('corrupted cache entry {}'.format(digest))
+        return json.loads(content.decode('utf-8'))
+
+    def _write_blob(self, obj):
+        content = dump_json(obj)
+        digest = hashlib.sha256(content).hexdigest()
+        if not os.path.isfile(self._blob_path(digest)):
+            write_file_atomic(self._blob_path(digest), content)
+        return digest
+
+    def get(self, resource_id, validator):
+        """ Returns (blueprint, {artifact name: artifact}) cached for the validator, or None. """
+        if not validator:
+            return None
+        entry = self._read_index().get(resource_id.lower())
+        if not entry or entry.get('validator') != validator:
+            return None
+        try:
+            return (self._read_blob(entry['blueprint']),
+                    {name: self._read_blob(digest) for name, digest in entry['artifacts'].items()})
+        except (OSError, ValueError, KeyError) as ex:
+            logger.debug('Ignoring blueprint export cache entry for %s: %s', resource_id, ex)
+            return None
+
+    def put(self, resource_id, validator, blueprint, artifacts):
+        if not validator:
+            return
+        try:
+            entry = {
+                'validator': validator,
+                'blueprint': self._write_blob(blueprint),
+                'artifacts': {name: self._write_blob(artifact) for name, artifact in artifacts.items()}
+            }
+            index = self._read_index()
+            index[resource_id.lower()] = entry
+            write_file_atomic(self._index_path, json.dumps(index).encode('utf-8'))
+        except OSError as ex:
+            logger.warning('Failed to update the blueprint export cache: %s', ex)
@@ -87,6 +87,23 @@ helps['blueprint import'] = """
                --input-path "path/to/blueprint/directory"
 """
 
+helps['blueprint export'] = """
+    type: command
+    short-summary: Export a blueprint definition and artifacts to a directory of json files.
+    long-summary: |
+        The directory can be imported with 'az blueprint import'. Exported published versions are cached locally,
+        and are exported again from the cache as long as the service reports them unchanged.
+    examples:
+      - name: Export the unpublished blueprint definition and artifacts
+        text: |-
+               az blueprint export --name MyBlueprint \\
+               --output-path "path/to/blueprint/directory"
+      - name: Export a published version of a blueprint
+        text: |-
+               az blueprint export --name MyBlueprint --version v2 \\
+               --output-path "path/to/blueprint/directory"
+"""
+
 helps['blueprint resource-group'] = """
     type: group
     short-summary: Commands to manage blueprint resource group artifact.
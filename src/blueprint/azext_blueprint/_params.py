@@ -71,6 +71,11 @@ def load_arguments(self, _):
         c.argument('blueprint_name', options_list=['--name', '-n'], help='Name of the blueprint definition.')
         c.argument('input_path', type=file_type, help='The directory path for json definitions of the blueprint and artifacts. The blueprint definition file should be named blueprint.json. Artifacts json files should be in a subdirectory named artifacts.', completer=FilesCompleter())
 
+    with self.argument_context('blueprint export') as c:
+        c.argument('blueprint_name', options_list=['--name', '-n'], help='Name of the blueprint definition.')
+        c.argument('output_path', help='The directory path to write the json definitions of the blueprint and artifacts to, in the layout read by \'az blueprint import\'. Other json files in its artifacts subdirectory are removed.', completer=FilesCompleter())
+        c.argument('version_id', options_list=['--version'], help='Version of the published blueprint definition to export. The unpublished blueprint is exported if omitted.')
+
     with self.argument_context('blueprint update') as c:
         c.argument('blueprint_name', options_list=['--name', '-n'], help='Name of the blueprint definition.')
         c.argument('description', help='Multi-line explain this resource.')
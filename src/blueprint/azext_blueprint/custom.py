@@ -77,6 +77,94 @@ def import_blueprint_with_artifacts(cmd,
     return blueprint_response
 
 
+def _export_validator(raw_response):
+    """ ETag of the response, or the last modified time of the definition when the service sends none """
+    etag = raw_response.response.headers.get('ETag')
+    if etag:
+        return etag
+    status = getattr(raw_response.output, 'status', None)
+    modified = getattr(status, 'last_modified', None) or getattr(status, 'time_created', None)
+    return 'lastModified:{}'.format(modified.isoformat()) if modified else None
+
+
+def _write_export(output_path, blueprint, artifacts):
+    """ Writes the layout read by import_blueprint_with_artifacts, only touching files whose content changed """
+    from ._export_cache import dump_json, write_file_atomic
+
+    files = {os.path.join(output_path, 'blueprint.json'): dump_json(blueprint)}
+    artifacts_path = os.path.join(output_path, 'artifacts')
+    for name, artifact in artifacts.items():
+        files[os.path.join(artifacts_path, name + '.json')] = dump_json(artifact)
+
+    # Artifact files of a previous export would be imported along with the new ones
+    if os.path.isdir(artifacts_path):
+        for filename in os.listdir(artifacts_path):
+            filepath = os.path.join(artifacts_path, filename)
+            if filename.endswith('.json') and filepath not in files:
+                os.remove(filepath)
+
+    written = 0
+    for filepath, content in files.items():
+        try:
+            with open(filepath, 'rb') as f:
+                if f.read() == content:
+                    continue
+        except OSError:
+            pass
+        write_file_atomic(filepath, content)
+        written += 1
+    return written
+
+
+def export_blueprint_with_artifacts(cmd,
+                                    client,
+                                    blueprint_name,
+                                    output_path,
+                                    version_id=None,
+                                    management_group=None,
+                                    subscription=None,
+                                    scope=None):
+    from concurrent.futures import ThreadPoolExecutor
+    from ._client_factory import cf_artifacts, cf_published_blueprints, cf_published_artifacts
+    from ._export_cache import BlueprintExportCache
+
+    cache = BlueprintExportCache(os.path.join(cmd.cli_ctx.config.config_dir, 'blueprint', 'exports'))
+    from_cache = False
+    if version_id:
+        # Published versions are immutable, their artifacts are only listed when the version itself changed
+        response = cf_published_blueprints(cmd.cli_ctx).get(scope=scope, blueprint_name=blueprint_name,
+                                                            version_id=version_id, raw=True)
+        resource_id = response.output.id
+        validator = _export_validator(response)
+        cached = cache.get(resource_id, validator)
+        if cached:
+            blueprint, artifacts = cached
+            from_cache = True
+        else:
+            artifact_list = cf_published_artifacts(cmd.cli_ctx).list(scope=scope, blueprint_name=blueprint_name,
+                                                                     version_id=version_id)
+            blueprint = response.output.serialize()
+            artifacts = {artifact.name: artifact.serialize() for artifact in artifact_list}
+            cache.put(resource_id, validator, blueprint, artifacts)
+    else:
+        artifact_client = cf_artifacts(cmd.cli_ctx)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            blueprint_future = executor.submit(client.get, scope=scope, blueprint_name=blueprint_name)
+            artifacts_future = executor.submit(lambda: list(artifact_client.list(scope=scope, blueprint_name=blueprint_name)))
+            blueprint = blueprint_future.result().serialize()
+            artifacts = {artifact.name: artifact.serialize() for artifact in artifacts_future.result()}
+
+    files_written = _write_export(output_path, blueprint, artifacts)
+    return {
+        'blueprintName': blueprint_name,
+        'versionId': version_id,
+        'outputPath': output_path,
+        'artifacts': sorted(artifacts),
+        'fromCache': from_cache,
+        'filesWritten': files_written
+    }
+
+
 def create_blueprint(cmd,
                      client,
                      blueprint_name,
@@ -0,0 +1,111 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import datetime
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from azext_blueprint.custom import export_blueprint_with_artifacts, import_blueprint_with_artifacts
+from azext_blueprint.vendored_sdks.blueprint.models import (
+    Blueprint, PublishedBlueprint, RoleAssignmentArtifact, TemplateArtifact
+)
+
+SCOPE = '/subscriptions/00000000-0000-0000-0000-000000000000'
+VERSION_ID = SCOPE + '/providers/Microsoft.Blueprint/blueprints/bp/versions/v1'
+
+
+def _artifact(cls, name, **kwargs):
+    artifact = cls(**kwargs)
+    artifact.name = name
+    return artifact
+
+
+def _raw(output, etag=None):
+    return SimpleNamespace(output=output, response=SimpleNamespace(headers={'ETag': etag} if etag else {}))
+
+
+class BlueprintExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        self.cmd = SimpleNamespace(cli_ctx=SimpleNamespace(config=SimpleNamespace(config_dir=self.work_dir)))
+        self.output_path = os.path.join(self.work_dir, 'export')
+
+        self.artifacts = [
+            _artifact(TemplateArtifact, 'storage', template={'resources': []}, parameters={}),
+            _artifact(RoleAssignmentArtifact, 'owner', role_definition_id='/owner', principal_ids=['p1'])
+        ]
+        version = PublishedBlueprint(display_name='Blueprint', target_scope='subscription', blueprint_name='bp',
+                                     change_notes='first')
+        version.id = VERSION_ID
+        self.version_etag = '"1"'
+        self.published_blueprints = mock.MagicMock()
+        self.published_blueprints.get.side_effect = lambda **kwargs: _raw(version, self.version_etag)
+        self.published_artifacts = mock.MagicMock()
+        self.published_artifacts.list.side_effect = lambda **kwargs: iter(self.artifacts)
+        self.draft_artifacts = mock.MagicMock()
+        self.draft_artifacts.list.side_effect = lambda **kwargs: iter(self.artifacts)
+        for name, client in [('cf_published_blueprints', self.published_blueprints),
+                             ('cf_published_artifacts', self.published_artifacts),
+                             ('cf_artifacts', self.draft_artifacts)]:
+            patcher = mock.patch('azext_blueprint._client_factory.' + name, return_value=client)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _export(self, version_id='v1', client=None):
+        return export_blueprint_with_artifacts(self.cmd, client, 'bp', self.output_path, version_id=version_id, scope=SCOPE)
+
+    def test_export_round_trips_through_import(self):
+        client = mock.MagicMock()
+        client.get.return_value = Blueprint(display_name='Draft', target_scope='subscription', parameters={})
+        result = self._export(version_id=None, client=client)
+        self.assertEqual((result['artifacts'], result['filesWritten']), (['owner', 'storage'], 3))
+
+        import_client = mock.MagicMock()
+        import_blueprint_with_artifacts(self.cmd, import_client, 'bp2', self.output_path, scope=SCOPE)
+        self.assertEqual(import_client.create_or_update.call_args[1]['blueprint'],
+                         {'display_name': 'Draft', 'target_scope': 'subscription', 'parameters': {}})
+        created = {call[1]['artifact_name']: call[1]['artifact'] for call in self.draft_artifacts.create_or_update.call_args_list}
+        self.assertEqual(created['storage'], {'kind': 'template', 'properties': {'template': {'resources': []}, 'parameters': {}}})
+        self.assertEqual(created['owner']['kind'], 'roleAssignment')
+
+    def test_published_version_served_from_cache_until_it_changes(self):
+        self.assertFalse(self._export()['fromCache'])
+        result = self._export()
+        self.assertEqual((result['fromCache'], result['filesWritten']), (True, 0))
+        self.published_artifacts.list.assert_called_once()
+
+        # A changed version is listed again, and only the changed artifact file is rewritten
+        self.version_etag = '"2"'
+        self.artifacts[0] = _artifact(TemplateArtifact, 'storage', template={'resources': [{}]}, parameters={})
+        result = self._export()
+        self.assertEqual((result['fromCache'], result['filesWritten']), (False, 1))
+        with open(os.path.join(self.output_path, 'artifacts', 'storage.json')) as f:
+            self.assertEqual(json.load(f)['properties']['template'], {'resources': [{}]})
+
+    def test_stale_artifact_files_removed(self):
+        os.makedirs(os.path.join(self.output_path, 'artifacts'))
+        with open(os.path.join(self.output_path, 'artifacts', 'removed.json'), 'w') as f:
+            f.write('{}')
+        # Without an ETag the last modified time identifies the version
+        self.version_etag = None
+        self.published_blueprints.get.side_effect = None
+        version = PublishedBlueprint(blueprint_name='bp')
+        version.id = VERSION_ID
+        version.status = SimpleNamespace(last_modified=datetime.datetime(2020, 1, 1), time_created=None)
+        self.published_blueprints.get.return_value = _raw(version)
+        self._export()
+        self.assertEqual(sorted(os.listdir(os.path.join(self.output_path, 'artifacts'))), ['owner.json', 'storage.json'])
+        self.assertTrue(self._export()['fromCache'])
+
+
+if __name__ == '__main__':
+    unittest.main()
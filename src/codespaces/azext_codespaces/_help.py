@@ -120,6 +120,8 @@ helps['codespace delete'] = """
           text: az codespace delete -g my-rg --plan my-plan --id 00000000-0000-0000-0000-000000000000
         - name: Delete a Codespace given plan id and Codespace name
           text: az codespace delete --plan /subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/my-rg/providers/Microsoft.Codespaces/plans/my-plan --name my-codespace
+        - name: Delete several Codespaces at once
+          text: az codespace delete -g my-rg --plan my-plan --name my-codespace other-codespace
 """
 
 helps['codespace update'] = """
@@ -154,6 +156,8 @@ helps['codespace resume'] = """
           text: az codespace resume -g my-rg --plan my-plan --id 00000000-0000-0000-0000-000000000000
         - name: Resume a Codespace given plan id and Codespace name
           text: az codespace resume --plan /subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/my-rg/providers/Microsoft.Codespaces/plans/my-plan --name my-codespace
+        - name: Resume several Codespaces at once
+          text: az codespace resume -g my-rg --plan my-plan --name my-codespace other-codespace
 """
 
 helps['codespace suspend'] = """
@@ -166,6 +170,8 @@ helps['codespace suspend'] = """
           text: az codespace suspend -g my-rg --plan my-plan --id 00000000-0000-0000-0000-000000000000
         - name: Suspend a Codespace given plan id and Codespace name
           text: az codespace suspend --plan /subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/my-rg/providers/Microsoft.Codespaces/plans/my-plan --name my-codespace
+        - name: Suspend several Codespaces at once
+          text: az codespace suspend -g my-rg --plan my-plan --name my-codespace other-codespace
 """
 
 helps['codespace open'] = """
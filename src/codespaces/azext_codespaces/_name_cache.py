@@ -0,0 +1,100 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+    Local cache of plan + Codespace friendly name to Codespace ID and plan ID
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_FILE_NAME = 'names.json'
+CACHE_TTL_SECONDS = 5 * 60
+
+
+def _default_cache_path():
+    from azure.cli.core.api import get_config_dir
+    return os.path.join(get_config_dir(), 'codespaces', CACHE_FILE_NAME)
+
+
+def plan_cache_key(subscription_id, resource_group_name, plan_name, domain):
+    return '/'.join([subscription_id or '', resource_group_name or '', plan_name, domain]).lower()
+
+
+class CodespaceNameCache:
+    """Maps Codespace friendly names to Codespace IDs, one entry per plan.
+
+    Every entry also records the plan ID so a cache hit needs neither the ARM plan lookup
+    nor a listing of the plan's Codespaces. Entries expire CACHE_TTL_SECONDS after the listing
+    they were built from.
+    """
+
+    def __init__(self, path=None, ttl=CACHE_TTL_SECONDS):
+        self._path = path or _default_cache_path()
+        self._ttl = ttl
+
+    def _load(self):
+        try:
+            with open(self._path, 'r') as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, entries):
+        now = time.time()
+        entries = {k: v for k, v in entries.items() if v.get('expires', 0) > now}
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self._path), prefix='.names-')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(entries, f)
+                os.replace(temp_path, self._path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except OSError as e:
+            logger.debug("Unable to update the Codespace name cache: %s", str(e))
+
+    def get(self, plan_key, codespace_name):
+        """Return (codespace_id, plan_id) for a cached, unexpired name or None."""
+        entry = self._load().get(plan_key)
+        if not entry or entry.get('expires', 0) <= time.time():
+            return None
+        codespace_id = entry.get('codespaces', {}).get(codespace_name)
+        if not codespace_id:
+            return None
+        return codespace_id, entry['planId']
+
+    def update(self, plan_key, plan_id, codespaces):
+        """Replace the entry of a plan with the friendly names of a fresh Codespace listing."""
+        names = {}
+        for codespace in codespaces:
+            # keep the first match, the same one a scan of the listing would find
+            names.setdefault(codespace['friendlyName'], codespace['id'])
+        entries = self._load()
+        entries[plan_key] = {'planId': plan_id, 'expires': time.time() + self._ttl, 'codespaces': names}
+        self._save(entries)
+
+    def add(self, plan_key, codespace_name, codespace_id):
+        entries = self._load()
+        entry = entries.get(plan_key)
+        if entry and entry.get('expires', 0) > time.time():
+            entry['codespaces'].setdefault(codespace_name, codespace_id)
+            self._save(entries)
+
+    def remove(self, plan_key, codespace_ids):
+        entries = self._load()
+        entry = entries.get(plan_key)
+        if entry:
+            entry['codespaces'] = {k: v for k, v in entry['codespaces'].items() if v not in codespace_ids}
+            self._save(entries)
@@ -7,10 +7,12 @@
     Helpers for requests to Codespaces non-ARM-based APIs
 """
 
+import logging
 import platform
 from enum import Enum
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from knack.util import CLIError
 from knack.log import get_logger
@@ -22,6 +24,9 @@ logger = get_logger(__name__)
 
 API_ROUTE = "/api/v1"
 
+# Upper bound on requests in flight when operating on several Codespaces at once
+MAX_CONCURRENT_REQUESTS = 8
+
 
 # The current secret scopes available on the service
 class SecretScope(Enum):
@@ -48,6 +53,8 @@ def assert_status_hook(r, *_, **__):
 
 
 def response_logging_hook(response, *_, **__):
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
     for k in response.request.__dict__:
         if k and not k.startswith('_'):
             logger.debug('codespaces-api.request : %s : %s', k, response.request.__dict__[k])
@@ -66,6 +73,7 @@ class NoStripAuthSession(requests.Session):
 
 
 session = NoStripAuthSession()
+session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT_REQUESTS))
 session.hooks = {
     'response': [response_logging_hook, assert_status_hook],
 }
@@ -84,10 +92,16 @@ def api_response_decorator(func):
                 return response.json() if response.content else response
             return None
         except requests.HTTPError as err:
-            raise CLIError(f"{err}.  Use --debug for details.")
+            raise CLIError(f"{err}.  Use --debug for details.") from err
     return wrapper
 
 
+def is_not_found_error(err):
+    """Whether a CLIError raised by an API call was caused by an HTTP 404."""
+    cause = err.__cause__
+    return isinstance(cause, requests.HTTPError) and cause.response is not None and cause.response.status_code == 404
+
+
 def custom_api_root_decorator(func):
     def wrapper(*args, **kwargs):
         cli_ctx = kwargs.pop('cli_ctx')
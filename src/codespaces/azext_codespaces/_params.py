@@ -51,6 +51,13 @@ def load_arguments(self, _):
         c.argument('do_not_prompt', options_list=['--yes', '-y'], action='store_true',
                    help='Do not prompt for confirmation.')
 
+    for scope in ['codespace delete', 'codespace resume', 'codespace suspend']:
+        with self.argument_context(scope) as c:
+            c.argument('codespace_name', options_list=['--name', '-n'], nargs='+',
+                       help='Space-separated names of one or more Codespaces.')
+            c.argument('codespace_id', options_list=['--id'], nargs='+', validator=validate_codespace_name_or_id,
+                       help='Space-separated ids of one or more Codespaces.')
+
     with self.argument_context('codespace location show') as c:
         c.argument('location_name', options_list=['--name', '-n'], help='Name of the region.')
 
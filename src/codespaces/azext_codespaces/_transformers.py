@@ -23,6 +23,12 @@ def transform_codespace_item_output(item):
     return new_result
 
 
+def transform_codespace_item_or_list_output(result):
+    if isinstance(result, list):
+        return transform_codespace_list_output(result)
+    return transform_codespace_item_output(result)
+
+
 def transform_location_list_output(result):
     from collections import OrderedDict
     new_result = []
@@ -9,6 +9,7 @@ from ._client_factory import cf_codespaces, cf_codespaces_plan
 from ._transformers import (
     transform_codespace_list_output,
     transform_codespace_item_output,
+    transform_codespace_item_or_list_output,
     transform_location_list_output,
     transform_location_detail_output,
     transform_plan_secret_list_output)
@@ -44,8 +45,8 @@ def load_command_table(self, _):
         g.custom_command('create', 'create_codespace', table_transformer=transform_codespace_item_output)
         g.custom_command('open', 'open_codespace')
         g.custom_command('delete', 'delete_codespace', confirmation="Are you sure you want to delete this Codespace?")
-        g.custom_command('resume', 'resume_codespace', table_transformer=transform_codespace_item_output)
-        g.custom_command('suspend', 'suspend_codespace', table_transformer=transform_codespace_item_output)
+        g.custom_command('resume', 'resume_codespace', table_transformer=transform_codespace_item_or_list_output)
+        g.custom_command('suspend', 'suspend_codespace', table_transformer=transform_codespace_item_or_list_output)
         g.custom_command('update', 'update_codespace', table_transformer=transform_codespace_item_output)
 
     # Hidden commands that should largely be used by the dev team
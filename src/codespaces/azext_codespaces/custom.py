@@ -8,6 +8,7 @@ from knack.log import get_logger
 from knack.prompting import prompt_y_n
 from . import _non_arm_apis as cs_api
 from . import _config as cs_config
+from ._name_cache import CodespaceNameCache, plan_cache_key
 from .vendored_sdks.codespaces.models import (
     CodespacesPlan,
     CodespacesPlanProperties,
@@ -17,15 +18,128 @@ from .vendored_sdks.codespaces.models import (
 logger = get_logger(__name__)
 
 
-def _determine_codespace_id(client, resource_group_name, plan_name, token, codespace_name, cli_ctx=None):
+def _plan_cache_key(client, resource_group_name, plan_name, cli_ctx):
+    return plan_cache_key(client.config.subscription_id, resource_group_name, plan_name,
+                          cs_config.get_service_domain(cli_ctx))
+
+
+def _determine_codespace_ids(client, resource_group_name, plan_name, token, codespace_names, cli_ctx=None):
+    """Resolve friendly names to Codespace IDs, listing the plan's Codespaces at most once.
+
+    Names are looked up in the local name cache first; any miss refreshes the plan's cache entry.
+    """
     if not cli_ctx:
         raise ValueError("cli_ctx kwarg must be set.")
+    cache = CodespaceNameCache()
+    plan_key = _plan_cache_key(client, resource_group_name, plan_name, cli_ctx)
+    cached = {name: cache.get(plan_key, name) for name in codespace_names}
+    if all(cached.values()):
+        return [cached[name][0] for name in codespace_names]
     plan = client.get(resource_group_name=resource_group_name, plan_name=plan_name)
     codespaces = cs_api.list_codespaces(token.access_token, plan.id, cli_ctx=cli_ctx)
-    codespace_id = next((c['id'] for c in codespaces if c['friendlyName'] == codespace_name), None)
-    if codespace_id:
-        return codespace_id
-    raise CLIError(f"Unable to find codespace '{codespace_name}' in plan {plan.id}")
+    cache.update(plan_key, plan.id, codespaces)
+    codespace_ids = []
+    for name in codespace_names:
+        codespace_id = next((c['id'] for c in codespaces if c['friendlyName'] == name), None)
+        if not codespace_id:
+            raise CLIError(f"Unable to find codespace '{name}' in plan {plan.id}")
+        codespace_ids.append(codespace_id)
+    return codespace_ids
+
+
+def _determine_codespace_id(client, resource_group_name, plan_name, token, codespace_name, cli_ctx=None):
+    return _determine_codespace_ids(client, resource_group_name, plan_name, token, [codespace_name],
+                                    cli_ctx=cli_ctx)[0]
+
+
+def _get_codespace(cmd, client, resource_group_name, plan_name, token, codespace_id=None, codespace_name=None):
+    """Get a Codespace by ID or by name.
+
+    A cached name that points at a Codespace that no longer exists is forgotten and the name is looked up again.
+    """
+    if codespace_name:
+        codespace_id = _determine_codespace_id(
+            client, resource_group_name, plan_name, token, codespace_name, cli_ctx=cmd.cli_ctx)
+    try:
+        return cs_api.get_codespace(token.access_token, codespace_id, cli_ctx=cmd.cli_ctx)
+    except CLIError as err:
+        if not cs_api.is_not_found_error(err):
+            raise
+        _forget_codespaces(cmd, client, resource_group_name, plan_name, [codespace_id])
+        if not codespace_name:
+            raise
+    codespace_id = _determine_codespace_id(
+        client, resource_group_name, plan_name, token, codespace_name, cli_ctx=cmd.cli_ctx)
+    return cs_api.get_codespace(token.access_token, codespace_id, cli_ctx=cmd.cli_ctx)
+
+
+def _run_codespace_operation(cmd, client, resource_group_name, plan_name, operation,
+                             codespace_ids=None, codespace_names=None):
+    """Run a Codespaces API operation on one or more Codespaces.
+
+    Several Codespaces are handled concurrently over the shared API session. A single Codespace
+    returns the operation's result, several return a list of results in the order given.
+    A cached name that points at a Codespace that no longer exists is looked up again and retried once.
+    """
+    token = client.write_codespaces_action(resource_group_name=resource_group_name, plan_name=plan_name)
+    if codespace_names:
+        codespace_ids = _determine_codespace_ids(
+            client, resource_group_name, plan_name, token, codespace_names, cli_ctx=cmd.cli_ctx)
+    codespace_ids = list(codespace_ids)
+    results, errors = _run_on_codespaces(cmd, token, operation, codespace_ids)
+
+    stale = [i for i, err in errors.items() if codespace_names and cs_api.is_not_found_error(err)]
+    if stale:
+        _forget_codespaces(cmd, client, resource_group_name, plan_name, [codespace_ids[i] for i in stale])
+        retry_ids = _determine_codespace_ids(client, resource_group_name, plan_name, token,
+                                             [codespace_names[i] for i in stale], cli_ctx=cmd.cli_ctx)
+        retry_results, retry_errors = _run_on_codespaces(cmd, token, operation, retry_ids)
+        for retry_index, index in enumerate(stale):
+            codespace_ids[index] = retry_ids[retry_index]
+            results[index] = retry_results[retry_index]
+            if retry_index in retry_errors:
+                errors[index] = retry_errors[retry_index]
+            else:
+                del errors[index]
+
+    if errors:
+        failed = [codespace_ids[i] for i in sorted(errors)]
+        _forget_codespaces(cmd, client, resource_group_name, plan_name, failed)
+        if len(codespace_ids) == 1:
+            raise errors[0]
+        for index in sorted(errors):
+            logger.error("Codespace %s: %s", codespace_ids[index], errors[index])
+        raise CLIError(f"Operation failed for {len(failed)} of {len(codespace_ids)} Codespaces: {', '.join(failed)}")
+    return results[0] if len(codespace_ids) == 1 else results
+
+
+def _run_on_codespaces(cmd, token, operation, codespace_ids):
+    """Run the operation on each Codespace, concurrently for several. Returns (results, {index: CLIError})."""
+    results = [None] * len(codespace_ids)
+    errors = {}
+    if len(codespace_ids) == 1:
+        try:
+            results[0] = operation(token.access_token, codespace_ids[0], cli_ctx=cmd.cli_ctx)
+        except CLIError as err:
+            errors[0] = err
+        return results, errors
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(len(codespace_ids), cs_api.MAX_CONCURRENT_REQUESTS)) as executor:
+        futures = [executor.submit(operation, token.access_token, codespace_id, cli_ctx=cmd.cli_ctx)
+                   for codespace_id in codespace_ids]
+    for index, future in enumerate(futures):
+        try:
+            results[index] = future.result()
+        except CLIError as err:
+            errors[index] = err
+    return results, errors
+
+
+def _forget_codespaces(cmd, client, resource_group_name, plan_name, codespace_ids):
+    # a failed or deleted Codespace may be gone, so make the next lookup by name list the plan again
+    CodespaceNameCache().remove(_plan_cache_key(client, resource_group_name, plan_name, cmd.cli_ctx),
+                                codespace_ids)
 
 
 # pylint: disable=unused-argument
@@ -134,39 +248,40 @@ def create_codespace(cmd,
         if dotfiles_command:
             create_data["personalization"]["dotfilesInstallCommand"] = dotfiles_command
     # Create codespace
-    return cs_api.create_codespace(token.access_token, create_data, cli_ctx=cmd.cli_ctx)
+    codespace = cs_api.create_codespace(token.access_token, create_data, cli_ctx=cmd.cli_ctx)
+    CodespaceNameCache().add(_plan_cache_key(client, resource_group_name, plan_name, cmd.cli_ctx),
+                             friendly_name, codespace['id'])
+    return codespace
 
 
 def get_codespace(cmd, client, plan_name, resource_group_name=None, codespace_id=None, codespace_name=None):
     token = client.write_codespaces_action(resource_group_name=resource_group_name, plan_name=plan_name)
-    if codespace_name:
-        codespace_id = _determine_codespace_id(
-            client, resource_group_name, plan_name, token, codespace_name, cli_ctx=cmd.cli_ctx)
-    return cs_api.get_codespace(token.access_token, codespace_id, cli_ctx=cmd.cli_ctx)
+    return _get_codespace(cmd, client, resource_group_name, plan_name, token, codespace_id, codespace_name)
 
 
 def delete_codespace(cmd, client, plan_name, resource_group_name=None, codespace_id=None, codespace_name=None):
-    token = client.write_codespaces_action(resource_group_name=resource_group_name, plan_name=plan_name)
-    if codespace_name:
-        codespace_id = _determine_codespace_id(
-            client, resource_group_name, plan_name, token, codespace_name, cli_ctx=cmd.cli_ctx)
-    cs_api.delete_codespace(token.access_token, codespace_id, cli_ctx=cmd.cli_ctx)
+    deleted = []
+
+    def _delete(access_token, codespace_id, **kwargs):
+        cs_api.delete_codespace(access_token, codespace_id, **kwargs)
+        deleted.append(codespace_id)
+
+    try:
+        _run_codespace_operation(cmd, client, resource_group_name, plan_name, _delete,
+                                 codespace_ids=codespace_id, codespace_names=codespace_name)
+    finally:
+        if deleted:
+            _forget_codespaces(cmd, client, resource_group_name, plan_name, deleted)
 
 
 def resume_codespace(cmd, client, plan_name, resource_group_name=None, codespace_id=None, codespace_name=None):
-    token = client.write_codespaces_action(resource_group_name=resource_group_name, plan_name=plan_name)
-    if codespace_name:
-        codespace_id = _determine_codespace_id(
-            client, resource_group_name, plan_name, token, codespace_name, cli_ctx=cmd.cli_ctx)
-    return cs_api.start_codespace(token.access_token, codespace_id, cli_ctx=cmd.cli_ctx)
+    return _run_codespace_operation(cmd, client, resource_group_name, plan_name, cs_api.start_codespace,
+                                    codespace_ids=codespace_id, codespace_names=codespace_name)
 
 
 def suspend_codespace(cmd, client, plan_name, resource_group_name=None, codespace_id=None, codespace_name=None):
-    token = client.write_codespaces_action(resource_group_name=resource_group_name, plan_name=plan_name)
-    if codespace_name:
-        codespace_id = _determine_codespace_id(
-            client, resource_group_name, plan_name, token, codespace_name, cli_ctx=cmd.cli_ctx)
-    return cs_api.shutdown_codespace(token.access_token, codespace_id, cli_ctx=cmd.cli_ctx)
+    return _run_codespace_operation(cmd, client, resource_group_name, plan_name, cs_api.shutdown_codespace,
+                                    codespace_ids=codespace_id, codespace_names=codespace_name)
 
 
 def update_codespace(cmd,
@@ -178,11 +293,8 @@ def update_codespace(cmd,
                      sku_name=None,
                      autoshutdown_delay=None):
     token = client.write_codespaces_action(resource_group_name=resource_group_name, plan_name=plan_name)
-    if codespace_name:
-        codespace_id = _determine_codespace_id(
-            client, resource_group_name, plan_name, token, codespace_name, cli_ctx=cmd.cli_ctx)
     data = {}
-    codespace = cs_api.get_codespace(token.access_token, codespace_id, cli_ctx=cmd.cli_ctx)
+    codespace = _get_codespace(cmd, client, resource_group_name, plan_name, token, codespace_id, codespace_name)
     if codespace['state'] != 'Shutdown':
         raise CLIError("Codespace must be in state 'Shutdown'. "
                        f"Cannot update a Codespace in state '{codespace['state']}'.")
@@ -190,16 +302,18 @@ def update_codespace(cmd,
         data['skuName'] = sku_name
     if autoshutdown_delay:
         data['autoShutdownDelayMinutes'] = autoshutdown_delay
-    return cs_api.update_codespace(token.access_token, codespace_id, data, cli_ctx=cmd.cli_ctx)
+    try:
+        return cs_api.update_codespace(token.access_token, codespace['id'], data, cli_ctx=cmd.cli_ctx)
+    except CLIError as err:
+        if cs_api.is_not_found_error(err):
+            _forget_codespaces(cmd, client, resource_group_name, plan_name, [codespace['id']])
+        raise
 
 
 def open_codespace(cmd, client, plan_name, resource_group_name=None, codespace_id=None,
                    codespace_name=None, do_not_prompt=None):
     token = client.write_codespaces_action(resource_group_name=resource_group_name, plan_name=plan_name)
-    if codespace_name:
-        codespace_id = _determine_codespace_id(
-            client, resource_group_name, plan_name, token, codespace_name, cli_ctx=cmd.cli_ctx)
-    codespace = cs_api.get_codespace(token.access_token, codespace_id, cli_ctx=cmd.cli_ctx)
+    codespace = _get_codespace(cmd, client, resource_group_name, plan_name, token, codespace_id, codespace_name)
     if not do_not_prompt and codespace['state'] != 'Available':
         msg = f"Current state of the codespace is '{codespace['state']}'." \
             " Continuing will cause the environment to be resumed.\nDo you want to continue?"
@@ -0,0 +1,135 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import requests
+from knack.util import CLIError
+
+from azext_codespaces import custom
+from azext_codespaces._name_cache import CodespaceNameCache, plan_cache_key
+
+
+class CodespaceNameCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.path = os.path.join(self.temp_dir, 'codespaces', 'names.json')
+        self.key = plan_cache_key('sub', 'My-RG', 'my-plan', 'online.visualstudio.com')
+        self.codespaces = [{'id': 'id-1', 'friendlyName': 'one'},
+                           {'id': 'id-2', 'friendlyName': 'two'},
+                           {'id': 'id-3', 'friendlyName': 'one'}]
+
+    def test_update_and_get(self):
+        cache = CodespaceNameCache(self.path)
+        cache.update(self.key, 'plan-id', self.codespaces)
+
+        self.assertEqual(('id-1', 'plan-id'), cache.get(self.key, 'one'))
+        self.assertEqual(('id-2', 'plan-id'), cache.get(self.key, 'two'))
+        self.assertIsNone(cache.get(self.key, 'three'))
+        self.assertIsNone(cache.get(plan_cache_key('sub', 'my-rg', 'other', 'online.visualstudio.com'), 'one'))
+
+    def test_key_is_case_insensitive(self):
+        self.assertEqual(self.key, plan_cache_key('SUB', 'my-rg', 'MY-PLAN', 'online.visualstudio.com'))
+
+    def test_expired_entry(self):
+        cache = CodespaceNameCache(self.path, ttl=-1)
+        cache.update(self.key, 'plan-id', self.codespaces)
+        self.assertIsNone(cache.get(self.key, 'one'))
+
+    def test_add_and_remove(self):
+        cache = CodespaceNameCache(self.path)
+        cache.add(self.key, 'new', 'id-4')
+        self.assertIsNone(cache.get(self.key, 'new'))
+
+        cache.update(self.key, 'plan-id', self.codespaces)
+        cache.add(self.key, 'new', 'id-4')
+        cache.remove(self.key, ['id-1'])
+
+        self.assertEqual(('id-4', 'plan-id'), cache.get(self.key, 'new'))
+        self.assertIsNone(cache.get(self.key, 'one'))
+
+    def test_corrupt_cache_file(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('not json')
+        cache = CodespaceNameCache(self.path)
+        self.assertIsNone(cache.get(self.key, 'one'))
+        cache.update(self.key, 'plan-id', self.codespaces)
+        self.assertEqual(('id-1', 'plan-id'), cache.get(self.key, 'one'))
+
+
+def _not_found():
+    response = requests.Response()
+    response.status_code = 404
+    try:
+        raise requests.HTTPError('404 Client Error', response=response)
+    except requests.HTTPError as err:
+        try:
+            raise CLIError(str(err)) from err
+        except CLIError as cli_error:
+            return cli_error
+
+
+class StaleCodespaceNameTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        path = os.path.join(self.temp_dir, 'names.json')
+        self.cmd = SimpleNamespace(cli_ctx=mock.MagicMock())
+        self.client = mock.MagicMock()
+        self.client.config.subscription_id = 'sub'
+        self.client.get.return_value = SimpleNamespace(id='plan-id')
+        self.token = SimpleNamespace(access_token='token')
+        self.key = plan_cache_key('sub', 'rg', 'plan', 'online.visualstudio.com')
+        CodespaceNameCache(path).update(self.key, 'plan-id', [{'id': 'old-id', 'friendlyName': 'one'}])
+
+        patches = [
+            mock.patch('azext_codespaces.custom.CodespaceNameCache', side_effect=lambda: CodespaceNameCache(path)),
+            mock.patch('azext_codespaces.custom.cs_config.get_service_domain', return_value='online.visualstudio.com'),
+            mock.patch('azext_codespaces.custom.cs_api.list_codespaces', return_value=[{'id': 'new-id', 'friendlyName': 'one'}]),
+            mock.patch('azext_codespaces.custom.cs_api.get_codespace', side_effect=self._get_codespace)
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cache = CodespaceNameCache(path)
+
+    @staticmethod
+    def _get_codespace(access_token, codespace_id, **_):
+        if codespace_id == 'old-id':
+            raise _not_found()
+        return {'id': codespace_id}
+
+    def test_deleted_codespace_forgotten_and_looked_up_again(self):
+        codespace = custom._get_codespace(self.cmd, self.client, 'rg', 'plan', self.token, codespace_name='one')
+        self.assertEqual(codespace, {'id': 'new-id'})
+        self.assertEqual(('new-id', 'plan-id'), self.cache.get(self.key, 'one'))
+
+    def test_deleted_codespace_by_id(self):
+        with self.assertRaises(CLIError):
+            custom._get_codespace(self.cmd, self.client, 'rg', 'plan', self.token, codespace_id='old-id')
+        self.assertIsNone(self.cache.get(self.key, 'one'))
+
+    def test_deleted_codespace_retried_for_bulk_operation(self):
+        self.cache.update(self.key, 'plan-id', [{'id': 'old-id', 'friendlyName': 'one'},
+                                                {'id': 'id-2', 'friendlyName': 'two'}])
+        listed = [{'id': 'new-id', 'friendlyName': 'one'}, {'id': 'id-2', 'friendlyName': 'two'}]
+        with mock.patch('azext_codespaces.custom.cs_api.list_codespaces', return_value=listed), \
+                mock.patch('azext_codespaces.custom.cs_api.start_codespace', side_effect=self._get_codespace) as start:
+            results = custom.resume_codespace(self.cmd, self.client, 'plan', resource_group_name='rg',
+                                              codespace_name=['one', 'two'])
+        self.assertEqual(results, [{'id': 'new-id'}, {'id': 'id-2'}])
+        self.assertEqual(start.call_count, 3)
+        self.assertEqual(('new-id', 'plan-id'), self.cache.get(self.key, 'one'))
+
+
+if __name__ == '__main__':
+    unittest.main()
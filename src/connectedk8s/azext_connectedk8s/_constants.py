@@ -72,3 +72,6 @@ Proxy_Cert_Path_Does_Not_Exist_Error = 'Proxy cert path {} does not exist. Pleas
 Get_Kubernetes_Infra_Fault_Type = 'kubernetes-get-infrastructure-error'
 No_Param_Error = 'No parmeters were specified with update command. Please run az connectedk8s update --help to check parameters available for update'
 EnableProxy_Conflict_Error = 'Conflict detected: --disable-proxy can not be set with --https-proxy, --http-proxy, --proxy-skip-range and --proxy-cert at the same time. Please run az connectedk8s update --help for more information about the parameters'
+Cluster_Probe_Cache_File = 'connectedk8s_cluster_probe.json'
+Cluster_Probe_Cache_TTL_Seconds = 3600
+Cluster_Probe_Node_Label_Selector = 'type!=virtual-kubelet'
@@ -4,7 +4,10 @@
 # --------------------------------------------------------------------------------------------
 
 import os
+import json
 import shutil
+import tempfile
+import time
 import subprocess
 from subprocess import Popen, PIPE
 
@@ -213,3 +216,47 @@ def validate_infrastructure_type(infra):
         if s.lower() == infra.lower():
             return s
     return "generic"
+
+
+def _cluster_probe_cache_path():
+    from azure.cli.core.api import get_config_dir
+    return os.path.join(get_config_dir(), consts.Cluster_Probe_Cache_File)
+
+
+def load_cluster_probe(cluster_key):
+    """Return the cached probe result for the cluster, or None if absent or expired."""
+    try:
+        with open(_cluster_probe_cache_path()) as f:
+            entry = json.load(f).get(cluster_key)
+    except (OSError, ValueError, AttributeError):
+        return None
+    if not entry or time.time() - entry.get('timestamp', 0) > consts.Cluster_Probe_Cache_TTL_Seconds:
+        return None
+    return entry.get('probe')
+
+
+def save_cluster_probe(cluster_key, probe):
+    path = _cluster_probe_cache_path()
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        entries = {}
+    if not isinstance(entries, dict):
+        entries = {}
+    now = time.time()
+    entries = {k: v for k, v in entries.items()
+               if now - v.get('timestamp', 0) <= consts.Cluster_Probe_Cache_TTL_Seconds}
+    entries[cluster_key] = {'timestamp': now, 'probe': probe}
+    # Write to a temporary file and rename it, so concurrent commands never read a partial cache
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f)
+            os.replace(temp_path, path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+    except OSError as e:
+        logger.debug("Unable to save the cluster probe cache: %s", str(e))
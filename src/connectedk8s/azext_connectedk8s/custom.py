@@ -6,7 +6,6 @@
 import errno
 import os
 import json
-import tempfile
 import time
 from subprocess import Popen, PIPE, run, STDOUT
 from base64 import b64encode
@@ -17,8 +16,6 @@ import requests
 
 from knack.util import CLIError
 from knack.log import get_logger
-from knack.prompting import prompt_y_n
-from knack.prompting import NoTTYException
 from azure.cli.core.commands.client_factory import get_subscription_id
 from azure.cli.core.util import sdk_no_wait
 from azure.cli.core import telemetry
@@ -32,6 +29,8 @@ from azext_connectedk8s._client_factory import cf_resource_groups
 from azext_connectedk8s._client_factory import _resource_client_factory
 import azext_connectedk8s._constants as consts
 import azext_connectedk8s._utils as utils
+from azext_connectedk8s._kubeconfig import (KubeconfigConflictError, load_kubeconfig, merge_kubeconfigs,
+                                            merge_named_entries, write_kubeconfig)
 
 from .vendored_sdks.models import ConnectedCluster, ConnectedClusterAADProfile, ConnectedClusterIdentity, AuthenticationDetailsValue
 
@@ -150,13 +149,17 @@ def create_connectedk8s(cmd, client, resource_group_name, cluster_name, https_pr
     check_kube_connection(configuration)
 
     # Get kubernetes cluster info
-    kubernetes_version = get_server_version(configuration)
+    if distribution == 'auto' or infrastructure == 'auto':
+        cluster_probe = probe_kubernetes_cluster(configuration, kube_config, kube_context)
+        kubernetes_version = cluster_probe['kubernetes_version']
+    else:
+        kubernetes_version = get_server_version(configuration)
     if distribution == 'auto':
-        kubernetes_distro = get_kubernetes_distro(configuration)  # (cluster heuristics)
+        kubernetes_distro = cluster_probe['kubernetes_distro']  # (cluster heuristics)
     else:
         kubernetes_distro = distribution
     if infrastructure == 'auto':
-        kubernetes_infra = get_kubernetes_infra(configuration)  # (cluster heuristics)
+        kubernetes_infra = cluster_probe['kubernetes_infra']  # (cluster heuristics)
     else:
         kubernetes_infra = infrastructure
 
@@ -491,64 +494,125 @@ def get_server_version(configuration):
                                            raise_error=False)
 
 
-def get_kubernetes_distro(configuration):  # Heuristic
+def get_first_node(configuration):
+    """Fetch a single node of the cluster. Returns (node, succeeded); node is None for a cluster without nodes.
+
+    Virtual kubelet nodes are skipped by the label selector, their provider id says nothing about the cluster.
+    """
     api_instance = kube_client.CoreV1Api(kube_client.ApiClient(configuration))
     try:
-        api_response = api_instance.list_node()
-        if api_response.items:
-            labels = api_response.items[0].metadata.labels
-            provider_id = str(api_response.items[0].spec.provider_id)
-            annotations = list(api_response.items)[0].metadata.annotations
-            if labels.get("node.openshift.io/os_id"):
-                return "openshift"
-            if labels.get("kubernetes.azure.com/node-image-version"):
-                return "aks"
-            if labels.get("cloud.google.com/gke-nodepool") or labels.get("cloud.google.com/gke-os-distribution"):
-                return "gke"
-            if labels.get("eks.amazonaws.com/nodegroup"):
-                return "eks"
-            if labels.get("minikube.k8s.io/version"):
-                return "minikube"
-            if provider_id.startswith("kind://"):
-                return "kind"
-            if provider_id.startswith("k3s://"):
-                return "k3s"
-            if annotations.get("rke.cattle.io/external-ip") or annotations.get("rke.cattle.io/internal-ip"):
-                return "rancher_rke"
-            if provider_id.startswith("moc://"):   # Todo: ask from aks hci team for more reliable identifier in node labels,etc
-                return "generic"                   # return "aks_hci"
-        return "generic"
+        api_response = api_instance.list_node(label_selector=consts.Cluster_Probe_Node_Label_Selector, limit=1)
+        return (api_response.items[0] if api_response.items else None), True
     except Exception as e:  # pylint: disable=broad-except
-        logger.warning("Error occured while trying to fetch kubernetes distribution.")
-        utils.kubernetes_exception_handler(e, consts.Get_Kubernetes_Distro_Fault_Type, 'Unable to fetch kubernetes distribution',
+        logger.warning("Error occured while trying to fetch kubernetes distribution and infrastructure.")
+        utils.kubernetes_exception_handler(e, consts.Get_Kubernetes_Distro_Fault_Type, 'Unable to fetch kubernetes distribution and infrastructure',
                                            raise_error=False)
-        return "generic"
+        return None, False
 
 
-def get_kubernetes_infra(configuration):  # Heuristic
-    api_instance = kube_client.CoreV1Api(kube_client.ApiClient(configuration))
-    try:
-        api_response = api_instance.list_node()
-        if api_response.items:
-            provider_id = str(api_response.items[0].spec.provider_id)
-            infra = provider_id.split(':')[0]
-            if infra == "k3s" or infra == "kind":
-                return "generic"
-            if infra == "azure":
-                return "azure"
-            if infra == "gce":
-                return "gcp"
-            if infra == "aws":
-                return "aws"
-            if infra == "moc":                  # Todo: ask from aks hci team for more reliable identifier in node labels,etc
-                return "generic"                # return "azure_stack_hci"
-            return utils.validate_infrastructure_type(infra)
+def get_kubernetes_distro_from_node(node):  # Heuristic
+    if node is None:
         return "generic"
-    except Exception as e:  # pylint: disable=broad-except
-        logger.warning("Error occured while trying to fetch kubernetes infrastructure.")
-        utils.kubernetes_exception_handler(e, consts.Get_Kubernetes_Infra_Fault_Type, 'Unable to fetch kubernetes infrastructure',
-                                           raise_error=False)
+    labels = node.metadata.labels or {}
+    provider_id = str(node.spec.provider_id)
+    annotations = node.metadata.annotations or {}
+    if labels.get("node.openshift.io/os_id"):
+        return "openshift"
+    if labels.get("kubernetes.azure.com/node-image-version"):
+        return "aks"
+    if labels.get("cloud.google.com/gke-nodepool") or labels.get("cloud.google.com/gke-os-distribution"):
+        return "gke"
+    if labels.get("eks.amazonaws.com/nodegroup"):
+        return "eks"
+    if labels.get("minikube.k8s.io/version"):
+        return "minikube"
+    if provider_id.startswith("kind://"):
+        return "kind"
+    if provider_id.startswith("k3s://"):
+        return "k3s"
+    if annotations.get("rke.cattle.io/external-ip") or annotations.get("rke.cattle.io/internal-ip"):
+        return "rancher_rke"
+    if provider_id.startswith("moc://"):   # Todo: ask from aks hci team for more reliable identifier in node labels,etc
+        return "generic"                   # return "aks_hci"
+    return "generic"
+
+
+def get_kubernetes_infra_from_node(node):  # Heuristic
+    if node is None:
         return "generic"
+    provider_id = str(node.spec.provider_id)
+    infra = provider_id.split(':')[0]
+    if infra == "k3s" or infra == "kind":
+        return "generic"
+    if infra == "azure":
+        return "azure"
+    if infra == "gce":
+        return "gcp"
+    if infra == "aws":
+        return "aws"
+    if infra == "moc":                  # Todo: ask from aks hci team for more reliable identifier in node labels,etc
+        return "generic"                # return "azure_stack_hci"
+    return utils.validate_infrastructure_type(infra)
+
+
+def get_cluster_probe_key(configuration, kube_config, kube_context):
+    """Identify the cluster by kube context, API server and cluster CA.
+
+    Local clusters (kind, k3s, minikube) often share the same API server address, so the address alone is not enough.
+    """
+    import hashlib
+    context_name = kube_context
+    if context_name is None:
+        try:
+            _, current_context = config.list_kube_config_contexts(config_file=kube_config)
+            context_name = current_context.get('name')
+        except Exception as e:  # pylint: disable=broad-except
+            logger.debug("Unable to read the current kube context: %s", str(e))
+    ca_digest = None
+    if configuration.ssl_ca_cert:
+        try:
+            with open(configuration.ssl_ca_cert, 'rb') as f:
+                ca_digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            pass
+    return hashlib.sha256(json.dumps([context_name, configuration.host, ca_digest]).encode('utf-8')).hexdigest()
+
+
+def get_kubernetes_distro_infra(configuration, kube_config=None, kube_context=None):
+    """Return the (distribution, infrastructure) of the cluster, from a single node.
+
+    The result is cached per cluster so that a later command does not list nodes again.
+    """
+    probe_key = get_cluster_probe_key(configuration, kube_config, kube_context)
+    probe = utils.load_cluster_probe(probe_key)
+    if probe is None:
+        node, node_fetched = get_first_node(configuration)
+        probe = {
+            'kubernetes_distro': get_kubernetes_distro_from_node(node),
+            'kubernetes_infra': get_kubernetes_infra_from_node(node)
+        }
+        if node_fetched:
+            utils.save_cluster_probe(probe_key, probe)
+    return probe['kubernetes_distro'], probe['kubernetes_infra']
+
+
+def probe_kubernetes_cluster(configuration, kube_config=None, kube_context=None):
+    """Collect the kubernetes version, distribution and infrastructure of the cluster.
+
+    The version and node requests are issued concurrently. The version is always fetched, it changes with every
+    upgrade.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        version_future = executor.submit(get_server_version, configuration)
+        distro_infra_future = executor.submit(get_kubernetes_distro_infra, configuration, kube_config, kube_context)
+        kubernetes_distro, kubernetes_infra = distro_infra_future.result()
+        return {
+            'kubernetes_version': version_future.result(),
+            'kubernetes_distro': kubernetes_distro,
+            'kubernetes_infra': kubernetes_infra
+        }
 
 
 def generate_request_payload(configuration, location, public_key, tags, aad_profile, kubernetes_distro, kubernetes_infra):
@@ -1060,6 +1124,13 @@ def print_or_merge_credentials(path, kubeconfig, overwrite_existing, context_nam
         print(kubeconfig)
         return
 
+    merge_credentials(path, [(kubeconfig, context_name)], overwrite_existing)
+
+
+def merge_credentials(path, kubeconfigs, overwrite_existing):
+    """Merge several unencrypted kubeconfigs, given as (kubeconfig, context_name) pairs, into the
+    file at the specified path with a single read and a single write.
+    """
     # ensure that at least an empty ~/.kube/config exists
     directory = os.path.dirname(path)
     if directory and not os.path.exists(directory):
@@ -1075,29 +1146,31 @@ def print_or_merge_credentials(path, kubeconfig, overwrite_existing, context_nam
         with os.fdopen(os.open(path, os.O_CREAT | os.O_WRONLY, 0o600), 'wt'):
             pass
 
-    # merge the new kubeconfig into the existing one
-    fd, temp_path = tempfile.mkstemp()
-    additional_file = os.fdopen(fd, 'w+t')
+    # merge the new kubeconfigs into the existing one
     try:
-        additional_file.write(kubeconfig)
-        additional_file.flush()
-        merge_kubernetes_configurations(path, temp_path, overwrite_existing, context_name)
+        additions = [(load_kubeconfig(kubeconfig), context_name) for kubeconfig, context_name in kubeconfigs]
+        merge_kubernetes_configuration_objects(path, additions, overwrite_existing)
     except yaml.YAMLError as ex:
         logger.warning('Failed to merge credentials to kube config file: %s', ex)
-    finally:
-        additional_file.close()
-        os.remove(temp_path)
 
 
 def merge_kubernetes_configurations(existing_file, addition_file, replace, context_name=None):
     try:
-        existing = load_kubernetes_configuration(existing_file)
         addition = load_kubernetes_configuration(addition_file)
     except Exception as ex:
         telemetry.set_exception(exception=ex, fault_type=consts.Failed_To_Load_K8s_Configuration_Fault_Type,
                                 summary='Exception while loading kubernetes configuration')
         raise CLIError('Exception while loading kubernetes configuration.' + str(ex))
 
+    if addition is None:
+        telemetry.set_exception(exception='Failed to load additional configuration', fault_type=consts.Failed_To_Load_K8s_Configuration_Fault_Type,
+                                summary='failed to load additional configuration from {}'.format(addition_file))
+        raise CLIError('failed to load additional configuration from {}'.format(addition_file))
+
+    merge_kubernetes_configuration_objects(existing_file, [(addition, context_name)], replace)
+
+
+def prepare_kubernetes_configuration(addition, context_name):
     if context_name is not None:
         addition['contexts'][0]['name'] = context_name
         addition['contexts'][0]['context']['cluster'] = context_name
@@ -1113,19 +1186,29 @@ def merge_kubernetes_configurations(existing_file, addition_file, replace, conte
                 break
         except (KeyError, TypeError):
             continue
+    return addition
 
-    if addition is None:
+
+def merge_kubernetes_configuration_objects(existing_file, additions, replace):
+    try:
+        existing = load_kubernetes_configuration(existing_file)
+    except Exception as ex:
+        telemetry.set_exception(exception=ex, fault_type=consts.Failed_To_Load_K8s_Configuration_Fault_Type,
+                                summary='Exception while loading kubernetes configuration')
+        raise CLIError('Exception while loading kubernetes configuration.' + str(ex))
+
+    if any(addition is None for addition, _ in additions):
         telemetry.set_exception(exception='Failed to load additional configuration', fault_type=consts.Failed_To_Load_K8s_Configuration_Fault_Type,
-                                summary='failed to load additional configuration from {}'.format(addition_file))
-        raise CLIError('failed to load additional configuration from {}'.format(addition_file))
+                                summary='failed to load additional configuration')
+        raise CLIError('failed to load additional configuration')
 
-    if existing is None:
-        existing = addition
-    else:
-        handle_merge(existing, addition, 'clusters', replace)
-        handle_merge(existing, addition, 'users', replace)
-        handle_merge(existing, addition, 'contexts', replace)
-        existing['current-context'] = addition['current-context']
+    additions = [prepare_kubernetes_configuration(addition, context_name) for addition, context_name in additions]
+    try:
+        existing = merge_kubeconfigs(existing, additions, replace)
+    except KubeconfigConflictError as ex:
+        telemetry.set_exception(exception='A different object with same name exists in the kubeconfig file', fault_type=consts.Different_Object_With_Same_Name_Fault_Type,
+                                summary=str(ex))
+        raise
 
     # check that ~/.kube/config is only read- and writable by its owner
     if platform.system() != 'Windows':
@@ -1134,52 +1217,31 @@ def merge_kubernetes_configurations(existing_file, addition_file, replace, conte
             logger.warning('%s has permissions "%s".\nIt should be readable and writable only by its owner.',
                            existing_file, existing_file_perms)
 
-    with open(existing_file, 'w+') as stream:
-        try:
-            yaml.safe_dump(existing, stream, default_flow_style=False)
-        except Exception as e:
-            telemetry.set_exception(exception=e, fault_type=consts.Failed_To_Merge_Kubeconfig_File,
-                                    summary='Exception while merging the kubeconfig file')
-            raise CLIError('Exception while merging the kubeconfig file.' + str(e))
+    try:
+        write_kubeconfig(existing, existing_file)
+    except Exception as e:
+        telemetry.set_exception(exception=e, fault_type=consts.Failed_To_Merge_Kubeconfig_File,
+                                summary='Exception while merging the kubeconfig file')
+        raise CLIError('Exception while merging the kubeconfig file.' + str(e))
 
-    current_context = addition.get('current-context', 'UNKNOWN')
+    current_context = additions[-1].get('current-context', 'UNKNOWN') if additions else 'UNKNOWN'
     msg = 'Merged "{}" as current context in {}'.format(current_context, existing_file)
     print(msg)
 
 
 def handle_merge(existing, addition, key, replace):
-    if not addition[key]:
-        return
-    if existing[key] is None:
-        existing[key] = addition[key]
-        return
-
-    for i in addition[key]:
-        for j in existing[key]:
-            if i['name'] == j['name']:
-                if replace or i == j:
-                    existing[key].remove(j)
-                else:
-                    msg = 'A different object named {} already exists in your kubeconfig file.\nOverwrite?'
-                    overwrite = False
-                    try:
-                        overwrite = prompt_y_n(msg.format(i['name']))
-                    except NoTTYException:
-                        pass
-                    if overwrite:
-                        existing[key].remove(j)
-                    else:
-                        msg = 'A different object named {} already exists in {} in your kubeconfig file.'
-                        telemetry.set_exception(exception='A different object with same name exists in the kubeconfig file', fault_type=consts.Different_Object_With_Same_Name_Fault_Type,
-                                                summary=msg.format(i['name'], key))
-                        raise CLIError(msg.format(i['name'], key))
-        existing[key].append(i)
+    try:
+        merge_named_entries(existing, addition, key, replace)
+    except KubeconfigConflictError as ex:
+        telemetry.set_exception(exception='A different object with same name exists in the kubeconfig file', fault_type=consts.Different_Object_With_Same_Name_Fault_Type,
+                                summary=str(ex))
+        raise
 
 
 def load_kubernetes_configuration(filename):
     try:
         with open(filename) as stream:
-            return yaml.safe_load(stream)
+            return load_kubeconfig(stream)
     except (IOError, OSError) as ex:
         if getattr(ex, 'errno', 0) == errno.ENOENT:
             telemetry.set_user_fault()
@@ -1298,15 +1360,13 @@ def update_agents(cmd, client, resource_group_name, cluster_name, https_proxy=""
     # Fetch Connected Cluster for agent version
     connected_cluster = get_connectedk8s(cmd, client, resource_group_name, cluster_name)
 
-    if hasattr(connected_cluster, 'distribution') and (connected_cluster.distribution is not None):
-        kubernetes_distro = connected_cluster.distribution
-    else:
-        kubernetes_distro = get_kubernetes_distro(configuration)
-
-    if hasattr(connected_cluster, 'infrastructure') and (connected_cluster.infrastructure is not None):
-        kubernetes_infra = connected_cluster.infrastructure
-    else:
-        kubernetes_infra = get_kubernetes_infra(configuration)
+    kubernetes_distro = getattr(connected_cluster, 'distribution', None)
+    kubernetes_infra = getattr(connected_cluster, 'infrastructure', None)
+    # Only list nodes when the connected cluster does not record the distribution or infrastructure
+    if kubernetes_distro is None or kubernetes_infra is None:
+        probed_distro, probed_infra = get_kubernetes_distro_infra(configuration, kube_config, kube_context)
+        kubernetes_distro = kubernetes_distro if kubernetes_distro is not None else probed_distro
+        kubernetes_infra = kubernetes_infra if kubernetes_infra is not None else probed_infra
 
     kubernetes_properties = {
         'Context.Default.AzureCLI.KubernetesVersion': kubernetes_version,
@@ -0,0 +1,78 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from azext_connectedk8s import custom
+
+
+def _node(provider_id, labels=None):
+    return SimpleNamespace(metadata=SimpleNamespace(labels=labels or {}, annotations={}),
+                           spec=SimpleNamespace(provider_id=provider_id))
+
+
+class ClusterProbeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir)
+        patcher = mock.patch('azure.cli.core.api.get_config_dir', return_value=self.config_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.nodes = {'kind-ctx': _node('kind://docker/kind/kind-control-plane'), 'k3s-ctx': _node('k3s://k3s-server')}
+        self.versions = iter(['v1.19.1', 'v1.20.2', 'v1.20.2'])
+        self.list_node = mock.MagicMock()
+        api = mock.MagicMock()
+        api.get_code.side_effect = lambda: SimpleNamespace(git_version=next(self.versions))
+        api.list_node = self.list_node
+        for target, value in [('CoreV1Api', api), ('VersionApi', api), ('ApiClient', None)]:
+            patcher = mock.patch('azext_connectedk8s.custom.kube_client.' + target, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _probe(self, kube_context):
+        configuration = SimpleNamespace(host='https://127.0.0.1:6443', ssl_ca_cert=None)
+        self.list_node.return_value = SimpleNamespace(items=[self.nodes[kube_context]])
+        return custom.probe_kubernetes_cluster(configuration, kube_context=kube_context)
+
+    def test_probe_cached_per_kube_context(self):
+        self.assertEqual(self._probe('kind-ctx'), {'kubernetes_version': 'v1.19.1', 'kubernetes_distro': 'kind',
+                                                   'kubernetes_infra': 'generic'})
+        self.assertEqual(self.list_node.call_args[1], {'label_selector': 'type!=virtual-kubelet', 'limit': 1})
+
+        # Another cluster behind the same API server address is probed on its own
+        self.assertEqual(self._probe('k3s-ctx')['kubernetes_distro'], 'k3s')
+        self.assertEqual(self.list_node.call_count, 2)
+
+        # A cached probe still reports the current version
+        probe = self._probe('kind-ctx')
+        self.assertEqual((probe['kubernetes_distro'], probe['kubernetes_version']), ('kind', 'v1.20.2'))
+        self.assertEqual(self.list_node.call_count, 2)
+        self.assertEqual(os.listdir(self.config_dir), ['connectedk8s_cluster_probe.json'])
+
+    def test_distro_infra_without_version(self):
+        configuration = SimpleNamespace(host='https://127.0.0.1:6443', ssl_ca_cert=None)
+        self.list_node.return_value = SimpleNamespace(items=[self.nodes['k3s-ctx']])
+        self.assertEqual(custom.get_kubernetes_distro_infra(configuration, kube_context='k3s-ctx'), ('k3s', 'generic'))
+        self.assertEqual(next(self.versions), 'v1.19.1')
+
+    def test_failed_node_listing_not_cached(self):
+        self.list_node.side_effect = Exception('forbidden')
+        with mock.patch('azext_connectedk8s._utils.kubernetes_exception_handler') as handler:
+            configuration = SimpleNamespace(host='https://127.0.0.1:6443', ssl_ca_cert=None)
+            probe = custom.probe_kubernetes_cluster(configuration, kube_context='kind-ctx')
+        self.assertEqual(probe['kubernetes_distro'], 'generic')
+        handler.assert_called_once()
+        self.assertEqual(os.listdir(self.config_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
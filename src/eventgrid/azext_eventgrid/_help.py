@@ -168,6 +168,19 @@ examples:
     text: az eventgrid domain topic create -g rg1 --domain-name domain1 --name domaintopic1
 """
 
+helps['eventgrid domain topic apply-event-subscriptions'] = """
+type: command
+short-summary: Create, update or delete the event subscriptions of many domain topics from a single template.
+long-summary: |
+    The event subscription is built once from the template and compared with the existing event subscriptions of every listed domain topic. Missing domain topics are created, and event subscriptions that are missing or differ from the template are created or updated concurrently. Failures do not stop the run; they are listed in the "failed" section of the returned report.
+    Example spec: {"template": {"endpoint": "https://contoso.com/api/events", "includedEventTypes": ["Created"], "maxDeliveryAttempts": 10}, "eventSubscriptions": [{"topic": "topic1", "name": "sub1"}, {"topic": "topic2", "name": "sub1"}]}
+examples:
+  - name: Apply the event subscriptions in a spec file to domain topics.
+    text: az eventgrid domain topic apply-event-subscriptions -g rg1 --domain-name domain1 --spec @subscriptions.json
+  - name: Show what would change, including the event subscriptions to delete because they are not in the spec.
+    text: az eventgrid domain topic apply-event-subscriptions -g rg1 --domain-name domain1 --spec @subscriptions.json --prune --dry-run
+"""
+
 helps['eventgrid domain topic delete'] = """
 type: command
 short-summary: Delete a domain topic under a domain.
@@ -1048,6 +1061,20 @@ examples:
         az eventgrid event-subscription list --source-resource-id /subscriptions/{SubID}/resourceGroups/{RG}/providers/Microsoft.EventGrid/domains/d1 --odata-query "NOT (name eq 'name1')"
 """
 
+helps['eventgrid event-subscription inventory'] = """
+type: command
+short-summary: List the event subscriptions of all Event Grid topics, system topics, partner topics, domains and domain topics.
+long-summary: |
+    The resources of every topic type are enumerated and their event subscriptions listed concurrently. Each event subscription is written to stdout as one line of JSON (NDJSON) with its scope type and scope resource ID, as soon as the event subscriptions of its scope have been listed.
+examples:
+  - name: Write the event subscriptions of all Event Grid resources in the current Azure subscription to a file.
+    text: |
+        az eventgrid event-subscription inventory > inventory.ndjson
+  - name: List the event subscriptions of the Event Grid resources in a resource group, with at most 4 concurrent requests.
+    text: |
+        az eventgrid event-subscription inventory -g rg1 --max-concurrency 4
+"""
+
 helps['eventgrid event-subscription show'] = """
 type: command
 short-summary: Get the details of an event subscription.
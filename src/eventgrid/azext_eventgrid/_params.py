@@ -17,6 +17,7 @@ from azure.cli.core.commands.parameters import (
     name_type
 )
 
+from azure.cli.core.util import get_json_object
 from .advanced_filter import EventSubscriptionAddFilter
 from .event_channel_filter import EventChannelAddFilter
 from .inbound_ip_rules import AddInboundIpRule
@@ -260,6 +261,13 @@ def load_arguments(self, _):    # pylint: disable=too-many-statements
         c.argument('domain_name', arg_type=domain_name_type, id_part=None)
         c.argument('odata_query', arg_type=odata_query_type, id_part=None)
 
+    with self.argument_context('eventgrid domain topic apply-event-subscriptions') as c:
+        c.argument('domain_name', arg_type=domain_name_type, id_part=None)
+        c.argument('spec', type=get_json_object, help='JSON spec with a "template" holding the arguments of `az eventgrid event-subscription create` and an "eventSubscriptions" list of {"topic", "name"} objects. Use @{file} to load from a file.')
+        c.argument('prune', action='store_true', help='Delete the event subscriptions of the listed domain topics that are not in the spec.')
+        c.argument('dry_run', action='store_true', help='Only report the changes that would be made.')
+        c.argument('max_concurrency', type=int, help='Maximum number of requests to run concurrently.')
+
     with self.argument_context('eventgrid domain private-endpoint-connection') as c:
         c.argument('domain_name', arg_type=domain_name_type, id_part='name')
         c.argument('private_endpoint_connection_name', arg_type=private_endpoint_connection_name_type, options_list=['--name', '-n'], id_part='privateendpointconnections')
@@ -355,6 +363,11 @@ def load_arguments(self, _):    # pylint: disable=too-many-statements
     with self.argument_context('eventgrid event-subscription list') as c:
         c.argument('odata_query', arg_type=odata_query_type, id_part=None)
 
+    with self.argument_context('eventgrid event-subscription inventory') as c:
+        c.argument('resource_group_name', arg_type=resource_group_name_type, help='Only include the topics and domains of this resource group.')
+        c.argument('odata_query', arg_type=odata_query_type, id_part=None)
+        c.argument('max_concurrency', type=int, help='Maximum number of list requests to run concurrently.')
+
     with self.argument_context('eventgrid event-subscription show') as c:
         c.argument('include_full_endpoint_url', arg_type=get_three_state_flag(), options_list=['--include-full-endpoint-url'], help="Specify to indicate whether the full endpoint URL should be returned. True if flag present.", )
 
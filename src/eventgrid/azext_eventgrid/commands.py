@@ -128,6 +128,7 @@ def load_command_table(self, _):
         g.custom_command('list', 'cli_domain_topic_list')
         g.custom_command('delete', 'cli_domain_topic_delete')
         g.custom_command('create', 'cli_domain_topic_create_or_update')
+        g.custom_command('apply-event-subscriptions', 'cli_domain_topic_event_subscription_apply')
 
     with self.command_group('eventgrid domain', domains_mgmt_util, client_factory=domains_factory) as g:
         g.show_command('show', 'get')
@@ -221,6 +222,7 @@ def load_command_table(self, _):
         g.custom_show_command('show', 'cli_eventgrid_event_subscription_get')
         g.custom_command('delete', 'cli_eventgrid_event_subscription_delete')
         g.custom_command('list', 'cli_event_subscription_list')
+        g.custom_command('inventory', 'cli_event_subscription_inventory')
         g.generic_update_command('update',
                                  getter_type=eventgrid_custom,
                                  setter_type=eventgrid_custom,
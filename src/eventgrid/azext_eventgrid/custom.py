@@ -61,6 +61,7 @@ EVENTGRID_PARTNER_REGISTRATIONS = "partnerregistration"
 EVENTGRID_PARTNER_NAMESPACES = "partnernamespace"
 EVENTGRID_EVENT_CHANNELS = "eventchannel"
 EVENTGRID_PARTNER_TOPIC = "partnertopic"
+EVENTGRID_PARTNER_TOPICS = "partnertopics"
 EVENTGRID_PRIVATE_ENDPOINT_CONNECTION = "privateendpointconnections"
 EVENTGRID_RESOURCE_SKU = "resourceSku"
 SKU_BASIC = "Basic"
@@ -99,6 +100,7 @@ EXTENSION_NUMBER_REGEX = "^(?:[0-9] ?){1,8}[0-9]$"
 
 DEFAULT_TOP = 100
 MAX_LONG_DESCRIPTION_LEN = 2048
+DEFAULT_MAX_CONCURRENCY = 8
 
 
 def cli_topic_list(
@@ -287,6 +289,170 @@ def cli_domain_topic_create_or_update(
         domain_topic_name)
 
 
+def cli_domain_topic_event_subscription_apply(   # pylint: disable=too-many-locals
+        cmd,
+        client,
+        resource_group_name,
+        domain_name,
+        spec,
+        prune=False,
+        dry_run=False,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """Make the event subscriptions of domain topics match a template.
+
+    `spec` holds a `template` with the arguments of `az eventgrid event-subscription create` and a list of
+    `event_subscriptions`, each naming a `topic` and a subscription `name`. The event subscription model is
+    built once from the template. The existing event subscriptions of every listed topic are compared
+    against it, then missing domain topics are created and event subscriptions are created, updated or, with
+    `prune`, deleted concurrently. Failures are collected in the returned report instead of stopping the run.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from ._client_factory import cf_eventgrid
+
+    if max_concurrency < 1:
+        raise CLIError('usage error: --max-concurrency must be at least 1.')
+    event_subscription_info, desired = _load_event_subscription_apply_spec(spec)
+    eventgrid_client = cf_eventgrid(cmd.cli_ctx)
+    domain_id = '/subscriptions/{}/resourceGroups/{}/providers/{}/{}/{}'.format(
+        eventgrid_client.config.subscription_id, resource_group_name, EVENTGRID_NAMESPACE, EVENTGRID_DOMAINS,
+        domain_name)
+    existing_topics = {topic.name.lower()
+                       for topic in client.list_by_domain(resource_group_name, domain_name, None, DEFAULT_TOP)}
+    report = {'created': [], 'updated': [], 'deleted': [], 'unchanged': [], 'failed': []}
+
+    def _record_failure(action, topic, name, ex):
+        logger.warning('Unable to %s event subscription %s of domain topic %s: %s', action, name, topic, ex)
+        report['failed'].append({'action': action, 'topic': topic, 'name': name, 'error': str(ex)})
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        # diff against the event subscriptions of the topics that already exist
+        def _list(topic):
+            return list(eventgrid_client.event_subscriptions.list_by_domain_topic(
+                resource_group_name, domain_name, topic, None, DEFAULT_TOP))
+
+        listings = {topic: executor.submit(_list, topic) for topic in desired if topic.lower() in existing_topics}
+        operations = []
+        for topic, names in desired.items():
+            try:
+                existing = {x.name.lower(): x for x in listings[topic].result()} if topic in listings else {}
+            except Exception as ex:  # pylint: disable=broad-except
+                for name in names:
+                    _record_failure('list', topic, name, ex)
+                continue
+            for name in names:
+                current = existing.pop(name.lower(), None)
+                if current is None:
+                    operations.append(('create', topic, name))
+                elif _event_subscription_differs(event_subscription_info, current):
+                    operations.append(('update', topic, name))
+                else:
+                    report['unchanged'].append({'topic': topic, 'name': name})
+            if prune:
+                operations.extend(('delete', topic, current.name) for current in existing.values())
+
+        if dry_run:
+            for action, topic, name in operations:
+                report[action + 'd'].append({'topic': topic, 'name': name})
+            return report
+
+        # event subscriptions can only be created once their domain topic exists
+        new_topics = {topic for _, topic, _ in operations if topic.lower() not in existing_topics}
+        topic_futures = {topic: executor.submit(lambda topic: client.create_or_update(
+            resource_group_name, domain_name, topic).result(), topic) for topic in new_topics}
+
+        def _apply(action, topic, name):
+            if topic in topic_futures:
+                topic_futures[topic].result()
+            scope = '{}/{}/{}'.format(domain_id, EVENTGRID_TOPICS, topic)
+            if action == 'delete':
+                eventgrid_client.event_subscriptions.delete(scope, name).result()
+            else:
+                eventgrid_client.event_subscriptions.create_or_update(scope, name, event_subscription_info).result()
+
+        # topic creations are queued first, so the operations waiting on them never starve the pool
+        futures = [(operation, executor.submit(_apply, *operation)) for operation in operations]
+        for (action, topic, name), future in futures:
+            try:
+                future.result()
+            except Exception as ex:  # pylint: disable=broad-except
+                _record_failure(action, topic, name, ex)
+                continue
+            report[action + 'd'].append({'topic': topic, 'name': name})
+
+    if report['failed']:
+        logger.warning('%d of %d event subscription operations failed.', len(report['failed']),
+                       len(report['failed']) + sum(len(report[x]) for x in ('created', 'updated', 'deleted')))
+    return report
+
+
+def _load_event_subscription_apply_spec(spec):
+    """Build the event subscription model from the template of an apply spec.
+
+    Returns the model and the desired event subscription names by domain topic.
+    """
+    import inspect
+    if not isinstance(spec, dict) or not isinstance(spec.get('template'), dict) or \
+            not isinstance(spec.get('event_subscriptions'), list):
+        raise CLIError('usage error: the spec must be an object with a "template" object and an '
+                       '"eventSubscriptions" list.')
+    template = dict(spec['template'])
+    if 'advanced_filters' in template:
+        template['advanced_filter'] = EventSubscriptionFilter.from_dict(
+            {'advanced_filters': template.pop('advanced_filters')}).advanced_filters
+    allowed = set(inspect.signature(_get_event_subscription_info).parameters)
+    unknown = sorted(set(template) - allowed)
+    if unknown:
+        raise CLIError('Unknown template properties: {}'.format(', '.join(unknown)))
+    event_subscription_info = _get_event_subscription_info(**template)
+
+    desired = {}
+    seen = set()
+    for item in spec['event_subscriptions']:
+        if not isinstance(item, dict) or not item.get('topic') or not item.get('name'):
+            raise CLIError('usage error: each event subscription must have a "topic" and a "name".')
+        key = (item['topic'].lower(), item['name'].lower())
+        if key in seen:
+            raise CLIError('Event subscription {} of domain topic {} is listed more than once.'.format(
+                item['name'], item['topic']))
+        seen.add(key)
+        desired.setdefault(item['topic'], []).append(item['name'])
+    return event_subscription_info, desired
+
+
+def _event_subscription_differs(desired, existing):
+    """Whether applying `desired` would change `existing`.
+
+    Only the properties set in `desired` are compared, since the service fills in defaults for the rest.
+    The service never returns the full URL of a webhook, so it is compared by its base URL.
+    """
+    desired_body = desired.serialize()
+    existing_body = existing.serialize(keep_readonly=True)
+    for path in (('properties', 'destination', 'properties'),
+                 ('properties', 'deliveryWithResourceIdentity', 'destination', 'properties')):
+        desired_destination = _get_nested(desired_body, path)
+        existing_destination = _get_nested(existing_body, path)
+        if desired_destination and existing_destination and 'endpointUrl' in desired_destination and \
+                existing_destination.get('endpointUrl') is None and \
+                desired_destination['endpointUrl'].split('?')[0] == existing_destination.get('endpointBaseUrl'):
+            existing_destination['endpointUrl'] = desired_destination['endpointUrl']
+    return not _is_contained(desired_body, existing_body)
+
+
+def _get_nested(body, path):
+    for key in path:
+        if not isinstance(body, dict):
+            return None
+        body = body.get(key)
+    return body
+
+
+def _is_contained(expected, actual):
+    if isinstance(expected, dict):
+        return isinstance(actual, dict) and all(
+            _is_contained(value, actual.get(key)) for key, value in expected.items())
+    return expected == actual
+
+
 def cli_domain_topic_delete(
         client,
         resource_group_name,
@@ -909,6 +1075,115 @@ def cli_event_subscription_list(   # pylint: disable=too-many-return-statements
         DEFAULT_TOP)
 
 
+def cli_event_subscription_inventory(
+        cmd,
+        resource_group_name=None,
+        odata_query=None,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """Write every event subscription of every topic, system topic, partner topic, domain and domain topic
+    as one line of JSON to stdout.
+
+    The resources of each topic type are enumerated concurrently, then the event subscriptions of each
+    resource are listed concurrently by at most `max_concurrency` requests. Each line is written as soon as
+    the subscriptions of its resource have been listed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from ._client_factory import cf_eventgrid
+
+    if max_concurrency < 1:
+        raise CLIError('usage error: --max-concurrency must be at least 1.')
+    eventgrid_client = cf_eventgrid(cmd.cli_ctx)
+    failures = []
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        scopes = _list_inventory_scopes(executor, eventgrid_client, resource_group_name, failures)
+        _write_inventory_event_subscriptions(executor, eventgrid_client, scopes, odata_query, failures)
+
+    if failures:
+        raise CLIError('The inventory is incomplete: {} scope(s) could not be listed.'.format(len(failures)))
+
+
+def _list_inventory_scopes(executor, eventgrid_client, resource_group_name, failures):
+    from concurrent.futures import as_completed
+
+    def _list_resources(operations):
+        if resource_group_name:
+            return list(operations.list_by_resource_group(resource_group_name, None, DEFAULT_TOP))
+        return list(operations.list_by_subscription(None, DEFAULT_TOP))
+
+    scope_listers = {
+        EVENTGRID_TOPICS: lambda: _list_resources(eventgrid_client.topics),
+        EVENTGRID_SYSTEM_TOPICS: lambda: _list_resources(eventgrid_client.system_topics),
+        EVENTGRID_PARTNER_TOPICS: lambda: _list_resources(eventgrid_client.partner_topics),
+        EVENTGRID_DOMAINS: lambda: _list_resources(eventgrid_client.domains),
+    }
+    scope_futures = {executor.submit(lister): scope_type for scope_type, lister in scope_listers.items()}
+    scopes = []
+    for future in as_completed(scope_futures):
+        try:
+            resources = future.result()
+        except Exception as ex:  # pylint: disable=broad-except
+            failures.append(scope_futures[future])
+            logger.warning('Unable to list %s: %s', scope_futures[future], ex)
+            continue
+        scopes.extend((scope_futures[future], resource) for resource in resources)
+
+    domain_topic_futures = {
+        executor.submit(lambda domain: list(eventgrid_client.domain_topics.list_by_domain(
+            parse_resource_id(domain.id)['resource_group'], domain.name, None, DEFAULT_TOP)), resource): resource
+        for scope_type, resource in scopes if scope_type == EVENTGRID_DOMAINS}
+    for future in as_completed(domain_topic_futures):
+        try:
+            scopes.extend((EVENTGRID_DOMAIN_TOPICS, topic) for topic in future.result())
+        except Exception as ex:  # pylint: disable=broad-except
+            failures.append(domain_topic_futures[future].id)
+            logger.warning('Unable to list the topics of domain %s: %s', domain_topic_futures[future].id, ex)
+    return scopes
+
+
+def _write_inventory_event_subscriptions(executor, eventgrid_client, scopes, odata_query, failures):
+    import json
+    import sys
+    from concurrent.futures import as_completed
+    from azure.cli.core.util import todict
+
+    subscription_futures = {
+        executor.submit(_list_event_subscriptions_for_scope, eventgrid_client, scope_type, resource.id,
+                        odata_query): (scope_type, resource.id)
+        for scope_type, resource in scopes}
+    for future in as_completed(subscription_futures):
+        scope_type, scope_id = subscription_futures[future]
+        try:
+            event_subscriptions = future.result()
+        except Exception as ex:  # pylint: disable=broad-except
+            failures.append(scope_id)
+            logger.warning('Unable to list the event subscriptions of %s: %s', scope_id, ex)
+            continue
+        for event_subscription in event_subscriptions:
+            record = {'scopeType': scope_type, 'scopeId': scope_id,
+                      'eventSubscription': todict(event_subscription)}
+            sys.stdout.write(json.dumps(record, default=str) + '\n')
+        sys.stdout.flush()
+
+
+def _list_event_subscriptions_for_scope(eventgrid_client, scope_type, scope_id, odata_query):
+    # the list operations page with DEFAULT_TOP, the largest page size the service accepts
+    id_parts = parse_resource_id(scope_id)
+    rg_name = id_parts['resource_group']
+    if scope_type == EVENTGRID_SYSTEM_TOPICS:
+        pages = eventgrid_client.system_topic_event_subscriptions.list_by_system_topic(
+            rg_name, id_parts['name'], odata_query, DEFAULT_TOP)
+    elif scope_type == EVENTGRID_PARTNER_TOPICS:
+        pages = eventgrid_client.partner_topic_event_subscriptions.list_by_partner_topic(
+            rg_name, id_parts['name'], odata_query, DEFAULT_TOP)
+    elif scope_type == EVENTGRID_DOMAIN_TOPICS:
+        pages = eventgrid_client.event_subscriptions.list_by_domain_topic(
+            rg_name, id_parts['name'], id_parts['child_name_1'], odata_query, DEFAULT_TOP)
+    else:
+        pages = eventgrid_client.event_subscriptions.list_by_resource(
+            rg_name, EVENTGRID_NAMESPACE, scope_type, id_parts['name'], odata_query, DEFAULT_TOP)
+    return list(pages)
+
+
 def cli_topic_private_endpoint_connection_get(
         client,
         resource_group_name,
@@ -0,0 +1,112 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import unittest
+from unittest import mock
+
+from knack.util import CLIError
+
+from azure.cli.core.util import get_json_object
+from azext_eventgrid.custom import (cli_domain_topic_event_subscription_apply, _load_event_subscription_apply_spec,
+                                    _event_subscription_differs)
+from azext_eventgrid.vendored_sdks.eventgrid.models import DomainTopic, EventSubscription, \
+    WebHookEventSubscriptionDestination, NumberInAdvancedFilter
+
+SPEC = '''{
+    "template": {"endpoint": "https://contoso.com/api/events?code=secret", "includedEventTypes": ["Created"],
+                 "maxDeliveryAttempts": 10,
+                 "advancedFilters": [{"operatorType": "NumberIn", "key": "data.size", "values": [1, 2]}]},
+    "eventSubscriptions": [{"topic": "t1", "name": "same"}, {"topic": "t1", "name": "changed"},
+                           {"topic": "t2", "name": "new"}]
+}'''
+
+
+def _named(model, name):
+    item = model()
+    item.name = name
+    return item
+
+
+def _existing(info, name, endpoint_base_url='https://contoso.com/api/events'):
+    current = EventSubscription.deserialize(info.serialize())
+    current.name = name
+    current.destination = WebHookEventSubscriptionDestination()
+    current.destination.endpoint_base_url = endpoint_base_url
+    current.provisioning_state = 'Succeeded'
+    return current
+
+
+class DomainTopicEventSubscriptionApplyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.info, self.desired = _load_event_subscription_apply_spec(get_json_object(SPEC))
+
+    def test_load_spec(self):
+        self.assertEqual(self.desired, {'t1': ['same', 'changed'], 't2': ['new']})
+        self.assertEqual(self.info.retry_policy.max_delivery_attempts, 10)
+        self.assertIsInstance(self.info.filter.advanced_filters[0], NumberInAdvancedFilter)
+        with self.assertRaises(CLIError):
+            _load_event_subscription_apply_spec({'template': {'endpoint': 'x', 'unknown': 1},
+                                                 'event_subscriptions': []})
+        with self.assertRaises(CLIError):
+            _load_event_subscription_apply_spec({'template': {'endpoint': 'x'},
+                                                 'event_subscriptions': [{'topic': 'a', 'name': 'b'},
+                                                                         {'topic': 'A', 'name': 'B'}]})
+
+    def test_differs(self):
+        self.assertFalse(_event_subscription_differs(self.info, _existing(self.info, 'same')))
+        self.assertTrue(_event_subscription_differs(self.info, _existing(self.info, 'x', 'https://other.com')))
+        changed = _existing(self.info, 'changed')
+        changed.filter.included_event_types = ['Deleted']
+        self.assertTrue(_event_subscription_differs(self.info, changed))
+
+    def _run(self, **kwargs):
+        changed = _existing(self.info, 'changed')
+        changed.retry_policy.max_delivery_attempts = 30
+        client = mock.MagicMock()
+        client.list_by_domain.return_value = iter([_named(DomainTopic, 't1')])
+        eventgrid_client = mock.MagicMock()
+        eventgrid_client.config.subscription_id = 'sub'
+        eventgrid_client.event_subscriptions.list_by_domain_topic.return_value = [
+            _existing(self.info, 'same'), changed, _existing(self.info, 'extra')]
+        with mock.patch('azext_eventgrid._client_factory.cf_eventgrid', return_value=eventgrid_client):
+            report = cli_domain_topic_event_subscription_apply(mock.MagicMock(), client, 'rg', 'd1',
+                                                               get_json_object(SPEC), max_concurrency=2, **kwargs)
+        return client, eventgrid_client, report
+
+    def test_apply(self):
+        client, eventgrid_client, report = self._run(prune=True)
+
+        self.assertEqual(report['unchanged'], [{'topic': 't1', 'name': 'same'}])
+        self.assertEqual(report['updated'], [{'topic': 't1', 'name': 'changed'}])
+        self.assertEqual(report['created'], [{'topic': 't2', 'name': 'new'}])
+        self.assertEqual(report['deleted'], [{'topic': 't1', 'name': 'extra'}])
+        client.create_or_update.assert_called_once_with('rg', 'd1', 't2')
+        scopes = sorted(call[0][0] for call in eventgrid_client.event_subscriptions.create_or_update.call_args_list)
+        self.assertEqual(scopes, [
+            '/subscriptions/sub/resourceGroups/rg/providers/Microsoft.EventGrid/domains/d1/topics/t1',
+            '/subscriptions/sub/resourceGroups/rg/providers/Microsoft.EventGrid/domains/d1/topics/t2'])
+
+    def test_dry_run(self):
+        client, eventgrid_client, report = self._run(dry_run=True)
+        self.assertEqual(len(report['created']) + len(report['updated']), 2)
+        self.assertEqual(report['deleted'], [])
+        client.create_or_update.assert_not_called()
+        eventgrid_client.event_subscriptions.create_or_update.assert_not_called()
+
+    def test_partial_failure(self):
+        client = mock.MagicMock()
+        client.list_by_domain.return_value = iter([])
+        client.create_or_update.side_effect = ValueError('boom')
+        eventgrid_client = mock.MagicMock()
+        with mock.patch('azext_eventgrid._client_factory.cf_eventgrid', return_value=eventgrid_client):
+            report = cli_domain_topic_event_subscription_apply(mock.MagicMock(), client, 'rg', 'd1',
+                                                               get_json_object(SPEC))
+        self.assertEqual(len(report['failed']), 3)
+        self.assertEqual(report['failed'][0]['error'], 'boom')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import json
+import unittest
+from unittest import mock
+
+from knack.util import CLIError
+
+from azext_eventgrid.custom import cli_event_subscription_inventory
+from azext_eventgrid.vendored_sdks.eventgrid.models import EventSubscription, Topic, Domain, DomainTopic, SystemTopic
+
+RG_ID = '/subscriptions/sub/resourceGroups/rg/providers/Microsoft.EventGrid/'
+
+
+def _resource(model, resource_type, name, **kwargs):
+    resource = model(location='westus2', **kwargs) if model is not DomainTopic else model()
+    resource.id = RG_ID + resource_type + '/' + name
+    resource.name = name.split('/')[-1]
+    return resource
+
+
+def _subscription(name):
+    subscription = EventSubscription()
+    subscription.name = name
+    return subscription
+
+
+class EventSubscriptionInventoryTest(unittest.TestCase):
+
+    def _client(self):
+        client = mock.MagicMock()
+        client.topics.list_by_subscription.return_value = iter([_resource(Topic, 'topics', 't1')])
+        client.domains.list_by_subscription.return_value = iter([_resource(Domain, 'domains', 'd1')])
+        client.system_topics.list_by_subscription.return_value = iter([_resource(SystemTopic, 'systemTopics', 's1')])
+        client.partner_topics.list_by_subscription.return_value = iter([])
+        client.domain_topics.list_by_domain.return_value = iter([_resource(DomainTopic, 'domains', 'd1/topics/dt1')])
+        client.event_subscriptions.list_by_resource.side_effect = \
+            lambda rg, ns, resource_type, name, query, top: iter([_subscription(resource_type + '-' + name)])
+        client.event_subscriptions.list_by_domain_topic.side_effect = \
+            lambda rg, domain, topic, query, top: iter([_subscription(domain + '-' + topic)])
+        client.system_topic_event_subscriptions.list_by_system_topic.side_effect = \
+            lambda rg, name, query, top: iter([_subscription('system-' + name)])
+        return client
+
+    def _run(self, client, **kwargs):
+        output = io.StringIO()
+        with mock.patch('azext_eventgrid._client_factory.cf_eventgrid', return_value=client), \
+                mock.patch('sys.stdout', output):
+            cli_event_subscription_inventory(mock.MagicMock(), max_concurrency=2, **kwargs)
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_inventory_all_scopes(self):
+        client = self._client()
+        records = self._run(client)
+
+        self.assertEqual(sorted((r['scopeType'], r['eventSubscription']['name']) for r in records), [
+            ('domains', 'domains-d1'), ('domaintopics', 'd1-dt1'),
+            ('systemtopics', 'system-s1'), ('topics', 'topics-t1')])
+        scope_ids = {r['scopeType']: r['scopeId'] for r in records}
+        self.assertEqual(scope_ids['domaintopics'], RG_ID + 'domains/d1/topics/dt1')
+        client.domain_topics.list_by_domain.assert_called_once_with('rg', 'd1', None, 100)
+
+    def test_inventory_reports_partial_failure(self):
+        client = self._client()
+        client.system_topic_event_subscriptions.list_by_system_topic.side_effect = ValueError('boom')
+        output = io.StringIO()
+        with mock.patch('azext_eventgrid._client_factory.cf_eventgrid', return_value=client), \
+                mock.patch('sys.stdout', output):
+            self.assertRaises(CLIError, cli_event_subscription_inventory, mock.MagicMock())
+        self.assertEqual(len(output.getvalue().splitlines()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,7 @@
 from codecs import open
 from setuptools import setup, find_packages
 
-VERSION = "0.4.9"
+VERSION = "0.5.0"
 
 CLASSIFIERS = [
     'Development Status :: 4 - Beta',
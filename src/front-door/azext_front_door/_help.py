@@ -37,6 +37,23 @@ helps['network front-door delete'] = """
     type: command
     short-summary: Delete a Front Door.
 """
+
+helps['network front-door batch-update'] = """
+    type: command
+    short-summary: Apply several subresource edits to a Front Door and its rules engines in a single update.
+    long-summary: |
+        Edits are applied in order to one in-memory copy of the Front Door, which is then committed with a single PUT.
+        Each rules engine that is edited is updated once; those updates complete before the Front Door is updated so that routing rules may reference them.
+        The spec is a list of edits (or an object with an "edits" list). Each edit has an "action" and a "type":
+            backend-pool, frontend-endpoint, load-balancing, probe, routing-rule: "upsert" with "properties", or "delete" with "name".
+            backend: "add" with "properties", or "remove" with "address"; both require "backendPool".
+            rules-engine-rule: "upsert" with "properties", or "delete" with "name"; both require "rulesEngine".
+        "properties" takes the same shape as the output of the corresponding show command.
+    examples:
+      - name: Add a backend pool and a routing rule, and drop the default routing rule, in one update.
+        text: |
+            az network front-door batch-update -g MyResourceGroup -n MyFrontDoor --spec edits.json
+"""
 # endregion
 
 # region FrontDoor BackendPool
@@ -17,7 +17,7 @@ from knack.arguments import CLIArgumentType
 from ._completers import get_fd_subresource_completion_list
 from ._validators import (
     validate_waf_policy, validate_load_balancing_settings, validate_probe_settings,
-    validate_frontend_endpoints, validate_backend_pool, validate_rules_engine)
+    validate_frontend_endpoints, validate_backend_pool, validate_rules_engine, validate_batch_spec)
 
 
 class RouteType(str, Enum):
@@ -93,6 +93,9 @@ def load_arguments(self, _):
     with self.argument_context('network front-door purge-endpoint') as c:
         c.argument('content_paths', nargs='+')
 
+    with self.argument_context('network front-door batch-update') as c:
+        c.argument('spec', help='JSON file path or inline JSON describing the list of subresource edits to apply in a single update.', validator=validate_batch_spec)
+
     with self.argument_context('network front-door backend-pool') as c:
         c.argument('load_balancing_settings', options_list='--load-balancing', help='Name or ID of the load balancing settings.', validator=validate_load_balancing_settings)
         c.argument('probe_settings', options_list='--probe', help='Name or ID of the probe settings.', validator=validate_probe_settings)
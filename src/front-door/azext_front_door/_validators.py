@@ -105,3 +105,15 @@ class MatchConditionAction(argparse._AppendAction):
     def __call__(self, parser, namespace, values, option_string=None):
         match_condition = self.parse_match_condition(values)
         super(MatchConditionAction, self).__call__(parser, namespace, match_condition, option_string)
+
+
+def validate_batch_spec(namespace):
+    import os
+    from azure.cli.core.util import get_file_json, shell_safe_json_parse
+
+    if namespace.spec is None:
+        return
+    if os.path.exists(os.path.expanduser(namespace.spec)):
+        namespace.spec = get_file_json(os.path.expanduser(namespace.spec))
+    else:
+        namespace.spec = shell_safe_json_parse(namespace.spec)
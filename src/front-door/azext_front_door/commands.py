@@ -69,6 +69,7 @@ def load_command_table(self, _):
         g.custom_command('list', 'list_front_doors')
         g.generic_update_command('update', custom_func_name='update_front_door', setter_arg_name='front_door_parameters')
         g.command('check-custom-domain', 'validate_custom_domain')
+        g.custom_command('batch-update', 'batch_update_front_door', supports_no_wait=True)
 
     with self.command_group('network front-door', fd_endpoint_sdk) as g:
         g.command('purge-endpoint', 'purge_content')
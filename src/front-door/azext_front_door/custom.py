@@ -37,12 +37,11 @@ class UpdateContext(object):
             setattr(self.instance, prop, value)
 
 
-def _upsert_frontdoor_subresource(cmd, resource_group_name, front_door_name, collection_name, obj_to_add, key_name):
-    client = cf_frontdoor(cmd.cli_ctx, None)
-    frontdoor = client.get(resource_group_name, front_door_name)
-    if not getattr(frontdoor, collection_name, None):
-        setattr(frontdoor, collection_name, [])
-    collection = getattr(frontdoor, collection_name, None)
+def _upsert_into_collection(parent, collection_name, obj_to_add, key_name):
+    """ Replace or append `obj_to_add` in a collection of `parent` in memory. Returns the key value. """
+    if not getattr(parent, collection_name, None):
+        setattr(parent, collection_name, [])
+    collection = getattr(parent, collection_name, None)
 
     item_name = getattr(obj_to_add, key_name)
     if item_name is None:
@@ -54,6 +53,21 @@ def _upsert_frontdoor_subresource(cmd, resource_group_name, front_door_name, col
         logger.warning("Item '%s' already exists. Replacing with new values.", item_name)
         collection.remove(match)
     collection.append(obj_to_add)
+    return item_name
+
+
+def _remove_from_collection(parent, collection_name, item_name):
+    """ Drop the entry named `item_name` (case-insensitive) from a collection of `parent` in memory. """
+    keep_items = \
+        [x for x in getattr(parent, collection_name) or [] if x.name.lower() != item_name.lower()]
+    with UpdateContext(parent) as c:
+        c.update_param(collection_name, keep_items, False)
+
+
+def _upsert_frontdoor_subresource(cmd, resource_group_name, front_door_name, collection_name, obj_to_add, key_name):
+    client = cf_frontdoor(cmd.cli_ctx, None)
+    frontdoor = client.get(resource_group_name, front_door_name)
+    item_name = _upsert_into_collection(frontdoor, collection_name, obj_to_add, key_name)
     result = client.create_or_update(resource_group_name, front_door_name, frontdoor).result()
     collection = getattr(result, collection_name)
     item = next(x for x in collection if getattr(x, key_name) == item_name)
@@ -99,10 +113,7 @@ def delete_frontdoor_resource_property_entry(resource, prop):
 
         client = cf_frontdoor(cmd.cli_ctx, None)
         item = client.get(resource_group_name, resource_name)
-        keep_items = \
-            [x for x in item.__getattribute__(prop) if x.name.lower() != item_name.lower()]
-        with UpdateContext(item) as c:
-            c.update_param(prop, keep_items, False)
+        _remove_from_collection(item, prop, item_name)
         if no_wait:
             sdk_no_wait(no_wait, client.create_or_update, resource_group_name, resource_name, item)
         else:
@@ -1437,3 +1448,165 @@ def list_rules_engine_action(cmd, resource_group_name,
     raise CLIError("rule '{}' not found".format(rule_name))
 
 # endregion
+
+
+# region Batch
+_BATCH_FRONT_DOOR_COLLECTIONS = {
+    'backend-pool': ('backend_pools', 'BackendPool'),
+    'frontend-endpoint': ('frontend_endpoints', 'FrontendEndpoint'),
+    'load-balancing': ('load_balancing_settings', 'LoadBalancingSettingsModel'),
+    'probe': ('health_probe_settings', 'HealthProbeSettingsModel'),
+    'routing-rule': ('routing_rules', 'RoutingRule')
+}
+_BATCH_ACTIONS = {
+    'backend': ('add', 'remove'),
+    'rules-engine-rule': ('upsert', 'delete')
+}
+_BATCH_ACTIONS.update({x: ('upsert', 'delete') for x in _BATCH_FRONT_DOOR_COLLECTIONS})
+
+
+def _load_batch_spec(spec):
+    """ Normalize a batch spec into a validated list of edits.
+
+    The spec is either a list of edits or an object with an 'edits' list. Each edit has an 'action',
+    a 'type' (a `network front-door` subgroup name, 'backend' or 'rules-engine-rule') and either
+    'properties' (the subresource body, as returned by the corresponding show command) or the key of
+    the entry to remove.
+    """
+    from knack.util import CLIError
+    edits = spec.get('edits') if isinstance(spec, dict) else spec
+    if not isinstance(edits, list) or not edits:
+        raise CLIError("usage error: the batch spec must be a non-empty list of edits or an object "
+                       "with an 'edits' list.")
+
+    for i, edit in enumerate(edits):
+        item_type = edit.get('type')
+        action = edit.get('action')
+        if item_type not in _BATCH_ACTIONS:
+            raise CLIError("edit {}: unknown type '{}'. Allowed values: {}".format(
+                i, item_type, ', '.join(sorted(_BATCH_ACTIONS))))
+        if action not in _BATCH_ACTIONS[item_type]:
+            raise CLIError("edit {}: action '{}' is not valid for '{}'. Allowed values: {}".format(
+                i, action, item_type, ', '.join(_BATCH_ACTIONS[item_type])))
+        if action in ('upsert', 'add') and not isinstance(edit.get('properties'), dict):
+            raise CLIError("edit {}: '{}' requires a 'properties' object.".format(i, action))
+        if action == 'delete' and not edit.get('name'):
+            raise CLIError("edit {}: 'delete' requires a 'name'.".format(i))
+        if item_type == 'backend' and not edit.get('backendPool'):
+            raise CLIError("edit {}: 'backend' edits require a 'backendPool'.".format(i))
+        if item_type == 'backend' and action == 'remove' and not edit.get('address'):
+            raise CLIError("edit {}: 'remove' requires an 'address'.".format(i))
+        if item_type == 'rules-engine-rule' and not edit.get('rulesEngine'):
+            raise CLIError("edit {}: 'rules-engine-rule' edits require a 'rulesEngine'.".format(i))
+    return edits
+
+
+def _apply_frontdoor_edit(frontdoor, edit):
+    """ Apply a single validated edit to an in-memory Front Door model. """
+    from knack.util import CLIError
+    from azext_front_door.vendored_sdks import models
+
+    item_type = edit['type']
+    action = edit['action']
+    if item_type == 'backend':
+        pool_name = edit['backendPool']
+        backend_pool = next((x for x in frontdoor.backend_pools or [] if x.name == pool_name), None)
+        if not backend_pool:
+            raise CLIError("Backend pool '{}' could not be found on frontdoor '{}'".format(
+                pool_name, frontdoor.name))
+        if action == 'add':
+            if backend_pool.backends is None:
+                backend_pool.backends = []
+            backend_pool.backends.append(models.Backend.from_dict(edit['properties']))
+        else:
+            address = edit['address'].lower()
+            backends = [x for x in backend_pool.backends or [] if x.address.lower() != address]
+            if len(backends) == len(backend_pool.backends or []):
+                raise CLIError("Backend '{}' could not be found in backend pool '{}'".format(
+                    edit['address'], pool_name))
+            backend_pool.backends = backends
+        return
+
+    collection_name, model_name = _BATCH_FRONT_DOOR_COLLECTIONS[item_type]
+    if action == 'upsert':
+        obj = getattr(models, model_name).from_dict(edit['properties'])
+        _upsert_into_collection(frontdoor, collection_name, obj, 'name')
+    else:
+        _remove_from_collection(frontdoor, collection_name, edit['name'])
+
+
+def _apply_rules_engine_edit(rules, edit):
+    """ Apply a single validated 'rules-engine-rule' edit to an in-memory list of rules. Returns the new list. """
+    from azext_front_door.vendored_sdks.models import RulesEngineRule
+
+    if edit['action'] == 'upsert':
+        rule = RulesEngineRule.from_dict(edit['properties'])
+        rules = [x for x in rules if x.name.lower() != (rule.name or '').lower()]
+        rules.append(rule)
+        return rules
+    return [x for x in rules if x.name.lower() != edit['name'].lower()]
+
+
+def batch_update_front_door(cmd, resource_group_name, front_door_name, spec, no_wait=False):
+    from knack.util import CLIError
+    from azext_front_door.vendored_sdks.models import ErrorResponseException
+
+    edits = _load_batch_spec(spec)
+    frontdoor_edits = [x for x in edits if x['type'] != 'rules-engine-rule']
+    rules_engine_edits = {}
+    for edit in edits:
+        if edit['type'] == 'rules-engine-rule':
+            rules_engine_edits.setdefault(edit['rulesEngine'], []).append(edit)
+
+    # Apply and validate every edit in memory before changing anything, so an invalid edit leaves both the
+    # Front Door and its rules engines untouched.
+    client = cf_frontdoor(cmd.cli_ctx, None)
+    frontdoor = None
+    if frontdoor_edits:
+        frontdoor = client.get(resource_group_name, front_door_name)
+        for edit in frontdoor_edits:
+            _apply_frontdoor_edit(frontdoor, edit)
+
+    re_client = cf_fd_rules_engines(cmd.cli_ctx, None)
+    pending = {}
+    for rules_engine_name, re_edits in rules_engine_edits.items():
+        try:
+            rules = re_client.get(resource_group_name, front_door_name, rules_engine_name).rules or []
+        except ErrorResponseException as e:
+            if e.response.status_code != 404:
+                raise e
+            rules = []
+        for edit in re_edits:
+            rules = _apply_rules_engine_edit(rules, edit)
+        if not rules:
+            raise CLIError("Rules Engine '{}' must at least contain one rule".format(rules_engine_name))
+        pending[rules_engine_name] = rules
+
+    # Rules engines are separate resources: issue their PUTs together and wait on the pollers so routing
+    # rules may reference them in the Front Door PUT below.
+    pollers = [(name, re_client.create_or_update(resource_group_name, front_door_name, name, rules=rules))
+               for name, rules in pending.items()]
+    written, errors = [], []
+    for name, poller in pollers:
+        try:
+            poller.result()
+            written.append(name)
+        except Exception as ex:  # pylint: disable=broad-except
+            errors.append("Rules Engine '{}': {}".format(name, ex))
+    if errors:
+        raise CLIError("Updated {} of {} rules engines ({}); the Front Door was not updated. Failed:\n{}".format(
+            len(written), len(pending), ', '.join(written) or 'none', '\n'.join(errors)))
+
+    if frontdoor is None:
+        return None
+
+    logger.info("Applying %d edits to Front Door '%s' in a single update.", len(frontdoor_edits), front_door_name)
+    try:
+        poller = sdk_no_wait(no_wait, client.create_or_update, resource_group_name, front_door_name, frontdoor)
+        return poller if no_wait or not written else poller.result()
+    except Exception as ex:
+        if not written:
+            raise
+        raise CLIError("Failed to update Front Door '{}' after updating rules engines ({}): {}".format(
+            front_door_name, ', '.join(written), ex))
+# endregion
@@ -0,0 +1,108 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+import unittest
+
+from knack.util import CLIError
+
+from azext_front_door.custom import _load_batch_spec, _apply_frontdoor_edit, _apply_rules_engine_edit
+from azext_front_door.vendored_sdks.models import (FrontDoor, BackendPool, Backend, RoutingRule,
+                                                   RulesEngineRule, RulesEngineAction)
+
+
+class FrontDoorBatchUpdateTest(unittest.TestCase):
+
+    def _front_door(self):
+        return FrontDoor(
+            backend_pools=[BackendPool(name='pool1', backends=[Backend(address='a.contoso.com')])],
+            routing_rules=[RoutingRule(name='DefaultRoutingRule')])
+
+    def test_batch_spec_validation(self):
+        edits = _load_batch_spec({'edits': [{'type': 'routing-rule', 'action': 'delete', 'name': 'r1'}]})
+        self.assertEqual(len(edits), 1)
+        with self.assertRaises(CLIError):
+            _load_batch_spec([])
+        with self.assertRaises(CLIError):
+            _load_batch_spec([{'type': 'backend-pool', 'action': 'add', 'properties': {}}])
+        with self.assertRaises(CLIError):
+            _load_batch_spec([{'type': 'backend', 'action': 'add', 'properties': {}}])
+        with self.assertRaises(CLIError):
+            _load_batch_spec([{'type': 'rules-engine-rule', 'action': 'delete', 'name': 'r1'}])
+
+    def test_batch_apply_frontdoor_edits(self):
+        front_door = self._front_door()
+        edits = _load_batch_spec([
+            {'type': 'backend-pool', 'action': 'upsert',
+             'properties': {'name': 'pool2', 'backends': [{'address': 'b.contoso.com'}]}},
+            {'type': 'backend', 'action': 'add', 'backendPool': 'pool1',
+             'properties': {'address': 'c.contoso.com', 'httpPort': 8080}},
+            {'type': 'backend', 'action': 'remove', 'backendPool': 'pool1', 'address': 'A.contoso.com'},
+            {'type': 'routing-rule', 'action': 'upsert',
+             'properties': {'name': 'rule2', 'patternsToMatch': ['/api/*']}},
+            {'type': 'routing-rule', 'action': 'delete', 'name': 'defaultroutingrule'}
+        ])
+        for edit in edits:
+            _apply_frontdoor_edit(front_door, edit)
+
+        self.assertEqual([x.name for x in front_door.backend_pools], ['pool1', 'pool2'])
+        self.assertEqual([x.address for x in front_door.backend_pools[0].backends], ['c.contoso.com'])
+        self.assertEqual(front_door.backend_pools[0].backends[0].http_port, 8080)
+        self.assertEqual([x.name for x in front_door.routing_rules], ['rule2'])
+        self.assertEqual(front_door.routing_rules[0].patterns_to_match, ['/api/*'])
+
+    def test_batch_apply_missing_backend_pool(self):
+        edit = {'type': 'backend', 'action': 'add', 'backendPool': 'missing', 'properties': {'address': 'x'}}
+        with self.assertRaises(CLIError):
+            _apply_frontdoor_edit(self._front_door(), edit)
+
+    def test_batch_apply_missing_backend(self):
+        edit = {'type': 'backend', 'action': 'remove', 'backendPool': 'pool1', 'address': 'missing.contoso.com'}
+        with self.assertRaises(CLIError):
+            _apply_frontdoor_edit(self._front_door(), edit)
+
+    def test_batch_update_validates_before_any_put(self):
+        from unittest import mock
+        from azext_front_door.custom import batch_update_front_door
+        frontdoor_client = mock.MagicMock()
+        frontdoor_client.get.return_value = self._front_door()
+        rules_engine_client = mock.MagicMock()
+        spec = [{'type': 'rules-engine-rule', 'action': 'upsert', 'rulesEngine': 'engine1',
+                 'properties': {'name': 'rule1', 'priority': 1, 'action': {}}},
+                {'type': 'backend', 'action': 'add', 'backendPool': 'missing', 'properties': {'address': 'x'}}]
+        with mock.patch('azext_front_door.custom.cf_frontdoor', return_value=frontdoor_client), \
+                mock.patch('azext_front_door.custom.cf_fd_rules_engines', return_value=rules_engine_client):
+            with self.assertRaises(CLIError):
+                batch_update_front_door(mock.MagicMock(), 'rg', 'fd', spec)
+        rules_engine_client.create_or_update.assert_not_called()
+        frontdoor_client.create_or_update.assert_not_called()
+
+    def test_batch_update_reports_written_rules_engines(self):
+        from unittest import mock
+        from azext_front_door.custom import batch_update_front_door
+        frontdoor_client = mock.MagicMock()
+        frontdoor_client.get.return_value = self._front_door()
+        frontdoor_client.create_or_update.return_value.result.side_effect = Exception('Conflict')
+        rules_engine_client = mock.MagicMock()
+        spec = [{'type': 'rules-engine-rule', 'action': 'upsert', 'rulesEngine': 'engine1',
+                 'properties': {'name': 'rule1', 'priority': 1, 'action': {}}},
+                {'type': 'routing-rule', 'action': 'delete', 'name': 'DefaultRoutingRule'}]
+        with mock.patch('azext_front_door.custom.cf_frontdoor', return_value=frontdoor_client), \
+                mock.patch('azext_front_door.custom.cf_fd_rules_engines', return_value=rules_engine_client):
+            with self.assertRaisesRegex(CLIError, r'after updating rules engines \(engine1\): Conflict'):
+                batch_update_front_door(mock.MagicMock(), 'rg', 'fd', spec)
+        rules_engine_client.create_or_update.assert_called_once()
+
+    def test_batch_apply_rules_engine_edits(self):
+        rules = [RulesEngineRule(name='rule1', priority=0, action=RulesEngineAction())]
+        action = {'requestHeaderActions': [{'headerActionType': 'Append', 'headerName': 'X-Test'}]}
+        for name, priority in (('Rule1', 1), ('rule2', 2)):
+            edit = {'action': 'upsert', 'properties': {'name': name, 'priority': priority, 'action': action}}
+            rules = _apply_rules_engine_edit(rules, edit)
+        self.assertEqual([(x.name, x.priority) for x in rules], [('Rule1', 1), ('rule2', 2)])
+        rules = _apply_rules_engine_edit(rules, {'action': 'delete', 'name': 'RULE2'})
+        self.assertEqual([x.name for x in rules], ['Rule1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
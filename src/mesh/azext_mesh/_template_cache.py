@@ -0,0 +1,161 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""Local caches for ARM templates generated from YAML files and for templates downloaded from URIs."""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+MAX_READ_WORKERS = 8
+# bump when the cached content or the key changes meaning
+CACHE_VERSION = '1'
+
+
+def _cache_dir(kind):
+    from azure.cli.core.api import get_config_dir
+    return os.path.join(get_config_dir(), 'mesh', kind)
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_copy(source, destination):
+    directory = os.path.dirname(destination) or '.'
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f, open(source, 'rb') as s:
+            shutil.copyfileobj(s, f)
+        os.replace(temp_path, destination)
+    except OSError:
+        os.remove(temp_path)
+        raise
+
+
+def _write_atomic(path, content):
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    fd, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except OSError:
+        os.remove(temp_path)
+        raise
+
+
+def _merge_utility_version():
+    try:
+        from importlib.metadata import version
+        return version('sfmergeutility')
+    except Exception:  # pylint: disable=broad-except
+        return 'unknown'
+
+
+def merge_input_key(file_paths, parameters=None, output_format='SF_SBZ_RP_JSON'):
+    """Hash the YAML files, in order, with the parameters and the merge utility version.
+
+    Files are read concurrently, which is what dominates for applications with hundreds of YAML files.
+    Parameter values naming files are hashed by content, like the merge utility reads them.
+    """
+    workers = max(1, min(MAX_READ_WORKERS, len(file_paths)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        digests = list(executor.map(_file_digest, file_paths))
+
+    parameter_files = {}
+    for params in parameters or []:
+        for item in params:
+            if os.path.isfile(item):
+                parameter_files[item] = _file_digest(item)
+
+    key = hashlib.sha256()
+    key.update(json.dumps({
+        'version': CACHE_VERSION,
+        'mergeutility': _merge_utility_version(),
+        'format': output_format,
+        'files': [[os.path.abspath(path), digest] for path, digest in zip(file_paths, digests)],
+        'parameters': parameters,
+        'parameterFiles': parameter_files
+    }, sort_keys=True).encode('utf-8'))
+    return key.hexdigest()
+
+
+def load_merged_template(key, output_file_path):
+    """Copy the template generated earlier for the key to output_file_path. Returns whether there was one."""
+    cached_path = os.path.join(_cache_dir('templates'), key + '.json')
+    if not os.path.isfile(cached_path):
+        return False
+    try:
+        _atomic_copy(cached_path, output_file_path)
+    except OSError as ex:
+        logger.debug('Unable to use cached ARM template %s: %s', cached_path, ex)
+        return False
+    logger.info('Input YAML files are unchanged, using the ARM template generated earlier.')
+    return True
+
+
+def save_merged_template(key, output_file_path):
+    try:
+        _atomic_copy(output_file_path, os.path.join(_cache_dir('templates'), key + '.json'))
+    except OSError as ex:
+        logger.debug('Unable to cache the generated ARM template: %s', ex)
+
+
+def retrieve_url(url, urlopen, ssl_context):
+    """Download url, revalidating a copy cached from an earlier download with If-None-Match/If-Modified-Since."""
+    from six.moves.urllib.error import HTTPError  # pylint: disable=import-error
+    from six.moves.urllib.request import Request  # pylint: disable=import-error
+
+    cache_path = os.path.join(_cache_dir('template-uris'), hashlib.sha256(url.encode('utf-8')).hexdigest())
+    cached = None
+    try:
+        with open(cache_path + '.json', 'r') as f:
+            cached = json.load(f)
+        with open(cache_path, 'rb') as f:
+            cached_body = f.read()
+    except (OSError, ValueError):
+        cached = None
+
+    headers = {}
+    if cached and cached.get('url') == url:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('lastModified'):
+            headers['If-Modified-Since'] = cached['lastModified']
+    try:
+        response = urlopen(Request(url, headers=headers), context=ssl_context)
+    except HTTPError as ex:
+        if ex.code == 304 and headers:
+            logger.info('Template %s is unchanged, using the cached copy.', url)
+            return cached_body
+        raise
+
+    body = response.read()
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        try:
+            _write_atomic(cache_path, body)
+            _write_atomic(cache_path + '.json', json.dumps(
+                {'url': url, 'etag': etag, 'lastModified': last_modified}).encode('utf-8'))
+        except OSError as ex:
+            logger.debug('Unable to cache template %s: %s', url, ex)
+    return body
@@ -21,6 +21,7 @@ from azure.cli.core.util import get_file_json, shell_safe_json_parse, sdk_no_wai
 from azure.cli.core.commands.client_factory import get_mgmt_service_client
 from azure.cli.core.profiles import ResourceType, get_sdk
 from sfmergeutility import SFMergeUtility  # pylint: disable=E0611,import-error
+from ._template_cache import merge_input_key, load_merged_template, save_merged_template, retrieve_url
 
 
 logger = get_logger(__name__)
@@ -51,8 +52,7 @@ def _ssl_context():
 
 
 def _urlretrieve(url):
-    req = urlopen(url, context=_ssl_context())
-    return req.read()
+    return retrieve_url(url, urlopen, _ssl_context())
 
 
 def _process_parameters(template_param_defs, parameter_lists):
@@ -229,9 +229,13 @@ def _invoke_mergeutil(input_yaml_files=None, parameters=None):
                     file_path_list.append(os.path.join(root, filename))
     else:
         file_path_list = input_yaml_files.split(',')
+    cache_key = merge_input_key(file_path_list, parameters, "SF_SBZ_RP_JSON")
+    if load_merged_template(cache_key, output_file_path):
+        return output_file_path
     if os.path.exists(output_file_path):
         os.remove(output_file_path)
     SFMergeUtility.sf_merge_utility(file_path_list, "SF_SBZ_RP_JSON", parameters=parameters, output_dir=None, prefix=prefix)
+    save_merged_template(cache_key, output_file_path)
     return output_file_path
 
 
@@ -0,0 +1,106 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import ssl
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from azext_mesh import _template_cache
+from azext_mesh._template_cache import merge_input_key, load_merged_template, save_merged_template, retrieve_url
+
+
+class _TemplateHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        template = self.server.template
+        template['requests'].append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == template['etag']:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(template['body']).encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', template['etag'])
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class TemplateCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir)
+        patcher = mock.patch.object(_template_cache, '_cache_dir', lambda kind: os.path.join(self.work_dir, 'cache', kind))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _write(self, name, content):
+        path = os.path.join(self.work_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_merge_input_key(self):
+        app = self._write('app.yaml', 'application:\n  name: app')
+        service = self._write('service.yaml', 'service:\n  name: svc')
+        params = self._write('params.yaml', 'location: westus')
+
+        key = merge_input_key([app, service], [['location=westus']])
+        self.assertEqual(key, merge_input_key([app, service], [['location=westus']]))
+        self.assertNotEqual(key, merge_input_key([service, app], [['location=westus']]))
+        self.assertNotEqual(key, merge_input_key([app, service], [['location=eastus']]))
+
+        key = merge_input_key([app, service], [[params]])
+        self._write('params.yaml', 'location: eastus')
+        self.assertNotEqual(key, merge_input_key([app, service], [[params]]))
+        self._write('service.yaml', 'service:\n  name: svc2')
+        self.assertNotEqual(key, merge_input_key([app, service], [[params]]))
+
+    def test_merged_template_round_trip(self):
+        output_file_path = os.path.join(self.work_dir, 'merged-arm_rp.json')
+        self.assertFalse(load_merged_template('key', output_file_path))
+
+        self._write('merged-arm_rp.json', '{"resources": []}')
+        save_merged_template('key', output_file_path)
+        os.remove(output_file_path)
+        self.assertTrue(load_merged_template('key', output_file_path))
+        with open(output_file_path) as f:
+            self.assertEqual(f.read(), '{"resources": []}')
+
+    def test_retrieve_url_revalidates(self):
+        server = HTTPServer(('127.0.0.1', 0), _TemplateHandler)
+        server.template = {'etag': '"v1"', 'body': {'version': 1}, 'requests': []}
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = 'http://127.0.0.1:{}/template.json'.format(server.server_port)
+        context = ssl.create_default_context()
+
+        self.assertEqual(json.loads(retrieve_url(url, urlopen, context)), {'version': 1})
+        self.assertEqual(json.loads(retrieve_url(url, urlopen, context)), {'version': 1})
+        self.assertEqual(server.template['requests'], [None, '"v1"'])
+
+        server.template.update(etag='"v2"', body={'version': 2})
+        self.assertEqual(json.loads(retrieve_url(url, urlopen, context)), {'version': 2})
+
+        # Failures to reach the server are not hidden behind the cached copy
+        with self.assertRaises(URLError):
+            retrieve_url('http://127.0.0.1:1/template.json', urlopen, context)
+
+
+if __name__ == '__main__':
+    unittest.main()
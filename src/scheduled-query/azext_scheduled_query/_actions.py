@@ -4,43 +4,62 @@
 # --------------------------------------------------------------------------------------------
 
 import argparse
+import copy
+from functools import lru_cache
 from knack.util import CLIError
 
+CONDITION_USAGE = \
+    'usage error: --condition {avg,min,max,total,count} ["METRIC COLUMN" from]\n' \
+    '                         "QUERY" {=,!=,>,>=,<,<=} THRESHOLD\n' \
+    '                         [resource id RESOURCEID]\n' \
+    '                         [where DIMENSION {includes,excludes} VALUE [or VALUE ...]\n' \
+    '                         [and   DIMENSION {includes,excludes} VALUE [or VALUE ...] ...]]\n' \
+    '                         [at least MinTimeToFail violations out of EvaluationPeriod aggregated points]'
+
+
+@lru_cache(maxsize=1024)
+def _parse_condition(condition):
+    # antlr4 is not available everywhere, restrict the import scope so that commands
+    # that do not need it don't fail when it is absent
+    import antlr4
+
+    # the generated lexer and parser keep their deserialized ATN and DFA cache at class level, so every
+    # condition parsed in this process after the first one reuses them
+    from azext_scheduled_query.grammar.scheduled_query import (
+        ScheduleQueryConditionLexer, ScheduleQueryConditionParser, ScheduleQueryConditionValidator)
+
+    lexer = ScheduleQueryConditionLexer(antlr4.InputStream(condition))
+    stream = antlr4.CommonTokenStream(lexer)
+    parser = ScheduleQueryConditionParser(stream)
+    tree = parser.expression()
+
+    try:
+        validator = ScheduleQueryConditionValidator()
+        walker = antlr4.ParseTreeWalker()
+        walker.walk(validator, tree)
+        scheduled_query_condition = validator.result()
+        for item in ['time_aggregation', 'threshold', 'operator']:
+            if not getattr(scheduled_query_condition, item, None):
+                raise CLIError(CONDITION_USAGE)
+    except (AttributeError, TypeError, KeyError):
+        raise CLIError(CONDITION_USAGE)
+    return scheduled_query_condition
+
+
+def parse_condition(condition):
+    """Parse a condition string into a Condition model.
+
+    Results are memoized on the exact condition string, so identical conditions in one process are parsed once.
+    Every caller gets its own copy since the commands fill in defaults on the returned model.
+    """
+    return copy.deepcopy(_parse_condition(condition))
+
 
 # pylint: disable=protected-access, too-few-public-methods
 class ScheduleQueryConditionAction(argparse._AppendAction):
 
     def __call__(self, parser, namespace, values, option_string=None):
-        # antlr4 is not available everywhere, restrict the import scope so that commands
-        # that do not need it don't fail when it is absent
-        import antlr4
-
-        from azext_scheduled_query.grammar.scheduled_query import (
-            ScheduleQueryConditionLexer, ScheduleQueryConditionParser, ScheduleQueryConditionValidator)
-
-        usage = 'usage error: --condition {avg,min,max,total,count} ["METRIC COLUMN" from]\n' \
-                '                         "QUERY" {=,!=,>,>=,<,<=} THRESHOLD\n' \
-                '                         [resource id RESOURCEID]\n' \
-                '                         [where DIMENSION {includes,excludes} VALUE [or VALUE ...]\n' \
-                '                         [and   DIMENSION {includes,excludes} VALUE [or VALUE ...] ...]]\n' \
-                '                         [at least MinTimeToFail violations out of EvaluationPeriod aggregated points]'
-        string_val = ' '.join(values)
-
-        lexer = ScheduleQueryConditionLexer(antlr4.InputStream(string_val))
-        stream = antlr4.CommonTokenStream(lexer)
-        parser = ScheduleQueryConditionParser(stream)
-        tree = parser.expression()
-
-        try:
-            validator = ScheduleQueryConditionValidator()
-            walker = antlr4.ParseTreeWalker()
-            walker.walk(validator, tree)
-            scheduled_query_condition = validator.result()
-            for item in ['time_aggregation', 'threshold', 'operator']:
-                if not getattr(scheduled_query_condition, item, None):
-                    raise CLIError(usage)
-        except (AttributeError, TypeError, KeyError):
-            raise CLIError(usage)
+        scheduled_query_condition = parse_condition(' '.join(values))
         super(ScheduleQueryConditionAction, self).__call__(parser,
                                                            namespace,
                                                            scheduled_query_condition,
@@ -40,6 +40,47 @@ examples:
     text: az monitor scheduled-query create -g {rg} -n {name1} --scopes {rg_id} --condition "count 'union Event, Syslog | where TimeGenerated > ago(1h) | where EventLevelName==\"Error\" or SeverityLevel==\"err\"' > 360 resource id _ResourceID at least 1 violations out of 5 aggregated points" --description "Test rule"
 """
 
+helps['monitor scheduled-query create-batch'] = """
+type: command
+short-summary: Create or replace the scheduled queries listed in a rules file.
+long-summary: |
+    The rules file is YAML or JSON, either a list of rules or a mapping with a `rules` list. Each rule takes
+    `name`, `scopes` and `condition` (a condition string as for `--condition`, or a list of them) and optionally
+    `resourceGroup`, `description`, `severity`, `disabled`, `windowSize`, `evaluationFrequency`,
+    `targetResourceType`, `muteActionsDuration`, `location`, `tags` and `actions` (a list of actions written like
+    the values of `--action`, `ACTION_GROUP [KEY=VAL ...]`, or of mappings with `actionGroup` and
+    `webHookProperties`).
+
+    All rules are validated and their conditions parsed before any of them is created. If some rules fail to be
+    created, the others are still created and the error lists which rules were created and which failed.
+examples:
+  - name: Create the scheduled queries of a rules file in a resource group.
+    text: |
+        az monitor scheduled-query create-batch -g {rg} --rules-file rules.yaml
+
+        # rules.yaml
+        rules:
+          - name: syslog-errors
+            scopes: [{vm_id}]
+            condition: count 'Syslog | where SeverityLevel == "err"' > 10
+            severity: 3
+"""
+
+helps['monitor scheduled-query apply'] = """
+type: command
+short-summary: Make the scheduled queries of the resource groups in a rules file match the file.
+long-summary: |
+    The rules file has the same format as for `az monitor scheduled-query create-batch`. All rules are validated
+    first, then the existing rules of each resource group in the file are listed once and compared with the file.
+    Rules that are missing are created, rules that differ are replaced and, with --prune, rules the file does
+    not list are deleted. Changes are applied concurrently within the request rate limit and summarized at the end.
+examples:
+  - name: Show the changes a rules file would make.
+    text: az monitor scheduled-query apply -g {rg} --rules-file rules.yaml --dry-run
+  - name: Apply a rules file and delete the rules of its resource groups that it does not list.
+    text: az monitor scheduled-query apply --rules-file rules.yaml --prune --max-concurrency 16
+"""
+
 helps['monitor scheduled-query update'] = """
 type: command
 short-summary: Update a scheduled query.
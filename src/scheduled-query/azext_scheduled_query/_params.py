@@ -4,7 +4,8 @@
 # --------------------------------------------------------------------------------------------
 # pylint: disable=line-too-long
 
-from azure.cli.core.commands.parameters import tags_type, get_three_state_flag
+from argcomplete.completers import FilesCompleter
+from azure.cli.core.commands.parameters import tags_type, get_three_state_flag, file_type
 from azure.cli.command_modules.monitor.actions import get_period_type
 from azure.cli.command_modules.monitor.validators import get_action_group_validator
 from knack.arguments import CLIArgumentType
@@ -35,3 +36,17 @@ def load_arguments(self, _):
                    options_list=['--mute-actions-duration', '--mad'],
                    help='Mute actions for the chosen period of time (in ISO 8601 duration format) after the alert is fired.')
         c.argument('actions', options_list=['--action', '-a'], action=ScheduleQueryAddAction, nargs='+', validator=get_action_group_validator('actions'))
+
+    for scope in ['create-batch', 'apply']:
+        with self.argument_context('monitor scheduled-query {}'.format(scope)) as c:
+            c.argument('resource_group_name', help='Resource group of the rules that do not specify a resourceGroup.')
+            c.argument('rules_file', type=file_type, completer=FilesCompleter(),
+                       help='YAML or JSON file with the list of rules.')
+
+    with self.argument_context('monitor scheduled-query apply') as c:
+        c.argument('prune', action='store_true',
+                   help='Delete the rules of the resource groups in the rules file that the file does not list.')
+        c.argument('dry_run', action='store_true', help='Report the changes without applying them.')
+        c.argument('max_concurrency', type=int, help='Maximum number of requests in flight at a time.')
+        c.argument('max_requests_per_second', type=float,
+                   help='Maximum number of requests started per second, to stay within the ARM request limits.')
@@ -0,0 +1,159 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from knack.log import get_logger
+from knack.util import CLIError
+
+logger = get_logger(__name__)
+
+RULE_MODEL = 'ScheduledQueryRuleResource'
+# properties the service may return in another casing or format than the rules file uses
+_CASE_INSENSITIVE_KEYS = {'scopes', 'targetResourceTypes', 'actionGroupId', 'location'}
+
+
+class RateLimiter(object):  # pylint: disable=too-few-public-methods
+    """Space out the start of requests made from any thread to at most requests_per_second."""
+
+    def __init__(self, requests_per_second):
+        self._interval = 1.0 / requests_per_second if requests_per_second else 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def _normalize(value, case_insensitive=False):
+    if isinstance(value, dict):
+        value = {k: _normalize(v, case_insensitive=k in _CASE_INSENSITIVE_KEYS) for k, v in value.items()}
+        return {k: v for k, v in value.items() if v not in (None, {}, [])}
+    if isinstance(value, list):
+        return [_normalize(v, case_insensitive) for v in value]
+    if case_insensitive and isinstance(value, str):
+        return value.replace(' ', '').lower()
+    return value
+
+
+def comparable_rule(client, rule):
+    """Serialize a rule the way it is sent to the service, ignoring read-only and formatting differences."""
+    return _normalize(client._serialize.body(rule, RULE_MODEL))  # pylint: disable=protected-access
+
+
+def list_existing_rules(client, resource_groups, limiter, max_concurrency):
+    """List the rules of every resource group once, concurrently. Returns {group: {rule name: rule}}, lowercased."""
+    def _list(resource_group_name):
+        limiter.wait()
+        return {rule.name.lower(): rule for rule in client.list_by_resource_group(resource_group_name)}
+
+    resource_groups = sorted(resource_groups)
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        return dict(zip(resource_groups, executor.map(_list, resource_groups)))
+
+
+def plan_changes(client, specs, existing, prune=False):
+    """Diff the rules of the rules file against the existing ones.
+
+    Returns the (operation, resource group, rule name, rule) changes and the names of the unchanged rules.
+    Existing rules missing from the file are only deleted with prune, and only in the file's resource groups.
+    """
+    from .custom import build_scheduled_query_rule
+    changes = []
+    unchanged = []
+    desired = set()
+    for spec in specs:
+        group, name = spec.key
+        desired.add((group, name))
+        current = existing[group].get(name)
+        rule = build_scheduled_query_rule(**spec.kwargs)
+        if current is None:
+            changes.append(('create', spec.resource_group_name, spec.rule_name, rule))
+        elif comparable_rule(client, rule) != comparable_rule(client, current):
+            changes.append(('update', spec.resource_group_name, spec.rule_name, rule))
+        else:
+            unchanged.append('{}/{}'.format(spec.resource_group_name, spec.rule_name))
+    if prune:
+        for group, rules in existing.items():
+            for name, current in rules.items():
+                if (group, name) not in desired:
+                    changes.append(('delete', _resource_group_of(current.id) or group, current.name, None))
+    return changes, unchanged
+
+
+def _resource_group_of(resource_id):
+    from azure.mgmt.core.tools import parse_resource_id
+    return parse_resource_id(resource_id or '').get('resource_group')
+
+
+def _apply_change(client, limiter, change):
+    operation, resource_group_name, rule_name, rule = change
+    limiter.wait()
+    logger.info('%s scheduled query rule %s/%s', operation, resource_group_name, rule_name)
+    if operation == 'delete':
+        client.delete(resource_group_name, rule_name)
+    else:
+        client.create_or_update(resource_group_name, rule_name, rule)
+
+
+def apply_rules(cli_ctx, client, specs, prune=False, dry_run=False, max_concurrency=8, max_requests_per_second=5):
+    """Bring the scheduled query rules of the resource groups in specs in line with specs and report the outcome."""
+    from ._rules_file import fill_default_locations
+    if max_concurrency < 1:
+        raise CLIError('usage error: --max-concurrency must be at least 1')
+    limiter = RateLimiter(max_requests_per_second)
+    existing = list_existing_rules(client, {spec.key[0] for spec in specs}, limiter, max_concurrency)
+
+    # updated rules keep their location unless the file sets one, new ones default to their resource group's
+    missing_location = []
+    for spec in specs:
+        if not spec.kwargs.get('location'):
+            current = existing[spec.key[0]].get(spec.key[1])
+            if current is not None:
+                spec.kwargs['location'] = current.location
+            else:
+                missing_location.append(spec)
+    fill_default_locations(cli_ctx, missing_location)
+
+    changes, unchanged = plan_changes(client, specs, existing, prune=prune)
+    if dry_run:
+        report = _build_report([(change, None) for change in changes], unchanged)
+        report['dryRun'] = True
+        return report
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = [(change, executor.submit(_apply_change, client, limiter, change)) for change in changes]
+        report = _build_report(futures, unchanged)
+
+    summary = '{} created, {} updated, {} deleted, {} unchanged, {} failed'.format(
+        len(report['created']), len(report['updated']), len(report['deleted']), len(report['unchanged']),
+        len(report['failed']))
+    if report['failed']:
+        raise CLIError('Failed to apply the rules file ({}):\n{}'.format(summary, '\n'.join(
+            '{} {}: {}'.format(item['operation'], item['name'], item['error']) for item in report['failed'])))
+    logger.warning('Applied the rules file: %s', summary)
+    return report
+
+
+def _build_report(results, unchanged):
+    """Sort the (change, future) results into the report, waiting for each future. Dry runs have no futures."""
+    report = {'created': [], 'updated': [], 'deleted': [], 'unchanged': unchanged, 'failed': []}
+    done_keys = {'create': 'created', 'update': 'updated', 'delete': 'deleted'}
+    for (operation, resource_group_name, rule_name, _), future in results:
+        name = '{}/{}'.format(resource_group_name, rule_name)
+        try:
+            if future is not None:
+                future.result()
+            report[done_keys[operation]].append(name)
+        except Exception as ex:  # pylint: disable=broad-except
+            report['failed'].append({'name': name, 'operation': operation, 'error': str(ex)})
+    return report
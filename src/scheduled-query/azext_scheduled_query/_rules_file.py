@@ -0,0 +1,176 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+from knack.util import CLIError
+
+# rule file key to create_scheduled_query argument
+RULE_ARGUMENTS = {
+    'scopes': 'scopes',
+    'condition': 'condition',
+    'description': 'description',
+    'severity': 'severity',
+    'disabled': 'disabled',
+    'windowSize': 'window_size',
+    'evaluationFrequency': 'evaluation_frequency',
+    'targetResourceType': 'target_resource_type',
+    'muteActionsDuration': 'mute_actions_duration',
+    'actions': 'actions',
+    'tags': 'tags',
+    'location': 'location'
+}
+RULE_KEYS = set(RULE_ARGUMENTS) | {'name', 'resourceGroup'}
+
+# same defaults as `monitor scheduled-query create`, which argparse passes through the period types
+DEFAULT_WINDOW_SIZE = '5m'
+DEFAULT_EVALUATION_FREQUENCY = '5m'
+DEFAULT_MUTE_ACTIONS_DURATION = 'PT30M'
+
+
+class ScheduledQueryRuleSpec(object):  # pylint: disable=too-few-public-methods
+    """A rule read from a rules file, with its conditions parsed and its arguments ready for the SDK."""
+
+    def __init__(self, resource_group_name, rule_name, kwargs):
+        self.resource_group_name = resource_group_name
+        self.rule_name = rule_name
+        self.kwargs = kwargs
+
+    @property
+    def key(self):
+        return self.resource_group_name.lower(), self.rule_name.lower()
+
+
+def load_rules_file(path):
+    """Read the rules of a YAML or JSON rules file, either a list of rules or a mapping with a `rules` list."""
+    import yaml
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as ex:
+        raise CLIError('Unable to read rules file {}: {}'.format(path, ex))
+    rules = content.get('rules') if isinstance(content, dict) else content
+    if not isinstance(rules, list) or not all(isinstance(rule, dict) for rule in rules):
+        raise CLIError('Rules file {} must contain a list of rules.'.format(path))
+    return rules
+
+
+def _action_group_id(subscription_id, resource_group_name, action_group):
+    from azure.mgmt.core.tools import is_valid_resource_id, resource_id
+    if is_valid_resource_id(action_group):
+        return action_group
+    return resource_id(subscription=subscription_id, resource_group=resource_group_name,
+                       namespace='microsoft.insights', type='actionGroups', name=action_group)
+
+
+def _build_actions(subscription_id, resource_group_name, actions):
+    """Parse the actions of a rule with the `--action` argument action.
+
+    An action is written like the values of `--action`, `ACTION_GROUP [KEY=VAL ...]`, or as a mapping with
+    `actionGroup` and `webHookProperties`. Action group names are resolved in the rule's resource group, like
+    the `--action` validator does.
+    """
+    import argparse
+    import shlex
+    from ._actions import ScheduleQueryAddAction
+    namespace = argparse.Namespace(actions=None)
+    parser = ScheduleQueryAddAction(option_strings=['--action'], dest='actions')
+    for action in actions:
+        if isinstance(action, str):
+            values = shlex.split(action)
+        elif isinstance(action, dict) and action.get('actionGroup'):
+            values = [action['actionGroup']] + ['{}={}'.format(key, value) for key, value in
+                                                (action.get('webHookProperties') or {}).items()]
+        else:
+            values = None
+        if not values:
+            raise ValueError('each action needs an actionGroup name or ID')
+        parser(None, namespace, values)
+    for action in namespace.actions:
+        action.action_group_id = _action_group_id(subscription_id, resource_group_name, action.action_group_id)
+    return namespace.actions
+
+
+def _build_rule(rule, resource_group_name, subscription_id):
+    from azure.cli.command_modules.monitor.actions import get_period_type
+    from ._actions import parse_condition
+
+    unknown = set(rule) - RULE_KEYS
+    if unknown:
+        raise ValueError('unknown keys {}'.format(', '.join(sorted(unknown))))
+    if not rule.get('name'):
+        raise ValueError('name is required')
+    resource_group_name = rule.get('resourceGroup') or resource_group_name
+    if not resource_group_name:
+        raise ValueError('resourceGroup is required when --resource-group is not specified')
+    for required in ['scopes', 'condition']:
+        if not rule.get(required):
+            raise ValueError('{} is required'.format(required))
+
+    kwargs = {arg: rule[key] for key, arg in RULE_ARGUMENTS.items() if key in rule}
+    for arg in ['scopes', 'condition']:
+        if isinstance(kwargs[arg], str):
+            kwargs[arg] = [kwargs[arg]]
+    conditions = []
+    for condition in kwargs['condition']:
+        try:
+            conditions.append(parse_condition(condition))
+        except CLIError:
+            raise ValueError('invalid condition "{}"'.format(condition))
+        periods = conditions[-1].failing_periods
+        if periods and periods.min_failing_periods_to_alert > periods.number_of_evaluation_periods:
+            raise ValueError('EvaluationPeriod must be greater than or equals to MinTimeToFail.')
+    kwargs['condition'] = conditions
+    kwargs['window_size'] = get_period_type()(kwargs.get('window_size', DEFAULT_WINDOW_SIZE))
+    kwargs['evaluation_frequency'] = get_period_type()(kwargs.get('evaluation_frequency',
+                                                                  DEFAULT_EVALUATION_FREQUENCY))
+    kwargs['mute_actions_duration'] = get_period_type(as_timedelta=True)(
+        kwargs.get('mute_actions_duration', DEFAULT_MUTE_ACTIONS_DURATION))
+    if 'severity' in kwargs:
+        kwargs['severity'] = int(kwargs['severity'])
+    if kwargs.get('actions'):
+        kwargs['actions'] = _build_actions(subscription_id, resource_group_name, kwargs['actions'])
+    return ScheduledQueryRuleSpec(resource_group_name, rule['name'], kwargs)
+
+
+def parse_rules(cli_ctx, rules, resource_group_name=None):
+    """Validate all rules and parse all of their conditions in this process before anything is created.
+
+    Raises one CLIError listing every invalid rule, so a mistake late in a large file is found up front.
+    """
+    from azure.cli.core.commands.client_factory import get_subscription_id
+    subscription_id = get_subscription_id(cli_ctx)
+    specs = []
+    errors = []
+    seen = set()
+    for index, rule in enumerate(rules):
+        label = rule.get('name') or '#{}'.format(index + 1)
+        try:
+            spec = _build_rule(rule, resource_group_name, subscription_id)
+        except (CLIError, ValueError, TypeError, AttributeError) as ex:
+            errors.append('rule {}: {}'.format(label, ex))
+            continue
+        if spec.key in seen:
+            errors.append('rule {}: defined more than once in resource group {}'.format(
+                label, spec.resource_group_name))
+            continue
+        seen.add(spec.key)
+        specs.append(spec)
+    if errors:
+        raise CLIError('Invalid rules file:\n' + '\n'.join(errors))
+    return specs
+
+
+def fill_default_locations(cli_ctx, specs):
+    """Default the location of rules without one to their resource group's, looking each group up once."""
+    from azure.cli.core.commands.client_factory import get_mgmt_service_client
+    from azure.cli.core.profiles import ResourceType
+    locations = {}
+    for spec in specs:
+        if spec.kwargs.get('location'):
+            continue
+        group = spec.resource_group_name.lower()
+        if group not in locations:
+            client = get_mgmt_service_client(cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES)
+            locations[group] = client.resource_groups.get(spec.resource_group_name).location
+        spec.kwargs['location'] = locations[group]
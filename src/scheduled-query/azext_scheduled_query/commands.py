@@ -17,6 +17,8 @@ def load_command_table(self, _):
 
     with self.command_group('monitor scheduled-query', scheduled_query_sdk) as g:
         g.custom_command('create', 'create_scheduled_query')
+        g.custom_command('create-batch', 'create_scheduled_query_batch')
+        g.custom_command('apply', 'apply_scheduled_query_rules')
         g.command('delete', 'delete', confirmation=True)
         g.custom_command('list', 'list_scheduled_query')
         g.show_command('show', 'get')
@@ -8,6 +8,17 @@ def create_scheduled_query(client, resource_group_name, rule_name, scopes, condi
                            disabled=False, description=None, tags=None, location=None,
                            actions=None, severity=2, window_size='5m', evaluation_frequency='5m',
                            target_resource_type=None, mute_actions_duration='PT30M'):
+    rule = build_scheduled_query_rule(scopes, condition, disabled=disabled, description=description, tags=tags,
+                                      location=location, actions=actions, severity=severity,
+                                      window_size=window_size, evaluation_frequency=evaluation_frequency,
+                                      target_resource_type=target_resource_type,
+                                      mute_actions_duration=mute_actions_duration)
+    return client.create_or_update(resource_group_name, rule_name, rule)
+
+
+def build_scheduled_query_rule(scopes, condition, disabled=False, description=None, tags=None, location=None,
+                               actions=None, severity=2, window_size='5m', evaluation_frequency='5m',
+                               target_resource_type=None, mute_actions_duration='PT30M'):
     from .vendored_sdks.azure_mgmt_scheduled_query.models import (ScheduledQueryRuleResource,
                                                                   ScheduledQueryRuleCriteria,
                                                                   ConditionFailingPeriods)
@@ -38,7 +49,7 @@ def create_scheduled_query(client, resource_group_name, rule_name, scopes, condi
         'location': location,
         'mute_actions_duration': mute_actions_duration
     }
-    return client.create_or_update(resource_group_name, rule_name, ScheduledQueryRuleResource(**kwargs))
+    return ScheduledQueryRuleResource(**kwargs)
 
 
 def list_scheduled_query(client, resource_group_name=None):
@@ -63,3 +74,32 @@ def update_scheduled_query(cmd, instance, tags=None, disabled=False, condition=N
         if condition is not None:
             c.set_param('criteria', ScheduledQueryRuleCriteria(all_of=condition))
     return instance
+
+
+def create_scheduled_query_batch(cmd, client, rules_file, resource_group_name=None):
+    from knack.util import CLIError
+    from ._rules_file import load_rules_file, parse_rules, fill_default_locations
+    specs = parse_rules(cmd.cli_ctx, load_rules_file(rules_file), resource_group_name)
+    fill_default_locations(cmd.cli_ctx, specs)
+    created = []
+    created_names = []
+    errors = []
+    for spec in specs:
+        try:
+            created.append(create_scheduled_query(client, spec.resource_group_name, spec.rule_name, **spec.kwargs))
+            created_names.append(spec.rule_name)
+        except Exception as ex:  # pylint: disable=broad-except
+            errors.append('rule {} in resource group {}: {}'.format(spec.rule_name, spec.resource_group_name, ex))
+    if errors:
+        raise CLIError('Created {} of {} rules ({}). Failed:\n{}'.format(
+            len(created), len(specs), ', '.join(created_names) or 'none', '\n'.join(errors)))
+    return created
+
+
+def apply_scheduled_query_rules(cmd, client, rules_file, resource_group_name=None, prune=False, dry_run=False,
+                                max_concurrency=8, max_requests_per_second=5):
+    from ._rules_apply import apply_rules
+    from ._rules_file import load_rules_file, parse_rules
+    specs = parse_rules(cmd.cli_ctx, load_rules_file(rules_file), resource_group_name)
+    return apply_rules(cmd.cli_ctx, client, specs, prune=prune, dry_run=dry_run, max_concurrency=max_concurrency,
+                       max_requests_per_second=max_requests_per_second)
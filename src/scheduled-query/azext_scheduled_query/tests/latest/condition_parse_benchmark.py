@@ -0,0 +1,48 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+""" Measure --condition parse throughput.
+
+Run from src/scheduled-query with: python -m azext_scheduled_query.tests.latest.condition_parse_benchmark
+"""
+
+import argparse
+import time
+
+from azext_scheduled_query._actions import parse_condition, _parse_normalized_condition
+
+TEMPLATE = "count 'union Event, Syslog | where TimeGenerated > ago(1h)' > {} " \
+           "resource id _ResourceId where Computer includes a or b and Level excludes x " \
+           "at least 2 violations out of 3 aggregated points"
+
+
+def _measure(label, conditions):
+    start = time.perf_counter()
+    for condition in conditions:
+        parse_condition(condition)
+    elapsed = time.perf_counter() - start
+    print('{:<32} {:>6} conditions {:>9.1f} ms {:>10.0f} conditions/s'.format(
+        label, len(conditions), elapsed * 1000, len(conditions) / elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=500, help='Number of conditions to parse per round.')
+    parser.add_argument('--distinct', type=int, default=20, help='Number of distinct conditions among them.')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    parse_condition(TEMPLATE.format(args.count))
+    print('{:<32} {:>9.1f} ms'.format('first parse, loads the grammar', (time.perf_counter() - start) * 1000))
+
+    _parse_normalized_condition.cache_clear()
+    _measure('distinct conditions', [TEMPLATE.format(i) for i in range(args.count)])
+    _parse_normalized_condition.cache_clear()
+    _measure('{} distinct conditions'.format(args.distinct),
+             [TEMPLATE.format(i % args.distinct) for i in range(args.count)])
+
+
+if __name__ == '__main__':
+    main()
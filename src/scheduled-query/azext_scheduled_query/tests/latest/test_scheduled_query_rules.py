@@ -0,0 +1,221 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from knack.util import CLIError
+
+from azext_scheduled_query._actions import parse_condition, _parse_condition
+from azext_scheduled_query._rules_apply import RateLimiter, apply_rules
+from azext_scheduled_query._rules_file import load_rules_file, parse_rules
+from azext_scheduled_query.custom import build_scheduled_query_rule, create_scheduled_query_batch
+
+CONDITION = "count 'union Event, Syslog | where  TimeGenerated > ago(1h)' > 360 resource id _ResourceId " \
+            "where Computer includes a or b at least 2 violations out of 3 aggregated points"
+
+
+class ConditionParseTest(unittest.TestCase):
+    def test_parse_is_memoized_and_copied(self):
+        _parse_condition.cache_clear()
+        first = parse_condition(CONDITION)
+        second = parse_condition(CONDITION)
+
+        self.assertEqual(_parse_condition.cache_info().misses, 1)
+        self.assertEqual(_parse_condition.cache_info().hits, 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(first.query, 'union Event, Syslog | where  TimeGenerated > ago(1h)')
+        self.assertEqual(first.time_aggregation, 'Count')
+        self.assertEqual(first.operator, 'GreaterThan')
+        self.assertEqual(first.resource_id_column, '_ResourceId')
+        self.assertEqual(first.dimensions[0].values, ['a', 'b'])
+        self.assertEqual(first.failing_periods.number_of_evaluation_periods, 3)
+
+        first.failing_periods.min_failing_periods_to_alert = 3
+        self.assertEqual(parse_condition(CONDITION).failing_periods.min_failing_periods_to_alert, 2)
+
+    def test_escaped_quotes_keep_query_whitespace(self):
+        first = parse_condition('count "Event | where  Message == \\"a  b\\"" > 1')
+        second = parse_condition('count "Event | where  Message == \\"a b\\"" > 1')
+
+        self.assertEqual(first.query, 'Event | where  Message == \\"a  b\\"')
+        self.assertEqual(second.query, 'Event | where  Message == \\"a b\\"')
+
+    def test_invalid_condition(self):
+        with self.assertRaises(CLIError):
+            parse_condition("count 'Heartbeat'")
+
+
+class RulesFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _write(self, content):
+        path = os.path.join(self.directory, 'rules.yaml')
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_parse_rules(self):
+        path = self._write("""
+rules:
+  - name: rule1
+    scopes: /subscriptions/sub/resourceGroups/rg
+    condition: count 'Heartbeat' > 0
+    windowSize: 10m
+    actions: [ag1, "ag2 key=value", {actionGroup: ag3, webHookProperties: {a: b}}]
+  - name: rule2
+    resourceGroup: other
+    scopes: [/subscriptions/sub/resourceGroups/other]
+    condition: ["count 'Heartbeat' > 0", "avg \\"Percent\\" from 'Perf' >= 90"]
+    severity: 4
+""")
+        rule1, rule2 = parse_rules(None, load_rules_file(path), 'rg')
+
+        self.assertEqual((rule1.resource_group_name, rule1.rule_name), ('rg', 'rule1'))
+        self.assertEqual(rule1.kwargs['scopes'], ['/subscriptions/sub/resourceGroups/rg'])
+        self.assertEqual(rule1.kwargs['window_size'], 'PT10M')
+        self.assertEqual(rule1.kwargs['evaluation_frequency'], 'PT5M')
+        self.assertEqual(rule1.kwargs['actions'][0].action_group_id,
+                         '/subscriptions/sub/resourceGroups/rg/providers/microsoft.insights/actionGroups/ag1')
+        self.assertEqual([a.web_hook_properties for a in rule1.kwargs['actions']], [None, {'key': 'value'}, {'a': 'b'}])
+        self.assertEqual(rule2.resource_group_name, 'other')
+        self.assertEqual(rule2.kwargs['severity'], 4)
+        self.assertEqual([c.time_aggregation for c in rule2.kwargs['condition']], ['Count', 'Average'])
+
+    def test_all_errors_reported(self):
+        path = self._write("""
+- name: bad-condition
+  scopes: [scope]
+  condition: count 'Heartbeat'
+- name: no-scopes
+  condition: count 'Heartbeat' > 0
+- name: bad-condition
+  scopes: [scope]
+  condition: count 'Heartbeat' > 0
+  unknown: 1
+""")
+        with self.assertRaises(CLIError) as context:
+            parse_rules(None, load_rules_file(path), 'rg')
+        message = str(context.exception)
+        self.assertIn('rule bad-condition: invalid condition', message)
+        self.assertIn('rule no-scopes: scopes is required', message)
+        self.assertIn('rule bad-condition: unknown keys unknown', message)
+
+    def test_create_batch_reports_created_rules(self):
+        path = self._write("""
+- name: rule1
+  scopes: [scope]
+  condition: count 'Heartbeat' > 0
+  location: westus
+- name: rule2
+  scopes: [scope]
+  condition: count 'Heartbeat' > 0
+  location: westus
+- name: rule3
+  scopes: [scope]
+  condition: count 'Heartbeat' > 0
+  location: westus
+""")
+
+        def _create_or_update(resource_group_name, rule_name, rule):
+            if rule_name == 'rule2':
+                raise ValueError('boom')
+            return rule
+
+        client = mock.MagicMock()
+        client.create_or_update.side_effect = _create_or_update
+        with self.assertRaises(CLIError) as context:
+            create_scheduled_query_batch(mock.MagicMock(), client, path, 'rg')
+        message = str(context.exception)
+        self.assertIn('Created 2 of 3 rules (rule1, rule3)', message)
+        self.assertIn('rule rule2 in resource group rg: boom', message)
+
+
+class _FakeRulesClient(object):
+    def __init__(self, existing, fail=()):
+        from msrest import Serializer
+        from azext_scheduled_query.vendored_sdks.azure_mgmt_scheduled_query import models
+        self._serialize = Serializer({k: v for k, v in models.__dict__.items() if isinstance(v, type)})
+        self.existing = existing
+        self.fail = fail
+        self.calls = []
+
+    def list_by_resource_group(self, resource_group_name):
+        self.calls.append(('list', resource_group_name))
+        return self.existing.get(resource_group_name, [])
+
+    def create_or_update(self, resource_group_name, rule_name, parameters):
+        if rule_name in self.fail:
+            raise CLIError('throttled')
+        self.calls.append(('put', resource_group_name, rule_name))
+
+    def delete(self, resource_group_name, rule_name):
+        self.calls.append(('delete', resource_group_name, rule_name))
+
+
+class ApplyRulesTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch('azure.cli.core.commands.client_factory.get_subscription_id', return_value='sub')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _existing(name, spec, **changes):
+        kwargs = dict(spec.kwargs, **changes)
+        rule = build_scheduled_query_rule(**kwargs)
+        rule.name = name
+        rule.id = '/subscriptions/sub/resourceGroups/RG/providers/microsoft.insights/scheduledQueryRules/' + name
+        # the service returns the location in display form
+        rule.location = 'East US'
+        return rule
+
+    def test_diff_and_apply(self):
+        rules = [{'name': name, 'scopes': ['/subscriptions/sub/resourceGroups/rg'], 'location': 'eastus',
+                  'condition': "count 'Heartbeat' > 0"} for name in ['same', 'changed', 'new']]
+        specs = parse_rules(None, rules, 'rg')
+        existing = {'rg': [self._existing('same', specs[0]), self._existing('changed', specs[1], severity=4),
+                           self._existing('extra', specs[0])]}
+
+        client = _FakeRulesClient(existing)
+        report = apply_rules(None, client, parse_rules(None, rules, 'rg'), dry_run=True)
+        self.assertEqual(client.calls, [('list', 'rg')])
+        self.assertEqual(report['created'], ['rg/new'])
+        self.assertEqual(report['updated'], ['rg/changed'])
+        self.assertEqual(report['unchanged'], ['rg/same'])
+
+        report = apply_rules(None, client, parse_rules(None, rules, 'rg'), prune=True)
+        self.assertEqual(sorted(client.calls[2:]), [('delete', 'RG', 'extra'), ('put', 'rg', 'changed'),
+                                                    ('put', 'rg', 'new')])
+        self.assertEqual(report['deleted'], ['RG/extra'])
+
+    def test_failures_reported_after_all_changes(self):
+        rules = [{'name': name, 'scopes': ['scope'], 'location': 'eastus', 'condition': "count 'Heartbeat' > 0"}
+                 for name in ['a', 'b', 'c']]
+        client = _FakeRulesClient({}, fail=('b',))
+        with self.assertRaises(CLIError) as context:
+            apply_rules(None, client, parse_rules(None, rules, 'rg'), max_requests_per_second=None)
+        self.assertIn('2 created, 0 updated, 0 deleted, 0 unchanged, 1 failed', str(context.exception))
+        self.assertIn('create rg/b: throttled', str(context.exception))
+        self.assertEqual(len([call for call in client.calls if call[0] == 'put']), 2)
+
+    def test_rate_limiter(self):
+        import time
+        limiter = RateLimiter(50)
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.wait()
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,6 +32,12 @@ helps['ssh config'] = """
         - name: Give the public IP (or hostname) of a VM for which to create a config
           text: |
             az ssh config --ip 1.2.3.4 --file ./sshconfig
+        - name: Create a config with an entry for every VM in a resource group, sharing one certificate
+          text: |
+            az ssh config --resource-group myResourceGroup --all-vms --file ./sshconfig
+        - name: Create a config with an entry for every VM in the subscription, using private IP addresses
+          text: |
+            az ssh config --all-vms --use-private-ip --file ./sshconfig
         - name: Create a generic config for use with any host
           text: |
             #Bash
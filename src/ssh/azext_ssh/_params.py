@@ -18,6 +18,12 @@ def load_arguments(self, _):
         c.argument('ssh_ip', options_list=['--ip'], help='The public IP address (or hostname) of the VM')
         c.argument('public_key_file', options_list=['--public-key-file', '-p'], help='The RSA public key file path')
         c.argument('private_key_file', options_list=['--private-key-file', '-i'], help='The RSA private key file path')
+        c.argument('all_vms', options_list=['--all-vms'], action='store_true',
+                   help='Write an entry for every VM in the resource group, '
+                        'or in the subscription if no resource group is given')
+        c.argument('use_private_ip', options_list=['--use-private-ip'], action='store_true',
+                   help='Use the private IP address of each VM instead of its public IP address. '
+                        'Requires --all-vms')
 
     with self.argument_context('ssh cert') as c:
         c.argument('cert_path', options_list=['--file', '-f'],
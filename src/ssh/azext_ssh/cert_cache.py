@@ -0,0 +1,148 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import base64
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+
+from knack import log
+
+from . import file_utils
+
+logger = log.get_logger(__name__)
+
+CERT_TYPE = "ssh-rsa-cert-v01@openssh.com"
+# certificates with less lifetime left than this are never handed out
+MIN_REMAINING_SECONDS = 5 * 60
+# certificates with less lifetime left than this are handed out and renewed in the background
+REFRESH_REMAINING_SECONDS = 20 * 60
+
+
+class CertificateInfo(object):
+    # pylint: disable=too-few-public-methods
+    def __init__(self, exponent, modulus, principals, valid_after, valid_before):
+        self.exponent = exponent
+        self.modulus = modulus
+        self.principals = principals
+        self.valid_after = valid_after
+        self.valid_before = valid_before
+
+    def remaining_seconds(self, now=None):
+        return self.valid_before - (now if now is not None else time.time())
+
+
+def parse_certificate(cert_text):
+    """Parse the public key and validity window of an OpenSSH ssh-rsa certificate.
+
+    The exponent and modulus are encoded the same way as rsa_parser.RSAParser does for public keys.
+    """
+    text_parts = cert_text.strip().split(' ')
+    if len(text_parts) < 2 or text_parts[0] != CERT_TYPE:
+        raise ValueError(f"Certificate is not {CERT_TYPE}")
+
+    reader = _CertReader(base64.b64decode(text_parts[1]))
+    if reader.read_string().decode("ascii") != CERT_TYPE:
+        raise ValueError(f"Encoded certificate is not {CERT_TYPE}")
+    reader.read_string()  # nonce
+    exponent = reader.read_string()
+    modulus = reader.read_string()
+    reader.read_uint64()  # serial
+    reader.read_uint32()  # certificate type
+    reader.read_string()  # key id
+    principals_reader = _CertReader(reader.read_string())
+    principals = []
+    while not principals_reader.at_end():
+        principals.append(principals_reader.read_string().decode("utf-8"))
+    valid_after = reader.read_uint64()
+    valid_before = reader.read_uint64()
+
+    return CertificateInfo(base64.urlsafe_b64encode(exponent).decode("ascii"),
+                           base64.urlsafe_b64encode(modulus).decode("ascii"),
+                           principals, valid_after, valid_before)
+
+
+class _CertReader(object):
+    def __init__(self, data):
+        self._data = data
+        self._read = 0
+
+    def at_end(self):
+        return self._read >= len(self._data)
+
+    def _take(self, length):
+        if self._read + length > len(self._data):
+            raise ValueError("Incorrectly encoded certificate")
+        data = self._data[self._read:self._read + length]
+        self._read += length
+        return data
+
+    def read_uint32(self):
+        return struct.unpack(">L", self._take(4))[0]
+
+    def read_uint64(self):
+        return struct.unpack(">Q", self._take(8))[0]
+
+    def read_string(self):
+        return self._take(self.read_uint32())
+
+
+class CertificateCache(object):
+    """Index of issued certificates keyed by the signed-in account and the public key.
+
+    Only the index lives in the cache directory; the certificates themselves stay where they were written
+    and are re-read and verified against the public key on every lookup.
+    """
+
+    def __init__(self, cache_dir, account):
+        self._index_path = os.path.join(cache_dir, "certs.json")
+        self._account = account
+        self._lock = threading.Lock()
+
+    def _key(self, key_id):
+        return hashlib.sha256(f"{self._account}\n{key_id}".encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, 'r') as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key_id, exponent, modulus):
+        """Return (cert_file, username, CertificateInfo) for a cached, unexpired certificate or None."""
+        entry = self._load_index().get(self._key(key_id))
+        if not entry:
+            return None
+        try:
+            with open(entry["cert_file"], 'r') as f:
+                info = parse_certificate(f.read())
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug("Ignoring cached certificate: %s", str(e))
+            return None
+        if (info.exponent, info.modulus) != (exponent, modulus):
+            logger.debug("Cached certificate %s was issued for a different key", entry["cert_file"])
+            return None
+        if info.remaining_seconds() < MIN_REMAINING_SECONDS:
+            return None
+        return entry["cert_file"], entry["username"], info
+
+    def put(self, key_id, cert_file, username, info):
+        with self._lock:
+            now = time.time()
+            index = {k: v for k, v in self._load_index().items() if v.get("valid_before", 0) > now}
+            index[self._key(key_id)] = {
+                "cert_file": os.path.abspath(cert_file),
+                "username": username,
+                "valid_before": info.valid_before
+            }
+            try:
+                file_utils.write_file_atomic(self._index_path, json.dumps(index))
+            except OSError as e:
+                logger.debug("Unable to update the certificate cache: %s", str(e))
@@ -7,14 +7,19 @@ import functools
 import os
 import hashlib
 import json
-import tempfile
+import threading
 
+from knack import log
 from knack import util
 
+from . import cert_cache
+from . import file_utils
 from . import ip_utils
 from . import rsa_parser
 from . import ssh_utils
 
+logger = log.get_logger(__name__)
+
 
 def ssh_vm(cmd, resource_group_name=None, vm_name=None, ssh_ip=None, public_key_file=None, private_key_file=None):
     _do_ssh_op(cmd, resource_group_name, vm_name, ssh_ip,
@@ -22,7 +27,13 @@ def ssh_vm(cmd, resource_group_name=None, vm_name=None, ssh_ip=None, public_key_
 
 
 def ssh_config(cmd, config_path, resource_group_name=None, vm_name=None, ssh_ip=None,
-               public_key_file=None, private_key_file=None):
+               public_key_file=None, private_key_file=None, all_vms=False, use_private_ip=False):
+    if all_vms:
+        _do_ssh_fleet_config(cmd, config_path, resource_group_name, vm_name, ssh_ip,
+                             public_key_file, private_key_file, use_private_ip)
+        return
+    if use_private_ip:
+        raise util.CLIError("--use-private-ip can only be used with --all-vms")
     op_call = functools.partial(ssh_utils.write_ssh_config, config_path, resource_group_name, vm_name)
     _do_ssh_op(cmd, resource_group_name, vm_name, ssh_ip, public_key_file, private_key_file, op_call)
 
@@ -45,15 +56,91 @@ def _do_ssh_op(cmd, resource_group, vm_name, ssh_ip, public_key_file, private_ke
     op_call(ssh_ip, username, cert_file, private_key_file)
 
 
+def _do_ssh_fleet_config(cmd, config_path, resource_group, vm_name, ssh_ip, public_key_file, private_key_file,
+                         use_private_ip):
+    if vm_name or ssh_ip:
+        raise util.CLIError("--all-vms cannot be used with --vm-name or --ip")
+    public_key_file, private_key_file = _check_or_create_public_private_files(public_key_file, private_key_file)
+
+    # the certificate request and the IP resolution are independent, run them side by side
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        cert = executor.submit(_get_and_write_certificate, cmd, public_key_file, None)
+        hosts = executor.submit(ip_utils.get_ssh_ips, cmd, resource_group, use_private_ip)
+        cert_file, username = cert.result()
+        hosts = hosts.result()
+
+    for host_resource_group, host_vm_name, _ in [x for x in hosts if not x[2]]:
+        logger.warning("Skipping VM '%s' in resource group '%s' which has no %s IP address",
+                       host_vm_name, host_resource_group, "private" if use_private_ip else "public")
+    hosts = [x for x in hosts if x[2]]
+    if not hosts:
+        raise util.CLIError("No VMs with an IP address to SSH to were found")
+
+    ssh_utils.write_fleet_ssh_config(config_path, hosts, username, cert_file, private_key_file)
+
+
 def _get_and_write_certificate(cmd, public_key_file, cert_file):
     scopes = ["https://pas.windows.net/CheckMyAccess/Linux/user_impersonation"]
     data = _prepare_jwk_data(public_key_file)
     from azure.cli.core._profile import Profile
     profile = Profile(cli_ctx=cmd.cli_ctx)
-    username, certificate = profile.get_msal_token(scopes, data)
     if not cert_file:
         cert_file = public_key_file + "-aadcert.pub"
-    return _write_cert_file(certificate, cert_file), username
+
+    cache = _get_certificate_cache(cmd, profile)
+    jwk = json.loads(data["req_cnf"])
+    cached = cache.get(data["key_id"], jwk["e"], jwk["n"]) if cache else None
+    if cached:
+        cached_file, username, info = cached
+        logger.debug("Reusing certificate %s valid for %d more seconds", cached_file, info.remaining_seconds())
+        if os.path.abspath(cached_file) != os.path.abspath(cert_file):
+            with open(cached_file, 'r') as f:
+                file_utils.write_file_atomic(cert_file, f.read())
+        if info.remaining_seconds() < cert_cache.REFRESH_REMAINING_SECONDS:
+            threading.Thread(target=_refresh_certificate,
+                             args=(profile, scopes, data, cert_file, cache)).start()
+        return cert_file, username
+
+    username, certificate = profile.get_msal_token(scopes, data)
+    cert_file = _write_cert_file(certificate, cert_file)
+    _cache_certificate(cache, data["key_id"], cert_file, username, certificate)
+    return cert_file, username
+
+
+def _refresh_certificate(profile, scopes, data, cert_file, cache):
+    try:
+        username, certificate = profile.get_msal_token(scopes, data)
+        file_utils.write_file_atomic(cert_file, f"{cert_cache.CERT_TYPE} {certificate}")
+        _cache_certificate(cache, data["key_id"], cert_file, username, certificate)
+    except Exception as e:  # pylint: disable=broad-except
+        logger.debug("Background certificate refresh failed: %s", str(e))
+
+
+def _get_certificate_cache(cmd, profile):
+    try:
+        account = profile.get_subscription()
+        account_key = "\n".join([cmd.cli_ctx.cloud.name, account["tenantId"], account["user"]["name"]])
+    except Exception as e:  # pylint: disable=broad-except
+        logger.debug("Certificate cache disabled: %s", str(e))
+        return None
+    return cert_cache.CertificateCache(_get_cache_dir(), account_key)
+
+
+def _cache_certificate(cache, key_id, cert_file, username, certificate):
+    if not cache:
+        return
+    try:
+        info = cert_cache.parse_certificate(f"{cert_cache.CERT_TYPE} {certificate}")
+    except ValueError as e:
+        logger.debug("Not caching certificate that could not be parsed: %s", str(e))
+        return
+    cache.put(key_id, cert_file, username, info)
+
+
+def _get_cache_dir():
+    from azure.cli.core.api import get_config_dir
+    return os.path.join(get_config_dir(), "ssh")
 
 
 def _prepare_jwk_data(public_key_file):
@@ -89,12 +176,19 @@ def _assert_args(resource_group, vm_name, ssh_ip):
 
 
 def _check_or_create_public_private_files(public_key_file, private_key_file):
-    # If nothing is passed in create a temporary directory with a ephemeral keypair
+    # If nothing is passed in use the keypair kept in the cache directory, creating it on first use.
+    # Reusing it lets the certificate issued for it be reused as well.
     if not public_key_file and not private_key_file:
-        temp_dir = tempfile.mkdtemp(prefix="aadsshcert")
-        public_key_file = os.path.join(temp_dir, "id_rsa.pub")
-        private_key_file = os.path.join(temp_dir, "id_rsa")
-        ssh_utils.create_ssh_keyfile(private_key_file)
+        key_dir = os.path.join(_get_cache_dir(), "keys")
+        public_key_file = os.path.join(key_dir, "id_rsa.pub")
+        private_key_file = os.path.join(key_dir, "id_rsa")
+        if not os.path.isfile(public_key_file) or not os.path.isfile(private_key_file):
+            file_utils.mkdir_p(key_dir)
+            os.chmod(key_dir, 0o700)
+            for key_file in (public_key_file, private_key_file):
+                if os.path.exists(key_file):
+                    os.remove(key_file)
+            ssh_utils.create_ssh_keyfile(private_key_file)
 
     if not os.path.isfile(public_key_file):
         raise util.CLIError(f"Public key file {public_key_file} not found")
@@ -5,6 +5,7 @@
 
 import errno
 import os
+import tempfile
 
 
 def make_dirs_for_file(file_path):
@@ -20,3 +21,16 @@ def mkdir_p(path):
             pass
         else:
             raise
+
+
+def write_file_atomic(file_path, contents):
+    make_dirs_for_file(file_path)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), prefix=".azssh")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(contents)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
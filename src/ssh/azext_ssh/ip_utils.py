@@ -34,3 +34,55 @@ def get_ssh_ip(cmd, resource_group, vm_name):
         if ssh_ip:
             break
     return ssh_ip
+
+
+def get_ssh_ips(cmd, resource_group=None, use_private_ip=False):
+    """Resolve the IP address of every VM in a resource group or in the subscription.
+
+    Instead of walking VM -> NIC -> public IP one GET at a time, VMs, NICs and public IPs are each listed
+    once (concurrently) and joined by resource ID in memory. Returns a list of (resource_group, vm_name, ip)
+    tuples, with ip None for VMs that have no usable address.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    compute_client = client_factory.get_mgmt_service_client(cmd.cli_ctx, profiles.ResourceType.MGMT_COMPUTE)
+    network_client = client_factory.get_mgmt_service_client(cmd.cli_ctx, profiles.ResourceType.MGMT_NETWORK)
+    vm_client = compute_client.virtual_machines
+
+    # NICs and public IPs may live in a different resource group than the VM, so list them subscription wide
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        vms = executor.submit(lambda: list(vm_client.list(resource_group) if resource_group else vm_client.list_all()))
+        nics = executor.submit(lambda: list(network_client.network_interfaces.list_all()))
+        public_ips = None
+        if not use_private_ip:
+            public_ips = executor.submit(lambda: list(network_client.public_ip_addresses.list_all()))
+        nics_by_id = {nic.id.lower(): nic for nic in nics.result()}
+        public_ips_by_id = {ip.id.lower(): ip for ip in public_ips.result()} if public_ips else {}
+        vms = vms.result()
+
+    results = []
+    for vm in vms:
+        vm_resource_group = tools.parse_resource_id(vm.id)['resource_group']
+        nic_refs = vm.network_profile.network_interfaces if vm.network_profile else []
+        # try the primary NIC first
+        nic_refs = sorted(nic_refs or [], key=lambda x: not getattr(x, 'primary', False))
+        results.append((vm_resource_group, vm.name,
+                        _resolve_vm_ip(nic_refs, nics_by_id, public_ips_by_id, use_private_ip)))
+    return results
+
+
+def _resolve_vm_ip(nic_refs, nics_by_id, public_ips_by_id, use_private_ip):
+    for nic_ref in nic_refs:
+        nic = nics_by_id.get(nic_ref.id.lower())
+        if not nic:
+            continue
+        for ip_config in nic.ip_configurations or []:
+            if use_private_ip:
+                ssh_ip = ip_config.private_ip_address
+            else:
+                public_ip_ref = ip_config.public_ip_address
+                public_ip = public_ips_by_id.get(public_ip_ref.id.lower()) if public_ip_ref else None
+                ssh_ip = public_ip.ip_address if public_ip else None
+            if ssh_ip:
+                return ssh_ip
+    return None
@@ -53,6 +53,20 @@ def write_ssh_config(config_path, resource_group, vm_name,
         f.write('\n'.join(lines))
 
 
+def write_fleet_ssh_config(config_path, hosts, username, cert_file, private_key_file):
+    """Write one Host entry per (resource_group, vm_name, ip) sharing a single certificate."""
+    lines = []
+    for resource_group, vm_name, ip in hosts:
+        lines.append("Host " + resource_group + "-" + vm_name)
+        lines.append("\tUser " + username)
+        lines.append("\tHostName " + ip)
+        lines.append("\tCertificateFile " + cert_file)
+        if private_key_file:
+            lines.append("\tIdentityFile " + private_key_file)
+
+    file_utils.write_file_atomic(config_path, '\n'.join(lines))
+
+
 def _get_ssh_path(ssh_command="ssh"):
     ssh_path = ssh_command
 
@@ -0,0 +1,106 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import base64
+import os
+import shutil
+import struct
+import tempfile
+import time
+import unittest
+
+from azext_ssh import cert_cache
+from azext_ssh import file_utils
+
+
+def _string(data):
+    return struct.pack(">L", len(data)) + data
+
+
+def _certificate(exponent=b'\x01\x00\x01', modulus=b'\x00\xc3\x11', principals=("user@contoso.com",),
+                 valid_after=0, valid_before=0):
+    body = b''.join([
+        _string(cert_cache.CERT_TYPE.encode("ascii")),
+        _string(b'nonce'),
+        _string(exponent),
+        _string(modulus),
+        struct.pack(">Q", 1),
+        struct.pack(">L", 1),
+        _string(b'key-id'),
+        _string(b''.join(_string(p.encode("utf-8")) for p in principals)),
+        struct.pack(">Q", valid_after),
+        struct.pack(">Q", valid_before),
+        _string(b''), _string(b''), _string(b''), _string(b'signature key'), _string(b'signature')
+    ])
+    return base64.b64encode(body).decode("ascii")
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+class CertificateParseTest(unittest.TestCase):
+    def test_parse_certificate(self):
+        cert = _certificate(principals=("a@contoso.com", "b@contoso.com"), valid_after=10, valid_before=20)
+        info = cert_cache.parse_certificate(f"{cert_cache.CERT_TYPE} {cert}")
+
+        self.assertEqual(_b64(b'\x01\x00\x01'), info.exponent)
+        self.assertEqual(_b64(b'\x00\xc3\x11'), info.modulus)
+        self.assertEqual(["a@contoso.com", "b@contoso.com"], info.principals)
+        self.assertEqual(10, info.valid_after)
+        self.assertEqual(20, info.valid_before)
+        self.assertEqual(5, info.remaining_seconds(now=15))
+
+    def test_parse_certificate_wrong_type(self):
+        self.assertRaises(ValueError, cert_cache.parse_certificate, "ssh-rsa AAAA")
+
+    def test_parse_certificate_truncated(self):
+        cert = base64.b64encode(base64.b64decode(_certificate())[:40]).decode("ascii")
+        self.assertRaises(ValueError, cert_cache.parse_certificate, f"{cert_cache.CERT_TYPE} {cert}")
+
+
+class CertificateCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.cache = cert_cache.CertificateCache(os.path.join(self.temp_dir, "cache"), "account")
+        self.exponent = _b64(b'\x01\x00\x01')
+        self.modulus = _b64(b'\x00\xc3\x11')
+
+    def _put(self, valid_before, cache=None):
+        cert_file = os.path.join(self.temp_dir, "id_rsa.pub-aadcert.pub")
+        cert = f"{cert_cache.CERT_TYPE} {_certificate(valid_before=int(valid_before))}"
+        file_utils.write_file_atomic(cert_file, cert)
+        (cache or self.cache).put("kid", cert_file, "user", cert_cache.parse_certificate(cert))
+        return cert_file
+
+    def test_get_valid_certificate(self):
+        cert_file = self._put(time.time() + 3600)
+
+        cert_path, username, info = self.cache.get("kid", self.exponent, self.modulus)
+
+        self.assertEqual(cert_file, cert_path)
+        self.assertEqual("user", username)
+        self.assertGreater(info.remaining_seconds(), cert_cache.REFRESH_REMAINING_SECONDS)
+
+    def test_get_near_expiry_certificate(self):
+        self._put(time.time() + 60)
+        self.assertIsNone(self.cache.get("kid", self.exponent, self.modulus))
+
+    def test_get_other_key_or_account(self):
+        self._put(time.time() + 3600)
+        other_account = cert_cache.CertificateCache(os.path.join(self.temp_dir, "cache"), "other")
+
+        self.assertIsNone(self.cache.get("kid", self.exponent, _b64(b'\x00\xc3\x12')))
+        self.assertIsNone(self.cache.get("other-kid", self.exponent, self.modulus))
+        self.assertIsNone(other_account.get("kid", self.exponent, self.modulus))
+
+    def test_get_missing_certificate_file(self):
+        os.remove(self._put(time.time() + 3600))
+        self.assertIsNone(self.cache.get("kid", self.exponent, self.modulus))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -37,6 +37,26 @@ class SshCustomCommandTest(unittest.TestCase):
         mock_do_op.assert_called_once_with(
             cmd, "rg", "vm", "ip", "public", "private", mock.ANY)
 
+    @mock.patch('azext_ssh.ssh_utils.write_fleet_ssh_config')
+    @mock.patch('azext_ssh.ip_utils.get_ssh_ips')
+    @mock.patch('azext_ssh.custom._get_and_write_certificate')
+    @mock.patch('azext_ssh.custom._check_or_create_public_private_files')
+    def test_ssh_config_all_vms(self, mock_check_files, mock_get_cert, mock_get_ips, mock_write):
+        cmd = mock.Mock()
+        mock_check_files.return_value = "public", "private"
+        mock_get_cert.return_value = "cert_file", "username"
+        mock_get_ips.return_value = [("rg", "vm1", "1.2.3.4"), ("rg", "vm2", None)]
+
+        custom.ssh_config(cmd, "path/to/file", "rg", all_vms=True)
+
+        mock_get_cert.assert_called_once_with(cmd, "public", None)
+        mock_get_ips.assert_called_once_with(cmd, "rg", False)
+        mock_write.assert_called_once_with(
+            "path/to/file", [("rg", "vm1", "1.2.3.4")], "username", "cert_file", "private")
+
+    def test_ssh_config_all_vms_with_vm_name(self):
+        self.assertRaises(util.CLIError, custom.ssh_config, mock.Mock(), "path/to/file", "rg", "vm", all_vms=True)
+
     @mock.patch('os.path.join')
     @mock.patch('azext_ssh.custom._assert_args')
     @mock.patch('azext_ssh.custom._check_or_create_public_private_files')
@@ -44,8 +64,10 @@ class SshCustomCommandTest(unittest.TestCase):
     @mock.patch('azext_ssh.custom._get_modulus_exponent')
     @mock.patch('azure.cli.core._profile.Profile.get_msal_token')
     @mock.patch('azext_ssh.custom._write_cert_file')
-    def test_do_ssh_op(self, mock_write_cert, mock_ssh_creds, mock_get_mod_exp, mock_ip,
+    @mock.patch('azext_ssh.custom._get_certificate_cache')
+    def test_do_ssh_op(self, mock_cache, mock_write_cert, mock_ssh_creds, mock_get_mod_exp, mock_ip,
                        mock_check_files, mock_assert, mock_join):
+        mock_cache.return_value = None
         cmd = mock.Mock()
         mock_op = mock.Mock()
         mock_check_files.return_value = "public", "private"
@@ -63,6 +85,42 @@ class SshCustomCommandTest(unittest.TestCase):
         mock_op.assert_called_once_with(
             "1.2.3.4", "username", mock_write_cert.return_value, "private")
 
+    @mock.patch('threading.Thread')
+    @mock.patch('azext_ssh.custom._get_certificate_cache')
+    @mock.patch('azext_ssh.custom._get_modulus_exponent')
+    @mock.patch('azure.cli.core._profile.Profile')
+    def test_get_and_write_certificate_cached(self, mock_profile, mock_get_mod_exp, mock_cache, mock_thread):
+        cmd = mock.Mock()
+        mock_get_mod_exp.return_value = "modulus", "exponent"
+        mock_info = mock.Mock()
+        mock_info.remaining_seconds.return_value = 3600
+        mock_cache.return_value.get.return_value = ("public-aadcert.pub", "username", mock_info)
+
+        cert_file, username = custom._get_and_write_certificate(cmd, "public", None)
+
+        self.assertEqual(("public-aadcert.pub", "username"), (cert_file, username))
+        mock_cache.return_value.get.assert_called_once_with(mock.ANY, "exponent", "modulus")
+        mock_profile.return_value.get_msal_token.assert_not_called()
+        mock_thread.assert_not_called()
+
+    @mock.patch('threading.Thread')
+    @mock.patch('azext_ssh.custom._get_certificate_cache')
+    @mock.patch('azext_ssh.custom._get_modulus_exponent')
+    @mock.patch('azure.cli.core._profile.Profile')
+    def test_get_and_write_certificate_cached_near_expiry(self, mock_profile, mock_get_mod_exp, mock_cache,
+                                                          mock_thread):
+        cmd = mock.Mock()
+        mock_get_mod_exp.return_value = "modulus", "exponent"
+        mock_info = mock.Mock()
+        mock_info.remaining_seconds.return_value = 600
+        mock_cache.return_value.get.return_value = ("public-aadcert.pub", "username", mock_info)
+
+        custom._get_and_write_certificate(cmd, "public", None)
+
+        mock_profile.return_value.get_msal_token.assert_not_called()
+        mock_thread.assert_called_once_with(target=custom._refresh_certificate, args=mock.ANY)
+        mock_thread.return_value.start.assert_called_once_with()
+
     @mock.patch('azext_ssh.custom._assert_args')
     @mock.patch('azext_ssh.custom._check_or_create_public_private_files')
     @mock.patch('azext_ssh.ip_utils.get_ssh_ip')
@@ -94,29 +152,37 @@ class SshCustomCommandTest(unittest.TestCase):
         self.assertRaises(util.CLIError, custom._assert_args, "rg", "vm", "ip")
 
     @mock.patch('azext_ssh.ssh_utils.create_ssh_keyfile')
-    @mock.patch('tempfile.mkdtemp')
+    @mock.patch('azext_ssh.file_utils.mkdir_p')
+    @mock.patch('os.chmod')
+    @mock.patch('os.path.exists')
     @mock.patch('os.path.isfile')
-    @mock.patch('os.path.join')
-    def test_check_or_create_public_private_files_defaults(self, mock_join, mock_isfile, mock_temp, mock_create):
+    @mock.patch('azext_ssh.custom._get_cache_dir')
+    def test_check_or_create_public_private_files_defaults(self, mock_cache_dir, mock_isfile, mock_exists,
+                                                           mock_chmod, mock_mkdir, mock_create):
+        mock_cache_dir.return_value = "/cache"
+        mock_isfile.side_effect = [False, True, True]
+        mock_exists.return_value = False
+
+        public, private = custom._check_or_create_public_private_files(None, None)
+
+        self.assertEqual('/cache/keys/id_rsa.pub', public)
+        self.assertEqual('/cache/keys/id_rsa', private)
+        mock_mkdir.assert_called_once_with('/cache/keys')
+        mock_chmod.assert_called_once_with('/cache/keys', 0o700)
+        mock_create.assert_called_once_with('/cache/keys/id_rsa')
+
+    @mock.patch('azext_ssh.ssh_utils.create_ssh_keyfile')
+    @mock.patch('os.path.isfile')
+    @mock.patch('azext_ssh.custom._get_cache_dir')
+    def test_check_or_create_public_private_files_defaults_reused(self, mock_cache_dir, mock_isfile, mock_create):
+        mock_cache_dir.return_value = "/cache"
         mock_isfile.return_value = True
-        mock_temp.return_value = "/tmp/aadtemp"
-        mock_join.side_effect = ['/tmp/aadtemp/id_rsa.pub', '/tmp/aadtemp/id_rsa']
 
         public, private = custom._check_or_create_public_private_files(None, None)
 
-        self.assertEqual('/tmp/aadtemp/id_rsa.pub', public)
-        self.assertEqual('/tmp/aadtemp/id_rsa', private)
-        mock_join.assert_has_calls([
-            mock.call("/tmp/aadtemp", "id_rsa.pub"),
-            mock.call("/tmp/aadtemp", "id_rsa")
-        ])
-        mock_isfile.assert_has_calls([
-            mock.call('/tmp/aadtemp/id_rsa.pub'),
-            mock.call('/tmp/aadtemp/id_rsa')
-        ])
-        mock_create.assert_has_calls([
-            mock.call('/tmp/aadtemp/id_rsa')
-        ])
+        self.assertEqual('/cache/keys/id_rsa.pub', public)
+        self.assertEqual('/cache/keys/id_rsa', private)
+        mock_create.assert_not_called()
 
     @mock.patch('os.path.isfile')
     @mock.patch('os.path.join')
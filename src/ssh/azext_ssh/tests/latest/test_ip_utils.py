@@ -0,0 +1,64 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import mock
+import unittest
+
+from azext_ssh import ip_utils
+
+
+def _resource(resource_id, **kwargs):
+    resource = mock.Mock(id=resource_id, **kwargs)
+    resource.name = resource_id.split('/')[-1]
+    return resource
+
+
+class IpUtilsTest(unittest.TestCase):
+    def setUp(self):
+        sub = '/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/'
+        nic1_id = sub + 'netrg/providers/Microsoft.Network/networkInterfaces/nic1'
+        nic2_id = sub + 'netrg/providers/Microsoft.Network/networkInterfaces/nic2'
+        pip_id = sub + 'netrg/providers/Microsoft.Network/publicIPAddresses/pip1'
+        self.vms = [
+            _resource(sub + 'rg/providers/Microsoft.Compute/virtualMachines/vm1',
+                      network_profile=mock.Mock(network_interfaces=[mock.Mock(id=nic1_id.upper(), primary=True)])),
+            _resource(sub + 'rg/providers/Microsoft.Compute/virtualMachines/vm2',
+                      network_profile=mock.Mock(network_interfaces=[mock.Mock(id=nic2_id, primary=True)]))
+        ]
+        self.nics = [
+            _resource(nic1_id, ip_configurations=[mock.Mock(private_ip_address='10.0.0.4',
+                                                            public_ip_address=mock.Mock(id=pip_id))]),
+            _resource(nic2_id, ip_configurations=[mock.Mock(private_ip_address='10.0.0.5', public_ip_address=None)])
+        ]
+        self.public_ips = [_resource(pip_id, ip_address='1.2.3.4')]
+
+    @mock.patch('azure.cli.core.commands.client_factory.get_mgmt_service_client')
+    def test_get_ssh_ips(self, mock_client):
+        client = mock_client.return_value
+        client.virtual_machines.list.return_value = iter(self.vms)
+        client.network_interfaces.list_all.return_value = iter(self.nics)
+        client.public_ip_addresses.list_all.return_value = iter(self.public_ips)
+
+        ips = ip_utils.get_ssh_ips(mock.Mock(), "rg")
+
+        self.assertEqual([("rg", "vm1", "1.2.3.4"), ("rg", "vm2", None)], ips)
+        client.virtual_machines.list.assert_called_once_with("rg")
+        client.network_interfaces.get.assert_not_called()
+        client.public_ip_addresses.get.assert_not_called()
+
+    @mock.patch('azure.cli.core.commands.client_factory.get_mgmt_service_client')
+    def test_get_ssh_ips_private(self, mock_client):
+        client = mock_client.return_value
+        client.virtual_machines.list_all.return_value = iter(self.vms)
+        client.network_interfaces.list_all.return_value = iter(self.nics)
+
+        ips = ip_utils.get_ssh_ips(mock.Mock(), use_private_ip=True)
+
+        self.assertEqual([("rg", "vm1", "10.0.0.4"), ("rg", "vm2", "10.0.0.5")], ips)
+        client.public_ip_addresses.list_all.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
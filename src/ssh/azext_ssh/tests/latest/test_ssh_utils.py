@@ -54,6 +54,26 @@ class SSHUtilsTests(unittest.TestCase):
         mock_open.assert_called_once_with("path/to/file", "w")
         mock_file.write.assert_called_once_with('\n'.join(expected_lines))
 
+    @mock.patch('azext_ssh.ssh_utils.file_utils.write_file_atomic')
+    def test_write_fleet_ssh_config(self, mock_write):
+        expected_lines = [
+            "Host rg-vm1",
+            "\tUser username",
+            "\tHostName 1.2.3.4",
+            "\tCertificateFile cert",
+            "\tIdentityFile privatekey",
+            "Host rg-vm2",
+            "\tUser username",
+            "\tHostName 1.2.3.5",
+            "\tCertificateFile cert",
+            "\tIdentityFile privatekey"
+        ]
+
+        ssh_utils.write_fleet_ssh_config(
+            "path/to/file", [("rg", "vm1", "1.2.3.4"), ("rg", "vm2", "1.2.3.5")], "username", "cert", "privatekey")
+
+        mock_write.assert_called_once_with("path/to/file", '\n'.join(expected_lines))
+
     @mock.patch('azext_ssh.ssh_utils.file_utils.make_dirs_for_file')
     def test_write_ssh_config_ip_only(self, mock_make_dirs):
         expected_lines = [
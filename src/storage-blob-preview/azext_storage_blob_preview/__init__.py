@@ -190,6 +190,8 @@ If you want to change the default action to apply when no rule matches, please u
                     """
                     ex.args = (message,)
                 elif ex.error_code == 'AuthenticationFailed':
+                    from ._account_cache import invalidate_used_account_keys
+                    invalidate_used_account_keys()
                     message = """
 Authentication failure. This may be caused by either invalid account key, connection string or sas token value provided for your storage account.
                     """
@@ -0,0 +1,145 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+    Local cache of storage account name to resource group and, if enabled, account key
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_FILE_NAME = 'accounts.bin'
+CACHE_KEY_FILE_NAME = 'accounts.key'
+ACCOUNT_TTL_SECONDS = 24 * 60 * 60
+ACCOUNT_KEY_TTL_SECONDS = 60 * 60
+
+# accounts whose cached key was handed out in this invocation, dropped from the cache if authentication fails
+_used_account_keys = set()
+# accounts whose cached resource group was handed out in this invocation, dropped from the cache if ARM does not
+# find the account there
+_used_resource_groups = set()
+
+
+def _default_cache_dir():
+    from azure.cli.core.api import get_config_dir
+    return os.path.join(get_config_dir(), 'storage-blob-preview')
+
+
+def _write_private_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.accounts-')
+    try:
+        os.chmod(temp_path, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+class StorageAccountCache(object):
+    """Maps storage account names to their resource group and, optionally, their key, per subscription.
+
+    The cache file is encrypted with a key kept in a separate file next to it; both are only readable by the
+    current user. Since the key is stored alongside, the encryption only obfuscates the cache, the file
+    permissions are what protect it. Resource groups expire after ACCOUNT_TTL_SECONDS and keys after
+    ACCOUNT_KEY_TTL_SECONDS.
+    """
+
+    def __init__(self, subscription_id, cache_dir=None):
+        self._subscription_id = (subscription_id or '').lower()
+        cache_dir = cache_dir or _default_cache_dir()
+        self._path = os.path.join(cache_dir, CACHE_FILE_NAME)
+        self._key_path = os.path.join(cache_dir, CACHE_KEY_FILE_NAME)
+
+    def _cipher(self):
+        from cryptography.fernet import Fernet
+        try:
+            with open(self._key_path, 'rb') as f:
+                return Fernet(f.read())
+        except (OSError, ValueError):
+            key = Fernet.generate_key()
+            _write_private_file(self._key_path, key)
+            return Fernet(key)
+
+    def _entry_key(self, account_name):
+        return '{}/{}'.format(self._subscription_id, account_name.lower())
+
+    def _load(self):
+        from cryptography.fernet import InvalidToken
+        try:
+            with open(self._path, 'rb') as f:
+                entries = json.loads(self._cipher().decrypt(f.read()).decode('utf-8'))
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError, InvalidToken):
+            return {}
+
+    def _save(self, entries):
+        now = time.time()
+        entries = {k: v for k, v in entries.items() if v.get('expires', 0) > now}
+        try:
+            _write_private_file(self._path, self._cipher().encrypt(json.dumps(entries).encode('utf-8')))
+        except OSError as ex:
+            logger.debug("Unable to update the storage account cache: %s", ex)
+
+    def get_resource_group(self, account_name):
+        entry = self._load().get(self._entry_key(account_name))
+        if not entry or entry.get('expires', 0) <= time.time():
+            return None
+        _used_resource_groups.add((self, account_name))
+        return entry['resourceGroup']
+
+    def get_account_key(self, account_name):
+        entry = self._load().get(self._entry_key(account_name))
+        if not entry or entry.get('keyExpires', 0) <= time.time() or not entry.get('key'):
+            return None
+        _used_account_keys.add((self, account_name))
+        return entry['key']
+
+    def put(self, account_name, resource_group, account_key=None):
+        entries = self._load()
+        entry = {'resourceGroup': resource_group, 'expires': time.time() + ACCOUNT_TTL_SECONDS}
+        if account_key:
+            entry.update({'key': account_key, 'keyExpires': time.time() + ACCOUNT_KEY_TTL_SECONDS})
+        entries[self._entry_key(account_name)] = entry
+        self._save(entries)
+
+    def remove(self, account_name):
+        entries = self._load()
+        if entries.pop(self._entry_key(account_name), None) is not None:
+            self._save(entries)
+
+
+def invalidate_used_account_keys():
+    """Drop the accounts whose cached key was used in this invocation, after the service rejected it."""
+    while _used_account_keys:
+        cache, account_name = _used_account_keys.pop()
+        logger.debug("Removing storage account %s from the cache after an authentication failure", account_name)
+        cache.remove(account_name)
+
+
+def invalidate_used_resource_groups():
+    """Drop the accounts whose cached resource group was used in this invocation, after ARM did not find them."""
+    while _used_resource_groups:
+        cache, account_name = _used_resource_groups.pop()
+        logger.warning("Removed the cached resource group of storage account %s, which was not found there. "
+                       "Run the command again to look it up.", account_name)
+        cache.remove(account_name)
+
+
+def resource_group_not_found_handler(ex, next_handler=None):
+    """Exception handler for management plane commands whose resource group may have come from the cache."""
+    if getattr(ex, 'status_code', None) == 404:
+        invalidate_used_resource_groups()
+    if next_handler:
+        return next_handler(ex)
+    raise ex
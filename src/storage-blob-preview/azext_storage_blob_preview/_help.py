@@ -92,6 +92,8 @@ short-summary: List blobs in a given container.
 examples:
   - name: List all storage blobs in a container whose names start with 'foo'; will match names such as 'foo', 'foobar', and 'foo/bar'
     text: az storage blob list -c MyContainer --prefix foo
+  - name: Stream all blobs in a container as JSON lines without holding the whole listing in memory.
+    text: az storage blob list -c MyContainer --num-results "*" --stream-output jsonl > blobs.jsonl
 """
 
 helps['storage blob metadata'] = """
@@ -353,6 +353,11 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
                    help='Filter the results to return only blobs whose name begins with the specified prefix.')
         c.argument('show_next_marker', action='store_true', is_preview=True,
                    help='Show nextMarker in result when specified.')
+        c.argument('stream_output', arg_type=get_enum_type(['jsonl', 'tsv']), is_preview=True,
+                   help='Write each blob to stdout as soon as its page arrives instead of collecting the whole '
+                   'result first, as one JSON object per line or as tab separated values in the columns of the '
+                   'table output. Memory use does not grow with the number of blobs. --output and --query do not '
+                   'apply to the streamed output.')
 
     for item in ['show', 'update']:
         with self.argument_context('storage blob metadata {}'.format(item), resource_type=CUSTOM_DATA_STORAGE_BLOB) \
@@ -182,6 +182,8 @@ def _transform_page_ranges(page_ranges):
 
 
 def transform_blob_list_output(result):
+    if result is None:  # output already streamed
+        return result
     for i, item in enumerate(result):
         if isinstance(item, dict) and 'nextMarker' in item:
             continue
@@ -234,6 +236,133 @@ def transform_blob_json_output(result):
     return new_result
 
 
+# output key under "properties" of the attributes transform_blob_json_output moves there, in output order
+_BLOB_PROPERTIES_KEYS = (
+    ('appendBlobCommittedBlockCount', 'appendBlobCommittedBlockCount'), ('blobTier', 'blobTier'),
+    ('blobTierChangeTime', 'blobTierChangeTime'), ('blobTierInferred', 'blobTierInferred'),
+    ('blobType', 'blobType'), ('size', 'contentLength'), ('contentRange', 'contentRange'),
+    ('contentSettings', 'contentSettings'), ('copy', 'copy'), ('creationTime', 'creationTime'),
+    ('deletedTime', 'deletedTime'), ('etag', 'etag'), ('lastModified', 'lastModified'), ('lease', 'lease'),
+    ('pageBlobSequenceNumber', 'pageBlobSequenceNumber'), ('pageRanges', 'pageRanges'),
+    ('archiveStatus', 'rehydrationStatus'), ('remainingRetentionDays', 'remainingRetentionDays'),
+    ('serverEncrypted', 'serverEncrypted'))
+_BLOB_TOP_LEVEL_KEYS = ('deleted', 'metadata', 'name', 'snapshot')
+_BLOB_CONTENT_SETTINGS_ATTRIBUTES = (
+    ('cache_control', 'cacheControl'), ('content_disposition', 'contentDisposition'),
+    ('content_encoding', 'contentEncoding'), ('content_language', 'contentLanguage'),
+    ('content_md5', 'contentMd5'), ('content_type', 'contentType'))
+_JSON_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+def _to_json_value(value):
+    # exact type check, str based enums must still go through todict to get their value
+    return value if type(value) in _JSON_SCALAR_TYPES else todict(value)  # pylint: disable=unidiomatic-typecheck
+
+
+class BlobJsonProjection(object):  # pylint: disable=too-few-public-methods
+    """Build the output of transform_blob_json_output directly from the attributes of a blob item.
+
+    The placement of every attribute is resolved once per attribute layout of the SDK model and reused, so
+    each blob costs one pass over its own attributes rather than a todict of the whole object and a rebuild.
+    """
+    __slots__ = ('_layouts',)
+
+    def __init__(self):
+        self._layouts = {}
+
+    def _compile(self, names):
+        from knack.util import to_camel_case
+        properties = dict(_BLOB_PROPERTIES_KEYS)
+        layout = []
+        for name in names:
+            if name.startswith('_'):
+                continue
+            key = to_camel_case(name)
+            if key == 'contentSettings':
+                layout.append((name, None, None))
+            elif key in properties:
+                layout.append((name, 'properties', properties[key]))
+            elif key in _BLOB_TOP_LEVEL_KEYS:
+                layout.append((name, 'top', key))
+            else:
+                layout.append((name, 'extra', key))
+        return layout
+
+    def __call__(self, item):
+        attributes = vars(item)
+        if 'content_settings' not in attributes:  # BlobPrefix object when there is delimiter specified
+            return {"name": item.name}
+        names = tuple(attributes)
+        layout = self._layouts.get(names)
+        if layout is None:
+            layout = self._layouts[names] = self._compile(names)
+
+        properties = dict.fromkeys(key for _, key in _BLOB_PROPERTIES_KEYS)
+        result = {"content": "", "deleted": None, "metadata": None, "name": None, "properties": properties,
+                  "snapshot": None}
+        extra = []
+        for name, section, key in layout:
+            value = attributes[name]
+            if callable(value):
+                continue
+            if section is None:
+                properties['contentSettings'] = {
+                    output_key: _encode_bytes(_to_json_value(getattr(value, attribute)))
+                    for attribute, output_key in _BLOB_CONTENT_SETTINGS_ATTRIBUTES}
+            elif section == 'properties':
+                value = _to_json_value(value)
+                properties[key] = _transform_page_ranges(value) if key == 'pageRanges' else value
+            elif section == 'top':
+                result[key] = _to_json_value(value)
+            else:
+                extra.append((key, value))
+        for key, value in extra:
+            result[key] = _to_json_value(value)
+        return result
+
+
+# attributes of the columns of the table output of blob list, in order
+_BLOB_TSV_ATTRIBUTES = ('name', 'blob_type', 'blob_tier', 'size', 'content_settings.content_type', 'last_modified',
+                        'snapshot')
+
+
+def _to_tsv_field(value):
+    value = _to_json_value(value)
+    if value is None:
+        return ''
+    return value if isinstance(value, str) else str(value)
+
+
+def _compile_tsv_row(attributes):
+    from operator import attrgetter
+    getters = [attrgetter(attribute) for attribute in attributes]
+
+    def _row(item):
+        if not hasattr(item, 'content_settings'):  # BlobPrefix
+            return '\t'.join([item.name] + [''] * (len(getters) - 1))
+        return '\t'.join(_to_tsv_field(getter(item)) for getter in getters)
+    return _row
+
+
+def stream_blob_list_output(items, output_format, stream):
+    """Write items to stream one line at a time as JSON lines or as TSV in the columns of the table output."""
+    import json
+    if output_format == 'tsv':
+        to_line = _compile_tsv_row(_BLOB_TSV_ATTRIBUTES)
+    else:
+        projection = BlobJsonProjection()
+
+        def to_line(item):
+            return json.dumps(projection(item))
+    count = 0
+    for item in items:
+        stream.write(to_line(item))
+        stream.write('\n')
+        count += 1
+    stream.flush()
+    return count
+
+
 def transform_container_list_output(result):
     for i, item in enumerate(result):
         if isinstance(item, dict) and 'nextMarker' in item:
@@ -29,9 +29,40 @@ logger = get_logger(__name__)
 
 
 # pylint: disable=inconsistent-return-statements,too-many-lines
+def _get_account_cache(cli_ctx):
+    from importlib.util import find_spec
+    from azure.cli.core.commands.client_factory import get_subscription_id
+    from ._account_cache import StorageAccountCache
+    if find_spec('cryptography') is None:
+        return None
+    return StorageAccountCache(get_subscription_id(cli_ctx))
+
+
 def _query_account_key(cli_ctx, account_name):
     """Query the storage account key. This is used when the customer doesn't offer account key but name."""
+    cache = _get_account_cache(cli_ctx)
+    cache_key = cache is not None and cli_ctx.config.getboolean('storage', 'cache_account_key', False)
+    if cache_key:
+        account_key = cache.get_account_key(account_name)
+        if account_key:
+            return account_key
+
+    cached_rg = cache.get_resource_group(account_name) if cache is not None else None
     rg, scf = _query_account_rg(cli_ctx, account_name)
+    try:
+        account_key = _list_account_key(cli_ctx, scf, rg, account_name)
+    except Exception:  # pylint: disable=broad-except
+        if not cached_rg:
+            raise
+        # the account may have moved since its resource group was cached, look it up again
+        rg, scf = _query_account_rg(cli_ctx, account_name, use_cache=False)
+        account_key = _list_account_key(cli_ctx, scf, rg, account_name)
+    if cache_key:
+        cache.put(account_name, rg, account_key)
+    return account_key
+
+
+def _list_account_key(cli_ctx, scf, rg, account_name):
     t_storage_account_keys = get_sdk(
         cli_ctx, ResourceType.MGMT_STORAGE, 'models.storage_account_keys#StorageAccountKeys')
 
@@ -43,13 +74,38 @@ def _query_account_key(cli_ctx, account_name):
     return scf.storage_accounts.list_keys(rg, account_name).keys[0].value  # pylint: disable=no-member
 
 
-def _query_account_rg(cli_ctx, account_name):
-    """Query the storage account's resource group, which the mgmt sdk requires."""
+def _query_account_rg(cli_ctx, account_name, use_cache=True):
+    """Query the storage account's resource group, which the mgmt sdk requires.
+
+    Commands that use a cached resource group register `resource_group_not_found_handler`, which drops it from
+    the cache when the account is not found there.
+    """
     scf = storage_client_factory(cli_ctx)
-    acc = next((x for x in scf.storage_accounts.list() if x.name == account_name), None)
+    cache = _get_account_cache(cli_ctx)
+    if cache is not None and use_cache:
+        rg = cache.get_resource_group(account_name)
+        if rg:
+            return rg, scf
+
+    rg = _find_account_rg(cli_ctx, scf, account_name)
+    if cache is not None:
+        cache.put(account_name, rg)
+    return rg, scf
+
+
+def _find_account_rg(cli_ctx, scf, account_name):
+    from msrestazure.tools import parse_resource_id
+    from azure.cli.core.commands.client_factory import get_mgmt_service_client
+    try:
+        # a filtered query returns the one account instead of every account in the subscription
+        resource_filter = "resourceType eq 'Microsoft.Storage/storageAccounts' and name eq '{}'".format(account_name)
+        resources = get_mgmt_service_client(cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES).resources
+        acc = next(iter(resources.list(filter=resource_filter)), None)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.debug('Unable to query storage account %s by name, listing all accounts: %s', account_name, ex)
+        acc = next((x for x in scf.storage_accounts.list() if x.name == account_name), None)
     if acc:
-        from msrestazure.tools import parse_resource_id
-        return parse_resource_id(acc.id)['resource_group'], scf
+        return parse_resource_id(acc.id)['resource_group']
     raise ValueError("Storage account '{}' not found.".format(account_name))
 
 
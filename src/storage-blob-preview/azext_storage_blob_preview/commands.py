@@ -7,6 +7,7 @@ from azure.cli.core.commands import CliCommandType
 from azure.cli.core.commands.arm import show_exception_handler
 from azure.cli.core.profiles import ResourceType
 
+from ._account_cache import resource_group_not_found_handler
 from ._client_factory import cf_blob_client, cf_container_client, cf_blob_service, cf_blob_lease_client, \
     cf_mgmt_blob_services, cf_sa, cf_mgmt_policy
 from .profiles import CUSTOM_DATA_STORAGE_BLOB, CUSTOM_MGMT_STORAGE
@@ -37,8 +38,10 @@ def load_command_table(self, _):  # pylint: disable=too-many-locals, too-many-st
 
     with self.command_group('storage account blob-service-properties', blob_service_mgmt_sdk,
                             custom_command_type=storage_account_custom_type,
-                            resource_type=CUSTOM_MGMT_STORAGE, min_api='2018-07-01', is_preview=True) as g:
-        g.show_command('show', 'get_service_properties')
+                            resource_type=CUSTOM_MGMT_STORAGE, min_api='2018-07-01', is_preview=True,
+                            exception_handler=resource_group_not_found_handler) as g:
+        g.show_command('show', 'get_service_properties',
+                       exception_handler=lambda ex: resource_group_not_found_handler(ex, show_exception_handler))
         g.generic_update_command('update',
                                  getter_name='get_service_properties',
                                  setter_name='set_service_properties',
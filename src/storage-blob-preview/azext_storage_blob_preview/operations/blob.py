@@ -523,7 +523,7 @@ def generate_sas_container_uri(client, cmd, container_name, permission=None,
 
 
 def list_blobs(client, delimiter=None, include=None, marker=None, num_results=None, prefix=None,
-               show_next_marker=None, **kwargs):
+               show_next_marker=None, stream_output=None, **kwargs):
     from ..track2_util import list_generator
 
     if delimiter:
@@ -532,6 +532,8 @@ def list_blobs(client, delimiter=None, include=None, marker=None, num_results=No
         generator = client.list_blobs(name_starts_with=prefix, include=include, results_per_page=num_results, **kwargs)
 
     pages = generator.by_page(continuation_token=marker)  # BlobPropertiesPaged
+    if stream_output:
+        return _stream_blobs(pages, num_results, show_next_marker, stream_output)
     result = list_generator(pages=pages, num_results=num_results)
 
     if show_next_marker:
@@ -545,6 +547,21 @@ def list_blobs(client, delimiter=None, include=None, marker=None, num_results=No
     return result
 
 
+def _stream_blobs(pages, num_results, show_next_marker, output_format):
+    import json
+    import sys
+    from ..track2_util import iter_generator
+    from .._transformers import stream_blob_list_output
+
+    count = stream_blob_list_output(iter_generator(pages, num_results), output_format, sys.stdout)
+    logger.info('Listed %d blobs', count)
+    if show_next_marker and output_format == 'jsonl':
+        sys.stdout.write(json.dumps({"nextMarker": pages.continuation_token}) + '\n')
+    elif pages.continuation_token:
+        logger.warning('Next Marker:')
+        logger.warning(pages.continuation_token)
+
+
 def list_containers(client, include_metadata=False, include_deleted=False, marker=None,
                     num_results=None, prefix=None, show_next_marker=None, **kwargs):
     from ..track2_util import list_generator
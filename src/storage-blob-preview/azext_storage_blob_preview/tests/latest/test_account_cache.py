@@ -0,0 +1,86 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from ... import _account_cache
+from ..._account_cache import StorageAccountCache, invalidate_used_account_keys, resource_group_not_found_handler
+
+
+class StorageAccountCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.addCleanup(_account_cache._used_resource_groups.clear)
+        self.addCleanup(_account_cache._used_account_keys.clear)
+        self.cache = StorageAccountCache('SUB', cache_dir=self.cache_dir)
+
+    def test_resource_group_and_key(self):
+        self.cache.put('Account', 'rg', 'secret-key')
+
+        self.assertEqual(self.cache.get_resource_group('account'), 'rg')
+        self.assertEqual(self.cache.get_account_key('account'), 'secret-key')
+        self.assertIsNone(StorageAccountCache('other', cache_dir=self.cache_dir).get_resource_group('account'))
+
+    def test_file_is_encrypted_and_private(self):
+        self.cache.put('account', 'my-resource-group', 'secret-key')
+        for name in (_account_cache.CACHE_FILE_NAME, _account_cache.CACHE_KEY_FILE_NAME):
+            path = os.path.join(self.cache_dir, name)
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+        with open(os.path.join(self.cache_dir, _account_cache.CACHE_FILE_NAME), 'rb') as f:
+            content = f.read()
+        self.assertNotIn(b'my-resource-group', content)
+        self.assertNotIn(b'secret-key', content)
+
+    def test_entries_expire(self):
+        self.cache.put('account', 'rg', 'secret-key')
+        now = time.time()
+        with mock.patch('azext_storage_blob_preview._account_cache.time.time',
+                        return_value=now + _account_cache.ACCOUNT_KEY_TTL_SECONDS + 1):
+            self.assertIsNone(self.cache.get_account_key('account'))
+            self.assertEqual(self.cache.get_resource_group('account'), 'rg')
+        with mock.patch('azext_storage_blob_preview._account_cache.time.time',
+                        return_value=now + _account_cache.ACCOUNT_TTL_SECONDS + 1):
+            self.assertIsNone(self.cache.get_resource_group('account'))
+
+    def test_invalidate_used_keys(self):
+        self.cache.put('used', 'rg', 'key1')
+        self.cache.put('unused', 'rg', 'key2')
+        self.assertEqual(self.cache.get_account_key('used'), 'key1')
+
+        invalidate_used_account_keys()
+
+        self.assertIsNone(self.cache.get_resource_group('used'))
+        self.assertEqual(self.cache.get_account_key('unused'), 'key2')
+
+    def test_not_found_invalidates_used_resource_groups(self):
+        self.cache.put('moved', 'old-rg')
+        self.cache.put('unused', 'rg')
+        self.assertEqual(self.cache.get_resource_group('moved'), 'old-rg')
+
+        error = Exception('not found')
+        error.status_code = 400
+        self.assertRaises(Exception, resource_group_not_found_handler, error)
+        self.assertEqual(self.cache.get_resource_group('moved'), 'old-rg')
+
+        error.status_code = 404
+        self.assertEqual(resource_group_not_found_handler(error, lambda ex: 'handled'), 'handled')
+        self.assertIsNone(self.cache.get_resource_group('moved'))
+        self.assertEqual(self.cache.get_resource_group('unused'), 'rg')
+
+    def test_unreadable_cache_is_empty(self):
+        self.cache.put('account', 'rg')
+        os.remove(os.path.join(self.cache_dir, _account_cache.CACHE_KEY_FILE_NAME))
+        self.assertIsNone(self.cache.get_resource_group('account'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import json
+import unittest
+from datetime import datetime
+
+from ...vendored_sdks.azure_storage_blob.v2020_02_10._list_blobs_helper import BlobPrefix
+from ...vendored_sdks.azure_storage_blob.v2020_02_10._models import BlobProperties
+from ..._transformers import BlobJsonProjection, stream_blob_list_output, transform_blob_json_output
+from ...track2_util import iter_generator
+
+
+def _blob(name):
+    blob = BlobProperties(**{
+        'name': name, 'metadata': {'a': 'b'}, 'Last-Modified': datetime(2020, 11, 5, 1, 2, 3), 'ETag': '"0x1"',
+        'Content-Length': 1024, 'x-ms-blob-type': 'BlockBlob', 'x-ms-access-tier': 'Hot',
+        'x-ms-access-tier-inferred': True, 'x-ms-server-encrypted': True, 'Content-Type': 'text/plain',
+        'Content-MD5': bytearray(b'md5'), 'x-ms-creation-time': datetime(2020, 11, 4)})
+    blob.container = 'container'
+    return blob
+
+
+class _Pages(object):
+    def __init__(self, pages):
+        self._pages = iter(pages)
+        self.continuation_token = 'start'
+        self.requested = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self.requested += 1
+        page, self.continuation_token = next(self._pages)
+        return iter(page)
+
+
+class BlobListStreamTest(unittest.TestCase):
+    def test_projection_matches_json_transform(self):
+        projection = BlobJsonProjection()
+        for blob in [_blob('a'), _blob('b')]:
+            self.assertEqual(json.dumps(projection(blob)), json.dumps(transform_blob_json_output(blob)))
+        self.assertEqual(projection(BlobPrefix(prefix='dir/')), {'name': 'dir/'})
+
+    def test_iter_generator_is_lazy(self):
+        pages = _Pages([([1, 2], 'next'), ([3, 4], 'last'), ([5], None)])
+        items = iter_generator(pages, None)
+        self.assertEqual(pages.requested, 0)
+        self.assertEqual([next(items), next(items)], [1, 2])
+        self.assertEqual(pages.requested, 1)
+        self.assertEqual(list(items), [3, 4, 5])
+
+        pages = _Pages([([1, 2], 'next'), ([3, 4], 'last'), ([5], None)])
+        self.assertEqual(list(iter_generator(pages, 3)), [1, 2, 3])
+        self.assertEqual(pages.continuation_token, 'last')
+
+        # a pager that runs dry while still reporting a continuation token ends the items
+        self.assertEqual(list(iter_generator(_Pages([([1], 'next')]), None)), [1])
+
+    def test_stream_output(self):
+        items = [_blob('a'), BlobPrefix(prefix='dir/')]
+        stream = io.StringIO()
+        self.assertEqual(stream_blob_list_output(iter(items), 'jsonl', stream), 2)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual(json.loads(lines[0])['properties']['contentSettings']['contentMd5'], 'bWQ1')
+        self.assertEqual(json.loads(lines[1]), {'name': 'dir/'})
+
+        stream = io.StringIO()
+        stream_blob_list_output(iter(items), 'tsv', stream)
+        self.assertEqual(stream.getvalue().splitlines(), [
+            'a\tBlockBlob\tHot\t1024\ttext/plain\t2020-11-05T01:02:03\t', 'dir/\t\t\t\t\t\t'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -89,3 +89,16 @@ def list_generator(pages, num_results):
         result += page
 
     return result
+
+
+def iter_generator(pages, num_results):
+    """Yield the items of pages as each page arrives, stopping after num_results items if it is specified."""
+    count = 0
+    for page in pages:
+        for item in page:
+            yield item
+            count += 1
+            if num_results is not None and count >= num_results:
+                return
+        if not pages.continuation_token:
+            return
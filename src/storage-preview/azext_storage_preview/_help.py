@@ -131,6 +131,8 @@ helps['storage azcopy blob upload'] = """
           text: az storage azcopy blob upload -c MyContainer --account-name MyStorageAccount -s "path/to/directory" --recursive
         - name: Upload the contents of a directory to a container.
           text: az storage azcopy blob upload -c MyContainer --account-name MyStorageAccount -s "path/to/directory/*" --recursive
+        - name: Upload two directories to a container at the same time, sharing a transfer rate cap of 500 megabits per second.
+          text: az storage azcopy blob upload -c MyContainer --account-name MyStorageAccount -s "path/to/directory1" "path/to/directory2" --recursive --max-concurrency 2 --cap-mbps 500
 """
 
 helps['storage azcopy blob download'] = """
@@ -269,10 +271,15 @@ helps['storage blob directory delete'] = """
     long-summary: >
         This operation's behavior is different depending on whether Hierarchical Namespace
         is enabled; if yes, then the delete operation can be atomic and instantaneous;
-        if not, the operation is performed in batches and a continuation token could be returned.
+        if not, the operation is performed in batches, with the subdirectories of a recursive delete deleted in
+        parallel. The progress is saved after every batch, so running the same command again resumes an
+        interrupted delete. Use --no-resume or --marker to start over; the saved progress is also discarded when a
+        batch fails with a client error.
     examples:
         - name: Delete a storage blob directory in a storage container.
           text: az storage blob directory delete -c MyContainer -d MyDirectoryPath --account-name MyStorageAccount
+        - name: Delete a storage blob directory and its content, with up to 16 subdirectories deleted in parallel.
+          text: az storage blob directory delete -c MyContainer -d MyDirectoryPath --account-name MyStorageAccount --recursive --max-connections 16
 """
 
 helps['storage blob directory download'] = """
@@ -331,7 +338,9 @@ helps['storage blob directory move'] = """
         Move a storage directory and all its content (which can contain other directories or blobs) to another storage
         blob directory in a storage container. This operation's behavior is different depending on whether Hierarchical
         Namespace is enabled; if yes, the move operation is atomic and no marker is returned; if not, the operation is
-        performed in batches and a continuation token could be returned.
+        performed in batches, with the subdirectories moved in parallel. The progress is saved after every batch,
+        so running the same command again resumes an interrupted move. Use --no-resume to start over; the saved
+        progress is also discarded when a batch fails with a client error.
     examples:
         - name: Move a storage directory to another storage blob directory in a storage container.
           text: az storage blob directory move -c MyContainer -d my-new-directory -s dir --account-name MyStorageAccount
@@ -347,6 +356,23 @@ helps['storage blob directory show'] = """
           text: az storage blob directory show -c MyContainer -d MyDirectoryPath --account-name MyStorageAccount
 """
 
+helps['storage blob directory usage'] = """
+    type: command
+    short-summary: Show the subdirectories of a storage blob directory that use the most capacity.
+    long-summary: >
+        The directory is walked depth first, with several directories listed in parallel, and the size and number
+        of blobs of each subdirectory include everything below it. When Hierarchical Namespace is enabled, the
+        listings of the directories up to --depth levels deep are cached by the ETag and last modified time of the
+        directory, so a rerun only lists the directories that changed. Overwriting or appending to a blob does not
+        change its directory, so use --no-cache after blobs were rewritten in place. Without Hierarchical
+        Namespace, or when the account's properties cannot be read, every directory is listed.
+    examples:
+        - name: Show the 10 subdirectories of a storage blob directory that use the most capacity.
+          text: az storage blob directory usage -c MyContainer -d MyDirectoryPath --account-name MyStorageAccount
+        - name: Show the 20 largest directories up to 5 levels deep, listing every directory again.
+          text: az storage blob directory usage -c MyContainer -d MyDirectoryPath --account-name MyStorageAccount --top 20 --depth 5 --no-cache
+"""
+
 helps['storage blob directory upload'] = """
     type: command
     short-summary: Upload blobs or subdirectories to a storage blob directory.
@@ -357,4 +383,6 @@ helps['storage blob directory upload'] = """
           text: az storage blob directory upload -c MyContainer --account-name MyStorageAccount -s "path/to/directory" -d directory --recursive
         - name: Upload a set of files in a local directory to a storage blob directory.
           text: az storage blob directory upload -c MyContainer --account-name MyStorageAccount -s "path/to/file*" -d directory --recursive
+        - name: Upload several local directories to a storage blob directory, two at a time.
+          text: az storage blob directory upload -c MyContainer --account-name MyStorageAccount -s "path/to/directory1" "path/to/directory2" "path/to/directory3" -d directory --recursive --max-concurrency 2
 """
@@ -136,8 +136,8 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.extra('destination_path', options_list=['--destination', '-d'],
                 validator=validate_azcopy_upload_destination_url,
                 help='The upload destination path.')
-        c.argument('source', options_list=['--source', '-s'],
-                   help='The source file path to upload from.')
+        c.argument('source', options_list=['--source', '-s'], nargs='+',
+                   help='The source file paths to upload from. Each source is uploaded by its own azcopy job.')
         c.argument('recursive', options_list=['--recursive', '-r'], action='store_true',
                    help='Recursively upload blobs.')
         c.ignore('destination')
@@ -174,6 +174,18 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
                    help='The source file path to sync from.')
         c.ignore('destination')
 
+    for scope in ['storage azcopy blob upload', 'storage azcopy blob download', 'storage azcopy blob sync',
+                  'storage blob directory upload', 'storage blob directory download']:
+        with self.argument_context(scope) as c:
+            c.argument('cap_mbps', type=float,
+                       help='Cap the transfer rate, in megabits per second. When several sources are uploaded '
+                            'concurrently, the cap is shared between them.')
+
+    for scope in ['storage azcopy blob upload', 'storage blob directory upload']:
+        with self.argument_context(scope) as c:
+            c.argument('max_concurrency', type=int,
+                       help='Maximum number of sources uploaded concurrently.')
+
     with self.argument_context('storage azcopy run-command') as c:
         c.positional('command_args', help='Command to run using azcopy. Please start commands with "azcopy ".')
 
@@ -239,6 +251,13 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
                         'is supported here.')
         c.argument('directory_path', directory_path_type, validator=validate_directory_name)
 
+    with self.argument_context('storage blob directory delete') as c:
+        c.argument('max_connections', type=int,
+                   help='Maximum number of subdirectories deleted in parallel when Hierarchical Namespace is not '
+                        'enabled and the service deletes the directory in batches.')
+        c.argument('no_resume', action='store_true',
+                   help='Discard the saved progress of an interrupted delete of the directory and start over.')
+
     with self.argument_context('storage blob directory download') as c:
         c.extra('source_container', options_list=['--container', '-c'], required=True,
                 help='The download source container.')
@@ -281,6 +300,11 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
                         "the destination directory will be overwritten. But if the destination directory is not empty, "
                         "in legacy mode the move operation will fail and in posix mode, the source directory will be "
                         "moved into the destination directory. ")
+        c.argument('max_connections', type=int,
+                   help='Maximum number of subdirectories moved in parallel when Hierarchical Namespace is not '
+                        'enabled and the service moves the directory in batches.')
+        c.argument('no_resume', action='store_true',
+                   help='Discard the saved progress of an interrupted move of the directory and start over.')
 
     with self.argument_context('storage blob directory show') as c:
         c.argument('directory_name', directory_path_type)
@@ -296,6 +320,17 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
                    "character (*) to perform the operation only if the resource does not exist, and fail the operation"
                    "if it does exist.")
 
+    with self.argument_context('storage blob directory usage') as c:
+        c.argument('top', type=int, help='The number of directories with the most capacity to show.')
+        c.argument('depth', type=int,
+                   help='The number of directory levels below the directory path to report. Capacity of deeper '
+                        'directories is added to their ancestor at this level.')
+        c.argument('max_connections', type=int, help='Maximum number of directories listed in parallel.')
+        c.argument('no_cache', action='store_true',
+                   help='List every directory again instead of reusing the listings of directories that have not '
+                        'changed since the last run. Blobs overwritten or appended to in place do not change their '
+                        'directory, so their cached sizes are only refreshed this way.')
+
     with self.argument_context('storage blob directory upload') as c:
         c.extra('destination_container', options_list=['--container', '-c'], required=True,
                 help='The upload destination container.')
@@ -303,8 +338,8 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
                 validator=validate_blob_directory_upload_destination_url,
                 help='The upload destination directory path. It should be an absolute path to container. If the '
                      'specified destination path does not exist, a new directory path will be created.')
-        c.argument('source', options_list=['--source', '-s'],
-                   help='The source file path to upload from.')
+        c.argument('source', options_list=['--source', '-s'], nargs='+',
+                   help='The source file paths to upload from. Each source is uploaded by its own azcopy job.')
         c.argument('recursive', options_list=['--recursive', '-r'], action='store_true',
                    help='Recursively upload blobs. If enabled, all the blobs including the blobs in subdirectories will'
                         ' be uploaded.')
@@ -9,9 +9,12 @@ import json
 import platform
 import subprocess
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from six.moves.urllib.parse import urlparse
 from azure.cli.core._profile import Profile
 from knack.log import get_logger
+from knack.util import CLIError
 
 logger = get_logger(__name__)
 
@@ -19,6 +22,7 @@ logger = get_logger(__name__)
 STORAGE_RESOURCE_ENDPOINT = "https://storage.azure.com"
 SERVICES = {'blob', 'file'}
 AZCOPY_VERSION = '10.5.0'
+_JOB_FAILED_STATUSES = {'Failed', 'Cancelled', 'CompletedWithErrors', 'CompletedWithErrorsAndSkipped'}
 
 
 class AzCopy(object):
@@ -42,17 +46,130 @@ class AzCopy(object):
             env_kwargs = {'AZCOPY_OAUTH_TOKEN_INFO': json.dumps(self.creds.token_info)}
         subprocess.call(command, env=dict(os.environ, **env_kwargs))
 
+    def run_job(self, args, on_progress=None):
+        """Run an azcopy job with JSON output and return the summary of the finished job.
+
+        `on_progress` is called with every job summary azcopy reports while the job runs.
+        """
+        command = [self.executable] + args + ['--output-type', 'json']
+        logger.info("Azcopy command: %s", [_redact_sas(arg) for arg in command])
+        env_kwargs = {}
+        if self.creds and self.creds.token_info:
+            env_kwargs = {'AZCOPY_OAUTH_TOKEN_INFO': json.dumps(self.creds.token_info)}
+        process = subprocess.Popen(command, env=dict(os.environ, **env_kwargs), stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, universal_newlines=True)
+        summary = None
+        errors = []
+        for line in process.stdout:
+            message_type, content = _parse_output_line(line)
+            if message_type in ('Progress', 'EndOfJob'):
+                try:
+                    summary = json.loads(content)
+                except ValueError:
+                    continue
+                if on_progress:
+                    on_progress(summary)
+            elif message_type == 'Error':
+                errors.append(content)
+            else:
+                logger.debug("Azcopy: %s", content)
+        return_code = process.wait()
+        if return_code or (summary and summary.get('JobStatus') in _JOB_FAILED_STATUSES):
+            if summary and summary.get('ErrorMsg'):
+                errors.append(summary['ErrorMsg'])
+            reason = '; '.join(e.strip() for e in errors) or (summary or {}).get('JobStatus', return_code)
+            raise CLIError('Azcopy {} failed: {}'.format(args[0], reason))
+        return summary
+
     def copy(self, source, destination, flags=None):
         flags = flags or []
-        self.run_command(['copy', source, destination] + flags)
+        return self.run_job(['copy', source, destination] + flags)
 
     def remove(self, target, flags=None):
         flags = flags or []
-        self.run_command(['remove', target] + flags)
+        return self.run_job(['remove', target] + flags)
 
     def sync(self, source, destination, flags=None):
         flags = flags or []
-        self.run_command(['sync', source, destination] + flags)
+        return self.run_job(['sync', source, destination] + flags)
+
+
+def _redact_sas(arg):
+    if arg.startswith('http') and '?' in arg:
+        return arg.split('?', 1)[0] + '?<SAS>'
+    return arg
+
+
+def _parse_output_line(line):
+    """Return the message type and content of a line of azcopy JSON output, or (None, line) for other lines."""
+    try:
+        message = json.loads(line)
+        return message['MessageType'], message['MessageContent']
+    except (ValueError, KeyError, TypeError):
+        return None, line.rstrip()
+
+
+class AzCopyJobRunner(object):  # pylint: disable=too-few-public-methods
+    """Runs azcopy jobs up to `max_concurrency` at a time and reports their combined progress.
+
+    `cap_mbps` is a bandwidth cap for all jobs together, split evenly between the jobs that run at the same time.
+    """
+
+    def __init__(self, cli_ctx=None, max_concurrency=1, cap_mbps=None):
+        self._hook = cli_ctx.get_progress_controller(det=True) if cli_ctx else None
+        self._max_concurrency = max(1, max_concurrency or 1)
+        self._cap_mbps = cap_mbps
+        self._lock = threading.Lock()
+        self._summaries = {}
+
+    def run(self, jobs):
+        """Run (azcopy, args) jobs and return their summaries in order. Raise if any of them failed."""
+        concurrency = min(self._max_concurrency, len(jobs))
+        extra_args = []
+        if self._cap_mbps:
+            extra_args = ['--cap-mbps', '{:g}'.format(self._cap_mbps / concurrency)]
+
+        def _run(index):
+            azcopy, args = jobs[index]
+            return azcopy.run_job(args + extra_args, on_progress=lambda summary: self._report(index, summary))
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [executor.submit(_run, index) for index in range(len(jobs))]
+            summaries = []
+            errors = []
+            for future in futures:
+                try:
+                    summaries.append(future.result())
+                except CLIError as ex:
+                    errors.append(str(ex))
+            if errors:
+                raise CLIError('\n'.join(errors))
+            return summaries
+        finally:
+            if self._hook:
+                self._hook.end()
+
+    def _report(self, index, summary):
+        if not self._hook:
+            return
+        with self._lock:
+            self._summaries[index] = summary
+            transferred = sum(int(s.get('TotalBytesTransferred') or 0) for s in self._summaries.values())
+            expected = sum(int(s.get('TotalBytesExpected') or s.get('TotalBytesEnumerated') or 0)
+                           for s in self._summaries.values())
+            completed = sum(int(s.get('TransfersCompleted') or 0) for s in self._summaries.values())
+            total = sum(int(s.get('TotalTransfers') or 0) for s in self._summaries.values())
+            self._hook.add(message='{}/{} transfers'.format(completed, total), value=transferred,
+                           total_val=max(expected, transferred, 1))
+
+
+def log_job_summary(summary):
+    if summary:
+        logger.info("Job %s %s: %s of %s transfers completed, %s failed, %s skipped, %s bytes transferred.",
+                    summary.get('JobID'), summary.get('JobStatus'), summary.get('TransfersCompleted'),
+                    summary.get('TotalTransfers'), summary.get('TransfersFailed'),
+                    summary.get('TransfersSkipped'), summary.get('TotalBytesTransferred'))
 
 
 class AzCopyCredentials(object):  # pylint: disable=too-few-public-methods
@@ -154,12 +154,13 @@ def load_command_table(self, _):  # pylint: disable=too-many-locals, too-many-st
         from ._format import transform_blob_output
         from ._transformers import (transform_storage_list_output, create_boolean_result_output_transformer)
         g.storage_command_oauth('create', 'create_directory')
-        g.storage_command_oauth('delete', 'delete_directory')
+        g.storage_custom_command_oauth('delete', 'delete_directory')
         g.storage_custom_command_oauth('move', 'rename_directory')
         g.storage_custom_command_oauth('show', 'show_directory', table_transformer=transform_blob_output,
                                        exception_handler=show_exception_handler)
         g.storage_custom_command_oauth('list', 'list_directory', transform=transform_storage_list_output,
                                        table_transformer=transform_blob_output)
+        g.storage_custom_command_oauth('usage', 'directory_usage')
         g.storage_command_oauth('exists', 'exists', transform=create_boolean_result_output_transformer('exists'))
         g.storage_command_oauth(
             'metadata show', 'get_blob_metadata', exception_handler=show_exception_handler)
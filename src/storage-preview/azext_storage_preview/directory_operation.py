@@ -0,0 +1,232 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 8
+# saved state older than this is not resumed, its continuation markers are likely expired
+STATE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60
+_DONE = True
+
+
+def _state_dir():
+    from azure.cli.core.api import get_config_dir
+    return os.path.join(get_config_dir(), 'storage-preview', 'directory-operations')
+
+
+class DirectoryOperationState(object):
+    """Continuation markers of a directory rename or delete, saved after every call so it can be resumed.
+
+    `marker` belongs to the calls on the whole directory; `partitions` maps each subdirectory that is
+    processed on its own to its marker, or to True once it is done.
+    """
+
+    def __init__(self, key, state_dir=None, resume=True):
+        self._path = os.path.join(state_dir or _state_dir(), hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+        self._lock = threading.Lock()
+        self.marker = None
+        self.partitions = None
+        self.resumed = False
+        self._discarded = False
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('key') == key and state.get('updated', 0) > time.time() - STATE_MAX_AGE_SECONDS:
+                self.marker = state.get('marker')
+                self.partitions = state.get('partitions')
+                self.resumed = True
+        except (OSError, ValueError):
+            pass
+        self._key = key
+        if self.resumed and not resume:
+            self.marker = None
+            self.partitions = None
+            self.resumed = False
+            self.clear()
+
+    def save_partition(self, name, marker):
+        with self._lock:
+            self.partitions[name] = marker if marker is not None else _DONE
+        self.save()
+
+    def save(self):
+        with self._lock:
+            if self._discarded:
+                return
+            state = {'key': self._key, 'updated': time.time(), 'marker': self.marker, 'partitions': self.partitions}
+            try:
+                os.makedirs(os.path.dirname(self._path), exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self._path), prefix='.state-')
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(state, f)
+                    os.replace(temp_path, self._path)
+                except BaseException:
+                    os.remove(temp_path)
+                    raise
+            except OSError as ex:
+                logger.debug('Unable to save the directory operation state: %s', ex)
+
+    def clear(self):
+        try:
+            os.remove(self._path)
+        except OSError:
+            pass
+
+    def discard(self):
+        """Forget the saved markers for good, including saves still to come from running partitions."""
+        with self._lock:
+            self._discarded = True
+            self.clear()
+
+
+def _is_retryable(ex):
+    # client errors such as a missing partition or an expired marker fail again on every rerun
+    status_code = getattr(ex, 'status_code', None)
+    return not isinstance(status_code, int) or status_code < 400 or status_code >= 500 or status_code in (408, 429)
+
+
+class _Progress(object):
+    def __init__(self, cmd, verb):
+        self._hook = cmd.cli_ctx.get_progress_controller(det=False) if cmd else None
+        self._verb = verb
+        self._lock = threading.Lock()
+        self._start = time.time()
+        self.calls = 0
+        self.partitions_done = 0
+        self.partitions = 0
+
+    def add_call(self):
+        with self._lock:
+            self.calls += 1
+            self._update()
+
+    def add_partition(self):
+        with self._lock:
+            self.partitions_done += 1
+            self._update()
+
+    def _update(self):
+        if not self._hook or self.calls < 2:
+            return
+        rate = self.calls / max(time.time() - self._start, 1e-3)
+        message = '{} {} batches ({:.1f}/s)'.format(self._verb, self.calls, rate)
+        if self.partitions:
+            message += ', {}/{} subdirectories'.format(self.partitions_done, self.partitions)
+        self._hook.add(message=message)
+
+    def end(self):
+        if self._hook and self.calls > 1:
+            self._hook.end()
+
+
+def list_subdirectories(client, container_name, directory_path):
+    """List the immediate subdirectories of a directory, i.e. the blobs under it marked as folders."""
+    prefix = directory_path.rstrip('/') + '/'
+    return [item.name for item in client.list_blobs(container_name, prefix=prefix, delimiter='/', include='m')
+            if getattr(item, 'metadata', None) and item.metadata.get('hdi_isfolder') == 'true']
+
+
+def _partition_destination(source_path, destination_path, name):
+    if destination_path is None:
+        return None
+    return destination_path.rstrip('/') + name[len(source_path.rstrip('/')):]
+
+
+def _exists(client, container_name, path):
+    if client.exists(container_name, path):
+        return True
+    return any(True for _ in client.list_blobs(container_name, prefix=path.rstrip('/') + '/', num_results=1))
+
+
+def list_untouched_subdirectories(client, container_name, source_path, destination_path=None):
+    """List the subdirectories that the batches run so far cannot have processed any part of.
+
+    The service works through a directory in listing order, so only the first subdirectory still there
+    can have been processed in part. A subdirectory whose destination already exists is left out as well.
+    """
+    subdirectories = sorted(list_subdirectories(client, container_name, source_path))[1:]
+    return [name for name in subdirectories
+            if destination_path is None or
+            not _exists(client, container_name, _partition_destination(source_path, destination_path, name))]
+
+
+def run_directory_operation(cmd, client, container_name, kind, call, source_path, destination_path=None,
+                            marker=None, partition=True, max_connections=DEFAULT_MAX_CONNECTIONS, resume=True):
+    """Run a directory rename or delete to completion, following its continuation markers.
+
+    `call(source, destination, marker, first)` performs one rename or delete call and returns the next
+    marker. A marker is only returned without Hierarchical Namespace, where the service works through
+    the directory in batches. Once that happens and `partition` is set, the subdirectories the first batch
+    has not reached are processed on their own with up to `max_connections` of them at a time, then the
+    calls on the whole directory continue from its marker. All markers are saved after each call, so
+    running the same operation again resumes where an interrupted one stopped, unless `resume` is unset or
+    a `marker` is given. The saved markers are discarded when a call fails with a client error, which
+    would fail the same way on every rerun.
+    """
+    state = DirectoryOperationState('\n'.join([client.account_name or '', container_name, kind, source_path,
+                                               destination_path or '']), resume=resume and marker is None)
+    progress = _Progress(cmd, 'Renamed' if kind == 'rename' else 'Deleted')
+    if state.resumed:
+        logger.warning('Resuming the interrupted %s of %s.', kind, source_path)
+
+    def _call(path, destination, path_marker, first):
+        try:
+            return call(path, destination, path_marker, first)
+        except Exception as ex:
+            if not _is_retryable(ex):
+                logger.warning('Discarding the saved progress of the %s of %s.', kind, source_path)
+                state.discard()
+            raise
+
+    if state.partitions is None:
+        state.marker = _call(source_path, destination_path, state.marker or marker, True)
+        progress.add_call()
+        if state.marker is None:
+            state.clear()
+            return progress.calls
+        subdirectories = list_untouched_subdirectories(client, container_name, source_path, destination_path) \
+            if partition else []
+        state.partitions = {name: None for name in subdirectories}
+        state.save()
+
+    pending = [name for name, partition_marker in state.partitions.items() if partition_marker is not _DONE]
+    progress.partitions = len(state.partitions)
+    progress.partitions_done = progress.partitions - len(pending)
+
+    def _run_partition(name):
+        destination = _partition_destination(source_path, destination_path, name)
+        partition_marker = state.partitions[name]
+        while True:
+            partition_marker = _call(name, destination, partition_marker, False)
+            progress.add_call()
+            state.save_partition(name, partition_marker)
+            if partition_marker is None:
+                break
+        progress.add_partition()
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_connections, len(pending)))) as executor:
+            for future in [executor.submit(_run_partition, name) for name in pending]:
+                future.result()
+
+    # the subdirectories processed on their own are gone by the time the batches reach them
+    while state.marker is not None:
+        state.marker = _call(source_path, destination_path, state.marker, False)
+        progress.add_call()
+        state.save()
+    state.clear()
+    progress.end()
+    return progress.calls
@@ -0,0 +1,200 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 8
+DEFAULT_DEPTH = 3
+# the directories with the most blobs are kept in the cache, listing them again costs the most requests
+MAX_CACHED_DIRECTORIES = 10000
+
+
+def _cache_dir():
+    from azure.cli.core.api import get_config_dir
+    return os.path.join(get_config_dir(), 'storage-preview', 'directory-usage')
+
+
+def _version(props):
+    """The ETag and last modified time of a directory, or None for a virtual directory without a marker blob."""
+    if props is None or not props.etag:
+        return None
+    return [props.etag, props.last_modified.isoformat() if props.last_modified else None]
+
+
+class DirectoryListingCache(object):
+    """Sizes of the blobs directly under each directory, keyed by the ETag and last modified time of the directory.
+
+    With Hierarchical Namespace, creating, deleting or renaming a blob changes the last modified time of its
+    directory, so a directory whose version is unchanged does not need to be listed again. Overwriting or
+    appending to a blob does not change its directory, so the size cached for it stays stale until another
+    child of the directory changes. Virtual directories without a marker blob have no version and are always
+    listed. At most `max_entries` directories are saved, the ones with the most blobs.
+    """
+
+    def __init__(self, account_name, container_name, cache_dir=None, max_entries=MAX_CACHED_DIRECTORIES):
+        key = '{}\n{}'.format(account_name or '', container_name)
+        self._path = os.path.join(cache_dir or _cache_dir(), hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+        self._max_entries = max_entries
+        try:
+            with open(self._path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+            if not isinstance(self._entries, dict):
+                self._entries = {}
+        except (OSError, ValueError):
+            self._entries = {}
+        self._visited = {}
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    def get(self, path, version):
+        entry = self._entries.get(path)
+        if version is None or not entry or entry.get('version') != version:
+            return None
+        return entry
+
+    def put(self, path, version, size, count, subdirectories):
+        if version is not None:
+            self._visited[path] = {'version': version, 'size': size, 'count': count,
+                                   'subdirectories': subdirectories}
+
+    def keep(self, path, entry):
+        self._visited[path] = entry
+
+    def save(self, root):
+        """Replace the entries under root with the ones visited, leaving other directories untouched."""
+        prefix = root.rstrip('/') + '/'
+        entries = {k: v for k, v in self._entries.items() if k != root and not k.startswith(prefix)}
+        entries.update(self._visited)
+        if len(entries) > self._max_entries:
+            largest = sorted(entries.items(), key=lambda item: item[1]['count'], reverse=True)[:self._max_entries]
+            entries = dict(largest)
+        try:
+            os.makedirs(os.path.dirname(self._path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self._path), prefix='.usage-')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f)
+                os.replace(temp_path, self._path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except OSError as ex:
+            logger.debug('Unable to save the directory usage cache: %s', ex)
+
+
+class UsageTree(object):
+    """Blob sizes and counts summed per directory, for the directories up to `depth` levels below the root.
+
+    Deeper directories are added to their ancestor at `depth`, so the tree only holds the directories near
+    the root.
+    """
+
+    def __init__(self, root, depth):
+        self._root = root.rstrip('/')
+        self._depth = depth
+        self.nodes = {self._root: [0, 0]}
+
+    def add(self, path, size, count):
+        relative_path = path.rstrip('/')[len(self._root):].strip('/')
+        node = self._root
+        self._add(node, size, count)
+        for part in (relative_path.split('/') if relative_path else [])[:self._depth]:
+            node = node + '/' + part if node else part
+            self._add(node, size, count)
+
+    def _add(self, node, size, count):
+        totals = self.nodes.setdefault(node, [0, 0])
+        totals[0] += size
+        totals[1] += count
+
+    def top(self, count):
+        directories = [(name, totals) for name, totals in self.nodes.items() if name != self._root]
+        directories.sort(key=lambda item: item[1][0], reverse=True)
+        return [{'directory': name, 'size': totals[0], 'blobCount': totals[1]}
+                for name, totals in directories[:count]]
+
+
+def _list_directory_level(client, container_name, path):
+    """List the blobs directly under a directory. Return their total size and count and the subdirectories."""
+    size = count = 0
+    markers = {}
+    prefixes = []
+    for item in client.list_blobs(container_name, prefix=path.rstrip('/') + '/', delimiter='/', include='m'):
+        props = getattr(item, 'properties', None)
+        if props is None:
+            prefixes.append(item.name.rstrip('/'))
+        elif (item.metadata or {}).get('hdi_isfolder') == 'true':
+            markers[item.name] = props
+        else:
+            size += props.content_length or 0
+            count += 1
+    # a directory shows up both as a prefix and, if it has one, as its marker blob
+    return size, count, [(name, markers.get(name)) for name in prefixes]
+
+
+def _get_directory_props(client, container_name, path):
+    from azure.common import AzureMissingResourceHttpError
+    try:
+        return client.get_blob_properties(container_name, path).properties
+    except AzureMissingResourceHttpError:
+        return None
+
+
+def get_directory_usage(client, container_name, directory_path, depth=DEFAULT_DEPTH, cache=None,
+                        max_connections=DEFAULT_MAX_CONNECTIONS):
+    """Walk a directory depth first, listing up to `max_connections` directories in parallel, and sum the sizes.
+
+    Walking depth first, the directories waiting to be listed are the siblings of the ones on the current
+    path rather than whole levels. The listings of directories up to `depth` levels below the root are
+    cached. A directory found in the cache with an unchanged version is not listed; its subdirectories
+    then need their version looked up on their own, since only a listing of their parent returns it.
+    """
+    root = directory_path.rstrip('/')
+    tree = UsageTree(root, depth)
+    pending = [(root, _get_directory_props(client, container_name, root) if cache is not None else None, False)]
+
+    def _cached(path):
+        relative_path = path[len(root):].strip('/')
+        return cache is not None and (relative_path.count('/') + 1 if relative_path else 0) <= depth
+
+    def _visit(item):
+        path, props, lookup = item
+        if not _cached(path):
+            props = None
+        elif lookup and path in cache:
+            props = _get_directory_props(client, container_name, path)
+        version = _version(props)
+        entry = cache.get(path, version) if props is not None else None
+        if entry is not None:
+            cache.keep(path, entry)
+            return path, entry['size'], entry['count'], [(name, None, True) for name in entry['subdirectories']]
+        size, count, subdirectories = _list_directory_level(client, container_name, path)
+        if props is not None:
+            cache.put(path, version, size, count, [name for name, _ in subdirectories])
+        return path, size, count, [(name, sub_props, sub_props is None) for name, sub_props in subdirectories]
+
+    max_connections = max(1, max_connections)
+    with ThreadPoolExecutor(max_workers=max_connections) as executor:
+        running = set()
+        while pending or running:
+            while pending and len(running) < max_connections:
+                running.add(executor.submit(_visit, pending.pop()))
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, size, count, subdirectories = future.result()
+                tree.add(path, size, count)
+                pending.extend(subdirectories)
+    if cache is not None:
+        cache.save(root)
+    return tree
@@ -5,24 +5,28 @@
 
 from __future__ import print_function
 # from knack.util import CLIError
-from ..azcopy.util import AzCopy, blob_client_auth_for_azcopy, login_auth_for_azcopy
+from ..azcopy.util import (AzCopy, AzCopyJobRunner, blob_client_auth_for_azcopy, login_auth_for_azcopy,
+                           log_job_summary)
 
 
-def storage_blob_copy(azcopy, source, destination, recursive=None):
+def storage_blob_copy(cmd, azcopy, sources, destination, recursive=None, max_concurrency=None, cap_mbps=None):
     flags = []
     if recursive is not None:
         flags.append('--recursive')
-    azcopy.copy(source, destination, flags=flags)
+    jobs = [(azcopy, ['copy', source, destination] + flags) for source in sources]
+    _run_azcopy_jobs(cmd, jobs, max_concurrency=max_concurrency, cap_mbps=cap_mbps)
 
 
-def storage_blob_upload(cmd, client, source, destination, recursive=None):
+def storage_blob_upload(cmd, client, source, destination, recursive=None, max_concurrency=None, cap_mbps=None):
     azcopy = _azcopy_blob_client(cmd, client)
-    storage_blob_copy(azcopy, source, _add_url_sas(destination, azcopy.creds.sas_token), recursive=recursive)
+    storage_blob_copy(cmd, azcopy, _as_list(source), _add_url_sas(destination, azcopy.creds.sas_token),
+                      recursive=recursive, max_concurrency=max_concurrency, cap_mbps=cap_mbps)
 
 
-def storage_blob_download(cmd, client, source, destination, recursive=None):
+def storage_blob_download(cmd, client, source, destination, recursive=None, cap_mbps=None):
     azcopy = _azcopy_blob_client(cmd, client)
-    storage_blob_copy(azcopy, _add_url_sas(source, azcopy.creds.sas_token), destination, recursive=recursive)
+    storage_blob_copy(cmd, azcopy, [_add_url_sas(source, azcopy.creds.sas_token)], destination,
+                      recursive=recursive, cap_mbps=cap_mbps)
 
 
 # def storage_blob_upload_batch(cmd, client, source, destination):
@@ -40,12 +44,13 @@ def storage_blob_remove(cmd, client, target, recursive=None):
     flags = []
     if recursive is not None:
         flags.append('--recursive')
-    azcopy.remove(_add_url_sas(target, azcopy.creds.sas_token), flags=flags)
+    _run_azcopy_jobs(cmd, [(azcopy, ['remove', _add_url_sas(target, azcopy.creds.sas_token)] + flags)])
 
 
-def storage_blob_sync(cmd, client, source, destination):
+def storage_blob_sync(cmd, client, source, destination, cap_mbps=None):
     azcopy = _azcopy_blob_client(cmd, client)
-    azcopy.sync(source, _add_url_sas(destination, azcopy.creds.sas_token), flags=['--delete-destination=true'])
+    args = ['sync', source, _add_url_sas(destination, azcopy.creds.sas_token), '--delete-destination=true']
+    _run_azcopy_jobs(cmd, [(azcopy, args)], cap_mbps=cap_mbps)
 
 
 def storage_run_command(cmd, command_args):
@@ -61,6 +66,16 @@ def _add_url_sas(url, sas):
     return '{}?{}'.format(url, sas)
 
 
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _run_azcopy_jobs(cmd, jobs, max_concurrency=None, cap_mbps=None):
+    runner = AzCopyJobRunner(cmd.cli_ctx, max_concurrency=max_concurrency, cap_mbps=cap_mbps)
+    for summary in runner.run(jobs):
+        log_job_summary(summary)
+
+
 def _azcopy_blob_client(cmd, client):
     return AzCopy(creds=blob_client_auth_for_azcopy(cmd, client))
 
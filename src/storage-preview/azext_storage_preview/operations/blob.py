@@ -9,6 +9,9 @@ from urllib.parse import quote
 from knack.util import CLIError
 from knack.log import get_logger
 
+from ..directory_operation import DEFAULT_MAX_CONNECTIONS, run_directory_operation
+from ..directory_usage import DEFAULT_DEPTH, DirectoryListingCache, get_directory_usage
+
 logger = get_logger(__name__)
 
 
@@ -73,20 +76,35 @@ def show_blob(cmd, client, container_name, blob_name, snapshot=None, lease_id=No
     return blob
 
 
-# pylint: disable=unused-variable,logging-format-interpolation
-def delete_directory(client, container_name, directory_name):
-
-    deleted, marker = client.delete_directory(container_name, directory_name, recursive=True)
+# pylint: disable=logging-format-interpolation
+def delete_directory(cmd, client, container_name, directory_path, fail_not_exist=False, recursive=False, marker=None,
+                     lease_id=None, if_modified_since=None, if_unmodified_since=None, if_match=None,
+                     if_none_match=None, timeout=None, max_connections=DEFAULT_MAX_CONNECTIONS, no_resume=False):
+    result = {'deleted': True}
+    conditions = {'lease_id': lease_id, 'if_modified_since': if_modified_since,
+                  'if_unmodified_since': if_unmodified_since, 'if_match': if_match, 'if_none_match': if_none_match}
+
+    def _delete(path, _, path_marker, first):
+        if first:
+            deleted, next_marker = client.delete_directory(
+                container_name, path, fail_not_exist=fail_not_exist, recursive=recursive, marker=path_marker,
+                timeout=timeout, **conditions)
+            result['deleted'] = deleted
+            return next_marker
+        return client.delete_directory(container_name, path, recursive=recursive, marker=path_marker,
+                                       timeout=timeout)[1]
 
     # if HNS is enabled, the delete operation is atomic and no marker is returned
     # if HNS is not enabled, and there are too more files/subdirectories in the directories to be deleted
     # in a single call, the service returns a marker, so that we can follow it and finish deleting
-    # the rest of the files/subdirectories
-    count = 1
-    while marker is not None:
-        deleted, marker = client.delete_directory(container_name, directory_name, marker=marker, recursive=True)
-        count += 1
-    logger.info("Took {} call(s) to finish moving.".format(count))
+    # the rest of the files/subdirectories, with the subdirectories deleted in parallel. The lease and the
+    # conditions apply to the directory itself, so a conditional delete is not split into subdirectories.
+    count = run_directory_operation(cmd, client, container_name, 'delete', _delete, directory_path, marker=marker,
+                                    partition=recursive and not any(conditions.values()),
+                                    max_connections=max_connections, resume=not no_resume)
+    logger.info("Took {} call(s) to finish deleting.".format(count))
+    # the result of a single call that deleted the whole directory
+    return result['deleted'], None
 
 
 def list_blobs(client, container_name, prefix=None, num_results=None, include='mc',
@@ -131,10 +149,38 @@ def list_directory(client, container_name, directory_path, prefix=None, num_resu
                              delimiter, marker, timeout)
 
 
-def rename_directory(client, container_name, new_path, source_path,
+def _is_hns_enabled(cli_ctx, account_name):
+    """Whether the account has Hierarchical Namespace, False when its properties cannot be read."""
+    from azure.cli.core.commands.client_factory import get_mgmt_service_client
+    from ..profiles import CUSTOM_MGMT_PREVIEW_STORAGE
+    try:
+        scf = get_mgmt_service_client(cli_ctx, CUSTOM_MGMT_PREVIEW_STORAGE)
+        account = next((x for x in scf.storage_accounts.list() if x.name == account_name), None)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.debug('Unable to read the properties of storage account %s: %s', account_name, ex)
+        return False
+    return bool(account and account.is_hns_enabled)
+
+
+def directory_usage(cmd, client, container_name, directory_path, top=10, depth=DEFAULT_DEPTH,
+                    max_connections=DEFAULT_MAX_CONNECTIONS, no_cache=False):
+    cache = None
+    # without Hierarchical Namespace a directory marker blob does not change when blobs below it do
+    if not no_cache:
+        if _is_hns_enabled(cmd.cli_ctx, client.account_name):
+            cache = DirectoryListingCache(client.account_name, container_name)
+        else:
+            logger.info('Hierarchical Namespace is not known to be enabled, listing every directory.')
+    tree = get_directory_usage(client, container_name, directory_path, depth=depth, cache=cache,
+                               max_connections=max_connections)
+    return tree.top(top)
+
+
+def rename_directory(cmd, client, container_name, new_path, source_path,
                      mode=None, lease_id=None, source_lease_id=None,
                      source_if_modified_since=None, source_if_unmodified_since=None,
-                     source_if_match=None, source_if_none_match=None, timeout=None):
+                     source_if_match=None, source_if_none_match=None, timeout=None,
+                     max_connections=DEFAULT_MAX_CONNECTIONS, no_resume=False):
     """
      Rename a directory(which can contain other directories or blobs).
 
@@ -176,26 +222,33 @@ def rename_directory(client, container_name, new_path, source_path,
          only if the source's ETag does not match the value specified.
      :param int timeout:
          The timeout parameter is expressed in seconds.
+     :param int max_connections:
+         Maximum number of subdirectories renamed in parallel when HNS is not enabled.
+     :param bool no_resume:
+         Start over instead of resuming an interrupted move of the same directory.
 
      """
 
-    # In order to find the required blob, `x-ms-rename-source` in header needs to encode the special character in URL.
-    source_path = quote(source_path)
+    conditions = {'lease_id': lease_id, 'source_lease_id': source_lease_id,
+                  'source_if_modified_since': source_if_modified_since,
+                  'source_if_unmodified_since': source_if_unmodified_since,
+                  'source_if_match': source_if_match, 'source_if_none_match': source_if_none_match}
 
-    marker = client.rename_path(container_name, new_path, source_path,
-                                mode=mode, lease_id=lease_id, source_lease_id=source_lease_id,
-                                source_if_modified_since=source_if_modified_since,
-                                source_if_unmodified_since=source_if_unmodified_since,
-                                source_if_match=source_if_match, source_if_none_match=source_if_none_match,
-                                timeout=timeout)
+    def _rename(path, destination, path_marker, first):
+        # In order to find the required blob, `x-ms-rename-source` in header needs to encode the special character
+        # in URL.
+        if first:
+            return client.rename_path(container_name, destination, quote(path), mode=mode, marker=path_marker,
+                                      timeout=timeout, **conditions)
+        return client.rename_path(container_name, destination, quote(path), mode=mode, marker=path_marker,
+                                  timeout=timeout)
 
     # if HNS is enabled, the rename operation is atomic and no marker is returned
     # if HNS is not enabled, and there are too more files/subdirectories in the directories to be renamed
     # in a single call, the service returns a marker, so that we can follow it and finish renaming
-    # the rest of the files/subdirectories
-
-    count = 1
-    while marker is not None:
-        marker = client.rename_path(container_name, new_path, source_path, marker=marker)
-        count += 1
+    # the rest of the files/subdirectories, with the subdirectories renamed in parallel. The leases and the
+    # conditions apply to the directories themselves, so a conditional move is not split into subdirectories.
+    count = run_directory_operation(cmd, client, container_name, 'rename', _rename, source_path, new_path,
+                                    partition=not any(conditions.values()), max_connections=max_connections,
+                                    resume=not no_resume)
     logger.info("Took {} call(s) to finish moving.".format(count))
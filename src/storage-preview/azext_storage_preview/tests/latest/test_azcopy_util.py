@@ -0,0 +1,71 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import threading
+import time
+import unittest
+
+from knack.util import CLIError
+
+from ...azcopy import util
+
+
+class _FakeAzCopy(object):
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.args = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def run_job(self, args, on_progress=None):
+        with self._lock:
+            self.args.append(args)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.05)
+        on_progress({'TotalBytesTransferred': 5, 'TotalBytesExpected': 10})
+        with self._lock:
+            self.running -= 1
+        if self.fail:
+            raise CLIError('Azcopy copy failed: {}'.format(args[1]))
+        return {'JobID': args[1], 'JobStatus': 'Completed'}
+
+
+class AzCopyOutputTest(unittest.TestCase):
+    def test_parse_output_line(self):
+        line = json.dumps({'TimeStamp': '2020-11-05T00:00:00Z', 'MessageType': 'Progress',
+                           'MessageContent': '{"PercentComplete": 50}'})
+        self.assertEqual(util._parse_output_line(line), ('Progress', '{"PercentComplete": 50}'))
+        self.assertEqual(util._parse_output_line('INFO: not json\n'), (None, 'INFO: not json'))
+
+    def test_redact_sas(self):
+        self.assertEqual(util._redact_sas('https://a.blob.core.windows.net/c?sv=1&sig=secret'),
+                         'https://a.blob.core.windows.net/c?<SAS>')
+        self.assertEqual(util._redact_sas('--recursive'), '--recursive')
+
+
+class AzCopyJobRunnerTest(unittest.TestCase):
+    def test_run_concurrently_with_shared_cap(self):
+        azcopy = _FakeAzCopy()
+        jobs = [(azcopy, ['copy', 'source{}'.format(i), 'destination']) for i in range(4)]
+        summaries = util.AzCopyJobRunner(max_concurrency=2, cap_mbps=100).run(jobs)
+
+        self.assertEqual([s['JobID'] for s in summaries], ['source0', 'source1', 'source2', 'source3'])
+        self.assertEqual(azcopy.max_running, 2)
+        self.assertTrue(all(args[-2:] == ['--cap-mbps', '50'] for args in azcopy.args))
+
+    def test_failures_are_raised_after_all_jobs(self):
+        azcopy = _FakeAzCopy(fail=True)
+        with self.assertRaises(CLIError) as context:
+            util.AzCopyJobRunner(max_concurrency=2).run([(azcopy, ['copy', 'a', 'b']), (azcopy, ['copy', 'c', 'd'])])
+        self.assertEqual(len(azcopy.args), 2)
+        self.assertIn('a', str(context.exception))
+        self.assertIn('c', str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
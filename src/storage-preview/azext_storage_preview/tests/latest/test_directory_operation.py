@@ -0,0 +1,176 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from ... import directory_operation
+
+
+class _Item(object):
+    # pylint: disable=too-few-public-methods
+    def __init__(self, name, folder):
+        self.name = name
+        self.metadata = {'hdi_isfolder': 'true'} if folder else {}
+
+
+class _FakeClient(object):
+    """Hands out `batches` markers per path before reporting it done."""
+
+    account_name = 'account'
+
+    def __init__(self, batches, children, existing=()):
+        self._batches = batches
+        self._children = children
+        self._existing = set(existing)
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def list_blobs(self, container_name, prefix=None, delimiter=None, include=None, num_results=None):
+        if prefix == 'src/':
+            return [_Item(prefix + name, folder) for name, folder in self._children]
+        return [_Item(name, False) for name in sorted(self._existing) if name.startswith(prefix)][:num_results]
+
+    def exists(self, container_name, blob_name):
+        return blob_name in self._existing
+
+    def call(self, path, destination, marker, first):
+        with self._lock:
+            self.calls.append((path, destination, marker, first))
+        batch = int(marker or 0) + 1
+        return str(batch) if batch < self._batches.get(path, 1) else None
+
+
+class _HttpError(Exception):
+    def __init__(self, status_code):
+        super(_HttpError, self).__init__(status_code)
+        self.status_code = status_code
+
+
+class DirectoryOperationTest(unittest.TestCase):
+    def setUp(self):
+        self.state_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.state_dir)
+        patcher = mock.patch('azext_storage_preview.directory_operation._state_dir', return_value=self.state_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, client, partition=True):
+        return directory_operation.run_directory_operation(None, client, 'container', 'rename', client.call, 'src',
+                                                           'dst', partition=partition)
+
+    def test_single_call(self):
+        client = _FakeClient({}, [('a', True)])
+        self.assertEqual(self._run(client), 1)
+        self.assertEqual(client.calls, [('src', 'dst', None, True)])
+
+    def test_partitions_subdirectories(self):
+        client = _FakeClient({'src': 3, 'src/b': 3, 'src/c': 2},
+                             [('c', True), ('a', True), ('b', True), ('file', False)])
+        self.assertEqual(self._run(client), 1 + 3 + 2 + 2)
+
+        self.assertEqual(client.calls[0], ('src', 'dst', None, True))
+        self.assertEqual({c for c in client.calls if c[0] == 'src/b'},
+                         {('src/b', 'dst/b', None, False), ('src/b', 'dst/b', '1', False),
+                          ('src/b', 'dst/b', '2', False)})
+        # the first subdirectory may have been reached by the first batch, it is left to the whole directory
+        self.assertFalse([c for c in client.calls if c[0] == 'src/a'])
+        # the whole directory continues from its marker once the subdirectories are done
+        self.assertEqual(client.calls[-2:], [('src', 'dst', '1', False), ('src', 'dst', '2', False)])
+        self.assertEqual(os.listdir(self.state_dir), [])
+
+    def test_partial_first_batch(self):
+        # the first batch moved all of `a` and part of `b`: only `c` is untouched
+        client = _FakeClient({'src': 2, 'src/c': 2}, [('b', True), ('c', True)],
+                             existing=['dst/a', 'dst/a/blob', 'dst/b/blob'])
+        self._run(client)
+
+        self.assertEqual(client.calls, [('src', 'dst', None, True),
+                                        ('src/c', 'dst/c', None, False),
+                                        ('src/c', 'dst/c', '1', False),
+                                        ('src', 'dst', '1', False)])
+
+    def test_without_partition_follows_marker(self):
+        client = _FakeClient({'src': 3}, [('a', True)])
+        self.assertEqual(self._run(client, partition=False), 3)
+        self.assertEqual([c[2] for c in client.calls], [None, '1', '2'])
+
+    def test_resume_after_interruption(self):
+        client = _FakeClient({'src': 2, 'src/b': 3, 'src/c': 1}, [('a', True), ('b', True), ('c', True)])
+        original_call = client.call
+
+        def _interrupted(path, destination, marker, first):
+            if path == 'src/b' and marker == '1':
+                raise KeyboardInterrupt()
+            return original_call(path, destination, marker, first)
+        client.call = _interrupted
+        with self.assertRaises(KeyboardInterrupt):
+            self._run(client)
+        self.assertEqual(len(os.listdir(self.state_dir)), 1)
+
+        client.call = original_call
+        client.calls = []
+        self._run(client)
+        self.assertEqual(client.calls, [('src/b', 'dst/b', '1', False),
+                                        ('src/b', 'dst/b', '2', False),
+                                        ('src', 'dst', '1', False)])
+        self.assertEqual(os.listdir(self.state_dir), [])
+
+    def test_failed_partition_discards_state(self):
+        client = _FakeClient({'src': 2, 'src/b': 3, 'src/c': 1}, [('a', True), ('b', True), ('c', True)])
+        original_call = client.call
+
+        def _not_found(path, destination, marker, first):
+            if path == 'src/b' and marker == '1':
+                raise _HttpError(404)
+            return original_call(path, destination, marker, first)
+        client.call = _not_found
+        with self.assertRaises(_HttpError):
+            self._run(client)
+        self.assertEqual(os.listdir(self.state_dir), [])
+
+        # the rerun starts over instead of resuming the broken partition
+        client.call = original_call
+        client.calls = []
+        self._run(client)
+        self.assertEqual(client.calls[0], ('src', 'dst', None, True))
+
+    def test_server_error_keeps_state_unless_not_resumed(self):
+        client = _FakeClient({'src': 2, 'src/b': 3}, [('a', True), ('b', True)])
+        original_call = client.call
+
+        def _server_error(path, destination, marker, first):
+            if path == 'src/b' and marker == '1':
+                raise _HttpError(503)
+            return original_call(path, destination, marker, first)
+        client.call = _server_error
+        with self.assertRaises(_HttpError):
+            self._run(client)
+        self.assertEqual(len(os.listdir(self.state_dir)), 1)
+
+        client.call = original_call
+        client.calls = []
+        directory_operation.run_directory_operation(None, client, 'container', 'rename', client.call, 'src', 'dst',
+                                                    resume=False)
+        self.assertEqual(client.calls[0], ('src', 'dst', None, True))
+        self.assertEqual(os.listdir(self.state_dir), [])
+
+    def test_rename_passes_mode_and_keeps_conditional_move_whole(self):
+        from ...operations.blob import rename_directory
+        client = mock.MagicMock(account_name='account')
+        client.rename_path.side_effect = ['1', '2', None]
+        rename_directory(None, client, 'container', 'dst', 'src', mode='legacy', source_if_match='etag')
+
+        self.assertEqual([c[1]['mode'] for c in client.rename_path.call_args_list], ['legacy'] * 3)
+        self.assertEqual(client.rename_path.call_args_list[0][1]['source_if_match'], 'etag')
+        client.list_blobs.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import datetime
+import shutil
+import tempfile
+import threading
+import unittest
+
+from ...directory_usage import DirectoryListingCache, UsageTree, get_directory_usage
+
+
+class _Props(object):
+    # pylint: disable=too-few-public-methods
+    def __init__(self, size=0, etag=None):
+        self.content_length = size
+        self.etag = etag
+        self.last_modified = datetime.datetime(2020, 11, 1) if etag else None
+
+
+class _Item(object):
+    # pylint: disable=too-few-public-methods
+    def __init__(self, name, props=None, metadata=None):
+        self.name = name
+        if props is not None:
+            self.properties = props
+        self.metadata = metadata
+
+
+class _FakeClient(object):
+    """A Hierarchical Namespace container: every directory has a marker blob whose ETag changes with its children."""
+
+    account_name = 'account'
+
+    def __init__(self, blobs):
+        self.blobs = dict(blobs)
+        self.listed = []
+        self._lock = threading.Lock()
+
+    def _directories(self):
+        directories = set()
+        for name in self.blobs:
+            parts = name.split('/')[:-1]
+            directories.update('/'.join(parts[:i + 1]) for i in range(len(parts)))
+        return directories
+
+    def _etag(self, directory):
+        children = sorted(n for n in self.blobs if n.rsplit('/', 1)[0] == directory)
+        return str(hash(tuple(children)))
+
+    def list_blobs(self, container_name, prefix=None, delimiter=None, include=None):
+        with self._lock:
+            self.listed.append(prefix)
+        items = []
+        for name in sorted(self._directories()):
+            if name.startswith(prefix) and '/' not in name[len(prefix):]:
+                items.append(_Item(name + '/'))
+                items.append(_Item(name, _Props(etag=self._etag(name)), {'hdi_isfolder': 'true'}))
+        for name, size in sorted(self.blobs.items()):
+            if name.startswith(prefix) and '/' not in name[len(prefix):]:
+                items.append(_Item(name, _Props(size, etag='blob'), {}))
+        return items
+
+    def get_blob_properties(self, container_name, blob_name):
+        return _Item(blob_name, _Props(etag=self._etag(blob_name)))
+
+
+BLOBS = {
+    'root/a/1': 10, 'root/a/2': 20, 'root/a/x/y/z/3': 5,
+    'root/b/1': 100,
+    'root/4': 1000,
+}
+
+
+class UsageTreeTest(unittest.TestCase):
+    def test_deeper_directories_roll_up(self):
+        tree = UsageTree('root', 1)
+        tree.add('root/a/x/y', 5, 1)
+        tree.add('root/a', 30, 2)
+        tree.add('root', 1000, 1)
+        self.assertEqual(set(tree.nodes), {'root', 'root/a'})
+        self.assertEqual(tree.nodes['root'], [1035, 4])
+        self.assertEqual(tree.top(5), [{'directory': 'root/a', 'size': 35, 'blobCount': 3}])
+
+
+class DirectoryUsageTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def _usage(self, client, depth=4, max_entries=100):
+        cache = DirectoryListingCache(client.account_name, 'container', cache_dir=self.cache_dir,
+                                      max_entries=max_entries)
+        return get_directory_usage(client, 'container', 'root', depth=depth, cache=cache, max_connections=4)
+
+    def test_usage_without_cache(self):
+        client = _FakeClient(BLOBS)
+        tree = get_directory_usage(client, 'container', 'root', depth=2)
+        self.assertEqual(tree.top(3), [{'directory': 'root/b', 'size': 100, 'blobCount': 1},
+                                       {'directory': 'root/a', 'size': 35, 'blobCount': 3},
+                                       {'directory': 'root/a/x', 'size': 5, 'blobCount': 1}])
+        self.assertEqual(tree.nodes['root'], [1135, 5])
+        self.assertNotIn('root/a/x/y', tree.nodes)
+
+    def test_rerun_lists_only_changed_directories(self):
+        client = _FakeClient(BLOBS)
+        first = self._usage(client).nodes
+        self.assertEqual(len(client.listed), 6)
+
+        client.listed = []
+        self.assertEqual(self._usage(client).nodes, first)
+        self.assertEqual(client.listed, [])
+
+        client.blobs['root/a/x/y/4'] = 7
+        client.listed = []
+        tree = self._usage(client)
+        self.assertEqual(client.listed, ['root/a/x/y/'])
+        self.assertEqual(tree.nodes['root/a'], [42, 4])
+
+    def test_directories_below_depth_are_not_cached(self):
+        client = _FakeClient(BLOBS)
+        self._usage(client, depth=2)
+        client.listed = []
+        self._usage(client, depth=2)
+        self.assertEqual(sorted(client.listed), ['root/a/x/y/', 'root/a/x/y/z/'])
+
+    def test_cache_keeps_directories_with_most_blobs(self):
+        client = _FakeClient(BLOBS)
+        self._usage(client, max_entries=1)
+        client.listed = []
+        self._usage(client, max_entries=1)
+        # only the listing of root/a, which holds two blobs, is kept
+        self.assertNotIn('root/a/', client.listed)
+        self.assertEqual(len(client.listed), 5)
+
+    def test_cache_only_with_hierarchical_namespace(self):
+        from types import SimpleNamespace
+        from unittest import mock
+        from ...operations.blob import directory_usage
+        cmd = SimpleNamespace(cli_ctx=None)
+        for hns, cached in ((False, False), (True, True)):
+            scf = mock.MagicMock()
+            scf.storage_accounts.list.return_value = [SimpleNamespace(name='account', is_hns_enabled=hns)]
+            with mock.patch('azure.cli.core.commands.client_factory.get_mgmt_service_client', return_value=scf), \
+                    mock.patch('azext_storage_preview.operations.blob.DirectoryListingCache',
+                               return_value=None) as cache:
+                top = directory_usage(cmd, _FakeClient(BLOBS), 'container', 'root', top=1, depth=2)
+            self.assertEqual(top, [{'directory': 'root/b', 'size': 100, 'blobCount': 1}])
+            self.assertEqual(cache.called, cached)
+
+
+if __name__ == '__main__':
+    unittest.main()
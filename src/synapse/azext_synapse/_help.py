@@ -305,6 +305,7 @@ examples:
 helps['synapse spark job list'] = """
 type: command
 short-summary: List all Spark jobs.
+long-summary: By default the first 20 jobs are returned. When --size is larger, pages of jobs beyond the first are requested concurrently.
 examples:
   - name: List all Spark jobs.
     text: |-
@@ -399,6 +400,24 @@ examples:
         --spark-pool-name testsparkpool --code @file-path --language pyspark
 """
 
+helps['synapse spark statement run'] = """
+type: command
+short-summary: Run Spark statements and wait for their results.
+long-summary: |
+    Waits for the Spark session to be ready, submits all statements at once and polls them with exponential
+    backoff. The output of each statement is written to stderr as soon as it completes. If a statement fails,
+    the statements queued after it are cancelled.
+examples:
+  - name: Run several Spark statements in order.
+    text: |-
+        az synapse spark statement run --session-id 1 --workspace-name testsynapseworkspace \\
+        --spark-pool-name testsparkpool --code "x = 1" "print(x + 1)" --language pyspark
+  - name: Run the cells of a script file, separated by lines starting with `# %%`.
+    text: |-
+        az synapse spark statement run --session-id 1 --workspace-name testsynapseworkspace \\
+        --spark-pool-name testsparkpool --script-file script.py --language pyspark --timeout 600
+"""
+
 helps['synapse spark statement show'] = """
 type: command
 short-summary: Get a Spark statement.
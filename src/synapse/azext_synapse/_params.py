@@ -20,9 +20,10 @@ def load_arguments(self, _):
 
     for scope in ['synapse spark job', 'synapse spark session']:
         with self.argument_context(scope + ' list') as c:
-            c.argument('from_index', help='Optional parameter specifying which index the list should begin from.')
-            c.argument('size',
-                       help='The size of the returned list.By default it is 20 and that is the maximum.')
+            c.argument('from_index', type=int,
+                       help='Optional parameter specifying which index the list should begin from.')
+            c.argument('size', type=int,
+                       help='The size of the returned list. By default it is 20. Larger sizes are fetched 20 at a time.')
 
     with self.argument_context('synapse spark job submit') as c:
         c.argument('main_definition_file', help='The main file used for the job.')
@@ -73,6 +74,14 @@ def load_arguments(self, _):
                    help='The code of Spark statement. This is either the code contents or use `@<file path>` to load the content from a file')
         c.argument('language', arg_type=get_enum_type(SparkStatementLanguage), validator=validate_statement_language, help='The language of Spark statement.')
 
+    with self.argument_context('synapse spark statement run') as c:
+        c.argument('code', nargs='+', completer=FilesCompleter(),
+                   help='Space-separated codes of Spark statements to run in order. Each is either the code contents or use `@<file path>` to load the content from a file')
+        c.argument('script_file', completer=FilesCompleter(),
+                   help='Path of a script file whose cells are run in order after any --code statements. Cells are separated by lines starting with `# %%`, `// %%` or `-- %%`.')
+        c.argument('language', arg_type=get_enum_type(SparkStatementLanguage), validator=validate_statement_language, help='The language of Spark statement.')
+        c.argument('timeout', type=int, help='Maximum number of seconds to wait for the session and all statements.')
+
     # synapse workspace
     for scope in ['show', 'create', 'update', 'delete']:
         with self.argument_context('synapse workspace ' + scope) as c:
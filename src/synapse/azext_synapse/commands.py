@@ -108,6 +108,7 @@ def load_command_table(self, _):
     with self.command_group('synapse spark statement', synapse_spark_session_sdk,
                             client_factory=cf_synapse_spark_session) as g:
         g.custom_command('invoke', 'create_spark_session_statement')
+        g.custom_command('run', 'run_spark_session_statements')
         g.custom_command('list', 'list_spark_session_statements')
         g.custom_show_command('show', 'get_spark_session_statement')
         g.custom_command('cancel', 'cancel_spark_session_statement', confirmation=True)
@@ -11,6 +11,18 @@ EXECUTOR_SIZE = {'Small': {'Cores': 4, 'Memory': '28g'}, 'Medium': {'Cores': 8,
 SPARK_DOTNET_ASSEMBLY_SEARCH_PATHS_KEY = 'spark.yarn.appMasterEnv.DOTNET_ASSEMBLY_SEARCH_PATHS'
 SPARK_DOTNET_UDFS_FOLDER_NAME = 'udfs'
 
+# Livy returns at most this many jobs per list request
+LIVY_LIST_PAGE_SIZE = 20
+LIVY_LIST_MAX_CONCURRENT_REQUESTS = 8
+
+# Polling of Spark sessions and statements backs off exponentially between these intervals (seconds)
+SPARK_POLL_INITIAL_INTERVAL = 0.5
+SPARK_POLL_MAX_INTERVAL = 10
+
+SPARK_SESSION_READY_STATES = ('idle', 'busy')
+SPARK_SESSION_PENDING_STATES = ('not_started', 'starting')
+SPARK_STATEMENT_DONE_STATES = ('available', 'error', 'cancelled')
+
 
 class SynapseSqlCreateMode(str, Enum):
     Default = 'Default'
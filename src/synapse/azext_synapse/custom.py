@@ -2,8 +2,10 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
+import time
+
 from azure.cli.core.util import sdk_no_wait, read_file_content
-from knack.log import get_logger  # pylint: disable=unused-import
+from knack.log import get_logger
 from knack.util import CLIError
 
 from azext_synapse.vendored_sdks.azure_synapse.models import ExtendedLivyBatchRequest, LivyStatementRequestBody, \
@@ -14,16 +16,47 @@ from azext_synapse.vendored_sdks.azure_mgmt_synapse.models import Workspace, Wor
     BigDataPoolResourceInfo, AutoScaleProperties, AutoPauseProperties, LibraryRequirements, NodeSizeFamily, \
     SqlPool, SqlPoolPatchInfo, Sku
 
-from .util import categorized_files, check_udfs_folder
+from .util import categorized_files, check_udfs_folder, split_code_cells
 from .constant import DOTNET_CLASS, DOTNET_FILE, SPARK_DOTNET_UDFS_FOLDER_NAME, EXECUTOR_SIZE, \
-    SPARK_DOTNET_ASSEMBLY_SEARCH_PATHS_KEY, SparkBatchLanguage, SynapseSqlCreateMode
+    SPARK_DOTNET_ASSEMBLY_SEARCH_PATHS_KEY, SparkBatchLanguage, SynapseSqlCreateMode, LIVY_LIST_PAGE_SIZE, \
+    LIVY_LIST_MAX_CONCURRENT_REQUESTS, SPARK_POLL_INITIAL_INTERVAL, SPARK_POLL_MAX_INTERVAL, \
+    SPARK_SESSION_READY_STATES, SPARK_SESSION_PENDING_STATES, SPARK_STATEMENT_DONE_STATES
 
 from ._client_factory import cf_synapse_client_workspace_factory
 
+logger = get_logger(__name__)
+
 
 # pylint: disable=too-many-locals, too-many-branches, too-many-statements, unused-argument, too-many-function-args
 def list_spark_batch_jobs(cmd, client, workspace_name, spark_pool_name, from_index=None, size=None):
-    return client.list(workspace_name, spark_pool_name, from_index, size, detailed=True)
+    return _list_livy_jobs(client, workspace_name, spark_pool_name, from_index, size)
+
+
+def _list_livy_jobs(client, workspace_name, spark_pool_name, from_index=None, size=None):
+    """List `size` jobs starting at `from_index`. Without a size, Livy returns its default page of 20 jobs.
+
+    Livy returns at most LIVY_LIST_PAGE_SIZE jobs per request. For a larger size the first page reports
+    the total, the remaining pages are then requested concurrently and joined into the first response.
+    """
+    if size is None or size <= LIVY_LIST_PAGE_SIZE:
+        return client.list(workspace_name, spark_pool_name, from_index, size, detailed=True)
+    start = from_index or 0
+    first_page = client.list(workspace_name, spark_pool_name, start, LIVY_LIST_PAGE_SIZE, detailed=True)
+    jobs = list(first_page.sessions or [])
+    end = start + size if first_page.total is None else min(start + size, first_page.total)
+    offsets = list(range(start + LIVY_LIST_PAGE_SIZE, end, LIVY_LIST_PAGE_SIZE)) \
+        if len(jobs) == LIVY_LIST_PAGE_SIZE else []
+    if offsets:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(len(offsets), LIVY_LIST_MAX_CONCURRENT_REQUESTS)) as executor:
+            pages = executor.map(
+                lambda offset: client.list(workspace_name, spark_pool_name, offset,
+                                           min(LIVY_LIST_PAGE_SIZE, end - offset), detailed=True),
+                offsets)
+            for page in pages:
+                jobs.extend(page.sessions or [])
+    first_page.sessions = jobs
+    return first_page
 
 
 def create_spark_batch_job(cmd, client, workspace_name, spark_pool_name, job_name, main_definition_file,
@@ -78,7 +111,7 @@ def cancel_spark_batch_job(cmd, client, workspace_name, spark_pool_name, job_id)
 
 # Spark Session
 def list_spark_session_jobs(cmd, client, workspace_name, spark_pool_name, from_index=None, size=None):
-    return client.list(workspace_name, spark_pool_name, from_index, size, detailed=True)
+    return _list_livy_jobs(client, workspace_name, spark_pool_name, from_index, size)
 
 
 def create_spark_session_job(cmd, client, workspace_name, spark_pool_name, job_name, executor_size, executors,
@@ -122,6 +155,98 @@ def create_spark_session_statement(cmd, client, workspace_name, spark_pool_name,
     return client.create_statement(workspace_name, spark_pool_name, session_id, livy_statement_request)
 
 
+def run_spark_session_statements(cmd, client, workspace_name, spark_pool_name, session_id, language,
+                                 code=None, script_file=None, timeout=None):
+    """Run statements in a Spark session and wait for their results.
+
+    The statements, given directly or as the cells of a script file, are all submitted up front so
+    the session runs them back to back. Each output is written to stderr as soon as its statement
+    completes. If a statement fails or the wait times out, the statements still queued are cancelled.
+    """
+    statements = list(code or [])
+    if script_file:
+        statements.extend(split_code_cells(read_file_content(script_file)))
+    statements = [statement for statement in statements if statement and statement.strip()]
+    if not statements:
+        raise CLIError('usage error: --code CODE [CODE ...] | --script-file PATH')
+    deadline = time.time() + timeout if timeout else None
+
+    _wait_for_spark_session(client, workspace_name, spark_pool_name, session_id, deadline)
+    submitted = [client.create_statement(workspace_name, spark_pool_name, session_id,
+                                         LivyStatementRequestBody(code=statement, kind=language))
+                 for statement in statements]
+    results = []
+    for index, statement in enumerate(submitted):
+        try:
+            statement = _wait_for_spark_statement(client, workspace_name, spark_pool_name, session_id, statement,
+                                                  deadline)
+        except CLIError:
+            _cancel_spark_statements(client, workspace_name, spark_pool_name, session_id, submitted[index:])
+            raise
+        _print_spark_statement_output(statement)
+        results.append(statement)
+        if statement.state != 'available' or (statement.output and statement.output.status == 'error'):
+            _cancel_spark_statements(client, workspace_name, spark_pool_name, session_id, submitted[index + 1:])
+            raise CLIError('Statement {} of {} (id {}) did not succeed; the statements after it were cancelled.'
+                           .format(index + 1, len(submitted), statement.id))
+    return results
+
+
+def _cancel_spark_statements(client, workspace_name, spark_pool_name, session_id, statements):
+    for statement in statements:
+        try:
+            client.delete_statement(workspace_name, spark_pool_name, session_id, statement.id)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning('Unable to cancel statement %s: %s', statement.id, ex)
+
+
+def _poll_with_backoff(get, done, deadline, description):
+    interval = SPARK_POLL_INITIAL_INTERVAL
+    while True:
+        result = get()
+        if done(result):
+            return result
+        if deadline is not None and time.time() + interval > deadline:
+            raise CLIError('Timed out waiting for {}.'.format(description))
+        time.sleep(interval)
+        interval = min(interval * 2, SPARK_POLL_MAX_INTERVAL)
+
+
+def _wait_for_spark_session(client, workspace_name, spark_pool_name, session_id, deadline):
+    session = _poll_with_backoff(
+        lambda: client.get(workspace_name, spark_pool_name, session_id),
+        lambda session: session.state not in SPARK_SESSION_PENDING_STATES,
+        deadline, 'Spark session {} to start'.format(session_id))
+    if session.state not in SPARK_SESSION_READY_STATES:
+        raise CLIError("Spark session {} is in state '{}' and cannot run statements."
+                       .format(session_id, session.state))
+    return session
+
+
+def _wait_for_spark_statement(client, workspace_name, spark_pool_name, session_id, statement, deadline):
+    if statement.state in SPARK_STATEMENT_DONE_STATES:
+        return statement
+    return _poll_with_backoff(
+        lambda: client.get_statement(workspace_name, spark_pool_name, session_id, statement.id),
+        lambda statement: statement.state in SPARK_STATEMENT_DONE_STATES,
+        deadline, 'Spark statement {}'.format(statement.id))
+
+
+def _print_spark_statement_output(statement):
+    import json
+    import sys
+    output = statement.output
+    if output is None:
+        text = "Statement {} {}.".format(statement.id, statement.state)
+    elif output.status == 'error':
+        text = '\n'.join(['{}: {}'.format(output.ename, output.evalue)] + (output.traceback or []))
+    elif isinstance(output.data, dict) and 'text/plain' in output.data:
+        text = output.data['text/plain']
+    else:
+        text = json.dumps(output.data)
+    print(text, file=sys.stderr, flush=True)
+
+
 def get_spark_session_statement(cmd, client, workspace_name, spark_pool_name, session_id, statement_id):
     return client.get_statement(workspace_name, spark_pool_name, session_id, statement_id)
 
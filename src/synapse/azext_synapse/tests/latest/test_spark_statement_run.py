@@ -0,0 +1,135 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+import unittest
+from unittest import mock
+
+from knack.util import CLIError
+
+from azext_synapse.custom import list_spark_batch_jobs, run_spark_session_statements
+from azext_synapse.util import split_code_cells
+from azext_synapse.vendored_sdks.azure_synapse.models import ExtendedLivyListBatchResponse, \
+    ExtendedLivyBatchResponse, ExtendedLivySessionResponse, LivyStatementResponseBody, LivyStatementOutput
+
+
+class FakeBatchClient:
+    def __init__(self, total):
+        self.total = total
+        self.calls = []
+
+    def list(self, workspace_name, spark_pool_name, from_index, size, detailed=None):
+        self.calls.append((from_index, size))
+        from_index = from_index or 0
+        ids = range(from_index, min(from_index + (size or 20), self.total))
+        return ExtendedLivyListBatchResponse(from_property=from_index, total=self.total,
+                                             sessions=[ExtendedLivyBatchResponse(id=i) for i in ids])
+
+
+class FakeSessionClient:
+    def __init__(self, session_states, outputs, polls_to_finish=2):
+        self.session_states = list(session_states)
+        self.outputs = outputs
+        self.polls_to_finish = polls_to_finish
+        self.statements = []
+        self.polls = {}
+        self.cancelled = []
+
+    def get(self, workspace_name, spark_pool_name, session_id):
+        state = self.session_states.pop(0) if len(self.session_states) > 1 else self.session_states[0]
+        return ExtendedLivySessionResponse(id=session_id, state=state)
+
+    def create_statement(self, workspace_name, spark_pool_name, session_id, body):
+        self.statements.append(body.code)
+        return LivyStatementResponseBody(id=len(self.statements) - 1, code=body.code, state='waiting')
+
+    def get_statement(self, workspace_name, spark_pool_name, session_id, statement_id):
+        self.polls[statement_id] = self.polls.get(statement_id, 0) + 1
+        if self.polls[statement_id] < self.polls_to_finish:
+            return LivyStatementResponseBody(id=statement_id, state='running')
+        return LivyStatementResponseBody(id=statement_id, state='available', output=self.outputs[statement_id])
+
+    def delete_statement(self, workspace_name, spark_pool_name, session_id, statement_id):
+        self.cancelled.append(statement_id)
+
+
+def _ok(text):
+    return LivyStatementOutput(status='ok', data={'text/plain': text})
+
+
+@mock.patch('azext_synapse.custom.time.sleep')
+class SparkStatementRunTest(unittest.TestCase):
+
+    def test_run_statements_and_script_cells(self, sleep):
+        client = FakeSessionClient(['starting', 'idle'], [_ok('1'), _ok('2'), _ok('3')])
+        with mock.patch('azext_synapse.custom.read_file_content', return_value='# %%\nb = 2\n# %% cell\nc = 3\n'):
+            results = run_spark_session_statements(None, client, 'ws', 'pool', 1, 'pyspark',
+                                                   code=['a = 1'], script_file='script.py')
+
+        self.assertEqual(client.statements, ['a = 1', 'b = 2', 'c = 3'])
+        self.assertEqual([r.output.data['text/plain'] for r in results], ['1', '2', '3'])
+        self.assertEqual([call[0][0] for call in sleep.call_args_list][:2], [0.5, 0.5])
+
+    def test_failed_statement_cancels_the_rest(self, _):
+        error = LivyStatementOutput(status='error', ename='NameError', evalue='x', traceback=[])
+        client = FakeSessionClient(['idle'], [_ok('1'), error, _ok('3'), _ok('4')])
+        with self.assertRaises(CLIError):
+            run_spark_session_statements(None, client, 'ws', 'pool', 1, 'pyspark', code=['1', 'x', '3', '4'])
+        self.assertEqual(client.cancelled, [2, 3])
+
+    @mock.patch('azext_synapse.custom.time.time')
+    def test_timeout_cancels_queued_statements(self, time, _):
+        time.side_effect = [0, 0, 100]
+        client = FakeSessionClient(['idle'], [_ok('1'), _ok('2')], polls_to_finish=10)
+        with self.assertRaises(CLIError):
+            run_spark_session_statements(None, client, 'ws', 'pool', 1, 'pyspark', code=['1', '2'], timeout=10)
+        self.assertEqual(client.cancelled, [0, 1])
+
+    def test_dead_session(self, _):
+        client = FakeSessionClient(['starting', 'dead'], [])
+        with self.assertRaises(CLIError):
+            run_spark_session_statements(None, client, 'ws', 'pool', 1, 'pyspark', code=['1'])
+        self.assertEqual(client.statements, [])
+
+    def test_no_statements(self, _):
+        with self.assertRaises(CLIError):
+            run_spark_session_statements(None, FakeSessionClient(['idle'], []), 'ws', 'pool', 1, 'pyspark',
+                                         code=[' '])
+
+
+class SparkJobListTest(unittest.TestCase):
+
+    def test_list_default_page(self):
+        client = FakeBatchClient(total=65)
+        result = list_spark_batch_jobs(None, client, 'ws', 'pool')
+        self.assertEqual([job.id for job in result.sessions], list(range(20)))
+        self.assertEqual(client.calls, [(None, None)])
+
+    def test_list_pages_concurrently(self):
+        client = FakeBatchClient(total=65)
+        result = list_spark_batch_jobs(None, client, 'ws', 'pool', size=100)
+        self.assertEqual([job.id for job in result.sessions], list(range(65)))
+        self.assertEqual(sorted(client.calls), [(0, 20), (20, 20), (40, 20), (60, 5)])
+
+    def test_list_with_from_index_and_size(self):
+        client = FakeBatchClient(total=65)
+        result = list_spark_batch_jobs(None, client, 'ws', 'pool', from_index=10, size=25)
+        self.assertEqual([job.id for job in result.sessions], list(range(10, 35)))
+
+    def test_list_single_page(self):
+        client = FakeBatchClient(total=5)
+        result = list_spark_batch_jobs(None, client, 'ws', 'pool', size=10)
+        self.assertEqual(len(result.sessions), 5)
+        self.assertEqual(client.calls, [(None, 10)])
+
+
+class SplitCodeCellsTest(unittest.TestCase):
+
+    def test_split_code_cells(self):
+        script = 'import os\n\n# %%\nx = 1\n\n// %% scala\nval y = 2\n-- %%\n   \n'
+        self.assertEqual(split_code_cells(script), ['import os', 'x = 1', 'val y = 2'])
+        self.assertEqual(split_code_cells('select 1'), ['select 1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,13 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
+import re
+
 from .constant import SPARK_DOTNET_ASSEMBLY_SEARCH_PATHS_KEY, SPARK_DOTNET_UDFS_FOLDER_NAME
 
+# a line like `# %%`, `// %%` or `-- %%` starts a new cell, as in notebook-style script files
+_CELL_DELIMITER = re.compile(r'^\s*(#|//|--)\s*%%.*$')
+
 
 def categorized_files(reference_files):
     files = []
@@ -24,3 +29,15 @@ def check_udfs_folder(conf):
     if udfs_folder_name not in paths:
         paths.append(udfs_folder_name)
     conf[SPARK_DOTNET_ASSEMBLY_SEARCH_PATHS_KEY] = ','.join(paths)
+
+
+def split_code_cells(script):
+    """Split a script into the code of its cells, dropping cells that contain only whitespace."""
+    cells = [[]]
+    for line in script.splitlines():
+        if _CELL_DELIMITER.match(line):
+            cells.append([])
+        else:
+            cells[-1].append(line)
+    cells = ['\n'.join(cell).strip('\n') for cell in cells]
+    return [cell for cell in cells if cell.strip()]
@@ -54,6 +54,22 @@ helps['vm repair run'] = """
             az vm repair run -g MyResourceGroup -n MySourceWinVM --custom-script-file ./file.ps1 --verbose
 """
 
+helps['vm repair run-fleet'] = """
+    type: command
+    short-summary: Run a verified script from GitHub on many VMs at a time. Parsed logs of each VM are written to stderr as its script completes.
+    long-summary: Returns the result of every VM and a summary. VMs whose OS does not match the script are skipped.
+    examples:
+        - name: Run the script with <run-id> on all VMs tagged with patch=faulty.
+          text: >
+            az vm repair run-fleet --tag patch=faulty --run-id win-hello-world --verbose
+        - name: Run the script on a list of VMs in a resource group, 20 VMs at a time.
+          text: >
+            az vm repair run-fleet -g MyResourceGroup --vm-ids MyVM1 MyVM2 MyVM3 --run-id linux-hello-world --max-concurrency 20
+        - name: Show the VMs the script failed on.
+          text: >
+            az vm repair run-fleet --tag patch=faulty --run-id win-hello-world --query "results[?status!='SUCCESS' || script_status!='SUCCESS']" -o table
+"""
+
 helps['vm repair list-scripts'] = """
     type: command
     short-summary: List available scripts. Located https://github.com/Azure/repair-script-library
@@ -67,4 +83,7 @@ helps['vm repair list-scripts'] = """
         - name: List scripts with test in its description.
           text: >
             az vm repair list-scripts --query "[?contains(description, 'test')]"
+        - name: Cache all scripts locally for use when GitHub cannot be reached.
+          text: >
+            az vm repair list-scripts --prefetch --verbose
 """
@@ -41,3 +41,15 @@ def load_arguments(self, _):
         c.argument('custom_script_file', help='Custom script file to run on VM. Script should be PowerShell for windows, Bash for Linux.')
         c.argument('parameters', nargs='+', help="Space-separated parameters in the format of '[name=]value'. Positional for bash scripts.")
         c.argument('run_on_repair', help="Script will be run on the linked repair VM.")
+
+    with self.argument_context('vm repair run-fleet') as c:
+        c.argument('resource_group_name', options_list=['--resource-group', '-g'], required=False, help='Resource group of the VMs given by name, or to limit the --tag query to.')
+        c.argument('vm_ids', nargs='+', help='Space-separated resource ids of the VMs, or names of the VMs in --resource-group.')
+        c.argument('tag', help="Run on the VMs with the tag, in the format of 'name=value', or 'name' for any value.")
+        c.argument('run_id', help='Unique run id for run scripts.')
+        c.argument('custom_script_file', help='Custom script file to run on the VMs. Script should be PowerShell for windows, Bash for Linux. VMs of the other OS are skipped.')
+        c.argument('parameters', nargs='+', help="Space-separated parameters in the format of '[name=]value'. Positional for bash scripts.")
+        c.argument('max_concurrency', type=int, help='Maximum number of VMs to run the script on at the same time.')
+
+    with self.argument_context('vm repair list-scripts') as c:
+        c.argument('prefetch', help='Download every script into the local cache. The cached files can be run with --custom-script-file when GitHub cannot be reached.')
@@ -4,7 +4,6 @@
 # --------------------------------------------------------------------------------------------
 
 from datetime import datetime
-from json import loads
 from re import match, search, findall
 from knack.log import get_logger
 from knack.util import CLIError
@@ -15,9 +14,9 @@ from msrestazure.azure_exceptions import CloudError
 from msrestazure.tools import parse_resource_id, is_valid_resource_id
 
 from .encryption_types import Encryption
-from .exceptions import AzCommandError
 from .repair_utils import (
-    _call_az_command,
+    _get_compute_client,
+    _get_resource_client,
     _get_repair_resource_tag,
     _fetch_encryption_settings,
     _resolve_api_version,
@@ -54,12 +53,12 @@ def validate_create(cmd, namespace):
     if namespace.repair_group_name:
         if namespace.repair_group_name == namespace.resource_group_name:
             raise CLIError('The repair resource group name cannot be the same as the source VM resource group.')
-        _validate_resource_group_name(namespace.repair_group_name)
+        _validate_resource_group_name(cmd, namespace.repair_group_name)
     else:
         namespace.repair_group_name = 'repair-' + namespace.vm_name + '-' + timestamp
 
     # Check encrypted disk
-    encryption_type, _, _, _ = _fetch_encryption_settings(source_vm)
+    encryption_type, _, _, _ = _fetch_encryption_settings(_get_compute_client(cmd.cli_ctx), source_vm)
     # Currently only supporting single pass
     if encryption_type in (Encryption.SINGLE_WITH_KEK, Encryption.SINGLE_WITHOUT_KEK):
         if not namespace.unlock_encrypted_vm:
@@ -91,7 +90,7 @@ def validate_restore(cmd, namespace):
 
     # No repair param given, find repair vm using tags
     if not namespace.repair_vm_id:
-        fetch_repair_vm(namespace)
+        fetch_repair_vm(cmd, namespace)
 
     if not is_valid_resource_id(namespace.repair_vm_id):
         raise CLIError('Repair resource id is not valid.')
@@ -134,17 +133,7 @@ def validate_run(cmd, namespace):
             raise CLIError('Only .sh or .bash scripts are supported for repair run on a Linux VM.')
         if not is_linux and not (namespace.custom_script_file.endswith('.ps1') or namespace.custom_script_file.endswith('.ps2')):
             raise CLIError('Only PowerShell scripts are supported for repair run on a Windows VM.')
-        # Check if file exists
-        import os.path
-        if not os.path.isfile(namespace.custom_script_file):
-            raise CLIError('Custom script file cannot be found. Please check if the file exists.')
-        # Check for current custom-run-file parameter limitations
-        if namespace.parameters:
-            raise CLIError('Parameter passing does not work for custom run files yet. Please remove --parameters arguments.')
-        with open(namespace.custom_script_file, 'r') as f:
-            first_line = f.readline()
-            if first_line.lower().startswith('param('):
-                raise CLIError('Powershell param() statement does not work for custom script files yet. Please remove the param() line in the file.')
+        _validate_custom_script_file(namespace)
 
         namespace.run_id = 'no-op'
 
@@ -156,7 +145,7 @@ def validate_run(cmd, namespace):
 
     # Fetch repair vm
     if namespace.run_on_repair and not namespace.repair_vm_id:
-        fetch_repair_vm(namespace)
+        fetch_repair_vm(cmd, namespace)
 
     # If not run_on_repair, repair_vm = source_vm. Scripts directly run on source VM.
     if not namespace.run_on_repair:
@@ -166,6 +155,55 @@ def validate_run(cmd, namespace):
         raise CLIError('Repair resource id is not valid.')
 
 
+def validate_run_fleet(cmd, namespace):
+    check_extension_version(EXTENSION_NAME)
+
+    # Check fleet parameters
+    if bool(namespace.vm_ids) == bool(namespace.tag):
+        raise CLIError('Please specify the VMs with either --vm-ids or --tag.')
+    if namespace.max_concurrency < 1:
+        raise CLIError('--max-concurrency must be at least 1.')
+
+    # Check run-id and custom run file parameters
+    if not namespace.run_id and not namespace.custom_script_file:
+        raise CLIError('Please specify the run id with --run-id.')
+    if namespace.run_id and namespace.custom_script_file:
+        raise CLIError('Cannot continue with both the run-id and the custom-run-file. Please specify just one.')
+    if namespace.custom_script_file:
+        if not namespace.custom_script_file.endswith(('.sh', '.bash', '.ps1', '.ps2')):
+            raise CLIError('Only .sh or .bash scripts for Linux VMs and PowerShell scripts for Windows VMs are supported.')
+        _validate_custom_script_file(namespace)
+
+    # VM names are looked up in the resource group, duplicates run once
+    if namespace.vm_ids:
+        from azure.cli.core.commands.client_factory import get_subscription_id
+        from msrestazure.tools import resource_id
+        vm_ids = []
+        for vm in namespace.vm_ids:
+            if not is_valid_resource_id(vm):
+                if not namespace.resource_group_name:
+                    raise CLIError('Please specify --resource-group for the VM name \'{}\', or use its resource id.'.format(vm))
+                vm = resource_id(subscription=get_subscription_id(cmd.cli_ctx), resource_group=namespace.resource_group_name,
+                                 namespace='Microsoft.Compute', type='virtualMachines', name=vm)
+            if vm.lower() not in [vm_id.lower() for vm_id in vm_ids]:
+                vm_ids.append(vm)
+        namespace.vm_ids = vm_ids
+
+
+def _validate_custom_script_file(namespace):
+    # Check if file exists
+    import os.path
+    if not os.path.isfile(namespace.custom_script_file):
+        raise CLIError('Custom script file cannot be found. Please check if the file exists.')
+    # Check for current custom-run-file parameter limitations
+    if namespace.parameters:
+        raise CLIError('Parameter passing does not work for custom run files yet. Please remove --parameters arguments.')
+    with open(namespace.custom_script_file, 'r') as f:
+        first_line = f.readline()
+        if first_line.lower().startswith('param('):
+            raise CLIError('Powershell param() statement does not work for custom script files yet. Please remove the param() line in the file.')
+
+
 def _prompt_encrypted_vm(namespace):
     from knack.prompting import prompt_y_n, NoTTYException
     try:
@@ -252,7 +290,7 @@ def _validate_disk_name(disk_name):
         raise CLIError('Disk name only allow up to 80 characters.')
 
 
-def _validate_resource_group_name(rg_name):
+def _validate_resource_group_name(cmd, rg_name):
     rg_pattern = r'[0-9a-zA-Z._\-()]+$'
     # if match is null or ends in period, then raise error
     if not match(rg_pattern, rg_name) or rg_name[-1] == '.':
@@ -263,30 +301,26 @@ def _validate_resource_group_name(rg_name):
 
     # Check for existing dup name
     try:
-        list_rg_command = 'az group list --query "[].name" -o json'
         logger.info('Checking for existing resource groups with identical name within subscription...')
-        output = _call_az_command(list_rg_command)
-    except AzCommandError as azCommandError:
-        logger.error(azCommandError)
+        rg_exists = _get_resource_client(cmd.cli_ctx).resource_groups.check_existence(rg_name)
+    except Exception as exception:
+        logger.error(exception)
         raise CLIError('Unexpected error occured while fetching existing resource groups.')
-    rg_list = loads(output)
 
-    if rg_name in [rg.lower() for rg in rg_list]:
+    if rg_exists:
         raise CLIError('Resource group with name \'{}\' already exists within subscription.'.format(rg_name))
 
 
-def fetch_repair_vm(namespace):
+def fetch_repair_vm(cmd, namespace):
     # Find repair VM
-    tag = _get_repair_resource_tag(namespace.resource_group_name, namespace.vm_name)
+    tag_name, tag_value = _get_repair_resource_tag(namespace.resource_group_name, namespace.vm_name).split('=', 1)
     try:
-        find_repair_command = 'az resource list --tag {tag} --query "[?type==\'Microsoft.Compute/virtualMachines\']" -o json' \
-                              .format(tag=tag)
         logger.info('Searching for repair-vm within subscription...')
-        output = _call_az_command(find_repair_command)
-    except AzCommandError as azCommandError:
-        logger.error(azCommandError)
+        resources = _get_resource_client(cmd.cli_ctx).resources.list(filter="tagName eq '{}' and tagValue eq '{}'".format(tag_name, tag_value))
+        repair_list = [resource.id for resource in resources if resource.type.lower() == 'microsoft.compute/virtualmachines']
+    except Exception as exception:
+        logger.error(exception)
         raise CLIError('Unexpected error occured while locating repair VM.')
-    repair_list = loads(output)
 
     # No repair VM found
     if not repair_list:
@@ -296,13 +330,13 @@ def fetch_repair_vm(namespace):
     # More than one repair VM found
     if len(repair_list) > 1:
         message = 'More than one repair VM found:\n'
-        for vm in repair_list:
-            message += vm['id'] + '\n'
+        for vm_id in repair_list:
+            message += vm_id + '\n'
         message += '\nPlease specify the repair VM id using the parameter --repair-vm-id'
         raise CLIError(message)
 
     # One repair VM found
-    namespace.repair_vm_id = repair_list[0]['id']
+    namespace.repair_vm_id = repair_list[0]
 
     logger.info('Found repair VM: %s\n', namespace.repair_vm_id)
 
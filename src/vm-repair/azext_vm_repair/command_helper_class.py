@@ -6,15 +6,17 @@
 # pylint: disable=line-too-long, too-many-instance-attributes
 
 import logging
+import threading
 import timeit
 import inspect
+from concurrent.futures import ThreadPoolExecutor
 from knack.log import get_logger
 
 from azure.cli.core.commands.client_factory import get_subscription_id
 
 from .telemetry import _track_command_telemetry, _track_run_command_telemetry
 
-from .repair_utils import _get_function_param_dict
+from .repair_utils import _get_function_param_dict, _get_compute_client, _get_resource_client
 
 STATUS_SUCCESS = 'SUCCESS'
 STATUS_ERROR = 'ERROR'
@@ -47,6 +49,14 @@ class command_helper(object):
         # Command name
         self.command_name = command_name
 
+        # Run-time of the command steps
+        self.step_timer = step_timer(logger)
+
+        # SDK clients shared by the command steps, created on first use
+        self._compute_client = None
+        self._resource_client = None
+        self._clients_lock = threading.Lock()
+
         # Init script data if command is vm repair run
         if command_name == VM_REPAIR_RUN_COMMAND:
             self.script = script_data()
@@ -91,6 +101,22 @@ class command_helper(object):
         else:
             _track_command_telemetry(self.logger, self.command_name, self.command_params, self.status, self.message, self.error_message, self.error_stack_trace, elapsed_time, get_subscription_id(self.cmd.cli_ctx), self.return_dict)
 
+    @property
+    def compute_client(self):
+        """ Compute SDK client of the command """
+        with self._clients_lock:
+            if self._compute_client is None:
+                self._compute_client = _get_compute_client(self.cmd.cli_ctx)
+            return self._compute_client
+
+    @property
+    def resource_client(self):
+        """ Resource SDK client of the command """
+        with self._clients_lock:
+            if self._resource_client is None:
+                self._resource_client = _get_resource_client(self.cmd.cli_ctx)
+            return self._resource_client
+
     def set_status_success(self):
         """ Set command status to success """
         self.status = STATUS_SUCCESS
@@ -113,6 +139,9 @@ class command_helper(object):
                 self.logger.error(self.error_message)
             if self.message:
                 self.logger.error(self.message)
+        if self.step_timer.steps:
+            self.step_timer.log_report()
+            self.return_dict["step_timings"] = self.step_timer.report()
 
         return self.return_dict
 
@@ -139,3 +168,51 @@ class script_data(object):
     def set_status_error(self):
         """ Set command status to error """
         self.status = STATUS_ERROR
+
+
+class step_timer(object):
+    """
+    Records how long each step of a command takes, including steps run concurrently.
+    """
+    def __init__(self, logger):
+        self.logger = logger
+
+        # (step name, run-time in seconds) in order of completion
+        self.steps = []
+
+        self._lock = threading.Lock()
+
+    def timed(self, step_name, function, *args, **kwargs):
+        """ Runs the function and records its run-time as step_name """
+        start_time = timeit.default_timer()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed_time = timeit.default_timer() - start_time
+            with self._lock:
+                self.steps.append((step_name, elapsed_time))
+            self.logger.debug('Step \'%s\' took %.2f seconds.', step_name, elapsed_time)
+
+    def run_concurrently(self, steps):
+        """
+        Runs independent steps given as {key: (step name, function, args)} concurrently and waits for all of them.
+        Returns the results of the succeeded steps by key and the first error raised, so that the caller
+        can clean up after the steps that succeeded before raising it.
+        """
+        results = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=max(len(steps), 1)) as executor:
+            futures = {key: executor.submit(self.timed, step_name, function, *args) for key, (step_name, function, args) in steps.items()}
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as exception:  # pylint: disable=broad-except
+                    error = error or exception
+        return results, error
+
+    def report(self):
+        """ Returns the step run-times for the command return dictionary """
+        return [{'step': step_name, 'seconds': round(elapsed_time, 2)} for step_name, elapsed_time in self.steps]
+
+    def log_report(self):
+        self.logger.info('Step run-times:\n%s\n', '\n'.join('  {:<40} {:>8.2f}s'.format(step_name, elapsed_time) for step_name, elapsed_time in self.steps))
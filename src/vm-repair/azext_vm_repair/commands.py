@@ -4,7 +4,7 @@
 # --------------------------------------------------------------------------------------------
 
 # pylint: disable=line-too-long
-from ._validators import validate_create, validate_restore, validate_run
+from ._validators import validate_create, validate_restore, validate_run, validate_run_fleet
 
 
 # pylint: disable=too-many-locals, too-many-statements
@@ -14,4 +14,5 @@ def load_command_table(self, _):
         g.custom_command('create', 'create', validator=validate_create)
         g.custom_command('restore', 'restore', validator=validate_restore)
         g.custom_command('run', 'run', validator=validate_run)
+        g.custom_command('run-fleet', 'run_fleet', validator=validate_run_fleet)
         g.custom_command('list-scripts', 'list_scripts')
@@ -4,16 +4,22 @@
 # --------------------------------------------------------------------------------------------
 
 # pylint: disable=line-too-long, too-many-locals, too-many-statements, broad-except, too-many-branches
+import sys
+import threading
 import timeit
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
 from knack.log import get_logger
+from knack.util import CLIError
 
 from azure.cli.command_modules.vm.custom import get_vm, _is_linux_os
 from azure.cli.command_modules.storage.storage_url_helpers import StorageResourceIdentifier
+from azure.core.exceptions import HttpResponseError
+from msrestazure.azure_exceptions import CloudError
 from msrestazure.tools import parse_resource_id
 
-from .command_helper_class import command_helper
+from .command_helper_class import command_helper, STATUS_SUCCESS, STATUS_ERROR
 from .repair_utils import (
     _uses_managed_disk,
     _call_az_command,
@@ -22,13 +28,15 @@ from .repair_utils import (
     _list_resource_ids_in_rg,
     _get_repair_resource_tag,
     _fetch_compatible_windows_os_urn,
-    _fetch_run_script_map,
+    _get_run_script_catalog,
     _fetch_run_script_path,
-    _process_ps_parameters,
-    _process_bash_parameters,
+    _get_run_command_params,
+    _list_vm_ids_by_tag,
     _parse_run_script_raw_logs,
     _check_script_succeeded,
-    _fetch_disk_info,
+    _clean_up_copied_disk,
+    _copy_managed_disk,
+    _create_resource_group,
     _unlock_singlepass_encrypted_disk,
     _invoke_run_command
 )
@@ -40,76 +48,68 @@ def create(cmd, vm_name, resource_group_name, repair_password=None, repair_usern
 
     # Init command helper object
     command = command_helper(logger, cmd, 'vm repair create')
+    timer = command.step_timer
+    copy_disk_id = None
+    # Once the repair VM create starts, the copied disk may be attached and is only deleted with the VM
+    repair_vm_create_started = False
     # Main command calling block
     try:
         # Fetch source VM data
-        source_vm = get_vm(cmd, resource_group_name, vm_name)
+        source_vm = timer.timed('Fetch source VM', get_vm, cmd, resource_group_name, vm_name)
         is_linux = _is_linux_os(source_vm)
         target_disk_name = source_vm.storage_profile.os_disk.name
         is_managed = _uses_managed_disk(source_vm)
-        copy_disk_id = None
         resource_tag = _get_repair_resource_tag(resource_group_name, vm_name)
         created_resources = []
+        zone = source_vm.zones[0] if source_vm.zones else None
+
+        # Independent steps run concurrently: the repair resource group, the OS disk copy and the repair VM size and image
+        steps = {
+            'sku': ('Fetch compatible VM size', _fetch_compatible_sku, (command.compute_client, source_vm)),
+            'resource_group': ('Create repair resource group', _create_resource_group, (cmd, command.resource_client, repair_group_name, source_vm.location))
+        }
+        if not is_linux:
+            steps['os_image_urn'] = ('Fetch compatible Windows image', _fetch_compatible_windows_os_urn, (command.compute_client, source_vm))
+        if is_managed:
+            logger.info('Source VM uses managed disks. Creating repair VM with managed disks.\n')
+            steps['copy_disk_id'] = ('Copy OS disk', _copy_managed_disk, (cmd, command.compute_client, resource_group_name, target_disk_name, copy_disk_name, zone))
+        results, error = timer.run_concurrently(steps)
+        copy_disk_id = results.get('copy_disk_id')
+        if error:
+            raise error
 
-        # Fetch OS image urn and set OS type for disk create
-        if is_linux:
-            os_image_urn = "UbuntuLTS"
-            os_type = 'Linux'
-        else:
-            os_image_urn = _fetch_compatible_windows_os_urn(source_vm)
-            os_type = 'Windows'
+        # Fetch OS image urn
+        os_image_urn = "UbuntuLTS" if is_linux else results['os_image_urn']
 
         # Set up base create vm command
         create_repair_vm_command = 'az vm create -g {g} -n {n} --tag {tag} --image {image} --admin-username {username} --admin-password {password}' \
                                    .format(g=repair_group_name, n=repair_vm_name, tag=resource_tag, image=os_image_urn, username=repair_username, password=repair_password)
-        # Fetch VM size of repair VM
-        sku = _fetch_compatible_sku(source_vm)
+        # Set VM size of repair VM
+        sku = results['sku']
         if not sku:
             raise SkuNotAvailableError('Failed to find compatible VM size for source VM\'s OS disk within given region and subscription.')
         create_repair_vm_command += ' --size {sku}'.format(sku=sku)
 
         # Set availability zone for vm
-        if source_vm.zones:
-            zone = source_vm.zones[0]
+        if zone:
             create_repair_vm_command += ' --zone {zone}'.format(zone=zone)
 
-        # Create new resource group
-        create_resource_group_command = 'az group create -l {loc} -n {group_name}' \
-                                        .format(loc=source_vm.location, group_name=repair_group_name)
-        logger.info('Creating resource group for repair VM and its resources...')
-        _call_az_command(create_resource_group_command)
-
         # MANAGED DISK
         if is_managed:
-            logger.info('Source VM uses managed disks. Creating repair VM with managed disks.\n')
-
-            # Copy OS disk command
-            disk_sku, location, os_type, hyperV_generation = _fetch_disk_info(resource_group_name, target_disk_name)
-            copy_disk_command = 'az disk create -g {g} -n {n} --source {s} --sku {sku} --location {loc} --os-type {os_type} --query id -o tsv' \
-                                .format(g=resource_group_name, n=copy_disk_name, s=target_disk_name, sku=disk_sku, loc=location, os_type=os_type)
-            # Only add hyperV variable when available
-            if hyperV_generation:
-                copy_disk_command += ' --hyper-v-generation {hyperV}'.format(hyperV=hyperV_generation)
-            # Set availability zone for vm when available
-            if source_vm.zones:
-                zone = source_vm.zones[0]
-                copy_disk_command += ' --zone {zone}'.format(zone=zone)
-            # Copy OS Disk
-            logger.info('Copying OS disk of source VM...')
-            copy_disk_id = _call_az_command(copy_disk_command).strip('\n')
             # Add copied OS Disk to VM creat command so that the VM is created with the disk attached
             create_repair_vm_command += ' --attach-data-disks {id}'.format(id=copy_disk_id)
             # Validate create vm create command to validate parameters before runnning copy disk command
             validate_create_vm_command = create_repair_vm_command + ' --validate'
             logger.info('Validating VM template before continuing...')
-            _call_az_command(validate_create_vm_command, secure_params=[repair_password, repair_username])
+            timer.timed('Validate repair VM', _call_az_command, validate_create_vm_command, secure_params=[repair_password, repair_username])
             # Create repair VM
             logger.info('Creating repair VM...')
-            _call_az_command(create_repair_vm_command, secure_params=[repair_password, repair_username])
+            repair_vm_create_started = True
+            timer.timed('Create repair VM', _call_az_command, create_repair_vm_command, secure_params=[repair_password, repair_username])
 
             # Handle encrypted VM cases
             if unlock_encrypted_vm:
-                stdout, stderr = _unlock_singlepass_encrypted_disk(repair_vm_name, repair_group_name, is_linux)
+                stdout, stderr = timer.timed('Unlock copied disk', _unlock_singlepass_encrypted_disk, cmd, command.compute_client, repair_vm_name, repair_group_name, is_linux)
                 logger.debug('Unlock script STDOUT:\n%s', stdout)
                 if stderr:
                     logger.warning('Encryption unlock script error was generated:\n%s', stderr)
@@ -123,7 +123,7 @@ def create(cmd, vm_name, resource_group_name, repair_password=None, repair_usern
             # Validate create vm create command to validate parameters before runnning copy disk commands
             validate_create_vm_command = create_repair_vm_command + ' --validate'
             logger.info('Validating VM template before continuing...')
-            _call_az_command(validate_create_vm_command, secure_params=[repair_password, repair_username])
+            timer.timed('Validate repair VM', _call_az_command, validate_create_vm_command, secure_params=[repair_password, repair_username])
 
             # get storage account connection string
             get_connection_string_command = 'az storage account show-connection-string -g {g} -n {n} --query connectionString -o tsv' \
@@ -135,21 +135,21 @@ def create(cmd, vm_name, resource_group_name, repair_password=None, repair_usern
             make_snapshot_command = 'az storage blob snapshot -c {c} -n {n} --connection-string "{con_string}" --query snapshot -o tsv' \
                                     .format(c=storage_account.container, n=storage_account.blob, con_string=connection_string)
             logger.info('Creating snapshot of OS disk...')
-            snapshot_timestamp = _call_az_command(make_snapshot_command, secure_params=[connection_string]).strip('\n')
+            snapshot_timestamp = timer.timed('Snapshot OS disk', _call_az_command, make_snapshot_command, secure_params=[connection_string]).strip('\n')
             snapshot_uri = os_disk_uri + '?snapshot={timestamp}'.format(timestamp=snapshot_timestamp)
 
             # Copy Snapshot into unmanaged Disk
             copy_snapshot_command = 'az storage blob copy start -c {c} -b {name} --source-uri {source} --connection-string "{con_string}"' \
                                     .format(c=storage_account.container, name=copy_disk_name, source=snapshot_uri, con_string=connection_string)
             logger.info('Creating a copy disk from the snapshot...')
-            _call_az_command(copy_snapshot_command, secure_params=[connection_string])
+            timer.timed('Start OS disk copy', _call_az_command, copy_snapshot_command, secure_params=[connection_string])
             # Generate the copied disk uri
             copy_disk_id = os_disk_uri.rstrip(storage_account.blob) + copy_disk_name
 
             # Create new repair VM with copied ummanaged disk command
             create_repair_vm_command = create_repair_vm_command + ' --use-unmanaged-disk'
             logger.info('Creating repair VM while disk copy is in progress...')
-            _call_az_command(create_repair_vm_command, secure_params=[repair_password, repair_username])
+            timer.timed('Create repair VM', _call_az_command, create_repair_vm_command, secure_params=[repair_password, repair_username])
 
             logger.info('Checking if disk copy is done...')
             copy_check_command = 'az storage blob show -c {c} -n {name} --connection-string "{con_string}" --query properties.copy.status -o tsv' \
@@ -162,9 +162,9 @@ def create(cmd, vm_name, resource_group_name, repair_password=None, repair_usern
             logger.info('Attaching copied disk to repair VM as data disk...')
             attach_disk_command = "az vm unmanaged-disk attach -g {g} -n {disk_name} --vm-name {vm_name} --vhd-uri {uri}" \
                                   .format(g=repair_group_name, disk_name=copy_disk_name, vm_name=repair_vm_name, uri=copy_disk_id)
-            _call_az_command(attach_disk_command)
+            timer.timed('Attach copied disk', _call_az_command, attach_disk_command)
 
-        created_resources = _list_resource_ids_in_rg(repair_group_name)
+        created_resources = _list_resource_ids_in_rg(command.resource_client, repair_group_name)
         command.set_status_success()
 
     # Some error happened. Stop command and clean-up resources.
@@ -172,7 +172,7 @@ def create(cmd, vm_name, resource_group_name, repair_password=None, repair_usern
         command.error_stack_trace = traceback.format_exc()
         command.error_message = "Command interrupted by user input."
         command.message = "Command interrupted by user input. Cleaning up resources."
-    except AzCommandError as azCommandError:
+    except (AzCommandError, CloudError, HttpResponseError) as azCommandError:
         command.error_stack_trace = traceback.format_exc()
         command.error_message = str(azCommandError)
         command.message = "Repair create failed. Cleaning up created resources."
@@ -200,7 +200,14 @@ def create(cmd, vm_name, resource_group_name, repair_password=None, repair_usern
     if not command.is_status_success():
         command.set_status_error()
         return_dict = command.init_return_dict()
-        _clean_up_resources(repair_group_name, confirm=False)
+        _clean_up_resources(command.resource_client, repair_group_name, confirm=False)
+        # The copied managed disk is created in the source resource group
+        if copy_disk_id and is_managed:
+            if repair_vm_create_started:
+                logger.warning('The copied OS disk \'%s\' in resource group \'%s\' may be attached to the repair VM. '
+                               'Delete it once the repair resource group \'%s\' is deleted.', copy_disk_name, resource_group_name, repair_group_name)
+            else:
+                _clean_up_copied_disk(command.compute_client, resource_group_name, copy_disk_name)
     else:
         created_resources.append(copy_disk_id)
         command.message = 'Your repair VM \'{n}\' has been created in the resource group \'{repair_rg}\' with disk \'{d}\' attached as data disk. ' \
@@ -270,7 +277,7 @@ def restore(cmd, vm_name, resource_group_name, disk_name=None, repair_vm_id=None
             logger.info('Attaching repaired data disk to source VM as an OS disk...')
             _call_az_command(attach_unmanaged_command)
         # Clean
-        _clean_up_resources(repair_resource_group, confirm=not yes)
+        _clean_up_resources(command.resource_client, repair_resource_group, confirm=not yes)
         command.set_status_success()
     except KeyboardInterrupt:
         command.error_stack_trace = traceback.format_exc()
@@ -325,26 +332,9 @@ def run(cmd, vm_name, resource_group_name, run_id=None, repair_vm_id=None, custo
         repair_vm_name = repair_vm_id['name']
         repair_resource_group = repair_vm_id['resource_group']
 
-        run_command_params = []
-        additional_scripts = []
-
-        # Normal scenario with run id
-        if not custom_script_file:
-            # Fetch run path from GitHub
-            repair_script_path = _fetch_run_script_path(run_id)
-            run_command_params.append('script_path="./{}"'.format(repair_script_path))
-        # Custom script scenario for script testers
-        else:
-            run_command_params.append('script_path=no-op')
-            additional_scripts.append(custom_script_file)
-
-        # Append Parameters
-        if parameters:
-            if is_linux:
-                param_string = _process_bash_parameters(parameters)
-            else:
-                param_string = _process_ps_parameters(parameters)
-            run_command_params.append('params="{}"'.format(param_string))
+        # Fetch run path from GitHub
+        repair_script_path = _fetch_run_script_path(cmd, run_id) if not custom_script_file else None
+        run_command_params, additional_scripts = _get_run_command_params(is_linux, repair_script_path, custom_script_file, parameters)
         if run_on_repair:
             vm_string = 'repair VM'
         else:
@@ -353,7 +343,7 @@ def run(cmd, vm_name, resource_group_name, run_id=None, repair_vm_id=None, custo
 
         # Run script and measure script run-time
         script_start_time = timeit.default_timer()
-        stdout, stderr = _invoke_run_command(script_name, repair_vm_name, repair_resource_group, is_linux, run_command_params, additional_scripts)
+        stdout, stderr = _invoke_run_command(cmd, command.compute_client, script_name, repair_vm_name, repair_resource_group, is_linux, run_command_params, additional_scripts)
         command.script.run_time = timeit.default_timer() - script_start_time
         logger.debug("stderr: %s", stderr)
 
@@ -392,7 +382,7 @@ def run(cmd, vm_name, resource_group_name, run_id=None, repair_vm_id=None, custo
         command.error_stack_trace = traceback.format_exc()
         command.error_message = "Command interrupted by user input."
         command.message = "Repair run failed. Command interrupted by user input."
-    except AzCommandError as azCommandError:
+    except (AzCommandError, CloudError, HttpResponseError) as azCommandError:
         command.error_stack_trace = traceback.format_exc()
         command.error_message = str(azCommandError)
         command.message = "Repair run failed."
@@ -429,13 +419,148 @@ def run(cmd, vm_name, resource_group_name, run_id=None, repair_vm_id=None, custo
     return return_dict
 
 
-def list_scripts(cmd):
+STATUS_SKIPPED = 'SKIPPED'
+STATUS_CANCELLED = 'CANCELLED'
+
+
+def _stream_fleet_logs(lock, vm_name, logs):
+    """ Writes the parsed log entries of a VM to stderr as soon as its script is done, keeping stdout for the result """
+    with lock:
+        for log in logs:
+            sys.stderr.write('[{}] {}\n'.format(vm_name, log['message']))
+        sys.stderr.flush()
+
+
+def _fleet_result_row(vm_id, status):
+    vm_resource = parse_resource_id(vm_id)
+    return {'vm_name': vm_resource['name'], 'resource_group': vm_resource['resource_group'], 'os': None,
+            'status': status, 'script_status': None, 'run_time': None, 'output': '', 'error_message': ''}
+
+
+def _run_fleet_vm(cmd, compute_client, vm_id, run_id, repair_script_path, custom_script_file, parameters, stream_lock):
+    """ Runs the script on one VM of the fleet and returns its row of the result matrix """
+    LINUX_RUN_SCRIPT_NAME = 'linux-run-driver.sh'
+    WINDOWS_RUN_SCRIPT_NAME = 'win-run-driver.ps1'
+
+    result = _fleet_result_row(vm_id, STATUS_ERROR)
+    try:
+        vm = compute_client.virtual_machines.get(result['resource_group'], result['vm_name'])
+        is_linux = _is_linux_os(vm)
+        result['os'] = 'Linux' if is_linux else 'Windows'
+
+        # Script IDs start with the OS they are for
+        if run_id and run_id.startswith('linux' if not is_linux else 'win'):
+            result['status'] = STATUS_SKIPPED
+            result['error_message'] = 'Script \'{}\' is not for {} VMs.'.format(run_id, result['os'])
+            return result
+        if custom_script_file and custom_script_file.endswith(('.ps1', '.ps2')) == is_linux:
+            result['status'] = STATUS_SKIPPED
+            result['error_message'] = 'Custom script file is not for {} VMs.'.format(result['os'])
+            return result
+
+        script_name = LINUX_RUN_SCRIPT_NAME if is_linux else WINDOWS_RUN_SCRIPT_NAME
+        run_command_params, additional_scripts = _get_run_command_params(is_linux, repair_script_path, custom_script_file, parameters)
+
+        script_start_time = timeit.default_timer()
+        stdout, stderr = _invoke_run_command(cmd, compute_client, script_name, result['vm_name'], result['resource_group'], is_linux, run_command_params, additional_scripts)
+        result['run_time'] = round(timeit.default_timer() - script_start_time, 2)
+        logger.debug("stderr of %s: %s", vm_id, stderr)
+
+        logs = _parse_run_script_raw_logs(stdout)
+        _stream_fleet_logs(stream_lock, result['vm_name'], logs)
+        output_level = 'output' if _check_script_succeeded(stdout) else 'error'
+        result['status'] = STATUS_SUCCESS
+        result['script_status'] = STATUS_SUCCESS if output_level == 'output' else STATUS_ERROR
+        result['output'] = '\n'.join([log['message'] for log in logs if log['level'].lower() == output_level])
+    except Exception as exception:
+        logger.debug(traceback.format_exc())
+        result['error_message'] = str(exception)
+    return result
+
+
+def run_fleet(cmd, vm_ids=None, tag=None, resource_group_name=None, run_id=None, custom_script_file=None, parameters=None, max_concurrency=10):
+
+    # Init command helper object
+    command = command_helper(logger, cmd, 'vm repair run-fleet')
+    results = []
+
+    try:
+        # Resolve fleet
+        if tag:
+            vm_ids = _list_vm_ids_by_tag(command.resource_client, tag, resource_group_name)
+        if not vm_ids:
+            raise CLIError('No VMs found to run the script on.')
+
+        # Fetch run path once for the whole fleet
+        repair_script_path = _fetch_run_script_path(cmd, run_id) if not custom_script_file else None
+
+        logger.info('Running script on %d VMs, %d at a time...', len(vm_ids), max_concurrency)
+        stream_lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(vm_ids))) as executor:
+            futures = {executor.submit(_run_fleet_vm, cmd, command.compute_client, vm_id, run_id, repair_script_path, custom_script_file, parameters, stream_lock): vm_id
+                       for vm_id in vm_ids}
+            try:
+                for future in as_completed(futures):
+                    results.append(future.result())
+            except KeyboardInterrupt:
+                # Let the running scripts finish but do not start new ones
+                for future, vm_id in futures.items():
+                    if future.cancel():
+                        results.append(_fleet_result_row(vm_id, STATUS_CANCELLED))
+                raise
+
+        command.set_status_success()
+    except KeyboardInterrupt:
+        command.error_stack_trace = traceback.format_exc()
+        command.error_message = "Command interrupted by user input."
+        command.message = "Repair run-fleet interrupted by user input. Scripts already started are not stopped."
+    except requests.exceptions.RequestException as exception:
+        command.error_stack_trace = traceback.format_exc()
+        command.error_message = str(exception)
+        command.message = "Failed to fetch run script data from GitHub. Please check this repository is reachable: https://github.com/Azure/repair-script-library"
+    except RunScriptNotFoundForIdError as exception:
+        command.error_stack_trace = traceback.format_exc()
+        command.error_message = str(exception)
+        command.message = "Repair run-fleet failed. Run ID not found."
+    except Exception as exception:
+        command.error_stack_trace = traceback.format_exc()
+        command.error_message = str(exception)
+        command.message = 'An unexpected error occurred. Try running again with the --debug flag to debug.'
+    finally:
+        if command.error_stack_trace:
+            logger.debug(command.error_stack_trace)
+
+    results.sort(key=lambda result: (result['resource_group'].lower(), result['vm_name'].lower()))
+    summary = {
+        'succeeded': len([r for r in results if r['status'] == STATUS_SUCCESS and r['script_status'] == STATUS_SUCCESS]),
+        'script_errors': len([r for r in results if r['status'] == STATUS_SUCCESS and r['script_status'] == STATUS_ERROR]),
+        'failed': len([r for r in results if r['status'] == STATUS_ERROR]),
+        'skipped': len([r for r in results if r['status'] == STATUS_SKIPPED]),
+        'cancelled': len([r for r in results if r['status'] == STATUS_CANCELLED])
+    }
+    if not command.is_status_success():
+        command.set_status_error()
+    else:
+        command.message = 'Script completed on {} of {} VMs: {} succeeded, {} with script errors, {} failed to run, {} skipped.' \
+                          .format(summary['succeeded'] + summary['script_errors'], len(results), summary['succeeded'],
+                                  summary['script_errors'], summary['failed'], summary['skipped'])
+        logger.info('\n%s\n', command.message)
+    return_dict = command.init_return_dict()
+    return_dict['summary'] = summary
+    return_dict['results'] = results
+
+    return return_dict
+
+
+def list_scripts(cmd, prefetch=False):
 
     # Init command helper object
     command = command_helper(logger, cmd, 'vm repair list-scripts')
 
     try:
-        run_map = _fetch_run_script_map()
+        catalog = _get_run_script_catalog(cmd)
+        run_map = catalog.scripts
+        failed_prefetch = catalog.prefetch() if prefetch else []
         command.set_status_success()
     except requests.exceptions.RequestException as exception:
         command.error_stack_trace = traceback.format_exc()
@@ -453,8 +578,16 @@ def list_scripts(cmd):
         command.set_status_error()
         return_dict = command.init_return_dict()
     else:
-        command.message = 'Available script list succesfully fetched from https://github.com/Azure/repair-script-library'
+        if catalog.is_stale:
+            command.message = 'GitHub could not be reached, listing the locally cached scripts from https://github.com/Azure/repair-script-library'
+        else:
+            command.message = 'Available script list succesfully fetched from https://github.com/Azure/repair-script-library'
+        if prefetch:
+            command.message += '\nPrefetched {} of {} scripts into the local cache.'.format(len(run_map) - len(failed_prefetch), len(run_map))
         return_dict = command.init_return_dict()
         return_dict['map'] = run_map
+        if prefetch:
+            return_dict['cached_scripts'] = {script['id']: catalog.get_cached_script_file(script['id']) for script in run_map if script['id'] not in failed_prefetch}
+            return_dict['failed_prefetch'] = failed_prefetch
 
     return return_dict
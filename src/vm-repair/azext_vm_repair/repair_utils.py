@@ -9,14 +9,13 @@ import os
 import re
 from json import loads
 import pkgutil
-import requests
 
 from knack.log import get_logger
 from knack.prompting import prompt_y_n, NoTTYException
 
 from .encryption_types import Encryption
 
-from .exceptions import AzCommandError, WindowsOsNotAvailableError, RunScriptNotFoundForIdError
+from .exceptions import AzCommandError, WindowsOsNotAvailableError
 # pylint: disable=line-too-long, deprecated-method
 
 REPAIR_MAP_URL = 'https://raw.githubusercontent.com/Azure/repair-script-library/master/map.json'
@@ -30,6 +29,37 @@ def _uses_managed_disk(vm):
     return True
 
 
+def _get_compute_client(cli_ctx):
+    """
+    Returns a new compute SDK client. Commands create their clients once, on the command helper, and pass
+    them to their steps, so that the steps run in-process and share one credential and connection pool.
+    """
+    from azure.cli.core.commands.client_factory import get_mgmt_service_client
+    from azure.cli.core.profiles import ResourceType
+    return get_mgmt_service_client(cli_ctx, ResourceType.MGMT_COMPUTE)
+
+
+def _get_resource_client(cli_ctx):
+    """ Returns a new resource SDK client, see _get_compute_client """
+    from azure.cli.core.commands.client_factory import get_mgmt_service_client
+    from azure.cli.core.profiles import ResourceType
+    return get_mgmt_service_client(cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES)
+
+
+def _begin(operations, method_name, *args, **kwargs):
+    """
+    Starts a long running operation and returns its poller, for both the 'begin_' prefixed operations of
+    track 2 SDKs and the track 1 ones of older CLI versions.
+    """
+    method = getattr(operations, 'begin_' + method_name, None) or getattr(operations, method_name)
+    return method(*args, **kwargs)
+
+
+def _is_not_found_error(error):
+    status_code = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    return status_code == 404 or 'could not be found' in str(error)
+
+
 def _call_az_command(command_string, run_async=False, secure_params=None):
     """
     Uses subprocess to run a command string. To hide sensitive parameters from logs, add the
@@ -67,10 +97,13 @@ def _call_az_command(command_string, run_async=False, secure_params=None):
     return None
 
 
-def _invoke_run_command(script_name, vm_name, rg_name, is_linux, parameters=None, additional_custom_scripts=None):
+def _invoke_run_command(cmd, compute_client, script_name, vm_name, rg_name, is_linux, parameters=None, additional_custom_scripts=None):
     """
     Use azure run command to run the scripts within the vm-repair/scripts file and return stdout, stderr.
+    Parameters are 'name=value' strings, unnamed ones are passed as arg1, arg2... like 'az vm run-command invoke' does.
     """
+    from azure.cli.core.profiles import ResourceType
+    from azure.cli.core.util import read_file_content
 
     REPAIR_DIR_NAME = 'azext_vm_repair'
     SCRIPTS_DIR_NAME = 'scripts'
@@ -88,29 +121,41 @@ def _invoke_run_command(script_name, vm_name, rg_name, is_linux, parameters=None
     else:
         command_id = RUN_COMMAND_RUN_PS_ID
 
-    # Process script list to scripts string
-    additional_scripts_string = ''
-    if additional_custom_scripts:
-        for script in additional_custom_scripts:
-            additional_scripts_string += ' "@{script_name}"'.format(script_name=script)
+    RunCommandInput, RunCommandInputParameter = cmd.get_models('RunCommandInput', 'RunCommandInputParameter',
+                                                               resource_type=ResourceType.MGMT_COMPUTE, operation_group='virtual_machines')
+    scripts = [read_file_content(script) for script in [run_script] + (additional_custom_scripts or [])]
+    input_parameters = [RunCommandInputParameter(name=name, value=value)
+                        for name, value in _split_run_command_parameters(parameters)]
 
-    run_command = 'az vm run-command invoke -g {rg} -n {vm} --command-id {command_id} ' \
-                  '--scripts @"{run_script}"{additional_scripts} -o json' \
-                  .format(rg=rg_name, vm=vm_name, command_id=command_id, run_script=run_script, additional_scripts=additional_scripts_string)
-    if parameters:
-        run_command += " --parameters {params}".format(params=' '.join(parameters))
-    return_str = _call_az_command(run_command)
+    logger.debug('Invoking run command %s on VM %s/%s', command_id, rg_name, vm_name)
+    poller = _begin(compute_client.virtual_machines, 'run_command', rg_name, vm_name,
+                    RunCommandInput(command_id=command_id, script=scripts, parameters=input_parameters))
+    return _parse_run_command_output(poller.result(), is_linux)
+
+
+def _split_run_command_parameters(parameters):
+    """ Returns (name, value) pairs, naming unnamed parameters arg1, arg2... """
+    pairs = []
+    unnamed_count = 0
+    for param in parameters or []:
+        if '=' in param:
+            name, value = param.split('=', 1)
+        else:
+            unnamed_count += 1
+            name, value = 'arg{}'.format(unnamed_count), param
+        pairs.append((name, value))
+    return pairs
 
-    # Extract stdout and stderr, if stderr exists then possible error
-    run_command_return = loads(return_str)
 
+def _parse_run_command_output(run_command_return, is_linux):
+    # Extract stdout and stderr, if stderr exists then possible error
     if is_linux:
-        run_command_message = run_command_return['value'][0]['message'].split('[stdout]')[1].split('[stderr]')
+        run_command_message = run_command_return.value[0].message.split('[stdout]')[1].split('[stderr]')
         stdout = run_command_message[0].strip('\n')
         stderr = run_command_message[1].strip('\n')
     else:
-        stdout = run_command_return['value'][0]['message']
-        stderr = run_command_return['value'][1]['message']
+        stdout = run_command_return.value[0].message
+        stderr = run_command_return.value[1].message
 
     return stdout, stderr
 
@@ -143,47 +188,101 @@ def check_extension_version(extension_name):
     logger.debug('The extension with name %s does not exist within available extensions.', extension_name)
 
 
-def _clean_up_resources(resource_group_name, confirm):
+def _clean_up_resources(resource_client, resource_group_name, confirm):
 
     try:
         if confirm:
             message = 'The clean-up will remove the resource group \'{rg}\' and all repair resources within:\n\n{r}' \
-                      .format(rg=resource_group_name, r='\n'.join(_list_resource_ids_in_rg(resource_group_name)))
+                      .format(rg=resource_group_name, r='\n'.join(_list_resource_ids_in_rg(resource_client, resource_group_name)))
             logger.warning(message)
             if not prompt_y_n('Continue with clean-up and delete resources?'):
                 logger.warning('Skipping clean-up')
                 return
 
-        delete_resource_group_command = 'az group delete --name {name} --yes --no-wait'.format(name=resource_group_name)
         logger.info('Cleaning up resources by deleting repair resource group \'%s\'...', resource_group_name)
-        _call_az_command(delete_resource_group_command)
+        # Not waiting for the deletion to complete, same as --no-wait
+        _begin(resource_client.resource_groups, 'delete', resource_group_name)
     # NoTTYException exception only thrown from confirm block
     except NoTTYException:
         logger.warning('Cannot confirm clean-up resouce in non-interactive mode.')
         logger.warning('Skipping clean-up')
         return
-    except AzCommandError as azCommandError:
-        # Only way to distinguish errors
-        resource_not_found_error_string = 'could not be found'
-        if resource_not_found_error_string in str(azCommandError):
+    except Exception as exception:  # pylint: disable=broad-except
+        if _is_not_found_error(exception):
             logger.info('Resource group not found. Skipping clean up.')
             return
-        logger.error(azCommandError)
+        logger.error(exception)
         logger.error("Clean up failed.")
 
 
-def _fetch_compatible_sku(source_vm):
+def _clean_up_copied_disk(compute_client, resource_group_name, copy_disk_name):
+    """ Deletes the copy of the source OS disk, which lives outside of the repair resource group """
+    try:
+        logger.info('Deleting copied OS disk \'%s\'...', copy_disk_name)
+        _begin(compute_client.disks, 'delete', resource_group_name, copy_disk_name)
+    except Exception as exception:  # pylint: disable=broad-except
+        logger.error(exception)
+        logger.error('Failed to delete copied OS disk \'%s\' in resource group \'%s\'.', copy_disk_name, resource_group_name)
+
+
+def _create_resource_group(cmd, resource_client, resource_group_name, location):
+    from azure.cli.core.profiles import ResourceType
+    ResourceGroup = cmd.get_models('ResourceGroup', resource_type=ResourceType.MGMT_RESOURCE_RESOURCES)
+    logger.info('Creating resource group for repair VM and its resources...')
+    return resource_client.resource_groups.create_or_update(resource_group_name, ResourceGroup(location=location))
+
+
+def _copy_managed_disk(cmd, compute_client, resource_group_name, source_disk_name, copy_disk_name, zone=None):
+    """ Copies a managed disk with the sku, location, os type and hyperV generation of the source and returns the id of the copy """
+    from azure.cli.core.profiles import ResourceType
+    Disk, CreationData, DiskSku = cmd.get_models('Disk', 'CreationData', 'DiskSku',
+                                                 resource_type=ResourceType.MGMT_COMPUTE, operation_group='disks')
+    disks = compute_client.disks
+    source_disk = disks.get(resource_group_name, source_disk_name)
+    disk = Disk(location=source_disk.location,
+                sku=DiskSku(name=source_disk.sku.name),
+                os_type=source_disk.os_type,
+                creation_data=CreationData(create_option='Copy', source_resource_id=source_disk.id),
+                zones=[zone] if zone else None)
+    # Only add hyperV generation when available
+    if source_disk.hyper_v_generation:
+        disk.hyper_v_generation = source_disk.hyper_v_generation
+    logger.info('Copying OS disk of source VM...')
+    return _begin(disks, 'create_or_update', resource_group_name, copy_disk_name, disk).result().id
+
+
+def _is_sku_available(sku):
+    for restriction in sku.restrictions or []:
+        if restriction.reason_code == 'NotAvailableForSubscription' and restriction.type == 'Location':
+            return False
+    return True
+
+
+def _is_repair_sku_candidate(sku):
+    # 2 to 8 vCPUs, 8 to 32 GB memory, data disks and premium IO
+    capabilities = {capability.name: capability.value for capability in sku.capabilities or []}
+    try:
+        if not 2 <= float(capabilities['vCPUs']) <= 8:
+            return False
+        if not 8 <= float(capabilities['MemoryGB']) <= 32:
+            return False
+        return float(capabilities['MaxDataDiskCount']) > 0 and capabilities['PremiumIO'] == 'True'
+    except (KeyError, ValueError):
+        return False
+
+
+def _fetch_compatible_sku(compute_client, source_vm):
 
     location = source_vm.location
     source_vm_sku = source_vm.hardware_profile.vm_size
 
-    # First get the source_vm sku, if its available go with it
-    check_sku_command = 'az vm list-skus -s {sku} -l {loc} --query [].name -o tsv'.format(sku=source_vm_sku, loc=location)
-
-    logger.info('Checking if source VM size is available...')
-    sku_check = _call_az_command(check_sku_command).strip('\n')
+    # One listing of the location's sizes serves both the source VM size check and the fallback
+    logger.info('Fetching available VM sizes...')
+    skus = [sku for sku in compute_client.resource_skus.list(filter="location eq '{}'".format(location))
+            if sku.resource_type == 'virtualMachines' and _is_sku_available(sku)]
 
-    if sku_check:
+    # First check the source_vm sku, if its available go with it
+    if any(sku.name.lower() == source_vm_sku.lower() for sku in skus):
         logger.info('Source VM size \'%s\' is available. Using it to create repair VM.\n', source_vm_sku)
         return source_vm_sku
 
@@ -191,17 +290,7 @@ def _fetch_compatible_sku(source_vm):
 
     # List available standard SKUs
     # TODO, premium IO only when needed
-    list_sku_command = 'az vm list-skus -s standard_d -l {loc} --query ' \
-                       '"[?capabilities[?name==\'vCPUs\' && to_number(value)>= to_number(\'2\')] && ' \
-                       'capabilities[?name==\'vCPUs\' && to_number(value)<= to_number(\'8\')] && ' \
-                       'capabilities[?name==\'MemoryGB\' && to_number(value)>=to_number(\'8\')] && ' \
-                       'capabilities[?name==\'MemoryGB\' && to_number(value)<=to_number(\'32\')] && ' \
-                       'capabilities[?name==\'MaxDataDiskCount\' && to_number(value)>to_number(\'0\')] && ' \
-                       'capabilities[?name==\'PremiumIO\' && value==\'True\']].name" -o json'\
-                       .format(loc=location)
-
-    logger.info('Fetching available VM sizes for repair VM...')
-    sku_list = loads(_call_az_command(list_sku_command).strip('\n'))
+    sku_list = [sku.name for sku in skus if 'standard_d' in sku.name.lower() and _is_repair_sku_candidate(sku)]
 
     if sku_list:
         logger.info('VM size \'%s\' is available. Using it to create repair VM.\n', sku_list[0])
@@ -210,28 +299,17 @@ def _fetch_compatible_sku(source_vm):
     return None
 
 
-def _fetch_disk_info(resource_group_name, disk_name):
-    """ Returns sku, location, os_type, hyperVgeneration as tuples """
-    show_disk_command = 'az disk show -g {g} -n {name} --query [sku.name,location,osType,hyperVgeneration] -o json'.format(g=resource_group_name, name=disk_name)
-    disk_info = loads(_call_az_command(show_disk_command))
-    # Note that disk_info will always have 4 elements if the command succeeded, if it fails it will cause an exception
-    sku, location, os_type, hyper_v_version = disk_info[0], disk_info[1], disk_info[2], disk_info[3]
-    return (sku, location, os_type, hyper_v_version)
-
-
 def _get_repair_resource_tag(resource_group_name, source_vm_name):
     return 'repair_source={rg}/{vm_name}'.format(rg=resource_group_name, vm_name=source_vm_name)
 
 
-def _list_resource_ids_in_rg(resource_group_name):
-    get_resources_command = 'az resource list --resource-group {rg} --query [].id -o json' \
-                            .format(rg=resource_group_name)
+def _list_resource_ids_in_rg(resource_client, resource_group_name):
     logger.debug('Fetching resources in resource group...')
-    ids = loads(_call_az_command(get_resources_command))
-    return ids
+    return [resource.id for resource in resource_client.resources.list_by_resource_group(resource_group_name)]
 
 
-def _fetch_encryption_settings(source_vm):
+def _fetch_encryption_settings(compute_client, source_vm):
+    from msrestazure.tools import parse_resource_id
     key_vault = None
     kekurl = None
     secreturl = None
@@ -241,12 +319,14 @@ def _fetch_encryption_settings(source_vm):
     if not _uses_managed_disk(source_vm):
         return Encryption.NONE, key_vault, kekurl, secreturl
 
-    disk_id = source_vm.storage_profile.os_disk.managed_disk.id
-    show_disk_command = 'az disk show --id {i} --query [encryptionSettingsCollection,encryptionSettingsCollection.encryptionSettings[].diskEncryptionKey.sourceVault.id,encryptionSettingsCollection.encryptionSettings[].keyEncryptionKey.keyUrl,encryptionSettingsCollection.encryptionSettings[].diskEncryptionKey.secretUrl] -o json' \
-                        .format(i=disk_id)
-    encryption_type, key_vault, kekurl, secreturl = loads(_call_az_command(show_disk_command))
-    if [encryption_type, key_vault, kekurl] == [None, None, None]:
+    disk_id = parse_resource_id(source_vm.storage_profile.os_disk.managed_disk.id)
+    disk = compute_client.disks.get(disk_id['resource_group'], disk_id['name'])
+    if disk.encryption_settings_collection is None:
         return Encryption.NONE, key_vault, kekurl, secreturl
+    settings = disk.encryption_settings_collection.encryption_settings or []
+    key_vault = [setting.disk_encryption_key.source_vault.id for setting in settings if setting.disk_encryption_key]
+    secreturl = [setting.disk_encryption_key.secret_url for setting in settings if setting.disk_encryption_key]
+    kekurl = [setting.key_encryption_key.key_url for setting in settings if setting.key_encryption_key]
     if kekurl == []:
         key_vault, secreturl = key_vault[0], secreturl[0]
         return Encryption.SINGLE_WITHOUT_KEK, key_vault, kekurl, secreturl
@@ -271,20 +351,20 @@ def _secret_tag_check(resource_group_name, copy_disk_name, secreturl):
         _call_az_command(set_tag_command)
 
 
-def _unlock_singlepass_encrypted_disk(repair_vm_name, repair_group_name, is_linux):
+def _unlock_singlepass_encrypted_disk(cmd, compute_client, repair_vm_name, repair_group_name, is_linux):
     logger.info('Unlocking attached copied disk...')
     if is_linux:
-        return _unlock_mount_linux_encrypted_disk(repair_vm_name, repair_group_name)
-    return _unlock_mount_windows_encrypted_disk(repair_vm_name, repair_group_name)
+        return _unlock_mount_linux_encrypted_disk(cmd, compute_client, repair_vm_name, repair_group_name)
+    return _unlock_mount_windows_encrypted_disk(cmd, compute_client, repair_vm_name, repair_group_name)
 
 
-def _unlock_singlepass_encrypted_disk_fallback(source_vm, resource_group_name, repair_vm_name, repair_group_name, copy_disk_name, is_linux):
+def _unlock_singlepass_encrypted_disk_fallback(cmd, compute_client, source_vm, resource_group_name, repair_vm_name, repair_group_name, copy_disk_name, is_linux):
     """
     Fallback for unlocking disk when script fails. This will install the ADE extension to unlock the Data disk.
     """
 
     # Installs the extension on repair VM and mounts the disk after unlocking.
-    encryption_type, key_vault, kekurl, secreturl = _fetch_encryption_settings(source_vm)
+    encryption_type, key_vault, kekurl, secreturl = _fetch_encryption_settings(compute_client, source_vm)
     if is_linux:
         volume_type = 'DATA'
     else:
@@ -307,7 +387,7 @@ def _unlock_singlepass_encrypted_disk_fallback(source_vm, resource_group_name, r
             # Validating secret tag and setting original tag if it got changed
             _secret_tag_check(resource_group_name, copy_disk_name, secreturl)
             logger.debug("Manually unlocking and mounting disk for Linux VMs.")
-            _unlock_mount_linux_encrypted_disk(repair_vm_name, repair_group_name)
+            _unlock_mount_linux_encrypted_disk(cmd, compute_client, repair_vm_name, repair_group_name)
     except AzCommandError as azCommandError:
         error_message = str(azCommandError)
         # Linux VM encryption extension bug where it fails and then continue to mount disk manually
@@ -315,28 +395,29 @@ def _unlock_singlepass_encrypted_disk_fallback(source_vm, resource_group_name, r
             logger.debug("Expected bug for linux VMs. Ignoring error.")
             # Validating secret tag and setting original tag if it got changed
             _secret_tag_check(resource_group_name, copy_disk_name, secreturl)
-            _unlock_mount_linux_encrypted_disk(repair_vm_name, repair_group_name)
+            _unlock_mount_linux_encrypted_disk(cmd, compute_client, repair_vm_name, repair_group_name)
         else:
             raise
 
 
-def _unlock_mount_linux_encrypted_disk(repair_vm_name, repair_group_name):
+def _unlock_mount_linux_encrypted_disk(cmd, compute_client, repair_vm_name, repair_group_name):
     # Unlocks the disk using the phasephrase and mounts it on the repair VM.
     LINUX_RUN_SCRIPT_NAME = 'linux-mount-encrypted-disk.sh'
-    return _invoke_run_command(LINUX_RUN_SCRIPT_NAME, repair_vm_name, repair_group_name, True)
+    return _invoke_run_command(cmd, compute_client, LINUX_RUN_SCRIPT_NAME, repair_vm_name, repair_group_name, True)
 
 
-def _unlock_mount_windows_encrypted_disk(repair_vm_name, repair_group_name):
+def _unlock_mount_windows_encrypted_disk(cmd, compute_client, repair_vm_name, repair_group_name):
     # Unlocks the disk using the phasephrase and mounts it on the repair VM.
     WINDOWS_RUN_SCRIPT_NAME = 'win-mount-encrypted-disk.ps1'
-    return _invoke_run_command(WINDOWS_RUN_SCRIPT_NAME, repair_vm_name, repair_group_name, False)
+    return _invoke_run_command(cmd, compute_client, WINDOWS_RUN_SCRIPT_NAME, repair_vm_name, repair_group_name, False)
 
 
-def _fetch_compatible_windows_os_urn(source_vm):
+def _fetch_compatible_windows_os_urn(compute_client, source_vm):
     location = source_vm.location
-    fetch_urn_command = 'az vm image list -s "2016-Datacenter" -f WindowsServer -p MicrosoftWindowsServer -l {loc} --verbose --all --query "[?sku==\'2016-Datacenter\'].urn | reverse(sort(@))" -o json'.format(loc=location)
+    publisher, offer, sku = 'MicrosoftWindowsServer', 'WindowsServer', '2016-Datacenter'
     logger.info('Fetching compatible Windows OS images from gallery...')
-    urns = loads(_call_az_command(fetch_urn_command))
+    images = compute_client.virtual_machine_images.list(location, publisher, offer, sku)
+    urns = sorted(('{}:{}:{}:{}'.format(publisher, offer, sku, image.name) for image in images), reverse=True)
 
     # No OS images available for Windows2016
     if not urns:
@@ -372,24 +453,62 @@ def _resolve_api_version(rcf, resource_provider_namespace, parent_resource_path,
         .format(resource_type))
 
 
-def _fetch_run_script_map():
+def _get_run_script_catalog(cmd):
+    """ Returns the run script catalog, refreshed from GitHub when reachable """
+    from .script_catalog import run_script_catalog
+    catalog = run_script_catalog(os.path.join(cmd.cli_ctx.config.config_dir, 'vm-repair', 'run-scripts'), REPAIR_MAP_URL)
+    catalog.refresh()
+    return catalog
+
+
+def _fetch_run_script_map(cmd):
+    return _get_run_script_catalog(cmd).scripts
+
 
-    # Fetch map.json from GitHub
-    response = requests.get(url=REPAIR_MAP_URL)
-    # Raise exception when request fails
-    response.raise_for_status()
+def _fetch_run_script_path(cmd, run_id):
+    return _get_run_script_catalog(cmd).get_script_path(run_id)
 
-    return response.json()
 
+def _get_run_command_params(is_linux, repair_script_path=None, custom_script_file=None, parameters=None):
+    """
+    Returns the run command parameters and additional scripts for the run driver scripts.
+    """
+    run_command_params = []
+    additional_scripts = []
 
-def _fetch_run_script_path(run_id):
+    # Normal scenario with run id
+    if not custom_script_file:
+        run_command_params.append('script_path=./{}'.format(repair_script_path))
+    # Custom script scenario for script testers
+    else:
+        run_command_params.append('script_path=no-op')
+        additional_scripts.append(custom_script_file)
 
-    map_json = _fetch_run_script_map()
-    repair_script_path = [script['path'] for script in map_json if script['id'] == run_id]
-    if repair_script_path:
-        return repair_script_path[0]
+    # Append Parameters
+    if parameters:
+        if is_linux:
+            param_string = _process_bash_parameters(parameters)
+        else:
+            param_string = _process_ps_parameters(parameters)
+        run_command_params.append('params={}'.format(param_string))
 
-    raise RunScriptNotFoundForIdError('Run-script not found for id: {}. Please validate if the id is correct.'.format(run_id))
+    return run_command_params, additional_scripts
+
+
+def _list_vm_ids_by_tag(resource_client, tag, resource_group_name=None):
+    """
+    Returns the ids of the VMs with the tag, given as 'name=value' or 'name' for any value.
+    """
+    tag_name, _, tag_value = tag.partition('=')
+    tag_filter = "tagName eq '{}'".format(tag_name)
+    if tag_value:
+        tag_filter += " and tagValue eq '{}'".format(tag_value)
+    resources = resource_client.resources
+    if resource_group_name:
+        vms = resources.list_by_resource_group(resource_group_name, filter=tag_filter)
+    else:
+        vms = resources.list(filter=tag_filter)
+    return [vm.id for vm in vms if vm.type.lower() == 'microsoft.compute/virtualmachines']
 
 
 def _process_ps_parameters(parameters):
@@ -0,0 +1,180 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# pylint: disable=line-too-long
+
+import hashlib
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+import requests
+
+from knack.log import get_logger
+
+from .exceptions import RunScriptNotFoundForIdError
+
+logger = get_logger(__name__)
+
+CATALOG_FILE_NAME = 'catalog.json'
+SCRIPTS_DIR_NAME = 'scripts'
+REQUEST_TIMEOUT = 30
+MAX_DOWNLOAD_WORKERS = 8
+
+
+class run_script_catalog(object):
+    """
+    Local copy of the repair script library map, revalidated with its ETag on every refresh and used as is when
+    the library cannot be reached. Prefetched script bodies are stored by the sha256 of their content.
+    """
+
+    def __init__(self, cache_dir, map_url):
+        self.cache_dir = cache_dir
+        self.map_url = map_url
+
+        # ETag of the cached map
+        self.etag = None
+
+        # map.json entries
+        self.scripts = []
+
+        # Run id to the file name of its prefetched script body, the sha256 of the body and the script's extension.
+        # Only kept for the cached version of the map.
+        self.script_files = {}
+
+        # True when the cached map is used because refreshing it failed
+        self.is_stale = False
+
+        self._scripts_by_id = {}
+        self._read_cache()
+
+    def _catalog_file(self):
+        return os.path.join(self.cache_dir, CATALOG_FILE_NAME)
+
+    def _script_file(self, file_name):
+        return os.path.join(self.cache_dir, SCRIPTS_DIR_NAME, file_name)
+
+    def _read_cache(self):
+        try:
+            with open(self._catalog_file(), 'r') as f:
+                catalog = json.load(f)
+            self._set_scripts(catalog['map'], catalog.get('etag'))
+            self.script_files = catalog.get('script_files', {})
+        except (OSError, ValueError, KeyError, TypeError) as exception:
+            logger.debug('No usable run script catalog cache: %s', exception)
+
+    def _write_file(self, path, content):
+        """ Writes the file atomically so that concurrent commands never read a partial catalog or script """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    def _write_cache(self):
+        catalog = {'etag': self.etag, 'map': self.scripts, 'script_files': self.script_files}
+        try:
+            self._write_file(self._catalog_file(), json.dumps(catalog).encode('utf-8'))
+        except OSError as exception:
+            logger.warning('Failed to save the run script catalog cache: %s', exception)
+
+    def _set_scripts(self, scripts, etag):
+        self._scripts_by_id = {script['id']: script for script in scripts}
+        self.scripts = scripts
+        self.etag = etag
+
+    def refresh(self):
+        """
+        Brings the cached map up to date. Only downloads it when its ETag changed, and falls back to the
+        cached map when the library cannot be reached. Raises when there is no cached map to fall back to.
+        """
+        headers = {'If-None-Match': self.etag} if self.etag and self.scripts else {}
+        try:
+            response = requests.get(url=self.map_url, headers=headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code == 304:
+                logger.debug('Run script catalog is up to date.')
+                return
+            response.raise_for_status()
+            scripts = response.json()
+        except (requests.exceptions.RequestException, ValueError) as exception:
+            if not self.scripts:
+                raise
+            logger.warning('Failed to refresh the run script catalog, using the cached copy: %s', exception)
+            self.is_stale = True
+            return
+
+        etag = response.headers.get('ETag')
+        if etag is None or etag != self.etag:
+            # Prefetched script bodies belong to the previous version of the map
+            self.script_files = {}
+        self._set_scripts(scripts, etag)
+        self._write_cache()
+
+    def get_script_path(self, run_id):
+        script = self._scripts_by_id.get(run_id)
+        if script is None:
+            raise RunScriptNotFoundForIdError('Run-script not found for id: {}. Please validate if the id is correct.'.format(run_id))
+        return script['path']
+
+    def get_script_url(self, run_id):
+        return urljoin(self.map_url, self.get_script_path(run_id))
+
+    def get_cached_script_file(self, run_id):
+        """ Returns the path of the prefetched script of the run id, or None if it is not cached or fails its hash check """
+        file_name = self.script_files.get(run_id)
+        if not file_name:
+            return None
+        path = self._script_file(file_name)
+        try:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+        if not file_name.startswith(digest):
+            logger.warning('Cached script for run id %s is corrupted and is ignored.', run_id)
+            return None
+        return path
+
+    def _download_script(self, run_id):
+        response = requests.get(url=self.get_script_url(run_id), timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        # Keep the extension, 'vm repair run --custom-script-file' picks the script type from it
+        file_name = hashlib.sha256(response.content).hexdigest() + os.path.splitext(self.get_script_path(run_id))[1]
+        if not os.path.isfile(self._script_file(file_name)):
+            self._write_file(self._script_file(file_name), response.content)
+        return file_name
+
+    def prefetch(self):
+        """
+        Downloads the body of every script in the map into the cache, for use without access to the library.
+        Returns the run ids that failed to download. Cached bodies no longer in the map are removed.
+        """
+        run_ids = [script['id'] for script in self.scripts]
+        failed = []
+        with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+            futures = {run_id: executor.submit(self._download_script, run_id) for run_id in run_ids}
+            for run_id, future in futures.items():
+                try:
+                    self.script_files[run_id] = future.result()
+                except (requests.exceptions.RequestException, OSError) as exception:
+                    logger.warning('Failed to prefetch script for run id %s: %s', run_id, exception)
+                    failed.append(run_id)
+        self._write_cache()
+
+        scripts_dir = os.path.join(self.cache_dir, SCRIPTS_DIR_NAME)
+        referenced = set(self.script_files.values())
+        for file_name in os.listdir(scripts_dir) if os.path.isdir(scripts_dir) else []:
+            if file_name not in referenced:
+                try:
+                    os.remove(os.path.join(scripts_dir, file_name))
+                except OSError:
+                    pass
+        return failed
@@ -0,0 +1,88 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from knack.log import get_logger
+
+from azext_vm_repair.command_helper_class import step_timer
+from azext_vm_repair.repair_utils import _fetch_compatible_sku, _invoke_run_command
+
+
+def _sku(name, vcpus='4', memory='16', restricted=False):
+    capabilities = [SimpleNamespace(name='vCPUs', value=vcpus), SimpleNamespace(name='MemoryGB', value=memory),
+                    SimpleNamespace(name='MaxDataDiskCount', value='8'), SimpleNamespace(name='PremiumIO', value='True')]
+    restrictions = [SimpleNamespace(reason_code='NotAvailableForSubscription', type='Location')] if restricted else []
+    return SimpleNamespace(name=name, resource_type='virtualMachines', capabilities=capabilities, restrictions=restrictions)
+
+
+class _FakeCmd(object):
+    def __init__(self):
+        from azure.cli.core.mock import DummyCli
+        self.cli_ctx = DummyCli()
+
+    def get_models(self, *attr_args, **kwargs):
+        from azure.cli.core.profiles import get_sdk
+        return get_sdk(self.cli_ctx, kwargs.pop('resource_type'), *attr_args, mod='models', **kwargs)
+
+
+class RepairUtilsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cmd = _FakeCmd()
+        self.compute = mock.MagicMock()
+
+    def test_fetch_compatible_sku(self):
+        source_vm = SimpleNamespace(location='westus', hardware_profile=SimpleNamespace(vm_size='Standard_E4s_v3'))
+        self.compute.resource_skus.list.return_value = [_sku('Standard_E4s_v3'), _sku('Standard_D2s_v3')]
+        self.assertEqual(_fetch_compatible_sku(self.compute, source_vm), 'Standard_E4s_v3')
+        self.compute.resource_skus.list.assert_called_once_with(filter="location eq 'westus'")
+
+        self.compute.resource_skus.list.return_value = [_sku('Standard_E4s_v3', restricted=True), _sku('Standard_D64s_v3', vcpus='64'),
+                                                        _sku('Standard_D4s_v3', restricted=True), _sku('Standard_D2s_v3')]
+        self.assertEqual(_fetch_compatible_sku(self.compute, source_vm), 'Standard_D2s_v3')
+
+        self.compute.resource_skus.list.return_value = [_sku('Standard_D64s_v3', vcpus='64')]
+        self.assertIsNone(_fetch_compatible_sku(self.compute, source_vm))
+
+    def test_invoke_run_command(self):
+        message = SimpleNamespace(message='Enable succeeded: \n[stdout]\nhello\n\n[stderr]\nwarning\n')
+        self.compute.virtual_machines.begin_run_command.return_value.result.return_value = SimpleNamespace(value=[message])
+
+        stdout, stderr = _invoke_run_command(self.cmd, self.compute, 'linux-run-driver.sh', 'vm', 'rg', True,
+                                             ['script_path=./src/linux/hello.sh', 'params=a b=c', 'positional'])
+
+        self.assertEqual((stdout, stderr), ('hello', 'warning'))
+        rg_name, vm_name, run_command_input = self.compute.virtual_machines.begin_run_command.call_args[0]
+        self.assertEqual((rg_name, vm_name, run_command_input.command_id), ('rg', 'vm', 'RunShellScript'))
+        self.assertEqual([(p.name, p.value) for p in run_command_input.parameters],
+                         [('script_path', './src/linux/hello.sh'), ('params', 'a b=c'), ('arg1', 'positional')])
+        self.assertEqual(len(run_command_input.script), 1)
+        self.assertIn('repair-script-library', run_command_input.script[0])
+
+    def test_step_timer_runs_steps_concurrently(self):
+        def _step(result):
+            time.sleep(0.2)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        timer = step_timer(get_logger(__name__))
+        start_time = time.time()
+        results, error = timer.run_concurrently({'a': ('Step a', _step, (1,)), 'b': ('Step b', _step, (ValueError('b failed'),)),
+                                                 'c': ('Step c', _step, (3,))})
+
+        self.assertLess(time.time() - start_time, 0.5)
+        self.assertEqual(results, {'a': 1, 'c': 3})
+        self.assertEqual(str(error), 'b failed')
+        self.assertEqual(sorted(step['step'] for step in timer.report()), ['Step a', 'Step b', 'Step c'])
+        self.assertTrue(all(step['seconds'] >= 0.2 for step in timer.report()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from azext_vm_repair.custom import run_fleet
+
+VM_ID = '/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Compute/virtualMachines/{}'
+LOG = '[Log-Start 01/01/2021 00:00:00]\n[Output 01/01/2021 00:00:01]{output}\n[STATUS]::{status}\n[Log-End 01/01/2021 00:00:02]/logs.txt'
+
+
+def _vm(name):
+    os_type = 'Windows' if name.startswith('win') else 'Linux'
+    return SimpleNamespace(name=name, storage_profile=SimpleNamespace(os_disk=SimpleNamespace(os_type=os_type)))
+
+
+class RunFleetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+        self.cmd = SimpleNamespace(cli_ctx=None)
+
+        compute = mock.MagicMock()
+        compute.virtual_machines.get.side_effect = lambda rg, name: _vm(name)
+        patches = [
+            mock.patch('azext_vm_repair.custom.command_helper'),
+            mock.patch('azext_vm_repair.custom._fetch_run_script_path', return_value='src/linux/fix.sh'),
+            mock.patch('azext_vm_repair.custom._invoke_run_command', side_effect=self._invoke_run_command),
+            mock.patch('azext_vm_repair.custom._list_vm_ids_by_tag', return_value=[VM_ID.format(name) for name in ['lin-ok', 'lin-bad', 'win-1']])
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # The command helper sends telemetry, use a plain return dict instead
+        patches[0].target.command_helper.return_value.init_return_dict.side_effect = dict
+        patches[0].target.command_helper.return_value.compute_client = compute
+
+    def _invoke_run_command(self, cmd, compute_client, script_name, vm_name, rg_name, is_linux, parameters, additional_scripts):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.1)
+        with self.lock:
+            self.running -= 1
+        if vm_name == 'lin-down':
+            raise RuntimeError('VM agent not ready')
+        status = 'ERROR' if vm_name == 'lin-bad' else 'SUCCESS'
+        return LOG.format(output='ran ' + parameters[0], status=status), ''
+
+    def test_concurrency_is_bounded(self):
+        vm_ids = [VM_ID.format('lin-{}'.format(i)) for i in range(6)]
+        result = run_fleet(self.cmd, vm_ids=vm_ids, run_id='linux-fix', max_concurrency=2)
+        self.assertEqual(self.max_running, 2)
+        self.assertEqual(result['summary']['succeeded'], 6)
+        self.assertEqual([row['vm_name'] for row in result['results']], ['lin-{}'.format(i) for i in range(6)])
+        self.assertEqual(result['results'][0]['output'], '[Output 01/01/2021 00:00:01]ran script_path=./src/linux/fix.sh')
+
+    def test_result_matrix(self):
+        vm_ids = [VM_ID.format(name) for name in ['lin-ok', 'lin-bad', 'lin-down', 'win-1']]
+        with mock.patch('sys.stderr') as stderr:
+            result = run_fleet(self.cmd, vm_ids=vm_ids, run_id='linux-fix')
+        self.assertEqual(result['summary'], {'succeeded': 1, 'script_errors': 1, 'failed': 1, 'skipped': 1, 'cancelled': 0})
+        rows = {row['vm_name']: row for row in result['results']}
+        self.assertEqual((rows['lin-bad']['status'], rows['lin-bad']['script_status']), ('SUCCESS', 'ERROR'))
+        self.assertEqual((rows['lin-down']['status'], rows['lin-down']['error_message']), ('ERROR', 'VM agent not ready'))
+        self.assertEqual((rows['win-1']['status'], rows['win-1']['os']), ('SKIPPED', 'Windows'))
+        streamed = ''.join(call[0][0] for call in stderr.write.call_args_list)
+        self.assertIn('[lin-ok] [STATUS]::SUCCESS\n', streamed)
+        self.assertNotIn('[win-1]', streamed)
+
+    def test_tag_query(self):
+        result = run_fleet(self.cmd, tag='patch=faulty', run_id='linux-fix')
+        self.assertEqual(result['summary'], {'succeeded': 1, 'script_errors': 1, 'failed': 0, 'skipped': 1, 'cancelled': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import requests
+
+from azext_vm_repair.exceptions import RunScriptNotFoundForIdError
+from azext_vm_repair.script_catalog import run_script_catalog
+
+SCRIPTS = {
+    '/src/linux/hello.sh': b'echo hello',
+    '/src/windows/hello.ps1': b'Write-Output hello'
+}
+MAP = [
+    {'id': 'linux-hello', 'path': 'src/linux/hello.sh', 'description': 'Linux hello'},
+    {'id': 'win-hello', 'path': 'src/windows/hello.ps1', 'description': 'Windows hello'}
+]
+
+
+class _LibraryHandler(BaseHTTPRequestHandler):
+    """ Serves map.json with an ETag and the scripts, like raw.githubusercontent.com """
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        library = self.server.library
+        library['requests'].append((self.path, self.headers.get('If-None-Match')))
+        if self.path == '/map.json':
+            if self.headers.get('If-None-Match') == library['etag']:
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = json.dumps(library['map']).encode('utf-8')
+            self.send_response(200)
+            self.send_header('ETag', library['etag'])
+        elif self.path in SCRIPTS:
+            body = SCRIPTS[self.path]
+            self.send_response(200)
+        else:
+            body = b''
+            self.send_response(404)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class ScriptCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.server = HTTPServer(('127.0.0.1', 0), _LibraryHandler)
+        self.server.library = {'etag': '"v1"', 'map': MAP, 'requests': []}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.map_url = 'http://127.0.0.1:{}/map.json'.format(self.server.server_port)
+
+    def _catalog(self):
+        catalog = run_script_catalog(self.cache_dir, self.map_url)
+        catalog.refresh()
+        return catalog
+
+    def test_map_revalidated_with_etag(self):
+        catalog = self._catalog()
+        self.assertEqual(catalog.get_script_path('win-hello'), 'src/windows/hello.ps1')
+        with self.assertRaises(RunScriptNotFoundForIdError):
+            catalog.get_script_path('unknown')
+
+        catalog = self._catalog()
+        self.assertEqual(self.server.library['requests'], [('/map.json', None), ('/map.json', '"v1"')])
+        self.assertEqual(catalog.scripts, MAP)
+        self.assertFalse(catalog.is_stale)
+
+        self.server.library.update(etag='"v2"', map=MAP[:1])
+        catalog = self._catalog()
+        self.assertEqual(catalog.scripts, MAP[:1])
+        self.assertEqual(catalog.etag, '"v2"')
+
+    def test_cached_map_used_when_library_unreachable(self):
+        self._catalog()
+        catalog = run_script_catalog(self.cache_dir, 'http://127.0.0.1:1/map.json')
+        catalog.refresh()
+        self.assertTrue(catalog.is_stale)
+        self.assertEqual(catalog.get_script_path('linux-hello'), 'src/linux/hello.sh')
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            run_script_catalog(tempfile.mkdtemp(dir=self.cache_dir), 'http://127.0.0.1:1/map.json').refresh()
+
+    def test_prefetch_stores_scripts_by_content_hash(self):
+        self.server.library['map'] = MAP + [{'id': 'missing', 'path': 'src/missing.sh'}]
+        catalog = self._catalog()
+        self.assertEqual(catalog.prefetch(), ['missing'])
+
+        path = catalog.get_cached_script_file('linux-hello')
+        self.assertEqual(os.path.basename(path), hashlib.sha256(b'echo hello').hexdigest() + '.sh')
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'echo hello')
+        self.assertIsNone(catalog.get_cached_script_file('missing'))
+
+        # Available from the cache alone, and corrupted files are not handed out
+        catalog = run_script_catalog(self.cache_dir, 'http://127.0.0.1:1/map.json')
+        self.assertTrue(catalog.get_cached_script_file('win-hello').endswith('.ps1'))
+        with open(path, 'wb') as f:
+            f.write(b'echo tampered')
+        self.assertIsNone(catalog.get_cached_script_file('linux-hello'))
+
+        # A new map version drops the prefetched scripts of the previous one
+        self.server.library['etag'] = '"v2"'
+        self.assertIsNone(self._catalog().get_cached_script_file('win-hello'))
+
+
+if __name__ == '__main__':
+    unittest.main()